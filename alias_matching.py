@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import fnmatch
 import re
-from typing import Iterable
+from typing import Callable, Iterable, Optional
 
 from werkzeug.exceptions import MethodNotAllowed, NotFound
 from werkzeug.routing import Map, RequestRedirect, Rule
@@ -151,6 +151,98 @@ def matches_path(
     return False
 
 
+PathMatcher = Callable[[str], bool]
+
+_GLOB_SPECIAL_CHARACTERS = "*?["
+
+
+def compile_matcher(
+    match_type: str, pattern: str, ignore_case: bool = False
+) -> Optional[PathMatcher]:
+    """Return a reusable predicate equivalent to :func:`matches_path`.
+
+    The predicate expects a candidate that already starts with ``/``.  ``None``
+    is returned for patterns that can never match (for example an invalid
+    regular expression), mirroring the ``False`` result of ``matches_path``.
+    """
+
+    match_type = (match_type or "literal").lower()
+
+    if match_type == "literal":
+        cleaned_pattern = _normalize_literal_path(_ensure_leading_slash(pattern))
+        if ignore_case:
+            folded = cleaned_pattern.casefold()
+            return lambda candidate: (
+                _normalize_literal_path(candidate).casefold() == folded
+            )
+        return lambda candidate: _normalize_literal_path(candidate) == cleaned_pattern
+
+    if match_type == "glob":
+        translated = fnmatch.translate(_ensure_leading_slash(pattern))
+        flags = re.IGNORECASE if ignore_case else 0
+        compiled = re.compile(translated, flags)
+        return lambda candidate: compiled.fullmatch(candidate) is not None
+
+    if match_type == "regex":
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            compiled = re.compile(pattern, flags)
+        except re.error:
+            return None
+        return lambda candidate: compiled.fullmatch(candidate) is not None
+
+    if match_type == "flask":
+        try:
+            adapter = Map([Rule(_ensure_leading_slash(pattern))]).bind(
+                "", url_scheme="http"
+            )
+        except (ValueError, TypeError, RuntimeError, AttributeError):
+            return None
+
+        def _match_flask(candidate: str) -> bool:
+            try:
+                adapter.match(candidate, method="GET")
+            except (NotFound, MethodNotAllowed):
+                return False
+            except (
+                ValueError,
+                RuntimeError,
+                AttributeError,
+                RequestRedirect,
+            ):  # pragma: no cover - defensive guard for malformed patterns and redirects
+                return False
+            return True
+
+        return _match_flask
+
+    return None
+
+
+def static_prefix(match_type: str, pattern: str, ignore_case: bool = False) -> Optional[str]:
+    """Return the literal text every matching path must start with.
+
+    ``None`` means no prefix can be derived and the pattern must be checked
+    against every path (regular expressions and case-insensitive globs).
+    """
+
+    match_type = (match_type or "literal").lower()
+    cleaned_pattern = _ensure_leading_slash(pattern)
+
+    if match_type == "glob" and not ignore_case:
+        end = len(cleaned_pattern)
+        for special in _GLOB_SPECIAL_CHARACTERS:
+            index = cleaned_pattern.find(special)
+            if index != -1:
+                end = min(end, index)
+        return cleaned_pattern[:end]
+
+    if match_type == "flask":
+        # Flask-style aliases ignore the ignore-case option when matching.
+        return cleaned_pattern.split("<", 1)[0]
+
+    return None
+
+
 def alias_sort_key(match_type: str, pattern: str) -> tuple[int, int]:
     """Return a tuple for consistent alias prioritisation during matching."""
 
@@ -180,8 +272,11 @@ def evaluate_test_strings(
 
 __all__ = [
     "PatternError",
+    "PathMatcher",
     "alias_sort_key",
+    "compile_matcher",
     "evaluate_test_strings",
     "matches_path",
     "normalise_pattern",
+    "static_prefix",
 ]
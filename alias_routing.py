@@ -5,7 +5,7 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, Generator, Iterable, Optional
+from typing import Any, Iterable, Optional
 from urllib.parse import urlsplit
 
 from flask import Response, redirect, request
@@ -13,10 +13,12 @@ from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.exceptions import MethodNotAllowed, NotFound
 from werkzeug.routing import Map, RequestRedirect, Rule
 
-from alias_definition import AliasRouteRule, collect_alias_routes
-from alias_matching import matches_path
+from alias_definition import AliasRouteRule
+from alias_routing_index import get_alias_routing_index
+from database import db
 from db_access import get_aliases, get_variables
 from identity import ensure_default_resources
+from models import Alias
 
 _FLASK_PLACEHOLDER_RE = re.compile(r"<(?:(?P<converter>[^:<>]+):)?(?P<name>[^<>]+)>")
 
@@ -109,34 +111,32 @@ def _variable_map() -> dict[str, str]:
     return result
 
 
-def _alias_routes_in_declaration_order() -> Generator[
-    tuple[Any, AliasRouteRule], None, None
-]:
-    """Yield alias routes in the order they are declared."""
+def _load_alias_sources() -> tuple[list[Any], dict[str, str]]:
+    """Return the aliases and variable map the routing index is built from."""
 
-    aliases = get_aliases()
-    variable_map = _variable_map()
-    for alias in aliases:
-        if not getattr(alias, "enabled", True):
-            continue
-        for route in collect_alias_routes(alias, variables=variable_map):
-            yield alias, route
+    return get_aliases(), _variable_map()
 
 
 def find_matching_alias(path: str) -> Optional[AliasMatch]:
     """Return the first alias route that matches the path.
 
-    Returns the first alias that matches the given path.
+    Routes are looked up in a prebuilt index that is rebuilt only after the
+    alias or variable tables change, so the result matches a scan of the
+    aliases in declaration order without re-parsing every definition.
     """
 
     # Ensure default resources are initialized
     ensure_default_resources()
 
-    # Match against all aliases (no user scoping needed)
-    for alias, route in _alias_routes_in_declaration_order():
-        if matches_path(route.match_type, route.match_pattern, path, route.ignore_case):
-            return AliasMatch(alias=alias, route=route)
-    return None
+    index = get_alias_routing_index(db.engine, _load_alias_sources)
+    entry = index.match(path)
+    if entry is None:
+        return None
+
+    alias = db.session.get(Alias, entry.alias_id) if entry.alias_id is not None else None
+    if alias is None:
+        return None
+    return AliasMatch(alias=alias, route=entry.route)
 
 
 @lru_cache(maxsize=128)
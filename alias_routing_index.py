@@ -0,0 +1,197 @@
+"""Prebuilt routing index used by :func:`alias_routing.find_matching_alias`.
+
+Matching a request path used to walk every enabled alias, re-parse its
+definition and recompile its pattern.  The index below is built once from
+the alias and variable tables and reused until either table changes:
+
+* literal routes live in hash maps keyed by their normalised path,
+* case-sensitive glob and Flask-style routes hang off a character trie keyed
+  by the static prefix of their pattern,
+* everything else (regular expressions, case-insensitive globs) is kept in a
+  short list of precompiled matchers.
+
+Every route remembers its position in declaration order so the index returns
+exactly the route the linear scan would have returned.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from alias_definition import AliasRouteRule, collect_alias_routes
+from alias_matching import PathMatcher, compile_matcher, static_prefix
+from change_tracking import get_table_versions
+
+ALIAS_TABLES = ("alias", "variable")
+
+
+@dataclass(frozen=True)
+class IndexedRoute:
+    """A compiled alias route and the alias it belongs to."""
+
+    order: int
+    alias_id: Any
+    route: AliasRouteRule
+    matcher: PathMatcher
+
+
+@dataclass
+class _TrieNode:
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    routes: list[IndexedRoute] = field(default_factory=list)
+
+
+def _normalize_literal(path: str) -> str:
+    if path == "/":
+        return "/"
+    return path.rstrip("/") or "/"
+
+
+class AliasRoutingIndex:
+    """Lookup structure answering "which alias route matches this path?"."""
+
+    def __init__(self, routes: Iterable[tuple[Any, AliasRouteRule]]) -> None:
+        self._literal: dict[str, IndexedRoute] = {}
+        self._literal_folded: dict[str, IndexedRoute] = {}
+        self._trie = _TrieNode()
+        self._fallback: list[IndexedRoute] = []
+        self.route_count = 0
+
+        for order, (alias_id, route) in enumerate(routes):
+            matcher = compile_matcher(
+                route.match_type, route.match_pattern, route.ignore_case
+            )
+            if matcher is None:
+                continue
+            entry = IndexedRoute(
+                order=order, alias_id=alias_id, route=route, matcher=matcher
+            )
+            self.route_count += 1
+            self._add(entry)
+
+    def _add(self, entry: IndexedRoute) -> None:
+        route = entry.route
+        match_type = (route.match_type or "literal").lower()
+        pattern = route.match_pattern or ""
+
+        if match_type == "literal":
+            key = _normalize_literal("/" + pattern.lstrip("/"))
+            if route.ignore_case:
+                self._literal_folded.setdefault(key.casefold(), entry)
+            else:
+                self._literal.setdefault(key, entry)
+            return
+
+        prefix = static_prefix(match_type, pattern, route.ignore_case)
+        if prefix is None:
+            self._fallback.append(entry)
+            return
+
+        node = self._trie
+        for character in prefix:
+            node = node.children.setdefault(character, _TrieNode())
+        node.routes.append(entry)
+
+    def _candidates(self, candidate: str) -> list[IndexedRoute]:
+        found: list[IndexedRoute] = []
+
+        normalized = _normalize_literal(candidate)
+        literal = self._literal.get(normalized)
+        if literal is not None:
+            found.append(literal)
+        folded = self._literal_folded.get(normalized.casefold())
+        if folded is not None:
+            found.append(folded)
+
+        node: Optional[_TrieNode] = self._trie
+        found.extend(self._trie.routes)
+        for character in candidate:
+            node = node.children.get(character) if node else None
+            if node is None:
+                break
+            found.extend(node.routes)
+
+        found.extend(self._fallback)
+        return found
+
+    def match(self, path: str) -> Optional[IndexedRoute]:
+        """Return the earliest-declared route matching ``path``."""
+
+        if not path:
+            return None
+        candidate = path if path.startswith("/") else "/" + path
+
+        best: Optional[IndexedRoute] = None
+        for entry in sorted(self._candidates(candidate), key=lambda item: item.order):
+            if entry.matcher(candidate):
+                best = entry
+                break
+        return best
+
+
+def build_alias_routing_index(
+    aliases: Iterable[Any], variable_map: Mapping[str, str]
+) -> AliasRoutingIndex:
+    """Return an index over the enabled routes of ``aliases`` in order."""
+
+    def _routes() -> Iterable[tuple[Any, AliasRouteRule]]:
+        for alias in aliases:
+            if not getattr(alias, "enabled", True):
+                continue
+            alias_id = getattr(alias, "id", None)
+            for route in collect_alias_routes(alias, variables=variable_map):
+                yield alias_id, route
+
+    return AliasRoutingIndex(_routes())
+
+
+@dataclass
+class _CachedIndex:
+    versions: tuple[int, ...]
+    index: AliasRoutingIndex
+
+
+_cache_lock = threading.Lock()
+_cache: "weakref.WeakKeyDictionary[Any, _CachedIndex]" = weakref.WeakKeyDictionary()
+
+
+def get_alias_routing_index(
+    engine: Any,
+    loader: Callable[[], tuple[Iterable[Any], Mapping[str, str]]],
+) -> AliasRoutingIndex:
+    """Return the cached index for ``engine``, rebuilding it when stale.
+
+    ``loader`` is called without arguments and must return the
+    ``(aliases, variable_map)`` pair used to build a fresh index.
+    """
+
+    versions = get_table_versions(*ALIAS_TABLES)
+    with _cache_lock:
+        cached = _cache.get(engine)
+    if cached is not None and cached.versions == versions:
+        return cached.index
+
+    aliases, variable_map = loader()
+    index = build_alias_routing_index(aliases, variable_map)
+    with _cache_lock:
+        _cache[engine] = _CachedIndex(versions=versions, index=index)
+    return index
+
+
+def clear_alias_routing_index() -> None:
+    """Drop every cached index so the next lookup rebuilds it."""
+
+    with _cache_lock:
+        _cache.clear()
+
+
+__all__ = [
+    "AliasRoutingIndex",
+    "IndexedRoute",
+    "build_alias_routing_index",
+    "clear_alias_routing_index",
+    "get_alias_routing_index",
+]
@@ -1,21 +1,30 @@
 """Analytics and page view tracking helpers for the Flask app."""
 
-from datetime import datetime
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, NamedTuple, Sequence
 
 from flask import Response, request, session
 from flask_sqlalchemy.pagination import Pagination
 from sqlalchemy.exc import SQLAlchemyError
 
 from db_access import (
-    count_page_views,
-    count_unique_page_view_paths,
-    get_popular_page_paths,
+    count_page_views_by_path,
     paginate_page_views,
     rollback_session,
     save_page_view,
+    save_page_views,
 )
 from models import PageView  # noqa: F401
+from page_view_writer import PendingPageView, get_page_view_writer
+
+POPULAR_PATH_LIMIT = 5
+
+
+class PopularPath(NamedTuple):
+    """A path and how many times it was viewed."""
+
+    path: str
+    count: int
 
 
 def make_session_permanent() -> None:
@@ -50,6 +59,21 @@ def create_page_view_record() -> PageView:
     )
 
 
+def _record_buffered_page_views(views: Sequence[PendingPageView]) -> None:
+    save_page_views(
+        [
+            PageView(
+                path=view.path,
+                method=view.method,
+                user_agent=view.user_agent,
+                ip_address=view.ip_address,
+                viewed_at=view.viewed_at,
+            )
+            for view in views
+        ]
+    )
+
+
 def track_page_view(response: Response) -> Response:
     """Track page views."""
     # Skip tracking in read-only mode
@@ -61,7 +85,19 @@ def track_page_view(response: Response) -> Response:
     try:
         if should_track_page_view(response):
             page_view = create_page_view_record()
-            save_page_view(page_view)
+            writer = get_page_view_writer(_record_buffered_page_views)
+            if writer is None:
+                save_page_view(page_view)
+            else:
+                writer.submit(
+                    PendingPageView(
+                        path=page_view.path,
+                        method=page_view.method,
+                        user_agent=page_view.user_agent,
+                        ip_address=page_view.ip_address,
+                        viewed_at=datetime.now(timezone.utc),
+                    )
+                )
     except (SQLAlchemyError, AttributeError, RuntimeError):
         # Don't let tracking errors break the request (database, attribute, or runtime errors)
         rollback_session()
@@ -73,20 +109,16 @@ def get_history_statistics(
     start: datetime | None = None,
     end: datetime | None = None,
 ) -> Dict[str, Any]:
-    """Calculate history statistics."""
-    # Get total views count
-    total_views = count_page_views(start=start, end=end)
-
-    # Get unique paths count
-    unique_paths = count_unique_page_view_paths(start=start, end=end)
-
-    # Get most visited paths
-    popular_paths = get_popular_page_paths(start=start, end=end)
+    """Calculate history statistics from the hourly and daily rollups."""
+    views_by_path = count_page_views_by_path(start=start, end=end)
+    popular = sorted(views_by_path.items(), key=lambda item: (-item[1], item[0]))
 
     return {
-        "total_views": total_views,
-        "unique_paths": unique_paths,
-        "popular_paths": popular_paths,
+        "total_views": sum(views_by_path.values()),
+        "unique_paths": len(views_by_path),
+        "popular_paths": [
+            PopularPath(path, count) for path, count in popular[:POPULAR_PATH_LIMIT]
+        ],
     }
 
 
@@ -27,6 +27,7 @@ except ImportError:
 
 
 from flask import Flask
+from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 import models  # noqa: F401  # pylint: disable=unused-import
@@ -45,6 +46,7 @@ from cid_presenter import (
     render_cid_link,
 )
 from database import db, init_db
+from db_access import ensure_page_view_rollups, ensure_server_definition_versions
 from db_config import DatabaseConfig
 from identity import ensure_default_resources
 from link_presenter import (
@@ -59,6 +61,7 @@ from link_presenter import (
 from response_formats import register_response_format_handlers
 from routes import main_bp
 from routes.core import internal_error, not_found_error
+from startup_timing import startup_phase
 
 # Load environment variables from .env file
 load_dotenv()
@@ -235,6 +238,15 @@ def create_app(config_override: Optional[dict] = None) -> Flask:
     configured_cid_directory = os.environ.get("CID_DIRECTORY", default_cid_directory)
 
     flask_app.config.setdefault("CID_DIRECTORY", configured_cid_directory)
+    flask_app.config.setdefault(
+        "PROVENANCE_WRITER_MODE", os.environ.get("PROVENANCE_WRITER_MODE", "sync")
+    )
+    flask_app.config.setdefault(
+        "MERMAID_RENDER_MODE", os.environ.get("MERMAID_RENDER_MODE", "background")
+    )
+    flask_app.config.setdefault(
+        "PAGE_VIEW_WRITER_MODE", os.environ.get("PAGE_VIEW_WRITER_MODE", "sync")
+    )
 
     # Set GIT_SHA from environment variable if provided (used in Vercel deployments)
     git_sha = os.environ.get("GIT_SHA")
@@ -365,13 +377,31 @@ def create_app(config_override: Optional[dict] = None) -> Flask:
             logging.info("Skipping database setup due to SKIP_DB_SETUP flag")
         else:
             try:
-                db.create_all()
+                with startup_phase("create_tables"):
+                    db.create_all()
                 logging.info("Database tables created")
             except Exception as e:
                 # Database initialization failure is critical - log and re-raise
                 logging.error("Failed to create database tables: %s", e, exc_info=True)
                 raise
 
+            try:
+                with startup_phase("page_view_rollups"):
+                    if ensure_page_view_rollups():
+                        logging.info("Rebuilt page view rollups")
+            except SQLAlchemyError as e:
+                # History statistics fall back to whatever rollups exist.
+                logging.warning("Failed to build page view rollups: %s", e)
+
+            try:
+                with startup_phase("server_definition_versions"):
+                    if ensure_server_definition_versions():
+                        logging.info("Indexed stored server definition versions")
+            except SQLAlchemyError as e:
+                # History then lists only snapshots stored from now on.
+                db.session.rollback()
+                logging.warning("Failed to index server definition versions: %s", e)
+
             if not testing_mode or cid_directory_overridden or load_cids_in_tests:
                 # Try to load CIDs, but store error if it fails so we can show 500 page
                 # On Vercel/serverless, allow missing CID directory (it may not be deployed)
@@ -382,9 +412,10 @@ def create_app(config_override: Optional[dict] = None) -> Flask:
                     "ALLOW_MISSING_CID_DIRECTORY", False
                 )
                 try:
-                    load_cids_from_directory(
-                        flask_app, allow_missing=allow_missing_cids
-                    )
+                    with startup_phase("load_cids"):
+                        load_cids_from_directory(
+                            flask_app, allow_missing=allow_missing_cids
+                        )
                     flask_app.config["CID_LOAD_ERROR"] = None
                 except RuntimeError as e:
                     # Store the error so we can show it in a 500 error page
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Archive and delete history rows that fall outside the retention policies.
+
+Expired ``page_views``, ``server_invocations`` and ``entity_interactions``
+rows are written to compressed bundle CIDs listed in a manifest CID, then
+deleted in batches; invocation metadata CIDs nothing refers to any more are
+garbage-collected.  Page view rollups are kept, so the history dashboard
+still covers archived periods.
+
+Usage:
+    python apply_retention.py [--page-views-days N] [--page-views-rows N]
+                              [--server-invocations-days N] [...]
+                              [--batch-size 500] [--dry-run] [--vacuum]
+
+Limits not given on the command line come from the
+``RETENTION_<TABLE>_MAX_AGE_DAYS`` / ``RETENTION_<TABLE>_MAX_ROWS``
+environment variables.
+"""
+
+import argparse
+import os
+import sys
+from dataclasses import replace
+from datetime import timedelta
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add script directory to path to enable imports from the application
+# This must happen before importing app modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# pylint: disable=wrong-import-position
+# Rationale: sys.path manipulation required before app imports for standalone script
+from app import create_app
+from database import db
+from retention import (
+    DEFAULT_BATCH_SIZE,
+    RETAINED_TABLES,
+    count_expired,
+    policies_from_config,
+    run_retention,
+)
+
+
+def _option(table: str) -> str:
+    return table.replace("_", "-")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    for table in RETAINED_TABLES:
+        parser.add_argument(
+            f"--{_option(table)}-days",
+            type=int,
+            help=f"Archive {table} older than this many days",
+        )
+        parser.add_argument(
+            f"--{_option(table)}-rows",
+            type=int,
+            help=f"Keep at most this many {table}",
+        )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report expired rows without archiving"
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Reclaim database space afterwards (SQLite only)",
+    )
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        policies = []
+        for policy in policies_from_config(app.config):
+            days = getattr(args, f"{policy.table}_days")
+            rows = getattr(args, f"{policy.table}_rows")
+            if days is not None:
+                policy = replace(policy, max_age=timedelta(days=days))
+            if rows is not None:
+                policy = replace(policy, max_rows=rows)
+            policies.append(policy)
+
+        if not any(policy.enabled for policy in policies):
+            print("No retention limits configured; nothing to do")
+            return 0
+
+        if args.dry_run:
+            for policy in policies:
+                if policy.enabled:
+                    print(f"Would archive {count_expired(policy)} {policy.table}")
+            return 0
+
+        try:
+            report = run_retention(policies, batch_size=args.batch_size)
+        except (SQLAlchemyError, OSError, ValueError) as error:
+            db.session.rollback()
+            print(f"❌ Retention failed: {error}")
+            return 1
+
+        if args.vacuum and db.engine.dialect.name == "sqlite":
+            db.session.commit()
+            with db.engine.connect() as connection:
+                connection.execution_options(isolation_level="AUTOCOMMIT").execute(
+                    text("VACUUM")
+                )
+            print("✓ Vacuumed database")
+
+    for table, count in sorted(report.archived.items()):
+        print(f"✓ Archived {count} {table}")
+    print(f"✓ Collected {len(report.collected_cids)} orphaned invocation CIDs")
+    if report.manifest_cid:
+        print(f"✅ Manifest: {report.manifest_cid}")
+    else:
+        print("✅ Nothing to archive")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""Offline benchmark suite for the request hot paths.
+
+Run ``python -m benchmarks run --size 1k --output results.json`` and compare
+against a stored baseline with
+``python -m benchmarks compare baseline.json results.json``.
+"""
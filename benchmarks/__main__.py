@@ -0,0 +1,128 @@
+"""Command line entry point: ``python -m benchmarks {run,compare} ...``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.compare import (
+    DEFAULT_METRIC,
+    DEFAULT_MIN_DELTA_MS,
+    DEFAULT_THRESHOLD,
+    compare_results,
+    format_comparisons,
+    has_regressions,
+)
+from benchmarks.datasets import SIZES
+from benchmarks.runner import DEFAULT_REPEAT, DEFAULT_WARMUP, run_benchmarks
+from benchmarks.scenarios import SCENARIOS_BY_NAME
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _run(args: argparse.Namespace) -> int:
+    document = run_benchmarks(
+        args.size,
+        args.scenario or None,
+        repeat=args.repeat,
+        warmup=args.warmup,
+    )
+    results = document["results"]
+    broken = [
+        name
+        for name, result in results.items()
+        if result["failures"] >= result["iterations"]
+    ]
+    if broken:
+        # Timings of requests that only ever failed would make a useless
+        # baseline, so do not write them at all.
+        print(
+            f"Not writing results; every request failed in: {', '.join(broken)}",
+            file=sys.stderr,
+        )
+        return 1
+    output = json.dumps(document, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}")
+    else:
+        print(output)
+    failing = [name for name, result in results.items() if result["failures"]]
+    if failing:
+        print(f"Failing scenarios: {', '.join(failing)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    baseline, current = _load(args.baseline), _load(args.current)
+    sizes = {
+        document.get("dataset", {}).get("size") for document in (baseline, current)
+    }
+    if len(sizes) > 1:
+        print(
+            "Warning: baseline and current used different dataset sizes",
+            file=sys.stderr,
+        )
+    comparisons = compare_results(
+        baseline,
+        current,
+        metric=args.metric,
+        threshold=args.threshold,
+        min_delta_ms=args.min_delta_ms,
+    )
+    print(format_comparisons(comparisons, args.metric))
+    if has_regressions(comparisons):
+        print("Performance regressions detected", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Time the scenarios and write JSON results")
+    run.add_argument("--size", choices=sorted(SIZES), default="1k")
+    run.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS_BY_NAME),
+        help="Scenario to run (repeatable; default: all)",
+    )
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    run.add_argument("--output", help="Results file (default: stdout)")
+    run.set_defaults(handler=_run)
+
+    compare = commands.add_parser(
+        "compare", help="Flag regressions against a baseline results file"
+    )
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--metric", default=DEFAULT_METRIC)
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown as a fraction (default: %(default)s)",
+    )
+    compare.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=DEFAULT_MIN_DELTA_MS,
+        help="Ignore differences smaller than this (default: %(default)s)",
+    )
+    compare.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Compare a benchmark results file against a stored baseline."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+DEFAULT_METRIC = "median_ms"
+DEFAULT_THRESHOLD = 0.25
+# Differences smaller than this are timer noise, whatever the ratio.
+DEFAULT_MIN_DELTA_MS = 0.5
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """One scenario's baseline and current timing."""
+
+    scenario: str
+    baseline_ms: Optional[float]
+    current_ms: Optional[float]
+    status: str  # "ok", "regression", "improvement", "new", "missing" or "failing"
+
+    @property
+    def change(self) -> Optional[float]:
+        if not self.baseline_ms or self.current_ms is None:
+            return None
+        return self.current_ms / self.baseline_ms - 1
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    *,
+    metric: str = DEFAULT_METRIC,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+) -> List[Comparison]:
+    """Classify every scenario found in either results document."""
+    baseline_results = baseline.get("results", {})
+    current_results = current.get("results", {})
+    comparisons = []
+    for name in sorted(set(baseline_results) | set(current_results)):
+        before = baseline_results.get(name, {}).get(metric)
+        entry = current_results.get(name)
+        after = entry.get(metric) if entry else None
+
+        if entry is None or after is None:
+            status = "missing"
+        elif entry.get("failures"):
+            status = "failing"
+        elif before is None:
+            status = "new"
+        elif after - before > max(min_delta_ms, before * threshold):
+            status = "regression"
+        elif before - after > max(min_delta_ms, before * threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        comparisons.append(Comparison(name, before, after, status))
+    return comparisons
+
+
+def has_regressions(comparisons: List[Comparison]) -> bool:
+    """Return True when any scenario got slower or started failing."""
+    return any(item.status in {"regression", "failing"} for item in comparisons)
+
+
+def format_comparisons(
+    comparisons: List[Comparison], metric: str = DEFAULT_METRIC
+) -> str:
+    """Return a plain-text table of ``comparisons``."""
+
+    def _ms(value: Optional[float]) -> str:
+        return f"{value:.3f}" if value is not None else "-"
+
+    lines = [f"{'scenario':<16} {'baseline':>12} {'current':>12} {'change':>8}  status"]
+    for item in comparisons:
+        change = f"{item.change:+.1%}" if item.change is not None else "-"
+        lines.append(
+            f"{item.scenario:<16} {_ms(item.baseline_ms):>12} "
+            f"{_ms(item.current_ms):>12} {change:>8}  {item.status}"
+        )
+    lines.append(f"({metric})")
+    return "\n".join(lines)
@@ -0,0 +1,161 @@
+"""Synthetic datasets for the benchmark suite.
+
+Every dataset is generated from its size alone, so two runs of the same
+size time exactly the same content.  Rows are bulk-inserted; only the
+handful of fixture servers that the scenarios call are stored one by one.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from sqlalchemy import insert
+
+from change_tracking import bump_all_tables
+from cid_core import generate_cid
+from cid_presenter import format_cid
+from database import db
+from models import CID, Alias, Server, Variable
+
+SIZES: Dict[str, int] = {"10": 10, "1k": 1_000, "100k": 100_000}
+
+INSERT_CHUNK = 5_000
+
+IO_DEFINITION = (
+    Path(__file__).resolve().parent.parent
+    / "reference"
+    / "templates"
+    / "servers"
+    / "definitions"
+    / "io.py"
+)
+
+# Servers the scenarios invoke, beside the generated ``server-NNNNNN`` rows.
+FIXTURE_SERVERS: Dict[str, str] = {
+    "bench-python": (
+        "def main():\n"
+        '    return {"output": "benchmark", "content_type": "text/plain"}\n'
+    ),
+    "bench-upper": (
+        "def main(payload):\n"
+        '    return {"output": str(payload).upper(), "content_type": "text/plain"}\n'
+    ),
+    "bench-suffix": (
+        "def main(payload):\n"
+        '    return {"output": f"{payload}-suffix", "content_type": "text/plain"}\n'
+    ),
+    "bench-bash": "#!/bin/bash\necho benchmark\n",
+}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """Names of representative rows in a generated dataset."""
+
+    size: str
+    count: int
+    cids: List[str]
+    middle_cid: str
+    middle_alias: str
+    search_term: str
+
+    def as_dict(self) -> Dict[str, int | str]:
+        counts: Dict[str, int | str] = {
+            table: self.count for table in ("aliases", "servers", "variables", "cids")
+        }
+        counts["size"] = self.size
+        return counts
+
+
+def _name(prefix: str, index: int) -> str:
+    return f"{prefix}-{index:06d}"
+
+
+def _cid_content(index: int) -> bytes:
+    # Long enough that the CID is a stored hash rather than literal content.
+    return f"Benchmark CID {index}\n{'lorem ipsum ' * 16}\n".encode("utf-8")
+
+
+def _chunks(rows: Iterator[dict]) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(model, rows: Iterator[dict]) -> None:
+    for chunk in _chunks(rows):
+        db.session.execute(insert(model), chunk)
+
+
+def build_dataset(size: str) -> Dataset:
+    """Populate the current app's database with the ``size`` dataset."""
+    if size not in SIZES:
+        raise ValueError(f"Unknown dataset size {size!r}; choose from {sorted(SIZES)}")
+    count = SIZES[size]
+
+    cids = []
+    cid_rows = []
+    for index in range(count):
+        content = _cid_content(index)
+        cid_value = format_cid(generate_cid(content))
+        cids.append(cid_value)
+        cid_rows.append(
+            {"path": f"/{cid_value}", "stored_data": content, "file_size": len(content)}
+        )
+    _insert(CID, iter(cid_rows))
+    _insert(
+        Alias,
+        (
+            {
+                "name": _name("alias", index),
+                "definition": f"{_name('alias', index)} -> /{cids[index]}",
+            }
+            for index in range(count)
+        ),
+    )
+    _insert(
+        Server,
+        (
+            {
+                "name": _name("server", index),
+                "definition": (
+                    "def main():\n"
+                    f'    return {{"output": "{index}", "content_type": "text/plain"}}\n'
+                ),
+            }
+            for index in range(count)
+        ),
+    )
+    _insert(
+        Variable,
+        (
+            {"name": _name("variable", index), "definition": f"value {index}"}
+            for index in range(count)
+        ),
+    )
+
+    fixtures = dict(FIXTURE_SERVERS)
+    fixtures["io"] = IO_DEFINITION.read_text(encoding="utf-8")
+    db.session.add_all(
+        Server(name=name, definition=definition, enabled=True)
+        for name, definition in fixtures.items()
+    )
+    db.session.commit()
+    bump_all_tables()
+
+    middle = count // 2
+    return Dataset(
+        size=size,
+        count=count,
+        cids=cids,
+        middle_cid=cids[middle],
+        middle_alias=_name("alias", middle),
+        search_term=_name("alias", middle)[:-1],
+    )
@@ -0,0 +1,142 @@
+"""Run benchmark scenarios against an in-memory app and collect timings."""
+
+from __future__ import annotations
+
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+RESULTS_SCHEMA = 1
+DEFAULT_REPEAT = 20
+DEFAULT_WARMUP = 3
+
+
+def _git_sha() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_sha": _git_sha(),
+    }
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Return the summary statistics stored for one scenario."""
+    ordered = sorted(samples_ms)
+    p95_index = min(len(ordered) - 1, max(0, round(0.95 * len(ordered)) - 1))
+    return {
+        "min_ms": round(ordered[0], 4),
+        "median_ms": round(statistics.median(ordered), 4),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p95_ms": round(ordered[p95_index], 4),
+        "max_ms": round(ordered[-1], 4),
+        "stdev_ms": round(statistics.stdev(ordered), 4) if len(ordered) > 1 else 0.0,
+    }
+
+
+def create_benchmark_app():
+    """Return an offline app backed by a fresh in-memory database."""
+    # The module-level app in ``app`` would otherwise be built on import.
+    os.environ.setdefault("VIEWER_SKIP_MODULE_APP", "1")
+    os.environ.setdefault("SESSION_SECRET", "benchmark-secret-key")
+
+    # pylint: disable=import-outside-toplevel
+    from app import create_app
+    from database import db
+    from db_config import DatabaseConfig, DatabaseMode
+
+    DatabaseConfig.set_mode(DatabaseMode.MEMORY)
+    app = create_app({"TESTING": True, "WTF_CSRF_ENABLED": False})
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def run_benchmarks(
+    size: str,
+    scenario_names: Optional[Sequence[str]] = None,
+    *,
+    repeat: int = DEFAULT_REPEAT,
+    warmup: int = DEFAULT_WARMUP,
+    log=print,
+) -> Dict[str, Any]:
+    """Time each scenario on a ``size`` dataset and return the results document."""
+    # pylint: disable=import-outside-toplevel
+    from benchmarks.datasets import build_dataset
+    from benchmarks.scenarios import SCENARIOS, SCENARIOS_BY_NAME
+
+    if scenario_names:
+        unknown = sorted(set(scenario_names) - set(SCENARIOS_BY_NAME))
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(unknown)}")
+        scenarios = [SCENARIOS_BY_NAME[name] for name in scenario_names]
+    else:
+        scenarios = list(SCENARIOS)
+
+    app = create_benchmark_app()
+    client = app.test_client()
+    results: Dict[str, Any] = {}
+
+    with app.app_context():
+        started = time.perf_counter()
+        dataset = build_dataset(size)
+        setup_seconds = time.perf_counter() - started
+        log(f"Built {size} dataset in {setup_seconds:.2f}s")
+
+        for scenario in scenarios:
+            operation = scenario.prepare(app, client, dataset)
+            for _ in range(warmup):
+                operation()
+
+            samples: List[float] = []
+            statuses: Counter = Counter()
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                statuses[operation()] += 1
+                samples.append((time.perf_counter() - started) * 1000)
+
+            summary = summarize(samples)
+            failures = sum(
+                count
+                for status, count in statuses.items()
+                if status not in scenario.ok_statuses
+            )
+            results[scenario.name] = {
+                "description": scenario.description,
+                "iterations": len(samples),
+                **summary,
+                "statuses": {str(status): count for status, count in statuses.items()},
+                "failures": failures,
+            }
+            flag = f"  ({failures} failed)" if failures else ""
+            log(f"{scenario.name:<16} median {summary['median_ms']:>10.3f} ms{flag}")
+
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "dataset": dataset.as_dict(),
+        "setup_seconds": round(setup_seconds, 3),
+        "settings": {"repeat": repeat, "warmup": warmup},
+        "results": results,
+    }
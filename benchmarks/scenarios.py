@@ -0,0 +1,173 @@
+"""Request hot paths timed by the benchmark suite.
+
+Each scenario's ``prepare`` function receives the app, a test client and
+the generated dataset, does any one-off setup, and returns the operation to
+time.  The operation returns the HTTP status it produced so the runner can
+report failures alongside the timings.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from flask import Flask
+from flask.testing import FlaskClient
+
+from benchmarks.datasets import Dataset
+
+Operation = Callable[[], int]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A named operation and the statuses that count as success."""
+
+    name: str
+    description: str
+    prepare: Callable[[Flask, FlaskClient, Dataset], Operation]
+    ok_statuses: frozenset = frozenset({200, 302})
+
+
+def _get(client: FlaskClient, path: str, **kwargs) -> Operation:
+    def operation() -> int:
+        return client.get(path, **kwargs).status_code
+
+    return operation
+
+
+def _export_form() -> Dict[str, str]:
+    return {
+        "include_aliases": "y",
+        "include_servers": "y",
+        "include_variables": "y",
+        "include_cid_map": "y",
+        "submit": "Export",
+    }
+
+
+def _export_cid(client: FlaskClient) -> str:
+    """Run one export and return the CID of its JSON payload."""
+    from db_access import get_exports  # pylint: disable=import-outside-toplevel
+
+    response = client.post("/export", data=_export_form())
+    if response.status_code != 200:
+        raise RuntimeError(
+            f"Export for import benchmark failed: {response.status_code}"
+        )
+    return get_exports(limit=1)[0].cid
+
+
+def _export_payload(client: FlaskClient) -> dict:
+    from db_access import get_cid_by_path  # pylint: disable=import-outside-toplevel
+
+    record = get_cid_by_path(f"/{_export_cid(client)}")
+    return json.loads(record.file_data)
+
+
+def _prepare_export(_app: Flask, client: FlaskClient, _dataset: Dataset) -> Operation:
+    def operation() -> int:
+        return client.post("/export", data=_export_form()).status_code
+
+    return operation
+
+
+def _prepare_import(_app: Flask, client: FlaskClient, _dataset: Dataset) -> Operation:
+    payload = _export_payload(client)
+
+    def operation() -> int:
+        return client.post("/import", json=payload).status_code
+
+    return operation
+
+
+def _prepare_boot_import(
+    app: Flask, client: FlaskClient, _dataset: Dataset
+) -> Operation:
+    # pylint: disable=import-outside-toplevel
+    from boot_cid_importer import import_boot_cid
+
+    boot_cid = _export_cid(client)
+
+    def operation() -> int:
+        success, _error = import_boot_cid(app, boot_cid, use_prebuilt_image=False)
+        return 200 if success else 500
+
+    return operation
+
+
+def _prepare_io_chain(
+    app: Flask, _client: FlaskClient, _dataset: Dataset
+) -> Operation:
+    # pylint: disable=import-outside-toplevel
+    from server_execution.io_execution import execute_io_chain
+
+    # The io server's ``main(*path_segments)`` cannot be mapped from a GET, so
+    # run the chain the way that ``main`` does.
+    path = "/io/bench-upper/bench-python"
+
+    def operation() -> int:
+        with app.test_request_context(path):
+            result = execute_io_chain(path, debug=False)
+        return 200 if result.success else 500
+
+    return operation
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        "cid_serve",
+        "GET /<cid> for stored content",
+        lambda _app, client, dataset: _get(client, f"/{dataset.middle_cid}"),
+    ),
+    Scenario(
+        "alias_redirect",
+        "GET /<alias> resolved to its CID target",
+        lambda _app, client, dataset: _get(client, f"/{dataset.middle_alias}"),
+    ),
+    Scenario(
+        "python_server",
+        "GET /<server> running a Python server",
+        lambda _app, client, _dataset: _get(client, "/bench-python"),
+    ),
+    Scenario(
+        "bash_server",
+        "GET /<server> running a bash server",
+        lambda _app, client, _dataset: _get(client, "/bench-bash"),
+    ),
+    Scenario(
+        "pipeline",
+        "GET of a three-segment server pipeline",
+        lambda _app, client, _dataset: _get(
+            client, "/bench-suffix/bench-upper/bench-python"
+        ),
+    ),
+    Scenario(
+        "io_chain",
+        "execute_io_chain through two servers, as the io server runs it",
+        _prepare_io_chain,
+    ),
+    Scenario(
+        "search_results",
+        "GET /search/results matching ten aliases",
+        lambda _app, client, dataset: _get(
+            client, "/search/results", query_string={"q": dataset.search_term}
+        ),
+    ),
+    Scenario(
+        "export",
+        "POST /export of aliases, servers and variables",
+        _prepare_export,
+    ),
+    Scenario("import", "POST /import of a previous export", _prepare_import),
+    Scenario(
+        "boot_cid_import",
+        "import_boot_cid of a previous export",
+        _prepare_boot_import,
+    ),
+]
+
+SCENARIOS_BY_NAME: Dict[str, Scenario] = {
+    scenario.name: scenario for scenario in SCENARIOS
+}
@@ -11,16 +11,14 @@ from flask import Flask, has_app_context
 
 from cid_presenter import cid_path, format_cid
 from cid_utils import is_normalized_cid
-from db_access import get_cid_by_path
-from models import CID
+from db_access import get_cid_by_path, iter_cid_paths
 
 LOGGER = logging.getLogger(__name__)
 
 
 def get_all_cid_paths_from_db() -> set[str]:
     """Return all CID paths currently in the database."""
-    all_cids = CID.query.all()
-    return {cid.path for cid in all_cids if cid.path}
+    return set(iter_cid_paths())
 
 
 def extract_cid_references_from_payload(payload: dict[str, Any]) -> set[str]:
@@ -180,14 +178,63 @@ def verify_boot_cid_dependencies(boot_cid: str) -> tuple[bool, Optional[str]]:
     return True, None
 
 
-def import_boot_cid(app: Flask, boot_cid: str) -> tuple[bool, Optional[str]]:
+def _pin_boot_image_cids(boot_cid: str, payload: dict[str, Any]) -> None:
+    """Keep the boot CID and everything it brought in safe from eviction."""
+    from readonly_config import ReadOnlyConfig  # pylint: disable=import-outside-toplevel
+
+    if not ReadOnlyConfig.is_read_only_mode():
+        return
+
+    from cid_memory_manager import CIDMemoryManager  # pylint: disable=import-outside-toplevel
+
+    paths = extract_cid_references_from_payload(payload)
+    cid_values = payload.get("cid_values", {})
+    if isinstance(cid_values, dict):
+        paths.update(filter(None, (cid_path(format_cid(key)) for key in cid_values)))
+    paths.add(cid_path(format_cid(boot_cid)) or boot_cid)
+    CIDMemoryManager.pin_cids(paths)
+
+
+def _restore_prebuilt_image(app: Flask, boot_cid: str) -> bool:
+    """Load the prebuilt SQLite image for ``boot_cid`` when one is available."""
+    from boot_image_db import restore_boot_image  # pylint: disable=import-outside-toplevel
+    from cid_directory_loader import (  # pylint: disable=import-outside-toplevel
+        load_cids_from_directory,
+    )
+
+    if not restore_boot_image(boot_cid):
+        return False
+
+    # The image replaced the CIDs loaded at startup; add back any that it
+    # does not already contain.
+    try:
+        load_cids_from_directory(app, allow_missing=True)
+    except RuntimeError as exc:
+        LOGGER.warning("Could not reload CID files after restoring boot image: %s", exc)
+
+    payload, error = load_and_validate_boot_cid(boot_cid)
+    if payload is not None:
+        _pin_boot_image_cids(boot_cid, payload)
+    elif error:
+        LOGGER.warning("Boot image restored but boot CID is unreadable: %s", error)
+    return True
+
+
+def import_boot_cid(
+    app: Flask, boot_cid: str, use_prebuilt_image: bool = True
+) -> tuple[bool, Optional[str]]:
     """Import a boot CID using the same mechanism as the /import page.
 
+    When running on an in-memory database and ``generate_boot_image.py
+    --sqlite`` produced an image for ``boot_cid``, that image is restored
+    instead of replaying the import.
+
     Note: This function must be called within an app.app_context().
 
     Args:
         app: Flask application instance
         boot_cid: The CID value to import
+        use_prebuilt_image: Whether a prebuilt SQLite image may be used
 
     Returns:
         A tuple of (success, error_message)
@@ -199,6 +246,10 @@ def import_boot_cid(app: Flask, boot_cid: str) -> tuple[bool, Optional[str]]:
             f"import_boot_cid must be called within an app context for {app.name!r}"
         )
 
+    if use_prebuilt_image and _restore_prebuilt_image(app, boot_cid):
+        LOGGER.info("Boot CID %s loaded from prebuilt image", boot_cid)
+        return True, None
+
     # First verify dependencies
     success, error = verify_boot_cid_dependencies(boot_cid)
     if not success:
@@ -276,6 +327,8 @@ def import_boot_cid(app: Flask, boot_cid: str) -> tuple[bool, Optional[str]]:
             return False, f"{prefix}Import errors:\n{error_msg}"
         return False, f"Boot CID import failed:\n{error_msg}"
 
+    _pin_boot_image_cids(boot_cid, payload)
+
     # Generate snapshot export after import completes
     from routes.import_export.import_engine import (  # pylint: disable=import-outside-toplevel
         generate_snapshot_export,
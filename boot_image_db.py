@@ -0,0 +1,182 @@
+"""Prebuilt SQLite databases for boot CIDs.
+
+Importing a boot CID replays its JSON through the import engine, which every
+cold start of an in-memory instance (``--read-only``, Vercel) used to pay.
+``generate_boot_image.py --sqlite`` performs that import once and saves the
+resulting database as ``<boot cid>.sqlite3``; at startup
+:func:`restore_boot_image` copies it into the in-memory database with the
+SQLite backup API instead.
+
+Each image records the boot CID and a fingerprint of the model schema, so an
+image built from older models is ignored and the import runs as before.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from change_tracking import bump_all_tables
+from database import db
+from db_config import DatabaseConfig, DatabaseMode
+from db_snapshot import raw_sqlite_connection
+
+LOGGER = logging.getLogger(__name__)
+
+INFO_TABLE = "boot_image_info"
+IMAGE_SUFFIX = ".sqlite3"
+
+
+def boot_image_directory() -> Path:
+    """Return the directory holding prebuilt boot images."""
+    configured = os.environ.get("BOOT_IMAGE_DB_DIR")
+    if configured:
+        return Path(configured)
+    return Path(__file__).parent / "boot_images"
+
+
+def boot_image_path(boot_cid: str, directory: Optional[Path] = None) -> Path:
+    """Return where the prebuilt image for ``boot_cid`` lives."""
+    return (directory or boot_image_directory()) / f"{boot_cid}{IMAGE_SUFFIX}"
+
+
+def schema_fingerprint() -> str:
+    """Return a digest of the mapped tables and columns."""
+    digest = hashlib.sha256()
+    for table in sorted(db.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(table.name.encode("utf-8"))
+        for column in table.columns:
+            digest.update(f"|{column.name}:{column.type}".encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def write_boot_image(boot_cid: str, target_path: Path) -> Path:
+    """Save the current in-memory database as the image for ``boot_cid``.
+
+    Must be called within an app context after the boot CID was imported.
+    """
+    target_path = Path(target_path)
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target_path.with_name(f".{target_path.name}.{os.getpid()}.tmp")
+
+    db.session.commit()
+    with db.engine.connect() as connection:
+        source = raw_sqlite_connection(connection)
+        destination = sqlite3.connect(str(temp_path))
+        try:
+            with destination:
+                source.backup(destination)
+            with destination:
+                destination.execute(
+                    f"CREATE TABLE IF NOT EXISTS {INFO_TABLE} "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                destination.executemany(
+                    f"INSERT OR REPLACE INTO {INFO_TABLE} (key, value) VALUES (?, ?)",
+                    [
+                        ("boot_cid", boot_cid),
+                        ("schema", schema_fingerprint()),
+                        ("created_at", datetime.now(timezone.utc).isoformat()),
+                    ],
+                )
+            destination.execute("VACUUM")
+        finally:
+            destination.close()
+
+    os.replace(temp_path, target_path)
+    return target_path
+
+
+def build_boot_image(
+    boot_cid: str, target_path: Path, cid_directory: Optional[Path] = None
+) -> Path:
+    """Import ``boot_cid`` into a fresh in-memory app and save the database.
+
+    Raises:
+        RuntimeError: If the boot CID cannot be imported
+    """
+    # pylint: disable=import-outside-toplevel
+    from app import create_app
+    from boot_cid_importer import import_boot_cid
+
+    previous_mode = DatabaseConfig.get_mode()
+    DatabaseConfig.set_mode(DatabaseMode.MEMORY)
+    try:
+        config = {"CID_DIRECTORY": str(cid_directory)} if cid_directory else None
+        app = create_app(config)
+        with app.app_context():
+            success, error = import_boot_cid(app, boot_cid, use_prebuilt_image=False)
+            if not success:
+                raise RuntimeError(error or f"Boot CID import failed for {boot_cid}")
+            return write_boot_image(boot_cid, target_path)
+    finally:
+        DatabaseConfig.set_mode(previous_mode)
+
+
+def _read_info(path: Path) -> Optional[dict[str, str]]:
+    try:
+        connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        return dict(connection.execute(f"SELECT key, value FROM {INFO_TABLE}"))
+    except sqlite3.Error:
+        return None
+    finally:
+        connection.close()
+
+
+def restore_boot_image(boot_cid: str, directory: Optional[Path] = None) -> bool:
+    """Replace the in-memory database with the prebuilt image for ``boot_cid``.
+
+    Returns False (leaving the database untouched) when not running on an
+    in-memory database or when no usable image exists. Must be called within
+    an app context, at startup, before any user data has been written.
+    """
+    if not DatabaseConfig.is_memory_mode():
+        return False
+
+    path = boot_image_path(boot_cid, directory)
+    if not path.is_file():
+        return False
+
+    info = _read_info(path)
+    if info is None or info.get("boot_cid") != boot_cid:
+        LOGGER.warning("Ignoring boot image %s: not built for %s", path, boot_cid)
+        return False
+    if info.get("schema") != schema_fingerprint():
+        LOGGER.warning("Ignoring boot image %s: built for a different schema", path)
+        return False
+
+    db.session.commit()
+    db.session.close()
+    source = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        with db.engine.connect() as connection:
+            source.backup(raw_sqlite_connection(connection))
+    finally:
+        source.close()
+
+    # Everything cached from the replaced database is stale.
+    bump_all_tables()
+    from cid_memory_manager import CIDMemoryManager  # pylint: disable=import-outside-toplevel
+
+    CIDMemoryManager.invalidate()
+    LOGGER.info("Restored boot image %s", path)
+    return True
+
+
+__all__ = [
+    "boot_image_directory",
+    "boot_image_path",
+    "build_boot_image",
+    "restore_boot_image",
+    "schema_fingerprint",
+    "write_boot_image",
+]
@@ -0,0 +1,189 @@
+"""Process-wide change counters for database tables.
+
+Caches that are derived from whole tables (alias routing, definition
+snapshots, user context) need a cheap way to tell whether their source rows
+changed.  This module bumps a monotonically increasing version for each
+table whenever the ORM flushes, bulk-updates or deletes rows in it, and for
+every table when the schema is created or dropped.  Consumers compare the
+version they were built against with :func:`get_table_versions` instead of
+re-reading the tables.
+
+Versions are bumped at flush, so the writing transaction sees its own
+changes, and again at commit, when other connections first see them.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from typing import Any, Iterable, Optional
+
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import db
+
+_SESSION_INFO_KEY = "change_tracking_tables"
+_SESSION_DELETED_KEY = "change_tracking_deleted_tables"
+
+_lock = threading.Lock()
+_counter = itertools.count(1)
+_versions: dict[str, int] = {}
+_deletion_versions: dict[str, int] = {}
+_global_version = 0
+
+
+def _bump(tables: Iterable[str], *, deleted: bool = False) -> None:
+    """Assign a fresh version to each of the supplied table names."""
+
+    with _lock:
+        for table in tables:
+            version = next(_counter)
+            _versions[table] = version
+            if deleted:
+                _deletion_versions[table] = version
+
+
+def bump_all_tables() -> None:
+    """Invalidate every table version (used for schema resets and raw writes)."""
+
+    global _global_version  # pylint: disable=global-statement
+    with _lock:
+        _global_version = next(_counter)
+
+
+def mark_tables_changed(*tables: str) -> None:
+    """Record out-of-band writes to the given tables.
+
+    ORM writes are tracked automatically; call this after raw SQL writes.
+    """
+
+    _bump(tables)
+
+
+def get_table_version(table: str) -> int:
+    """Return the current version for a single table."""
+
+    with _lock:
+        return max(_versions.get(table, 0), _global_version)
+
+
+def get_table_versions(*tables: str) -> tuple[int, ...]:
+    """Return the current versions for the supplied tables as a tuple."""
+
+    with _lock:
+        return tuple(max(_versions.get(table, 0), _global_version) for table in tables)
+
+
+def get_deletion_version(table: str) -> int:
+    """Return a version that changes only when rows are deleted from ``table``.
+
+    Caches that merely assume rows still exist (for example a CID they
+    stored earlier) can key on this instead of the much busier table version.
+    """
+
+    with _lock:
+        return max(_deletion_versions.get(table, 0), _global_version)
+
+
+def current_engine() -> Optional[Any]:
+    """Return the engine of the active app, or ``None`` without one.
+
+    Process-wide caches key their entries by engine so several apps (and
+    their separate databases) can coexist in one process.
+    """
+
+    if not has_app_context():
+        return None
+    try:
+        return db.engine
+    except RuntimeError:
+        # The active app is not registered with the SQLAlchemy extension.
+        return None
+
+
+def _tables_for_instances(instances: Iterable[Any]) -> set[str]:
+    tables: set[str] = set()
+    for instance in instances:
+        table = getattr(type(instance), "__table__", None)
+        name = getattr(table, "name", None)
+        if name:
+            tables.add(name)
+    return tables
+
+
+def _pending_tables(session: Session) -> set[str]:
+    return session.info.setdefault(_SESSION_INFO_KEY, set())
+
+
+def _pending_deleted_tables(session: Session) -> set[str]:
+    return session.info.setdefault(_SESSION_DELETED_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session: Session, _flush_context: Any) -> None:
+    tables = _tables_for_instances(
+        itertools.chain(session.new, session.dirty, session.deleted)
+    )
+    if not tables:
+        return
+    _pending_tables(session).update(tables)
+    # Bump immediately so reads inside the same transaction see fresh data.
+    deleted_tables = _tables_for_instances(session.deleted)
+    _pending_deleted_tables(session).update(deleted_tables)
+    _bump(tables - deleted_tables)
+    _bump(deleted_tables, deleted=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_statement(orm_execute_state: Any) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = getattr(getattr(mapper, "local_table", None), "name", None)
+    if table:
+        _pending_tables(orm_execute_state.session).add(table)
+        if orm_execute_state.is_delete:
+            _pending_deleted_tables(orm_execute_state.session).add(table)
+        _bump((table,), deleted=orm_execute_state.is_delete)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    tables = session.info.pop(_SESSION_INFO_KEY, None)
+    deleted_tables = session.info.pop(_SESSION_DELETED_KEY, None) or set()
+    if tables:
+        # Other connections only see the rows now; anything they cached
+        # between the flush and the commit was built from the old rows.
+        _bump(tables - deleted_tables)
+        _bump(deleted_tables, deleted=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _bump_on_rollback(session: Session) -> None:
+    tables = session.info.pop(_SESSION_INFO_KEY, None)
+    session.info.pop(_SESSION_DELETED_KEY, None)
+    if tables:
+        # Anything built from the rolled-back rows is now stale.
+        _bump(tables)
+
+
+@event.listens_for(db.metadata, "after_create")
+def _bump_after_create(*_args: Any, **_kwargs: Any) -> None:
+    bump_all_tables()
+
+
+@event.listens_for(db.metadata, "after_drop")
+def _bump_after_drop(*_args: Any, **_kwargs: Any) -> None:
+    bump_all_tables()
+
+
+__all__ = [
+    "bump_all_tables",
+    "current_engine",
+    "get_deletion_version",
+    "get_table_version",
+    "get_table_versions",
+    "mark_tables_changed",
+]
@@ -0,0 +1,130 @@
+"""Pluggable storage for CID payloads.
+
+By default CID bytes live in the ``cid.file_data`` column.  Setting
+``CID_BLOB_STORE=directory`` moves new payloads to a sharded directory
+(``CID_BLOB_DIR``, default ``cid_blobs``) laid out as ``<prefix>/<cid>``; the
+database row then keeps only the path, size and creation time.  Rows written
+before the switch keep working until ``migrate_cid_blobs.py`` moves them.
+
+Blobs are read through ``mmap`` so callers that accept a ``memoryview`` (see
+:attr:`models.CID.data_view`) never copy the payload.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from cid_core import CID_LENGTH_PREFIX_CHARS
+
+BACKEND_DATABASE = "database"
+BACKEND_DIRECTORY = "directory"
+
+DEFAULT_BLOB_DIR = "cid_blobs"
+SHARD_PREFIX_CHARS = 2
+
+BlobData = Union[bytes, bytearray, memoryview]
+
+
+class DatabaseBlobStore:
+    """Keep payloads in the CID table (the historical behaviour)."""
+
+    name = BACKEND_DATABASE
+    external = False
+
+    def write(self, cid: str, data: BlobData) -> None:  # pragma: no cover - no-op
+        return None
+
+    def read(self, cid: str) -> Optional[memoryview]:
+        return None
+
+    def exists(self, cid: str) -> bool:
+        return False
+
+    def delete(self, cid: str) -> None:  # pragma: no cover - no-op
+        return None
+
+
+class DirectoryBlobStore:
+    """Content-addressed files sharded by the first characters of the digest."""
+
+    name = BACKEND_DIRECTORY
+    external = True
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root)
+
+    def path_for(self, cid: str) -> Path:
+        """Return the file that holds ``cid``.
+
+        The leading characters of a CID encode the content length, so shards
+        use the characters right after that prefix.
+        """
+        name = cid.lstrip("/")
+        digest = name[CID_LENGTH_PREFIX_CHARS:] or name
+        return self.root / digest[:SHARD_PREFIX_CHARS] / name
+
+    def write(self, cid: str, data: BlobData) -> None:
+        target = self.path_for(cid)
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "wb", delete=False, dir=target.parent, prefix=".tmp-"
+        ) as handle:
+            handle.write(data)
+            temp_name = handle.name
+        os.replace(temp_name, target)
+
+    def read(self, cid: str) -> Optional[memoryview]:
+        """Return a read-only view of the blob, or None when it is missing."""
+        try:
+            with open(self.path_for(cid), "rb") as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return memoryview(b"")
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        return memoryview(mapped)
+
+    def exists(self, cid: str) -> bool:
+        return self.path_for(cid).exists()
+
+    def delete(self, cid: str) -> None:
+        try:
+            self.path_for(cid).unlink()
+        except FileNotFoundError:
+            pass
+
+
+BlobStore = Union[DatabaseBlobStore, DirectoryBlobStore]
+
+_lock = threading.Lock()
+_store: Optional[BlobStore] = None
+
+
+def _store_from_environment() -> BlobStore:
+    backend = os.environ.get("CID_BLOB_STORE", BACKEND_DATABASE).strip().lower()
+    if backend == BACKEND_DIRECTORY:
+        return DirectoryBlobStore(os.environ.get("CID_BLOB_DIR") or DEFAULT_BLOB_DIR)
+    return DatabaseBlobStore()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the configured blob store, reading the environment on first use."""
+    global _store  # pylint: disable=global-statement
+    with _lock:
+        if _store is None:
+            _store = _store_from_environment()
+        return _store
+
+
+def configure_blob_store(store: Optional[BlobStore]) -> None:
+    """Install ``store`` (None re-reads the environment on next use)."""
+    global _store  # pylint: disable=global-statement
+    with _lock:
+        _store = store
@@ -2,18 +2,36 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, Optional
 
 from flask import Flask
 
-from cid_utils import generate_cid, is_normalized_cid
-from db_access import create_cid_record, get_cid_by_path
+from cid_core import generate_cid, is_literal_cid
+from cid_memory_manager import CIDMemoryManager
+from cid_utils import is_normalized_cid
+from database import db
+from db_access import get_cid_by_path
+from models import CID
+from readonly_config import ReadOnlyConfig
+from startup_timing import startup_phase
 
 LOGGER = logging.getLogger(__name__)
 
+MANIFEST_VERSION = 1
+# Below this many files to hash, starting worker processes costs more than it saves.
+PARALLEL_MIN_FILES = 64
+EXISTING_LOOKUP_BATCH_SIZE = 500
+# Missing files are read and inserted this many (or this many bytes) at a time.
+INSERT_BATCH_SIZE = 500
+INSERT_BATCH_BYTES = 16 * 1024 * 1024
+
 
 def _describe_invalid_cid_filename(filename: str) -> str:
     """Return a detailed diagnostic for why a CID filename is invalid."""
@@ -122,25 +140,166 @@ def _iter_candidate_files(directory: Path) -> Iterable[Path]:
         yield entry
 
 
-def load_cids_from_directory(app: Flask, allow_missing: bool = False) -> None:
-    """Ensure the database contains CID entries for files in the directory.
+def cid_manifest_path(app: Flask) -> str:
+    """Return where verified CID file fingerprints are cached between boots.
 
-    The directory defaults to ``app.root_path / "cids"`` but can be overridden via
-    the ``CID_DIRECTORY`` configuration option. Each file's name must exactly match
-    the generated CID for its contents. Any mismatch terminates the application
-    immediately.
+    The manifest lives in the app's instance folder unless
+    ``VIEWER_CID_MANIFEST`` names another file.
+    """
+    return os.environ.get("VIEWER_CID_MANIFEST") or os.path.join(
+        app.instance_path, "cid-manifest.json"
+    )
 
-    Args:
-        app: Flask application instance
-        allow_missing: If True, missing directory is treated as empty (no error).
-                      If False, raises RuntimeError when directory doesn't exist.
-                      Defaults to False for backward compatibility.
 
-    Raises:
-        RuntimeError: If directory doesn't exist and allow_missing=False, or if
-                     there are validation errors with CID files.
+def _loader_workers() -> int:
+    try:
+        return int(os.environ.get("CID_LOADER_WORKERS", os.cpu_count() or 1))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def _is_private(handle) -> bool:
+    """Return whether an open manifest is owned by us and writable only by us."""
+    stat = os.fstat(handle.fileno())
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        return False
+    return not stat.st_mode & 0o022
+
+
+def _load_manifest(manifest_path: str) -> dict[str, list]:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as handle:
+            if not _is_private(handle):
+                LOGGER.warning(
+                    "Ignoring CID manifest %s: it is writable by other users",
+                    manifest_path,
+                )
+                return {}
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _save_manifest(manifest_path: str, entries: dict[str, list]) -> None:
+    temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(manifest_path) or ".", mode=0o700, exist_ok=True)
+        descriptor = os.open(
+            temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+            json.dump({"version": MANIFEST_VERSION, "entries": entries}, handle)
+        os.replace(temp_path, manifest_path)
+    except OSError as exc:
+        # A read-only instance folder only costs a rehash next boot.
+        LOGGER.debug("Could not write CID manifest %s: %s", manifest_path, exc)
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def _hash_file(path: str) -> tuple[str, int, int, str]:
+    """Return ``(path, size, mtime_ns, cid)`` for a CID file.
+
+    Module level so it can run in a worker process.
+    """
+    with open(path, "rb") as handle:
+        data = handle.read()
+        stat = os.fstat(handle.fileno())
+    return path, stat.st_size, stat.st_mtime_ns, generate_cid(data)
+
+
+def _hash_files(paths: list[str]) -> Iterator[tuple[str, int, int, str]]:
+    """Hash files, fanning out over a process pool for large directories."""
+    workers = min(_loader_workers(), len(paths))
+    if workers > 1 and len(paths) >= PARALLEL_MIN_FILES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                yield from executor.map(
+                    _hash_file, paths, chunksize=max(len(paths) // (workers * 4), 1)
+                )
+            return
+        except (OSError, NotImplementedError, BrokenProcessPool) as exc:
+            # Some hosts (e.g. serverless sandboxes) cannot start processes.
+            LOGGER.info("Hashing CID files serially: %s", exc)
+    for path in paths:
+        yield _hash_file(path)
+
+
+def _forget_removed_files(
+    manifest: dict[str, list], directory: Path, candidate_files: list[Path]
+) -> bool:
+    """Drop manifest entries for files no longer in ``directory``."""
+    current = {str(file_path.resolve()) for file_path in candidate_files}
+    prefix = os.path.join(str(directory.resolve()), "")
+    removed = [
+        key for key in manifest if key.startswith(prefix) and key not in current
+    ]
+    for key in removed:
+        del manifest[key]
+    return bool(removed)
+
+
+def _is_unchanged(file_path: Path, entry: object) -> bool:
+    """Return whether ``entry`` records this file's current size and mtime."""
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return False
+    return entry == [stat.st_size, stat.st_mtime_ns, file_path.name]
+
+
+def _verify_files(
+    manifest_path: str, directory: Path, candidate_files: list[Path], known: set[str]
+) -> dict[str, str]:
+    """Return ``{file path: generated CID}``, rehashing only changed files.
+
+    A manifest entry is only trusted for files whose CID is already in the
+    database (``known``); files new to the database are always hashed.
     """
+    manifest = _load_manifest(manifest_path)
+    removed = _forget_removed_files(manifest, directory, candidate_files)
+
+    verified: dict[str, str] = {}
+    stale: list[str] = []
+    for file_path in candidate_files:
+        key = str(file_path.resolve())
+        if file_path.name in known and _is_unchanged(file_path, manifest.get(key)):
+            verified[key] = file_path.name
+        else:
+            stale.append(key)
+
+    for path, size, mtime_ns, generated_cid in _hash_files(stale):
+        verified[path] = generated_cid
+        manifest[path] = [size, mtime_ns, generated_cid]
+
+    if stale or removed:
+        _save_manifest(manifest_path, manifest)
+    LOGGER.debug(
+        "Verified %d CID files (%d rehashed)", len(candidate_files), len(stale)
+    )
+    return verified
+
+
+def _existing_cid_sizes(paths: list[str]) -> dict[str, Optional[int]]:
+    """Return stored file sizes for the CID paths already in the database."""
+    sizes: dict[str, Optional[int]] = {}
+    for start in range(0, len(paths), EXISTING_LOOKUP_BATCH_SIZE):
+        chunk = paths[start : start + EXISTING_LOOKUP_BATCH_SIZE]
+        for path, size in db.session.query(CID.path, CID.file_size).filter(
+            CID.path.in_(chunk)
+        ):
+            sizes[path] = size
+    return sizes
 
+
+def _cid_directory(app: Flask, allow_missing: bool) -> Optional[Path]:
+    """Return the configured CID directory, or None when it may be absent."""
     configured_directory = app.config.get("CID_DIRECTORY")
     directory = (
         Path(configured_directory)
@@ -155,7 +314,7 @@ def load_cids_from_directory(app: Flask, allow_missing: bool = False) -> None:
                 "CID directory %s does not exist, skipping CID loading (allow_missing=True)",
                 directory,
             )
-            return
+            return None
         message = f"No CID directory: {directory}"
         LOGGER.error("CID directory %s does not exist: %s", directory, message)
         raise RuntimeError(message)
@@ -164,21 +323,21 @@ def load_cids_from_directory(app: Flask, allow_missing: bool = False) -> None:
         message = f"CID directory {directory} is not a directory"
         LOGGER.error(message)
         raise RuntimeError(message)
+    return directory
+
 
+def _scan_directory(directory: Path) -> list[Path]:
+    """Return the CID files in ``directory``, rejecting invalid filenames."""
     # Try to iterate files from the directory (read-only is fine)
     try:
-        candidate_files = list(_iter_candidate_files(directory))
+        with startup_phase("cids.scan"):
+            candidate_files = list(_iter_candidate_files(directory))
     except (OSError, PermissionError) as e:
         # Directory exists but we can't read from it
         message = f"Cannot read from CID directory {directory}: {e}"
         LOGGER.error(message)
         raise RuntimeError(message) from e
 
-    # If directory is empty, that's fine - just skip loading
-    if not candidate_files:
-        LOGGER.debug("CID directory %s is empty, skipping CID loading", directory)
-        return
-
     for file_path in candidate_files:
         filename = file_path.name
 
@@ -190,9 +349,21 @@ def load_cids_from_directory(app: Flask, allow_missing: bool = False) -> None:
             )
             LOGGER.error(message)
             raise RuntimeError(message)
+    return candidate_files
 
-        file_bytes = file_path.read_bytes()
-        generated_cid = generate_cid(file_bytes)
+
+def _verify_filenames(
+    app: Flask, directory: Path, candidate_files: list[Path], known: set[str]
+) -> None:
+    """Raise unless every file is named after the CID of its contents."""
+    with startup_phase("cids.verify"):
+        generated = _verify_files(
+            cid_manifest_path(app), directory, candidate_files, known
+        )
+
+    for file_path in candidate_files:
+        filename = file_path.name
+        generated_cid = generated[str(file_path.resolve())]
 
         if filename != generated_cid:
             message = (
@@ -202,15 +373,117 @@ def load_cids_from_directory(app: Flask, allow_missing: bool = False) -> None:
             LOGGER.error(message)
             raise RuntimeError(message)
 
-        cid_path = f"/{generated_cid}"
-        existing = get_cid_by_path(cid_path)
 
-        if existing is None:
-            create_cid_record(generated_cid, file_bytes)
-            LOGGER.debug("Loaded CID %s from %s", generated_cid, file_path)
-        else:
-            if existing.file_data != file_bytes:
-                message = f"CID {generated_cid} already exists in the database with different content"
-                LOGGER.error(message)
-                raise RuntimeError(message)
-            LOGGER.debug("CID %s already present in database; skipping", generated_cid)
+def _check_existing(
+    directory: Path, stored: list[str], existing: dict[str, Optional[int]]
+) -> list[str]:
+    """Return the CIDs missing from the database, checking the others match."""
+    missing: list[str] = []
+    for cid_value in stored:
+        cid_path = f"/{cid_value}"
+        if cid_path not in existing:
+            missing.append(cid_value)
+            continue
+        # Content-addressed rows only differ through corruption; compare
+        # sizes cheaply, and bytes when the stored size is unknown.
+        file_size = (directory / cid_value).stat().st_size
+        stored_size = existing[cid_path]
+        differs = stored_size is not None and stored_size != file_size
+        if stored_size is None:
+            record = get_cid_by_path(cid_path)
+            differs = record is not None and record.file_data != (
+                directory / cid_value
+            ).read_bytes()
+        if differs:
+            message = f"CID {cid_value} already exists in the database with different content"
+            LOGGER.error(message)
+            raise RuntimeError(message)
+        LOGGER.debug("CID %s already present in database; skipping", cid_value)
+    return missing
+
+
+def _insert_batch(payloads: dict[str, bytes]) -> None:
+    """Insert one batch of CID files with a single flush and commit."""
+    if ReadOnlyConfig.is_read_only_mode():
+        for content in payloads.values():
+            CIDMemoryManager.check_cid_size(len(content))
+        CIDMemoryManager.ensure_memory_available(
+            sum(len(content) for content in payloads.values())
+        )
+
+    # One flush lets SQLAlchemy batch the rows into multi-row INSERTs while
+    # still running the mapper hooks (blob store, search index).
+    db.session.add_all(
+        CID(path=f"/{cid_value}", file_data=content, file_size=len(content))
+        for cid_value, content in payloads.items()
+    )
+    db.session.commit()
+
+
+def _insert_missing(directory: Path, missing: list[str]) -> None:
+    """Insert CID files that are not in the database, a bounded batch at a time.
+
+    A batch holds at most ``INSERT_BATCH_SIZE`` files or, past its first
+    file, ``INSERT_BATCH_BYTES`` of content.
+    """
+    payloads: dict[str, bytes] = {}
+    batch_bytes = 0
+    for cid_value in missing:
+        content = (directory / cid_value).read_bytes()
+        if payloads and (
+            len(payloads) >= INSERT_BATCH_SIZE
+            or batch_bytes + len(content) > INSERT_BATCH_BYTES
+        ):
+            _insert_batch(payloads)
+            payloads, batch_bytes = {}, 0
+        payloads[cid_value] = content
+        batch_bytes += len(content)
+    if payloads:
+        _insert_batch(payloads)
+    LOGGER.debug("Loaded %d CIDs from %s", len(missing), directory)
+
+
+def load_cids_from_directory(app: Flask, allow_missing: bool = False) -> None:
+    """Ensure the database contains CID entries for files in the directory.
+
+    The directory defaults to ``app.root_path / "cids"`` but can be overridden via
+    the ``CID_DIRECTORY`` configuration option. Each file's name must exactly match
+    the generated CID for its contents. Any mismatch terminates the application
+    immediately.
+
+    Verified ``(path, size, mtime_ns)`` fingerprints are cached in an owner-only
+    manifest (see :func:`cid_manifest_path`), so unchanged files whose CIDs are
+    already in the database are not rehashed on the next boot; other files are
+    hashed, in a process pool when there are many.
+
+    Args:
+        app: Flask application instance
+        allow_missing: If True, missing directory is treated as empty (no error).
+                      If False, raises RuntimeError when directory doesn't exist.
+                      Defaults to False for backward compatibility.
+
+    Raises:
+        RuntimeError: If directory doesn't exist and allow_missing=False, or if
+                     there are validation errors with CID files.
+    """
+    directory = _cid_directory(app, allow_missing)
+    if directory is None:
+        return
+
+    candidate_files = _scan_directory(directory)
+    # If directory is empty, that's fine - just skip loading
+    if not candidate_files:
+        LOGGER.debug("CID directory %s is empty, skipping CID loading", directory)
+        return
+
+    # Literal CIDs embed their content and are never stored.
+    stored = [f.name for f in candidate_files if not is_literal_cid(f.name)]
+    existing = _existing_cid_sizes([f"/{cid_value}" for cid_value in stored])
+    known = {path.lstrip("/") for path in existing}
+
+    _verify_filenames(app, directory, candidate_files, known)
+
+    with startup_phase("cids.insert"):
+        missing = _check_existing(directory, stored, existing)
+        if missing:
+            _insert_missing(directory, missing)
@@ -0,0 +1,232 @@
+"""Shared bookkeeping for tables that memoize results as CIDs.
+
+:mod:`derived_artifacts` and :mod:`server_execution.result_memo` both map a
+key to a ``result_cid`` whose content lives in the CID table. A
+:class:`CIDMemo` holds what they have in common: hit statistics per renderer
+or server, reading a recorded result (and forgetting the record when its CID
+has been evicted), storing a result as a CID before recording it, and
+pruning the table to a maximum number of entries every ``PRUNE_INTERVAL``
+stores.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.exceptions import HTTPException
+
+from cid_core import generate_cid
+from cid_presenter import cid_path, format_cid
+
+LOGGER = logging.getLogger(__name__)
+
+# Prune at most once per this many stores; the table may briefly overshoot.
+PRUNE_INTERVAL = 100
+
+
+def env_int(name: str, default: int) -> int:
+    """Return the integer environment variable ``name`` or ``default``."""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _rollback() -> None:
+    from db_access import rollback_session  # pylint: disable=import-outside-toplevel
+
+    rollback_session()
+
+
+@dataclass
+class MemoStats:
+    """Lookup and store counts for one renderer or server."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+@dataclass(frozen=True)
+class MemoLimits:
+    """Environment variables bounding a memo table, with their defaults."""
+
+    max_bytes_env: str
+    default_max_bytes: int
+    max_entries_env: str
+    default_max_entries: int
+
+
+class CIDMemo:
+    """Statistics, storage and pruning for one CID-backed memo table.
+
+    ``group`` names the per-name section of :meth:`stats` (``"renderers"``,
+    ``"servers"``) and ``prune`` trims the table to a number of entries.
+    Database errors are logged and rolled back, so a failing memo only costs
+    the work it would have saved.
+    """
+
+    def __init__(
+        self,
+        description: str,
+        group: str,
+        limits: MemoLimits,
+        prune: Callable[[int], Any],
+    ) -> None:
+        self.description = description
+        self.group = group
+        self.limits = limits
+        self._prune = prune
+        self._lock = threading.Lock()
+        self._stats: Dict[str, MemoStats] = {}
+        self._stores_since_prune = 0
+
+    def count(self, name: str, field: str) -> None:
+        """Add one to the ``hits``, ``misses`` or ``stores`` count of ``name``."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = MemoStats()
+            setattr(stats, field, getattr(stats, field) + 1)
+
+    def find(self, name: str, get_record: Callable[[], Any]) -> Any:
+        """Return ``get_record()`` without reading its result, counting it."""
+        try:
+            record = get_record()
+        except SQLAlchemyError as exc:
+            LOGGER.warning("%s lookup failed: %s", self.description, exc)
+            _rollback()
+            record = None
+        self.count(name, "misses" if record is None else "hits")
+        return record
+
+    def lookup(
+        self,
+        name: str,
+        get_record: Callable[[], Any],
+        forget: Callable[[], Any],
+    ) -> Optional[Tuple[Any, bytes]]:
+        """Return ``(record, result)`` for ``get_record()``, counting the outcome.
+
+        When the record's result CID is no longer stored, ``forget`` deletes
+        the record and the lookup counts as a miss.
+        """
+        # pylint: disable=import-outside-toplevel
+        from db_access import get_cid_by_path
+
+        found: Optional[Tuple[Any, bytes]] = None
+        try:
+            record = get_record()
+            if record is not None:
+                cid_record = get_cid_by_path(cid_path(record.result_cid) or "")
+                data = getattr(cid_record, "file_data", None)
+                if data is not None:
+                    found = (record, bytes(data))
+                else:
+                    # The result was evicted or deleted; compute it again.
+                    forget()
+        except SQLAlchemyError as exc:
+            LOGGER.warning("%s lookup failed: %s", self.description, exc)
+            _rollback()
+            found = None
+        self.count(name, "misses" if found is None else "hits")
+        return found
+
+    def store(
+        self, name: str, output: bytes, record: Callable[[str], Any]
+    ) -> bool:
+        """Store ``output`` as a CID and ``record(result_cid)`` it.
+
+        Outputs over the size limit are skipped. Returns whether it was stored.
+        """
+        # pylint: disable=import-outside-toplevel
+        from db_access import create_cid_record, get_cid_by_path
+
+        if len(output) > env_int(
+            self.limits.max_bytes_env, self.limits.default_max_bytes
+        ):
+            return False
+        result_cid = format_cid(generate_cid(output))
+
+        def write(cid_value: str) -> None:
+            record_path = cid_path(cid_value)
+            if record_path and get_cid_by_path(record_path) is None:
+                create_cid_record(cid_value, output)
+            record(cid_value)
+
+        return self.record(name, result_cid, write)
+
+    def record(
+        self, name: str, result_cid: str, record: Callable[[str], Any]
+    ) -> bool:
+        """Call ``record(result_cid)`` for an already stored result."""
+        try:
+            record(result_cid)
+        except (SQLAlchemyError, HTTPException, ValueError) as exc:
+            # Read-only deployments may refuse to store more content; the
+            # result itself was still produced.
+            LOGGER.warning(
+                "Could not store %s for %s: %s", self.description, name, exc
+            )
+            if isinstance(exc, SQLAlchemyError):
+                _rollback()
+            return False
+
+        self.count(name, "stores")
+        with self._lock:
+            self._stores_since_prune += 1
+            prune = self._stores_since_prune >= PRUNE_INTERVAL
+            if prune:
+                self._stores_since_prune = 0
+        if prune:
+            self.prune()
+        return True
+
+    def prune(self) -> None:
+        """Trim the table to its configured maximum number of entries."""
+        try:
+            self._prune(
+                env_int(self.limits.max_entries_env, self.limits.default_max_entries)
+            )
+        except SQLAlchemyError as exc:
+            LOGGER.warning("Could not prune %s table: %s", self.description, exc)
+            _rollback()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return overall and per-name hit statistics."""
+        with self._lock:
+            named = {
+                name: stats.as_dict() for name, stats in sorted(self._stats.items())
+            }
+        hits = sum(stats["hits"] for stats in named.values())
+        misses = sum(stats["misses"] for stats in named.values())
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            self.group: named,
+        }
+
+    def reset(self) -> None:
+        """Zero the statistics and the prune countdown."""
+        with self._lock:
+            self._stats.clear()
+            self._stores_since_prune = 0
+
+
+__all__ = ["CIDMemo", "MemoLimits", "MemoStats", "PRUNE_INTERVAL", "env_int"]
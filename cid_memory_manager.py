@@ -1,11 +1,35 @@
 # cid_memory_manager.py
-"""CID memory management for read-only mode."""
+"""CID memory management for read-only mode.
 
+Stored CID bytes are tracked in process: the total is seeded with one query
+per database engine and then adjusted as CID rows are committed or deleted,
+so inserts no longer sum the table. When space is needed an eviction policy
+picks victims, which are removed in a single transaction. Policies:
+
+* ``gds`` (default): GreedyDual-Size. Priority is ``L + 1/size`` and ``L``
+  rises to each victim's priority, so large blobs go first unless they keep
+  being read. With no access history this evicts largest first.
+* ``lru``: least recently stored or read.
+* ``lfu``: least frequently read, oldest first among ties.
+
+Access is recorded by the CID lookup helpers in :mod:`db_access.cids`. CIDs
+imported from a boot image can be pinned so they are never evicted.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
 import logging
-from typing import Optional
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from flask import abort
-from sqlalchemy import func
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
 
 from database import db
 from models import CID
@@ -13,6 +37,283 @@ from readonly_config import ReadOnlyConfig
 
 logger = logging.getLogger(__name__)
 
+_SESSION_INFO_KEY = "cid_memory_changes"
+
+
+class EvictionPolicy(ABC):
+    """Orders evictable CIDs; pinned CIDs are never handed to a policy."""
+
+    name = ""
+
+    @abstractmethod
+    def add(self, path: str, size: int) -> None:
+        """Start tracking a stored CID."""
+
+    @abstractmethod
+    def access(self, path: str) -> None:
+        """Record a read of a tracked CID."""
+
+    @abstractmethod
+    def remove(self, path: str) -> None:
+        """Stop tracking a CID that was deleted outside eviction."""
+
+    @abstractmethod
+    def pop_victim(self) -> Optional[str]:
+        """Remove and return the next CID to evict, or None when empty."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of tracked CIDs."""
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evict the least recently stored or read CID."""
+
+    name = "lru"
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, path: str, size: int) -> None:
+        self._entries[path] = None
+        self._entries.move_to_end(path)
+
+    def access(self, path: str) -> None:
+        if path in self._entries:
+            self._entries.move_to_end(path)
+
+    def remove(self, path: str) -> None:
+        self._entries.pop(path, None)
+
+    def pop_victim(self) -> Optional[str]:
+        if not self._entries:
+            return None
+        path, _ = self._entries.popitem(last=False)
+        return path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LFUPolicy(EvictionPolicy):
+    """Evict the least frequently read CID, oldest first among ties."""
+
+    name = "lfu"
+
+    def __init__(self) -> None:
+        self._frequency: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_frequency = 0
+
+    def _unlink(self, path: str) -> Optional[int]:
+        frequency = self._frequency.pop(path, None)
+        if frequency is None:
+            return None
+        bucket = self._buckets[frequency]
+        del bucket[path]
+        if not bucket:
+            del self._buckets[frequency]
+        return frequency
+
+    def _link(self, path: str, frequency: int) -> None:
+        self._frequency[path] = frequency
+        self._buckets.setdefault(frequency, OrderedDict())[path] = None
+
+    def add(self, path: str, size: int) -> None:
+        self._unlink(path)
+        self._link(path, 1)
+        self._min_frequency = 1
+
+    def access(self, path: str) -> None:
+        frequency = self._unlink(path)
+        if frequency is None:
+            return
+        self._link(path, frequency + 1)
+        if frequency == self._min_frequency and frequency not in self._buckets:
+            self._min_frequency = frequency + 1
+
+    def remove(self, path: str) -> None:
+        self._unlink(path)
+
+    def pop_victim(self) -> Optional[str]:
+        if not self._frequency:
+            return None
+        if self._min_frequency not in self._buckets:
+            # Only after explicit removals; frequencies are few in practice.
+            self._min_frequency = min(self._buckets)
+        path = next(iter(self._buckets[self._min_frequency]))
+        self._unlink(path)
+        return path
+
+    def __len__(self) -> int:
+        return len(self._frequency)
+
+
+class GreedyDualSizePolicy(EvictionPolicy):
+    """GreedyDual-Size with unit cost: priority ``L + 1/size``."""
+
+    name = "gds"
+
+    def __init__(self) -> None:
+        self._inflation = 0.0
+        self._sizes: Dict[str, int] = {}
+        self._priority: Dict[str, Tuple[float, int]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+
+    def _push(self, path: str) -> None:
+        entry = (self._inflation + 1.0 / max(self._sizes[path], 1), next(self._counter))
+        self._priority[path] = entry
+        heapq.heappush(self._heap, (entry[0], entry[1], path))
+
+    def add(self, path: str, size: int) -> None:
+        self._sizes[path] = size
+        self._push(path)
+
+    def access(self, path: str) -> None:
+        if path in self._sizes:
+            self._push(path)
+
+    def remove(self, path: str) -> None:
+        # Heap entries are discarded lazily when they surface.
+        self._sizes.pop(path, None)
+        self._priority.pop(path, None)
+
+    def pop_victim(self) -> Optional[str]:
+        while self._heap:
+            priority, sequence, path = heapq.heappop(self._heap)
+            if self._priority.get(path) != (priority, sequence):
+                continue
+            self._inflation = priority
+            self.remove(path)
+            return path
+        return None
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+
+EVICTION_POLICIES = {
+    policy.name: policy for policy in (GreedyDualSizePolicy, LRUPolicy, LFUPolicy)
+}
+
+
+class _MemoryState:
+    """Byte accounting, eviction order and metrics for one database engine."""
+
+    def __init__(self, policy_name: str) -> None:
+        self.policy_name = policy_name
+        self.policy: EvictionPolicy = EVICTION_POLICIES[policy_name]()
+        self.sizes: Dict[str, int] = {}
+        self.pinned: set[str] = set()
+        self.total_bytes = 0
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_evicted = 0
+
+    def load(self) -> None:
+        rows = db.session.query(
+            CID.path, func.coalesce(CID.file_size, func.length(CID.file_data))
+        ).order_by(CID.created_at.asc(), CID.id.asc())
+        self.policy = EVICTION_POLICIES[self.policy_name]()
+        self.sizes.clear()
+        self.total_bytes = 0
+        for path, size in rows:
+            self.add(path, int(size or 0))
+        self.loaded = True
+
+    def add(self, path: str, size: int) -> None:
+        self.discard(path)
+        self.sizes[path] = size
+        self.total_bytes += size
+        if path not in self.pinned:
+            self.policy.add(path, size)
+
+    def discard(self, path: str) -> None:
+        size = self.sizes.pop(path, None)
+        if size is not None:
+            self.total_bytes -= size
+            self.policy.remove(path)
+
+
+_lock = threading.RLock()
+_states: "weakref.WeakKeyDictionary[Any, _MemoryState]" = weakref.WeakKeyDictionary()
+
+
+def _state(load: bool = True) -> _MemoryState:
+    """Return the state for the current engine, seeding it when needed."""
+    engine = db.engine
+    policy_name = ReadOnlyConfig.get_cid_eviction_policy()
+    with _lock:
+        state = _states.get(engine)
+        if state is None:
+            state = _states[engine] = _MemoryState(policy_name)
+        elif state.policy_name != policy_name:
+            state.policy_name = policy_name
+            state.loaded = False
+        if load and not state.loaded:
+            state.load()
+        return state
+
+
+def _engine_for(session: Session) -> Any:
+    bind = session.get_bind()
+    return getattr(bind, "engine", bind)
+
+
+def _queue_change(target: CID, size: Optional[int]) -> None:
+    session = object_session(target)
+    if session is None or not target.path:
+        return
+    session.info.setdefault(_SESSION_INFO_KEY, []).append((target.path, size))
+
+
+@event.listens_for(CID, "after_insert")
+def _track_insert(_mapper: Any, _connection: Any, target: CID) -> None:
+    _queue_change(target, int(target.file_size or 0))
+
+
+@event.listens_for(CID, "after_delete")
+def _track_delete(_mapper: Any, _connection: Any, target: CID) -> None:
+    _queue_change(target, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    changes = session.info.pop(_SESSION_INFO_KEY, None)
+    if not changes:
+        return
+    with _lock:
+        state = _states.get(_engine_for(session))
+        if state is None or not state.loaded:
+            return
+        for path, size in changes:
+            if size is None:
+                state.discard(path)
+            else:
+                state.add(path, size)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_delete(orm_execute_state: Any) -> None:
+    if not orm_execute_state.is_delete:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not CID:
+        return
+    with _lock:
+        state = _states.get(_engine_for(orm_execute_state.session))
+        if state is not None:
+            # Bulk deletes skip the mapper events; reseed on next use.
+            state.loaded = False
+
 
 class CIDMemoryManager:
     """Manage CID storage within memory limits in read-only mode."""
@@ -24,8 +325,7 @@ class CIDMemoryManager:
         Returns:
             Total size in bytes
         """
-        result = db.session.query(func.sum(CID.file_size)).scalar()
-        return result or 0
+        return _state().total_bytes
 
     @staticmethod
     def check_cid_size(content_size: int) -> None:
@@ -50,52 +350,104 @@ class CIDMemoryManager:
             abort(413, description="Content too large for read-only mode memory limit")
 
     @staticmethod
-    def ensure_memory_available(required_bytes: int) -> None:
-        """Ensure enough memory is available by evicting largest CIDs if needed.
+    def record_access(path: str, found: bool) -> None:
+        """Record a CID lookup for eviction ordering and hit-ratio metrics.
 
         Args:
-            required_bytes: Bytes needed for new CID
+            path: CID path that was looked up
+            found: Whether the CID was stored
         """
         if not ReadOnlyConfig.is_read_only_mode():
             return
 
-        max_memory = ReadOnlyConfig.get_max_cid_memory()
-        current_size = CIDMemoryManager.get_total_cid_size()
-        available = max_memory - current_size
+        with _lock:
+            state = _state()
+            if found:
+                state.hits += 1
+                state.policy.access(path)
+            else:
+                state.misses += 1
 
-        if required_bytes <= available:
-            return
+    @staticmethod
+    def pin_cids(paths: Iterable[str]) -> int:
+        """Exempt CIDs (for example a boot image) from eviction.
 
-        # Need to free up space - delete largest CIDs until we have enough room
-        needed = required_bytes - available
-        freed = 0
+        Args:
+            paths: CID paths, with or without the leading slash
 
-        logger.info(
-            "Need to free %d bytes for new CID (current: %d, max: %d)",
-            needed,
-            current_size,
-            max_memory,
-        )
+        Returns:
+            Number of paths newly pinned
+        """
+        added = 0
+        with _lock:
+            state = _state(load=False)
+            for path in paths:
+                normalized = f"/{path.lstrip('/')}"
+                if normalized in state.pinned:
+                    continue
+                state.pinned.add(normalized)
+                state.policy.remove(normalized)
+                added += 1
+        return added
 
-        evicted = 0
-        while freed < needed:
-            # Find the largest CID
-            largest = CID.query.order_by(CID.file_size.desc()).first()
+    @staticmethod
+    def invalidate() -> None:
+        """Reseed byte accounting on next use (after replacing the database)."""
+        with _lock:
+            state = _state(load=False)
+            state.loaded = False
+
+    @staticmethod
+    def ensure_memory_available(required_bytes: int) -> None:
+        """Ensure enough memory is available by evicting CIDs if needed.
 
-            if not largest:
-                # No more CIDs to delete
-                logger.error("Cannot free enough memory for new CID")
-                abort(413, description="Cannot free enough memory for new CID")
+        Victims are chosen by the configured eviction policy and deleted in
+        one transaction.
 
-            freed_size = largest.file_size or 0
-            logger.info("Evicting CID %s (size: %d bytes)", largest.path, freed_size)
+        Args:
+            required_bytes: Bytes needed for new CID
+        """
+        if not ReadOnlyConfig.is_read_only_mode():
+            return
 
-            db.session.delete(largest)
-            freed += freed_size
-            evicted += 1
+        max_memory = ReadOnlyConfig.get_max_cid_memory()
+        with _lock:
+            state = _state()
+            current_size = state.total_bytes
+            available = max_memory - current_size
+            if required_bytes <= available:
+                return
+
+            needed = required_bytes - available
+            logger.info(
+                "Need to free %d bytes for new CID (current: %d, max: %d)",
+                needed,
+                current_size,
+                max_memory,
+            )
 
+            victims: List[str] = []
+            freed = 0
+            while freed < needed:
+                path = state.policy.pop_victim()
+                if path is None:
+                    # Put the candidates back; nothing was deleted.
+                    for victim in victims:
+                        state.policy.add(victim, state.sizes.get(victim, 0))
+                    logger.error("Cannot free enough memory for new CID")
+                    abort(413, description="Cannot free enough memory for new CID")
+                victims.append(path)
+                freed += state.sizes.get(path, 0)
+
+        for chunk in _chunks(victims, 500):
+            for record in CID.query.filter(CID.path.in_(chunk)):
+                db.session.delete(record)
         db.session.commit()
-        logger.info("Freed %d bytes by evicting %d CID(s)", freed, evicted)
+
+        with _lock:
+            state.evictions += len(victims)
+            state.bytes_evicted += freed
+        logger.info("Freed %d bytes by evicting %d CID(s)", freed, len(victims))
 
     @staticmethod
     def store_cid_with_limit_check(cid_path: str, content: bytes) -> Optional[CID]:
@@ -125,3 +477,27 @@ class CIDMemoryManager:
         # Extract CID from path (remove leading /)
         cid_value = cid_path.lstrip("/")
         return create_cid_record_raw(cid_value, content)
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """Return byte accounting and eviction metrics for the current engine."""
+        with _lock:
+            state = _state(load=False)
+            lookups = state.hits + state.misses
+            return {
+                "policy": state.policy_name,
+                "max_bytes": ReadOnlyConfig.get_max_cid_memory(),
+                "tracked_bytes": state.total_bytes if state.loaded else None,
+                "tracked_cids": len(state.sizes) if state.loaded else None,
+                "pinned": len(state.pinned),
+                "hits": state.hits,
+                "misses": state.misses,
+                "hit_ratio": state.hits / lookups if lookups else None,
+                "evictions": state.evictions,
+                "bytes_evicted": state.bytes_evicted,
+            }
+
+
+def _chunks(values: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
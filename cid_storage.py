@@ -5,10 +5,13 @@ the database, including support for server, variable, and secret definitions.
 """
 
 import json
-from typing import Any, Union
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import db_access
 
+from change_tracking import current_engine, get_deletion_version, get_table_version
 from cid import CID, to_cid_string
 from cid_core import generate_cid, is_literal_cid
 from cid_presenter import cid_path, format_cid
@@ -152,6 +155,90 @@ def store_cid_from_json(json_content: str) -> str:
     return store_cid_from_bytes(json_bytes)
 
 
+# ============================================================================
+# DEFINITIONS SNAPSHOT CACHE
+# ============================================================================
+
+# Snapshot kind -> table whose rows it serializes.
+_DEFINITIONS_TABLES = {
+    "servers": "server",
+    "variables": "variable",
+    "secrets": "secret",
+}
+
+_definitions_lock = threading.Lock()
+_definitions_cids: "weakref.WeakKeyDictionary[Any, Dict[str, Tuple[Tuple[int, int], str]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _definitions_stamp(kind: str) -> Tuple[int, int]:
+    """Return the versions a cached definitions CID for ``kind`` depends on.
+
+    The CID changes when the definitions table is written to, and the stored
+    record may disappear when CID rows are deleted.
+    """
+    return (get_table_version(_DEFINITIONS_TABLES[kind]), get_deletion_version("cid"))
+
+
+def _cached_definitions_cid(kind: str) -> Optional[str]:
+    engine = current_engine()
+    if engine is None:
+        return None
+    with _definitions_lock:
+        entry = _definitions_cids.get(engine, {}).get(kind)
+    if entry is None or entry[0] != _definitions_stamp(kind):
+        return None
+    return entry[1]
+
+
+def _remember_definitions_cid(
+    kind: str, stamp: Tuple[int, int], cid_value: str
+) -> str:
+    engine = current_engine()
+    if engine is not None:
+        with _definitions_lock:
+            _definitions_cids.setdefault(engine, {})[kind] = (stamp, cid_value)
+    return cid_value
+
+
+def _store_definitions_cid(kind: str, generate_json: Callable[[], str]) -> str:
+    stamp = _definitions_stamp(kind)
+    json_bytes = generate_json().encode("utf-8")
+    cid_value = format_cid(generate_cid(json_bytes))
+    ensure_cid_exists(cid_value, json_bytes)
+    return _remember_definitions_cid(kind, stamp, cid_value)
+
+
+def _current_definitions_cid(kind: str, generate_json: Callable[[], str]) -> str:
+    cached = _cached_definitions_cid(kind)
+    if cached is not None:
+        return cached
+
+    stamp = _definitions_stamp(kind)
+    json_bytes = generate_json().encode("utf-8")
+    cid_value = format_cid(generate_cid(json_bytes))
+
+    cid_record_path = cid_path(cid_value)
+    content = get_cid_content(cid_record_path) if cid_record_path else None
+    if not content:
+        ensure_cid_exists(cid_value, json_bytes)
+    return _remember_definitions_cid(kind, stamp, cid_value)
+
+
+def get_definitions_snapshot_cids() -> Dict[str, str]:
+    """Return the current servers, variables and secrets snapshot CIDs.
+
+    Each value is recomputed only after its table has changed, so calling
+    this on every server invocation is cheap.
+    """
+    return {
+        "servers": get_current_server_definitions_cid(),
+        "variables": get_current_variable_definitions_cid(),
+        "secrets": get_current_secret_definitions_cid(),
+    }
+
+
 # ============================================================================
 # SERVER DEFINITIONS
 # ============================================================================
@@ -188,27 +275,19 @@ def store_server_definitions_cid() -> str:
     Returns:
         CID string
     """
-    json_content = generate_all_server_definitions_json()
-    return store_cid_from_json(json_content)
+    return _store_definitions_cid("servers", generate_all_server_definitions_json)
 
 
 def get_current_server_definitions_cid() -> str:
     """Get the CID for the current server definitions JSON.
 
-    Creates the CID if it doesn't exist.
+    Creates the CID if it doesn't exist. The value is cached until the
+    server table changes.
 
     Returns:
         CID string
     """
-    json_content = generate_all_server_definitions_json()
-    json_bytes = json_content.encode("utf-8")
-    cid_value = format_cid(generate_cid(json_bytes))
-
-    cid_record_path = cid_path(cid_value)
-    content = get_cid_content(cid_record_path) if cid_record_path else None
-    if content:
-        return cid_value
-    return store_server_definitions_cid()
+    return _current_definitions_cid("servers", generate_all_server_definitions_json)
 
 
 # ============================================================================
@@ -242,27 +321,19 @@ def store_variable_definitions_cid() -> str:
     Returns:
         CID string
     """
-    json_content = generate_all_variable_definitions_json()
-    return store_cid_from_json(json_content)
+    return _store_definitions_cid("variables", generate_all_variable_definitions_json)
 
 
 def get_current_variable_definitions_cid() -> str:
     """Get the CID for the current variable definitions JSON.
 
-    Creates the CID if it doesn't exist.
+    Creates the CID if it doesn't exist. The value is cached until the
+    variable table changes.
 
     Returns:
         CID string
     """
-    json_content = generate_all_variable_definitions_json()
-    json_bytes = json_content.encode("utf-8")
-    cid_value = format_cid(generate_cid(json_bytes))
-
-    cid_record_path = cid_path(cid_value)
-    content = get_cid_content(cid_record_path) if cid_record_path else None
-    if content:
-        return cid_value
-    return store_variable_definitions_cid()
+    return _current_definitions_cid("variables", generate_all_variable_definitions_json)
 
 
 # ============================================================================
@@ -296,28 +367,16 @@ def store_secret_definitions_cid() -> str:
     Returns:
         CID string
     """
-    json_content = generate_all_secret_definitions_json()
-    json_bytes = json_content.encode("utf-8")
-    cid_value = format_cid(generate_cid(json_bytes))
-
-    ensure_cid_exists(cid_value, json_bytes)
-    return cid_value
+    return _store_definitions_cid("secrets", generate_all_secret_definitions_json)
 
 
 def get_current_secret_definitions_cid() -> str:
     """Get the CID for the current secret definitions JSON.
 
-    Creates the CID if it doesn't exist.
+    Creates the CID if it doesn't exist. The value is cached until the
+    secret table changes.
 
     Returns:
         CID string
     """
-    json_content = generate_all_secret_definitions_json()
-    json_bytes = json_content.encode("utf-8")
-    cid_value = format_cid(generate_cid(json_bytes))
-
-    cid_record_path = cid_path(cid_value)
-    content = get_cid_content(cid_record_path) if cid_record_path else None
-    if content:
-        return cid_value
-    return store_secret_definitions_cid()
+    return _current_definitions_cid("secrets", generate_all_secret_definitions_json)
@@ -89,6 +89,7 @@ from cid_storage import (
     get_current_secret_definitions_cid,
     get_current_server_definitions_cid,
     get_current_variable_definitions_cid,
+    get_definitions_snapshot_cids,
     store_cid_from_bytes,
     store_cid_from_json,
     store_secret_definitions_cid,
@@ -7,6 +7,7 @@ from typing import Optional, Tuple
 from urllib.parse import urlparse
 
 from flask import Flask
+from sqlalchemy.orm import undefer
 
 from cid_core import is_normalized_cid, normalize_component, is_probable_cid_component
 from cid_presenter import cid_path
@@ -164,7 +165,7 @@ def list_boot_cids() -> list[Tuple[str, dict]]:
         List of tuples: (cid_value, metadata)
         where metadata includes: size, created_at, sections
     """
-    all_cids = CID.query.all()
+    all_cids = CID.query.options(undefer(CID.stored_data)).all()
     boot_cids = []
 
     for cid_record in all_cids:
@@ -303,11 +304,20 @@ OPTIONS:
     --dump-db-on-exit FILE
                         Dump the in-memory database to FILE on exit
     --snapshot NAME     Create an in-memory database snapshot with the given NAME
+    --snapshot-parent NAME
+                        Only record rows added since snapshot NAME (differential)
+    --snapshot-compression {none,gzip,zstd}
+                        Compress the snapshot file (default: none)
     --list-snapshots    List available in-memory database snapshots and exit
     --read-only         Run in read-only mode (blocks state changes, uses in-memory DB)
     --max-cid-memory SIZE
                         Maximum memory for CID storage in read-only mode (default: 1G)
                         Supports K, M, G, T units (e.g., 512M, 2G)
+    --cid-eviction-policy {gds,lru,lfu}
+                        CIDs evicted first when that memory is full (default: gds)
+                        gds favours small and recently read CIDs; see /meta/caches
+    --async-provenance  Record server invocation provenance on a background thread
+                        (queued records are flushed on exit)
 
 ARGUMENTS:
     URL                 A URL to make a GET request to (must start with http://, https://, or /)
@@ -5,7 +5,7 @@ import argparse
 import re
 
 from db_config import DatabaseConfig, DatabaseMode
-from readonly_config import ReadOnlyConfig
+from readonly_config import CID_EVICTION_POLICIES, DEFAULT_CID_EVICTION_POLICY, ReadOnlyConfig
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -57,6 +57,20 @@ def parse_arguments() -> argparse.Namespace:
         help="List available in-memory database snapshots and exit",
     )
 
+    parser.add_argument(
+        "--snapshot-parent",
+        type=str,
+        metavar="NAME",
+        help="Make the --snapshot differential against an existing snapshot",
+    )
+
+    parser.add_argument(
+        "--snapshot-compression",
+        choices=("none", "gzip", "zstd"),
+        default="none",
+        help="Compression for --snapshot files (default: none)",
+    )
+
     parser.add_argument(
         "--read-only",
         action="store_true",
@@ -70,6 +84,13 @@ def parse_arguments() -> argparse.Namespace:
         help="Maximum memory for CID storage in read-only mode (default: 1G, e.g., 100M, 2G)",
     )
 
+    parser.add_argument(
+        "--cid-eviction-policy",
+        choices=CID_EVICTION_POLICIES,
+        default=DEFAULT_CID_EVICTION_POLICY,
+        help="Which CIDs to evict when read-only CID memory is full (default: gds)",
+    )
+
     return parser.parse_args()
 
 
@@ -123,3 +144,6 @@ def configure_from_args(args: argparse.Namespace) -> None:
                 ReadOnlyConfig.set_max_cid_memory(max_bytes)
             except ValueError as e:
                 raise ValueError(f"Invalid --max-cid-memory value: {e}") from e
+
+        if getattr(args, "cid_eviction_policy", None):
+            ReadOnlyConfig.set_cid_eviction_policy(args.cid_eviction_policy)
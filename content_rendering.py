@@ -6,11 +6,15 @@ including GitHub-style Markdown, Mermaid diagrams, and Formdown forms.
 
 import base64
 import html
+import logging
+import os
 import re
+import threading
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import requests
+from flask import current_app, has_app_context
 from sqlalchemy.exc import SQLAlchemyError
 
 try:
@@ -26,7 +30,12 @@ except ModuleNotFoundError as exc:  # pragma: no cover
 from cid_core import generate_cid, base64url_encode
 from cid_presenter import cid_path, format_cid
 from cid_storage import ensure_cid_exists, get_cid_content
+from db_config import DatabaseConfig
+from derived_artifacts import find_derived_cid, record_derived_cid, source_cid_for
 from formdown_renderer import render_formdown_html
+from mermaid_render_worker import MermaidRenderWorker
+
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
@@ -40,6 +49,19 @@ MARKDOWN_EXTENSIONS = [
     "sane_lists",
 ]
 
+# Bump whenever render_markdown_document output changes, so rendered pages
+# cached by derived_artifacts are produced again.
+MARKDOWN_RENDERER_VERSION = "1"
+
+# Mermaid diagrams: "background" renders off the request path, "sync" inline
+MERMAID_MODE_BACKGROUND = "background"
+MERMAID_MODE_SYNC = "sync"
+# Derived-artifact name and version for source -> stored SVG mappings
+MERMAID_ARTIFACT = "mermaid_svg"
+MERMAID_RENDERER_VERSION = "1"
+# Marks figures whose stored SVG is still being rendered
+MERMAID_PENDING_ATTRIBUTE = "data-mermaid-pending"
+
 # Patterns to detect markdown content
 MARKDOWN_INDICATOR_PATTERNS = [
     re.compile(r"(^|\n)#{1,6}\s+\S"),  # Headers
@@ -328,16 +350,43 @@ class MermaidRenderLocation:
 
 
 class MermaidRenderer:
-    """Render Mermaid diagrams through mermaid.ink and store them as CIDs."""
+    """Render Mermaid diagrams through mermaid.ink and store them as CIDs.
+
+    Inside an app context backed by an on-disk or server database (unless
+    ``MERMAID_RENDER_MODE`` is ``sync``) diagrams are rendered off the
+    request path: an unseen diagram is returned as a pending figure that
+    points at the renderer's remote URL while a worker thread fetches the
+    SVG, stores it as a CID and records the source-to-SVG mapping as a
+    derived artifact, so every process reuses it.  In-memory databases
+    always render inline, since a worker would share the request's
+    connection.
+
+    The renderer endpoint comes from the constructor, the app's
+    ``MERMAID_RENDERER_URL`` or the environment variable of the same name,
+    so a local stand-in service can replace mermaid.ink.
+    """
 
     API_ENDPOINT = "https://mermaid.ink/svg"
     REMOTE_SVG_BASE = "https://mermaid.ink/svg/"
     REQUEST_TIMEOUT_SECONDS = 20
 
-    def __init__(self) -> None:
+    def __init__(self, endpoint: Optional[str] = None) -> None:
         """Initialize the renderer with a session and cache."""
         self._session = requests.Session()
         self._cache: Dict[str, MermaidRenderLocation] = {}
+        self._endpoint = endpoint
+        self._worker: Optional[MermaidRenderWorker] = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        """Return the URL that Mermaid source is posted to."""
+        configured = self._endpoint
+        if not configured and has_app_context():
+            configured = current_app.config.get("MERMAID_RENDERER_URL")
+        if not configured:
+            configured = os.environ.get("MERMAID_RENDERER_URL")
+        return (configured or self.API_ENDPOINT).rstrip("/")
 
     def render_html(self, source: str) -> str:
         """Render Mermaid diagram source to HTML figure element.
@@ -359,6 +408,16 @@ class MermaidRenderer:
         if cached is not None:
             return self._build_html(cached, normalized)
 
+        if self._renders_in_background():
+            location = self._persisted_location(normalized)
+            if location is None:
+                self._schedule(normalized)
+                return self._build_html(
+                    self._remote_location(normalized), normalized, pending=True
+                )
+            self._cache[normalized] = location
+            return self._build_html(location, normalized)
+
         location: Optional[MermaidRenderLocation]
         try:
             svg_bytes = self._fetch_svg(normalized)
@@ -374,6 +433,8 @@ class MermaidRenderer:
                 # Fall back to data URL
                 data_url = self._build_data_url(svg_bytes)
                 location = MermaidRenderLocation(is_cid=False, value=data_url)
+            else:
+                self._remember(normalized, location)
 
         if location is None:
             raise MermaidRenderingError("Mermaid renderer failed to produce an image")
@@ -381,8 +442,79 @@ class MermaidRenderer:
         self._cache[normalized] = location
         return self._build_html(location, normalized)
 
+    @staticmethod
+    def _renders_in_background() -> bool:
+        if not has_app_context() or "sqlalchemy" not in current_app.extensions:
+            return False
+        # In-memory databases share one connection, so a worker commit would
+        # also commit (or roll back) the request's open transaction.
+        if DatabaseConfig.is_memory_mode():
+            return False
+        mode = str(current_app.config.get("MERMAID_RENDER_MODE") or MERMAID_MODE_BACKGROUND)
+        return mode.lower() != MERMAID_MODE_SYNC
+
+    @staticmethod
+    def _source_cid(source: str) -> str:
+        return source_cid_for(source.encode("utf-8"))
+
+    def _persisted_location(self, source: str) -> Optional[MermaidRenderLocation]:
+        """Return the stored SVG recorded for ``source`` by any process."""
+        svg_cid = find_derived_cid(
+            MERMAID_ARTIFACT, MERMAID_RENDERER_VERSION, self._source_cid(source)
+        )
+        if svg_cid is None:
+            return None
+        return MermaidRenderLocation(is_cid=True, value=svg_cid)
+
+    def _remember(self, source: str, location: MermaidRenderLocation) -> None:
+        """Record a stored SVG so later renders (in any process) reuse it."""
+        if location.is_cid:
+            record_derived_cid(
+                MERMAID_ARTIFACT,
+                MERMAID_RENDERER_VERSION,
+                self._source_cid(source),
+                location.value,
+            )
+
+    def _schedule(self, source: str) -> None:
+        app = current_app._get_current_object()  # pylint: disable=protected-access
+        with self._worker_lock:
+            worker = self._worker
+            if worker is None or worker.app is not app:
+                if worker is not None:
+                    worker.stop()
+                worker = self._worker = MermaidRenderWorker(self, app)
+        worker.submit(source)
+
+    def render_in_background(self, source: str) -> None:
+        """Fetch, store and record one diagram (called on the worker thread)."""
+        svg_bytes = self._fetch_svg(source)
+        if not svg_bytes:
+            raise MermaidRenderingError("Mermaid renderer returned no data")
+        location = self._store_svg(svg_bytes)
+        if location is None:
+            raise MermaidRenderingError("Could not store rendered Mermaid diagram")
+        self._remember(source, location)
+        self._cache[source] = location
+
+    def wait_for_background_renders(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued diagrams are rendered; False if ``timeout`` passes."""
+        worker = self._worker
+        return worker.flush(timeout) if worker is not None else True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and background queue counters."""
+        worker = self._worker
+        stats: Dict[str, Any] = {
+            "endpoint": self.endpoint,
+            "memory_entries": len(self._cache),
+        }
+        if worker is not None:
+            stats.update(worker.stats())
+        return stats
+
     def _fetch_svg(self, source: str) -> bytes:
-        """Fetch SVG from mermaid.ink API.
+        """Fetch SVG from the configured renderer endpoint.
 
         Args:
             source: Mermaid diagram source
@@ -394,7 +526,7 @@ class MermaidRenderer:
             requests.RequestException: If fetch fails
         """
         response = self._session.post(
-            self.API_ENDPOINT,
+            self.endpoint,
             data=source.encode("utf-8"),
             timeout=self.REQUEST_TIMEOUT_SECONDS,
             headers={"Content-Type": "text/plain"},
@@ -451,35 +583,38 @@ class MermaidRenderer:
         """
         return base64url_encode(source.encode("utf-8"))
 
-    @classmethod
-    def _remote_location(cls, source: str) -> Optional[MermaidRenderLocation]:
-        """Build a remote URL for mermaid.ink rendering.
+    def _remote_location(self, source: str) -> MermaidRenderLocation:
+        """Build a remote URL that renders the diagram on the endpoint.
 
         Args:
             source: Mermaid diagram source
 
         Returns:
-            Location pointing to remote mermaid.ink URL
+            Location pointing to the remote SVG URL
         """
-        encoded = cls._encode_source(source)
-        remote_url = f"{cls.REMOTE_SVG_BASE}{encoded}"
+        encoded = self._encode_source(source)
+        remote_url = f"{self.endpoint}/{encoded}"
         return MermaidRenderLocation(is_cid=False, value=remote_url)
 
     @classmethod
-    def _build_html(cls, location: MermaidRenderLocation, source: str) -> str:
+    def _build_html(
+        cls, location: MermaidRenderLocation, source: str, *, pending: bool = False
+    ) -> str:
         """Build HTML figure element for the diagram.
 
         Args:
             location: Where the diagram is stored
             source: Original Mermaid source (for data attribute)
+            pending: Mark the figure as awaiting a stored rendering
 
         Returns:
             HTML figure element
         """
         escaped_src = html.escape(location.img_src(), quote=True)
         encoded_diagram = cls._encode_source(source)
+        pending_attr = f' {MERMAID_PENDING_ATTRIBUTE}="true"' if pending else ""
         return (
-            f'<figure class="mermaid-diagram" data-mermaid-source="{encoded_diagram}">\n'
+            f'<figure class="mermaid-diagram" data-mermaid-source="{encoded_diagram}"{pending_attr}>\n'
             f'  <img src="{escaped_src}" alt="Mermaid diagram" loading="lazy" decoding="async">\n'
             f"</figure>\n"
         )
@@ -489,6 +624,11 @@ class MermaidRenderer:
 _mermaid_renderer = MermaidRenderer()
 
 
+def get_mermaid_render_stats() -> Dict[str, Any]:
+    """Return statistics for the shared Mermaid renderer."""
+    return _mermaid_renderer.stats()
+
+
 def replace_mermaid_fences(text: str) -> Tuple[str, bool]:
     """Replace ```mermaid fences with rendered diagram figures.
 
@@ -594,6 +734,12 @@ def render_markdown_document(text: str) -> str:
     return _build_html_document(title, body)
 
 
+def markdown_renderer_version() -> str:
+    """Return the version under which rendered Markdown documents are cached."""
+    library_version = getattr(markdown, "__version__", "unavailable")
+    return f"{MARKDOWN_RENDERER_VERSION}/markdown-{library_version}"
+
+
 def _build_html_document(title: str, body: str) -> str:
     """Build a complete HTML document with styling.
 
@@ -5,13 +5,20 @@ including caching, content type detection, and special rendering modes.
 """
 
 import base64
+import codecs
 import io
+import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from email.utils import parsedate_to_datetime
-from typing import Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
-from flask import Response, make_response, render_template, request
+from flask import (
+    Response,
+    make_response,
+    render_template,
+    request,
+)
 
 try:
     import qrcode  # type: ignore[import-not-found]
@@ -21,8 +28,14 @@ except ModuleNotFoundError as exc:  # pragma: no cover
 else:
     _qrcode_import_error = None
 
-from content_rendering import decode_text_safely, render_markdown_document
+from content_rendering import (
+    MERMAID_PENDING_ATTRIBUTE,
+    decode_text_safely,
+    markdown_renderer_version,
+    render_markdown_document,
+)
 from cid_presenter import cid_path
+from derived_artifacts import render_derived, source_cid_for
 from mime_utils import extract_filename_from_cid_path, get_mime_type_from_extension
 
 
@@ -38,6 +51,9 @@ QR_EXT = ".qr"
 # HTTP header constants
 HEADER_IF_NONE_MATCH = "If-None-Match"
 HEADER_IF_MODIFIED_SINCE = "If-Modified-Since"
+HEADER_IF_RANGE = "If-Range"
+HEADER_ACCEPT_RANGES = "Accept-Ranges"
+HEADER_CONTENT_RANGE = "Content-Range"
 
 # Content type constants
 CONTENT_TYPE_HTML_UTF8 = "text/html; charset=utf-8"
@@ -49,6 +65,13 @@ CONTENT_TYPE_TEXT_PLAIN = "text/plain"
 # QR code configuration
 QR_CODE_BOX_SIZE = 12
 QR_CODE_BORDER = 4
+# Bump when the QR image output changes (see derived_artifacts)
+QR_IMAGE_VERSION = "1"
+
+# Range requests
+# Requests asking for more ranges than this are answered with the full body
+MAX_BYTE_RANGES = 16
+HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
 # Caching configuration
 # CIDs are content-addressed (immutable), so we can cache them indefinitely
@@ -261,7 +284,9 @@ def _process_content_body(
 
     # Handle markdown rendering
     if path_info.is_markdown_html:
-        rendered = _serve_markdown_html(response_body)
+        rendered = _serve_markdown_html(
+            response_body, path_info.normalized_cid or source_cid_for(response_body)
+        )
         if rendered:
             return rendered, CONTENT_TYPE_HTML
 
@@ -316,7 +341,7 @@ def _add_response_headers(
     # Since CIDs are content-addressed, the content is immutable
     response.headers["ETag"] = etag
     response.headers["Last-Modified"] = cid_content.created_at.strftime(
-        "%a, %d %b %Y %H:%M:%S GMT"
+        HTTP_DATE_FORMAT
     )
     response.headers["Cache-Control"] = CACHE_CONTROL_IMMUTABLE
     response.headers["Expires"] = CACHE_EXPIRES_HEADER
@@ -342,11 +367,197 @@ def _parse_if_modified_since(header_value: str) -> Optional[datetime]:
         return None
 
 
+# ============================================================================
+# RANGE REQUESTS
+# ============================================================================
+
+ByteRange = Tuple[int, int]
+ChunkReader = Callable[[int, int], Iterable[bytes]]
+
+
+def _needs_full_body(path_info: PathInfo) -> bool:
+    """Return True when the served bytes depend on the whole stored body.
+
+    QR pages and rendered markdown transform the content.  Text re-encoding
+    never changes valid UTF-8, so those cases only need to be decoded to pick
+    the content type (see :func:`_sniff_streamed_content_type`).
+    """
+    return path_info.is_qr or path_info.is_markdown_html
+
+
+def _is_utf8_stream(chunks: Iterable[bytes]) -> bool:
+    """Return True if the concatenated ``chunks`` decode as UTF-8."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in chunks:
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _sniff_streamed_content_type(
+    cid_content, content_type: str, path_info: PathInfo
+) -> str:
+    """Return the content type for a streamed body.
+
+    Mirrors the text handling in :func:`_process_content_body`: the whole
+    body is decoded, chunk by chunk, before it is labelled as UTF-8 text.
+    """
+    sniffs_text = (
+        path_info.is_text
+        or content_type == CONTENT_TYPE_TEXT_PLAIN
+        or (
+            content_type == CONTENT_TYPE_OCTET_STREAM
+            and not path_info.has_extension
+        )
+    )
+    if not sniffs_text:
+        return content_type
+
+    if _is_utf8_stream(cid_content.iter_data()):
+        return CONTENT_TYPE_TEXT_UTF8
+    return CONTENT_TYPE_TEXT_PLAIN if path_info.is_text else content_type
+
+
+def _if_range_matches(etag: str, cid_content) -> bool:
+    """Evaluate If-Range against the ETag and Last-Modified we would send.
+
+    Returns True when there is no If-Range header, so Range applies.
+    """
+    if_range = request.if_range
+    if if_range.etag is not None:
+        return f'"{if_range.etag}"' == etag
+    if if_range.date is not None:
+        return if_range.date.strftime(HTTP_DATE_FORMAT) == cid_content.created_at.strftime(
+            HTTP_DATE_FORMAT
+        )
+    return not request.headers.get(HEADER_IF_RANGE)
+
+
+def _requested_byte_ranges(
+    length: int, etag: str, cid_content
+) -> Optional[List[ByteRange]]:
+    """Return the satisfiable ``[start, stop)`` ranges requested by the client.
+
+    Returns None when the full body should be sent: no usable Range header,
+    a stale If-Range validator, or more than ``MAX_BYTE_RANGES`` ranges.  An
+    empty list means the Range header cannot be satisfied (416).
+
+    Example:
+        >>> # Range: bytes=0-9,-5 against a 100 byte body
+        >>> _requested_byte_ranges(100, etag, record)
+        [(0, 10), (95, 100)]
+    """
+    if request.method not in {"GET", "HEAD"}:
+        return None
+
+    byte_range = request.range
+    if byte_range is None or byte_range.units != "bytes":
+        return None
+    if len(byte_range.ranges) > MAX_BYTE_RANGES:
+        return None
+    if not _if_range_matches(etag, cid_content):
+        return None
+
+    satisfiable: List[ByteRange] = []
+    for start, stop in byte_range.ranges:
+        if start < 0:
+            start, stop = max(0, length + start), length
+        else:
+            stop = length if stop is None else min(stop, length)
+        if start < stop:
+            satisfiable.append((start, stop))
+    return satisfiable
+
+
+def _content_range(start: int, stop: int, length: int) -> str:
+    return f"bytes {start}-{stop - 1}/{length}"
+
+
+def _multipart_byteranges(
+    ranges: List[ByteRange], length: int, content_type: str, read: ChunkReader
+) -> Tuple[Iterator[bytes], int, str]:
+    """Build a multipart/byteranges body.
+
+    Returns (body_iterator, content_length, boundary).
+    """
+    boundary = uuid.uuid4().hex
+    headers = [
+        (
+            f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+            f"{HEADER_CONTENT_RANGE}: {_content_range(start, stop, length)}\r\n\r\n"
+        ).encode("ascii")
+        for start, stop in ranges
+    ]
+    closing = f"--{boundary}--\r\n".encode("ascii")
+    total = (
+        sum(len(header) + (stop - start) + 2 for header, (start, stop) in zip(headers, ranges))
+        + len(closing)
+    )
+
+    def generate() -> Iterator[bytes]:
+        for header, (start, stop) in zip(headers, ranges):
+            yield header
+            yield from read(start, stop)
+            yield b"\r\n"
+        yield closing
+
+    return generate(), total, boundary
+
+
+def _make_range_response(
+    ranges: List[ByteRange],
+    length: int,
+    content_type: str,
+    read: ChunkReader,
+) -> Response:
+    """Create a 206 (or 416 when ``ranges`` is empty) response."""
+    if not ranges:
+        response = make_response("", 416)
+        response.headers[HEADER_CONTENT_RANGE] = f"bytes */{length}"
+        response.headers[HEADER_ACCEPT_RANGES] = "bytes"
+        return response
+
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+        body: Iterable[bytes] = read(start, stop)
+        content_length = stop - start
+        mimetype = content_type
+    else:
+        body, content_length, boundary = _multipart_byteranges(
+            ranges, length, content_type, read
+        )
+        mimetype = f"multipart/byteranges; boundary={boundary}"
+
+    response = Response(body, status=206)
+    response.headers["Content-Type"] = mimetype
+    response.headers["Content-Length"] = content_length
+    if len(ranges) == 1:
+        response.headers[HEADER_CONTENT_RANGE] = _content_range(*ranges[0], length)
+    return response
+
+
 # ============================================================================
 # CONTENT SERVING
 # ============================================================================
 
 
+def _is_not_modified(etag: str, cid_content) -> bool:
+    """Return True if If-None-Match or If-Modified-Since allow a 304."""
+    if request.headers.get(HEADER_IF_NONE_MATCH) == etag:
+        return True
+
+    # Check If-Modified-Since header
+    if_modified_since_header = request.headers.get(HEADER_IF_MODIFIED_SINCE)
+    if if_modified_since_header:
+        if_modified_since = _parse_if_modified_since(if_modified_since_header)
+        if if_modified_since and if_modified_since >= cid_content.created_at:
+            return True
+    return False
+
+
 def serve_cid_content(cid_content, path: str) -> Optional[Response]:
     """Serve CID content with appropriate headers and caching.
 
@@ -357,7 +568,8 @@ def serve_cid_content(cid_content, path: str) -> Optional[Response]:
     - Auto-detection for other content
 
     Args:
-        cid_content: CID content record with file_data and created_at
+        cid_content: CID content record with created_at and either file_data
+            or file_size plus iter_data
         path: Request path (e.g., "/CID.filename.ext")
 
     Returns:
@@ -372,9 +584,18 @@ def serve_cid_content(cid_content, path: str) -> Optional[Response]:
         This function implements HTTP conditional requests (304 Not Modified)
         for efficient bandwidth usage. Since CIDs are content-addressed,
         we can cache them indefinitely.
+
+        Range and If-Range requests are answered with 206 (multipart/byteranges
+        for several ranges) or 416. Records that provide ``iter_data`` (see
+        ``db_access.StreamedCIDRecord``) are streamed in chunks whenever the
+        body is served unchanged, which includes plain and auto-detected
+        text; only QR pages and rendered markdown need the whole body.
     """
     # Validate input
-    if cid_content is None or cid_content.file_data is None:
+    if cid_content is None:
+        return None
+    streamable = callable(getattr(cid_content, "iter_data", None))
+    if not streamable and cid_content.file_data is None:
         return None
 
     # Parse path information
@@ -383,29 +604,52 @@ def serve_cid_content(cid_content, path: str) -> Optional[Response]:
     # Determine content type
     content_type = _determine_content_type(path, path_info)
 
-    # Process content body based on request mode
-    response_body, final_content_type = _process_content_body(
-        cid_content.file_data, content_type, path_info
-    )
-
     # Handle conditional requests (304 Not Modified)
     etag = f'"{path_info.target_cid}"'
-    if request.headers.get(HEADER_IF_NONE_MATCH) == etag:
+    if _is_not_modified(etag, cid_content):
         return _make_304_response(etag, cid_content)
 
-    # Check If-Modified-Since header
-    if_modified_since_header = request.headers.get(HEADER_IF_MODIFIED_SINCE)
-    if if_modified_since_header:
-        if_modified_since = _parse_if_modified_since(if_modified_since_header)
-        if if_modified_since and if_modified_since >= cid_content.created_at:
-            return _make_304_response(etag, cid_content)
+    # Stream stored bytes that are served unchanged; everything else is
+    # processed in memory as before.
+    streamed = streamable and not _needs_full_body(path_info)
+    response_body = b""
+    if streamed:
+        final_content_type = _sniff_streamed_content_type(
+            cid_content, content_type, path_info
+        )
+        length = cid_content.file_size
+
+        def read(start: int, stop: int) -> Iterable[bytes]:
+            return cid_content.iter_data(start, stop)
 
-    # Build full response
-    response = make_response(response_body)
-    response.headers["Content-Type"] = final_content_type
-    response.headers["Content-Length"] = len(response_body)
+    else:
+        response_body, final_content_type = _process_content_body(
+            cid_content.file_data, content_type, path_info
+        )
+        length = len(response_body)
+
+        def read(start: int, stop: int) -> Iterable[bytes]:
+            return [response_body[start:stop]]
+
+    ranges = _requested_byte_ranges(length, etag, cid_content)
+    if ranges is not None:
+        response = _make_range_response(
+            ranges, length, final_content_type, read
+        )
+        if response.status_code == 416:
+            return response
+    elif streamed:
+        response = Response(read(0, length))
+        response.headers["Content-Type"] = final_content_type
+        response.headers["Content-Length"] = length
+    else:
+        # Build full response
+        response = make_response(response_body)
+        response.headers["Content-Type"] = final_content_type
+        response.headers["Content-Length"] = len(response_body)
 
     # Add caching and download headers
+    response.headers[HEADER_ACCEPT_RANGES] = "bytes"
     filename = extract_filename_from_cid_path(path)
     _add_response_headers(response, etag, cid_content, filename, path_info)
 
@@ -415,6 +659,9 @@ def serve_cid_content(cid_content, path: str) -> Optional[Response]:
 def _serve_qr_code(target_cid: str) -> bytes:
     """Generate QR code page for a CID.
 
+    Only the QR image is reused from earlier renders; the page itself extends
+    the site layout and is rendered for every request.
+
     Args:
         target_cid: CID string
 
@@ -422,31 +669,52 @@ def _serve_qr_code(target_cid: str) -> bytes:
         HTML page as bytes
     """
     qr_target_url = f"https://256t.org/{target_cid}"
-    qr_image_url = generate_qr_data_url(qr_target_url)
+    qr_image = render_derived(
+        "qr_image",
+        QR_IMAGE_VERSION,
+        target_cid,
+        lambda: generate_qr_data_url(qr_target_url).encode("ascii"),
+    )
     html = render_template(
         "cid_qr.html",
         title="CID QR Code",
         cid=target_cid,
         qr_value=qr_target_url,
-        qr_image_url=qr_image_url,
+        qr_image_url=qr_image.decode("ascii"),
         cid_href=cid_path(target_cid),
     )
     return html.encode("utf-8")
 
 
-def _serve_markdown_html(response_body: bytes) -> Optional[bytes]:
+def _serve_markdown_html(
+    response_body: bytes, source_cid: Optional[str] = None
+) -> Optional[bytes]:
     """Render markdown content to HTML.
 
+    Pages rendered from a CID are stored and reused on later requests.
+
     Args:
         response_body: Raw markdown bytes
+        source_cid: CID of ``response_body``, when known
 
     Returns:
         Rendered HTML bytes or None if decode fails
     """
-    text = decode_text_safely(response_body)
-    if text is not None:
-        return render_markdown_document(text).encode("utf-8")
-    return None
+
+    def render() -> Optional[bytes]:
+        text = decode_text_safely(response_body)
+        if text is not None:
+            return render_markdown_document(text).encode("utf-8")
+        return None
+
+    # Pages with diagrams still rendering in the background are not final.
+    return render_derived(
+        "markdown_html",
+        markdown_renderer_version(),
+        source_cid,
+        render,
+        store_if=lambda page: MERMAID_PENDING_ATTRIBUTE.encode("ascii") not in page,
+    )
 
 
 def _make_304_response(etag: str, cid_content) -> Response:
@@ -462,6 +730,6 @@ def _make_304_response(etag: str, cid_content) -> Response:
     response = make_response("", 304)
     response.headers["ETag"] = etag
     response.headers["Last-Modified"] = cid_content.created_at.strftime(
-        "%a, %d %b %Y %H:%M:%S GMT"
+        HTTP_DATE_FORMAT
     )
     return response
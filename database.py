@@ -15,5 +15,7 @@ db = SQLAlchemy(model_class=Base)
 
 def init_db(app: Flask) -> SQLAlchemy:
     """Initialize the database with the Flask app."""
+    import change_tracking  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+
     db.init_app(app)
     return db
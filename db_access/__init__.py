@@ -22,53 +22,89 @@ if TYPE_CHECKING:  # pragma: no cover
         LiteralCIDRecord,
         MAX_MESSAGE_LENGTH,
         ServerInvocationInput,
+        StreamedCIDRecord,
+        UploadsPage,
+        backfill_server_definition_versions,
         count_cids,
+        count_derived_artifacts,
+        count_expired_rows,
         count_page_views,
+        count_page_views_by_path,
         count_secrets,
+        count_server_result_memos,
         count_servers,
         count_unique_page_view_paths,
         count_variables,
         create_cid_record,
         create_server_invocation,
+        delete_cids,
+        delete_derived_artifacts,
         delete_entity,
+        delete_rows_by_id,
+        delete_server_result_memos,
+        ensure_page_view_rollups,
+        ensure_server_definition_versions,
         find_cids_by_prefix,
         find_entity_interaction,
+        find_referenced_cids,
         find_server_invocations_by_cid,
         get_alias_by_name,
         get_alias_by_target_path,
         get_aliases,
         get_cid_by_path,
         get_cids_by_paths,
+        get_derived_artifact,
         get_entity_interactions,
         get_first_alias_name,
         get_first_cid,
         get_first_secret_name,
         get_first_server_name,
         get_first_variable_name,
+        get_oldest_rows,
         get_popular_page_paths,
         get_recent_cids,
         get_recent_entity_interactions,
+        get_retention_archives,
         get_secret_by_name,
         get_secrets,
+        get_secrets_by_ids,
         get_server_by_name,
+        get_server_definition_versions,
         get_server_invocations,
         get_server_invocations_by_result_cids,
         get_server_invocations_by_server,
+        get_server_result_memo,
         get_servers,
+        get_servers_by_ids,
+        get_streamable_cid_by_path,
         get_template_aliases,
         get_template_secrets,
         get_template_servers,
         get_template_uploads,
         get_template_variables,
         get_uploads,
+        get_upload_totals,
+        get_uploads_page,
         get_variable_by_name,
         get_variables,
+        get_variables_by_ids,
+        iter_cid_metadata,
+        iter_cid_paths,
         paginate_page_views,
+        prune_derived_artifacts,
+        prune_server_result_memos,
+        read_cid_data,
+        rebuild_page_view_rollups,
+        record_derived_artifact,
         record_entity_interaction,
         record_export,
+        record_retention_archive,
+        record_server_definition_versions,
+        record_server_result_memo,
         rollback_session,
         save_entity,
         save_page_view,
+        save_page_views,
         update_alias_cid_reference,
         update_cid_references,
     )
@@ -25,6 +25,8 @@ from .aliases import (
 )
 from .cids import (
     LiteralCIDRecord,
+    StreamedCIDRecord,
+    UploadsPage,
     count_cids,
     create_cid_record,
     find_cids_by_prefix,
@@ -32,7 +34,13 @@ from .cids import (
     get_cids_by_paths,
     get_first_cid,
     get_recent_cids,
+    get_streamable_cid_by_path,
     get_uploads,
+    get_upload_totals,
+    get_uploads_page,
+    iter_cid_metadata,
+    iter_cid_paths,
+    read_cid_data,
     update_cid_references,
 )
 from .uploads import (
@@ -60,16 +68,21 @@ from .invocations import (
 )
 from .page_views import (
     count_page_views,
+    count_page_views_by_path,
     count_unique_page_view_paths,
+    ensure_page_view_rollups,
     get_popular_page_paths,
     paginate_page_views,
+    rebuild_page_view_rollups,
     save_page_view,
+    save_page_views,
 )
 from .secrets import (
     count_secrets,
     get_first_secret_name,
     get_secret_by_name,
     get_secrets,
+    get_secrets_by_ids,
     get_template_secrets,
 )
 from .servers import (
@@ -77,14 +90,45 @@ from .servers import (
     get_first_server_name,
     get_server_by_name,
     get_servers,
+    get_servers_by_ids,
     get_template_servers,
 )
+from .derived_artifacts import (
+    count_derived_artifacts,
+    delete_derived_artifacts,
+    get_derived_artifact,
+    prune_derived_artifacts,
+    record_derived_artifact,
+)
+from .retention import (
+    count_expired_rows,
+    delete_cids,
+    delete_rows_by_id,
+    find_referenced_cids,
+    get_oldest_rows,
+    get_retention_archives,
+    record_retention_archive,
+)
+from .server_results import (
+    count_server_result_memos,
+    delete_server_result_memos,
+    get_server_result_memo,
+    prune_server_result_memos,
+    record_server_result_memo,
+)
+from .server_versions import (
+    backfill_server_definition_versions,
+    ensure_server_definition_versions,
+    get_server_definition_versions,
+    record_server_definition_versions,
+)
 from .variables import (
     count_variables,
     get_first_variable_name,
     get_template_variables,
     get_variable_by_name,
     get_variables,
+    get_variables_by_ids,
 )
 
 EXPORTS: Dict[str, Any] = {
@@ -100,6 +144,7 @@ EXPORTS: Dict[str, Any] = {
     "MAX_MESSAGE_LENGTH": MAX_MESSAGE_LENGTH,
     # Servers
     "get_servers": get_servers,
+    "get_servers_by_ids": get_servers_by_ids,
     "get_template_servers": get_template_servers,
     "get_server_by_name": get_server_by_name,
     "get_first_server_name": get_first_server_name,
@@ -114,22 +159,32 @@ EXPORTS: Dict[str, Any] = {
     "update_alias_cid_reference": update_alias_cid_reference,
     # Variables
     "get_variables": get_variables,
+    "get_variables_by_ids": get_variables_by_ids,
     "get_template_variables": get_template_variables,
     "get_variable_by_name": get_variable_by_name,
     "get_first_variable_name": get_first_variable_name,
     "count_variables": count_variables,
     # Secrets
     "get_secrets": get_secrets,
+    "get_secrets_by_ids": get_secrets_by_ids,
     "get_template_secrets": get_template_secrets,
     "get_secret_by_name": get_secret_by_name,
     "get_first_secret_name": get_first_secret_name,
     "count_secrets": count_secrets,
     # CIDs
     "LiteralCIDRecord": LiteralCIDRecord,
+    "StreamedCIDRecord": StreamedCIDRecord,
+    "UploadsPage": UploadsPage,
     "get_cid_by_path": get_cid_by_path,
+    "get_streamable_cid_by_path": get_streamable_cid_by_path,
+    "read_cid_data": read_cid_data,
     "find_cids_by_prefix": find_cids_by_prefix,
     "create_cid_record": create_cid_record,
     "get_uploads": get_uploads,
+    "get_upload_totals": get_upload_totals,
+    "get_uploads_page": get_uploads_page,
+    "iter_cid_paths": iter_cid_paths,
+    "iter_cid_metadata": iter_cid_metadata,
     "get_template_uploads": get_template_uploads,
     "get_cids_by_paths": get_cids_by_paths,
     "get_recent_cids": get_recent_cids,
@@ -142,6 +197,10 @@ EXPORTS: Dict[str, Any] = {
     "count_unique_page_view_paths": count_unique_page_view_paths,
     "get_popular_page_paths": get_popular_page_paths,
     "paginate_page_views": paginate_page_views,
+    "save_page_views": save_page_views,
+    "count_page_views_by_path": count_page_views_by_path,
+    "ensure_page_view_rollups": ensure_page_view_rollups,
+    "rebuild_page_view_rollups": rebuild_page_view_rollups,
     # Interactions
     "EntityInteractionRequest": EntityInteractionRequest,
     "EntityInteractionLookup": EntityInteractionLookup,
@@ -156,6 +215,31 @@ EXPORTS: Dict[str, Any] = {
     "get_server_invocations_by_server": get_server_invocations_by_server,
     "get_server_invocations_by_result_cids": get_server_invocations_by_result_cids,
     "find_server_invocations_by_cid": find_server_invocations_by_cid,
+    # Server definition versions
+    "record_server_definition_versions": record_server_definition_versions,
+    "get_server_definition_versions": get_server_definition_versions,
+    "backfill_server_definition_versions": backfill_server_definition_versions,
+    "ensure_server_definition_versions": ensure_server_definition_versions,
+    # Memoized server results
+    "get_server_result_memo": get_server_result_memo,
+    "record_server_result_memo": record_server_result_memo,
+    "delete_server_result_memos": delete_server_result_memos,
+    "prune_server_result_memos": prune_server_result_memos,
+    "count_server_result_memos": count_server_result_memos,
+    # Derived artifacts
+    "get_derived_artifact": get_derived_artifact,
+    "record_derived_artifact": record_derived_artifact,
+    "delete_derived_artifacts": delete_derived_artifacts,
+    "prune_derived_artifacts": prune_derived_artifacts,
+    "count_derived_artifacts": count_derived_artifacts,
+    # Retention
+    "count_expired_rows": count_expired_rows,
+    "delete_cids": delete_cids,
+    "delete_rows_by_id": delete_rows_by_id,
+    "find_referenced_cids": find_referenced_cids,
+    "get_oldest_rows": get_oldest_rows,
+    "get_retention_archives": get_retention_archives,
+    "record_retention_archive": record_retention_archive,
     # Exports
     "record_export": record_export,
     "get_exports": get_exports,
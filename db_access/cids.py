@@ -1,18 +1,37 @@
 """CID management operations."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Callable, Dict, Iterable, List, Optional, Union
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from sqlalchemy import and_, func, literal, or_, select, true, union
+from sqlalchemy.orm import undefer
+from sqlalchemy.pool import StaticPool
+
+from cid_blob_store import get_blob_store
 from database import db
 import models
-from models import Alias, CID, Server
+from models import Alias, CID, Server, ServerInvocation
 from db_access._common import save_entity, normalize_cid_value
 from cid import CID as ValidatedCID, to_cid_string
 
 SaveServerDefinition = Callable[[str, int], str]
 StoreServerDefinitions = Callable[[int], str]
 
+CID_STREAM_CHUNK_SIZE = 256 * 1024
+CID_METADATA_BATCH_SIZE = 1000
+UPLOADS_PER_PAGE = 50
+
 
 @dataclass
 class LiteralCIDRecord:
@@ -100,7 +119,224 @@ def get_cid_by_path(path: str) -> Optional[CID | LiteralCIDRecord]:
         return literal_record
 
     # Fall back to database lookup for hash-based CIDs
-    return CID.query.filter_by(path=path).first()
+    record = CID.query.options(undefer(CID.stored_data)).filter_by(path=path).first()
+    _record_cid_access(path, record is not None)
+    return record
+
+
+def _record_cid_access(path: str, found: bool) -> None:
+    """Feed stored-CID lookups to the read-only mode eviction policy."""
+    from readonly_config import ReadOnlyConfig  # pylint: disable=import-outside-toplevel
+
+    if ReadOnlyConfig.is_read_only_mode():
+        from cid_memory_manager import CIDMemoryManager  # pylint: disable=import-outside-toplevel
+
+        CIDMemoryManager.record_access(path, found)
+
+
+def read_cid_data(
+    cid_id: int, offset: int, length: int, *, path: Optional[str] = None
+) -> bytes:
+    """Return ``length`` bytes of a stored CID's content starting at ``offset``.
+
+    Payloads in an external blob store are sliced from their memory map when
+    ``path`` is given. Otherwise SQLite reads through an incremental blob
+    handle and other databases use ``substr``, so only the requested slice
+    leaves the database.
+    """
+    return _read_slice(db.session.connection(), cid_id, offset, length, path)
+
+
+def _read_slice(
+    connection: Any, cid_id: int, offset: int, length: int, path: Optional[str]
+) -> bytes:
+    if length <= 0:
+        return b""
+
+    store = get_blob_store()
+    if store.external and path:
+        view = store.read(path.lstrip("/"))
+        if view is not None and len(view):
+            return bytes(view[offset : offset + length])
+
+    if connection.dialect.name == "sqlite":
+        blobopen = getattr(connection.connection.driver_connection, "blobopen", None)
+        if blobopen is not None:
+            with blobopen(CID.__tablename__, "file_data", cid_id, readonly=True) as blob:
+                blob.seek(offset)
+                return blob.read(length)
+
+    value = connection.execute(
+        select(func.substr(CID.file_data, offset + 1, length)).where(
+            CID.id == cid_id
+        )
+    ).scalar()
+    return bytes(value or b"")
+
+
+@dataclass
+class StreamedCIDRecord:
+    """Metadata for a stored CID whose content is read in slices on demand.
+
+    ``file_data`` is still available for callers that need the whole body,
+    but :meth:`iter_data` lets responses stream without materializing it.
+    """
+
+    id: int
+    path: str
+    file_size: int
+    created_at: datetime
+    engine: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def file_data(self) -> bytes:
+        return read_cid_data(self.id, 0, self.file_size, path=self.path)
+
+    def iter_data(
+        self,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = CID_STREAM_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Yield the bytes in ``[start, end)`` in chunks of ``chunk_size``.
+
+        Chunks are read through a connection of their own, so the iterator
+        keeps working after the request (and its app context) has ended. An
+        engine with a single shared connection (``sqlite:///:memory:``) is
+        read up front instead, since returning that connection to the pool
+        would roll back the session using it.
+        """
+        stop = self.file_size if end is None else min(end, self.file_size)
+        if self.engine is None or isinstance(self.engine.pool, StaticPool):
+            return iter(
+                list(
+                    self._read_chunks(
+                        db.session.connection(), start, stop, chunk_size
+                    )
+                )
+            )
+        return self._stream_chunks(self.engine, start, stop, chunk_size)
+
+    def _stream_chunks(
+        self, engine: Any, start: int, stop: int, chunk_size: int
+    ) -> Iterator[bytes]:
+        with engine.connect() as connection:
+            yield from self._read_chunks(connection, start, stop, chunk_size)
+
+    def _read_chunks(
+        self, connection: Any, start: int, stop: int, chunk_size: int
+    ) -> Iterator[bytes]:
+        offset = start
+        while offset < stop:
+            chunk = _read_slice(
+                connection,
+                self.id,
+                offset,
+                min(chunk_size, stop - offset),
+                self.path,
+            )
+            if not chunk:
+                return
+            yield chunk
+            offset += len(chunk)
+
+    def __repr__(self) -> str:
+        return f"<StreamedCID {self.path}>"
+
+
+def get_streamable_cid_by_path(
+    path: str,
+) -> Optional[StreamedCIDRecord | LiteralCIDRecord]:
+    """Return a CID record for serving without loading its content.
+
+    Literal CIDs resolve as in :func:`get_cid_by_path`; stored CIDs return a
+    :class:`StreamedCIDRecord` built from a metadata-only query.
+    """
+    literal_record = _try_resolve_literal_cid(path)
+    if literal_record is not None:
+        return literal_record
+
+    row = _metadata_query().filter(CID.path == path).first()
+    _record_cid_access(path, row is not None)
+    if row is None:
+        return None
+
+    return _streamed_record(row)
+
+
+def _metadata_query():
+    """Return a query selecting CID metadata without the payload column."""
+    return db.session.query(
+        CID.id,
+        CID.path,
+        func.coalesce(CID.file_size, func.length(CID.file_data)),
+        CID.created_at,
+    )
+
+
+def _streamed_record(row) -> StreamedCIDRecord:
+    cid_id, cid_path, file_size, created_at = row
+    return StreamedCIDRecord(
+        id=cid_id,
+        path=cid_path,
+        file_size=int(file_size or 0),
+        created_at=created_at,
+        engine=db.engine,
+    )
+
+
+def iter_cid_paths(batch_size: int = CID_METADATA_BATCH_SIZE) -> Iterator[str]:
+    """Yield every stored CID path, reading ``batch_size`` rows per query."""
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(CID.id, CID.path)
+            .filter(CID.id > last_id)
+            .order_by(CID.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return
+        for _, path in rows:
+            if path:
+                yield path
+        last_id = rows[-1][0]
+
+
+def iter_cid_metadata(
+    page: Optional[int] = None, per_page: int = CID_METADATA_BATCH_SIZE
+) -> Iterator[StreamedCIDRecord]:
+    """Yield stored CIDs as :class:`StreamedCIDRecord` metadata, ordered by id.
+
+    With ``page`` (1-based) only that page of ``per_page`` rows is returned;
+    otherwise every row is yielded, ``per_page`` rows per query. Payloads are
+    never selected; ``file_data`` on the yielded records reads on demand.
+    """
+    if page is not None:
+        rows = (
+            _metadata_query()
+            .order_by(CID.id.asc())
+            .offset((max(page, 1) - 1) * per_page)
+            .limit(per_page)
+            .all()
+        )
+        yield from (_streamed_record(row) for row in rows)
+        return
+
+    last_id = 0
+    while True:
+        rows = (
+            _metadata_query()
+            .filter(CID.id > last_id)
+            .order_by(CID.id.asc())
+            .limit(per_page)
+            .all()
+        )
+        if not rows:
+            return
+        yield from (_streamed_record(row) for row in rows)
+        last_id = rows[-1][0]
 
 
 def find_cids_by_prefix(prefix: str) -> List[CID]:
@@ -188,15 +424,110 @@ def create_cid_record(cid: Union[str, ValidatedCID], file_content: bytes) -> CID
     return record
 
 
-def get_uploads() -> List[CID]:
-    """Return all CID uploads ordered from newest to oldest."""
+def _session_query():
     session_provider = getattr(models, "db", None)
     if session_provider is not None and hasattr(session_provider, "session"):
-        query = session_provider.session.query
-    else:
-        query = db.session.query
+        return session_provider.session.query
+    return db.session.query
+
+
+def get_uploads(limit: Optional[int] = None) -> List[CID]:
+    """Return CID uploads, with content, ordered from newest to oldest.
+
+    Pass ``limit`` to load only the newest rows; listings that do not need
+    the content should use :func:`get_uploads_page` or :func:`iter_cid_metadata`.
+    """
+    query = (
+        _session_query()(CID)
+        .options(undefer(CID.stored_data))
+        .order_by(CID.created_at.desc(), CID.id.desc())
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
 
-    return query(CID).order_by(CID.created_at.desc()).all()
+@dataclass
+class UploadsPage:
+    """One page of uploads plus the cursor for the next (older) page."""
+
+    items: List[CID]
+    next_cursor: Optional[int]
+
+
+def _server_event_cid_paths():
+    """Select the paths of CIDs written by server invocations."""
+    columns = (
+        ServerInvocation.result_cid,
+        ServerInvocation.invocation_cid,
+        ServerInvocation.request_details_cid,
+        ServerInvocation.servers_cid,
+    )
+    return union(
+        *(
+            select(literal("/") + column).where(column.isnot(None), column != "")
+            for column in columns
+        )
+    )
+
+
+def _uploads_filter(exclude_server_events: bool):
+    if not exclude_server_events:
+        return true()
+    return CID.path.not_in(_server_event_cid_paths())
+
+
+def get_uploads_page(
+    before: Optional[int] = None,
+    per_page: int = UPLOADS_PER_PAGE,
+    *,
+    exclude_server_events: bool = False,
+) -> UploadsPage:
+    """Return up to ``per_page`` uploads older than the upload ``before``.
+
+    Pages are keyset paginated on ``(created_at, id)``, so each page costs
+    the same however deep the listing goes. ``before`` is the
+    ``next_cursor`` of the previous page (the id of its last upload).
+    ``exclude_server_events`` leaves out CIDs recorded by server invocations
+    in the query itself, so pages stay full.
+    """
+    query = (
+        _session_query()(CID)
+        .options(undefer(CID.stored_data))
+        .filter(_uploads_filter(exclude_server_events))
+        .order_by(CID.created_at.desc(), CID.id.desc())
+    )
+    if before is not None:
+        anchor = db.session.query(CID.created_at).filter(CID.id == before).first()
+        if anchor is None:
+            return UploadsPage(items=[], next_cursor=None)
+        anchor_created_at = anchor[0]
+        query = query.filter(
+            or_(
+                CID.created_at < anchor_created_at,
+                and_(CID.created_at == anchor_created_at, CID.id < before),
+            )
+        )
+
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = items[-1].id if len(rows) > per_page else None
+    return UploadsPage(items=items, next_cursor=next_cursor)
+
+
+def get_upload_totals(*, exclude_server_events: bool = False) -> Tuple[int, int]:
+    """Return ``(count, total_bytes)`` over all uploads without reading payloads."""
+    count, total = (
+        db.session.query(
+            func.count(CID.id),
+            func.coalesce(
+                func.sum(func.coalesce(CID.file_size, func.length(CID.file_data))), 0
+            ),
+        )
+        .filter(_uploads_filter(exclude_server_events))
+        .one()
+    )
+    return int(count or 0), int(total or 0)
 
 
 def get_cids_by_paths(paths: Iterable[str]) -> List[CID]:
@@ -205,7 +536,11 @@ def get_cids_by_paths(paths: Iterable[str]) -> List[CID]:
     if not normalized_paths:
         return []
 
-    return CID.query.filter(CID.path.in_(normalized_paths)).all()
+    return (
+        CID.query.options(undefer(CID.stored_data))
+        .filter(CID.path.in_(normalized_paths))
+        .all()
+    )
 
 
 def get_recent_cids(limit: int = 10) -> List[CID]:
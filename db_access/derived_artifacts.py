@@ -0,0 +1,61 @@
+"""Artifacts rendered from immutable CID content, such as Markdown pages."""
+
+from typing import Optional
+
+from database import db
+from models import DerivedArtifact
+
+
+def get_derived_artifact(key: str) -> Optional[DerivedArtifact]:
+    """Return the artifact recorded under ``key``, if any."""
+    return DerivedArtifact.query.filter_by(key=key).first()
+
+
+def record_derived_artifact(
+    key: str, renderer: str, source_cid: str, result_cid: str
+) -> DerivedArtifact:
+    """Store (or replace) the artifact for ``key`` and commit."""
+    artifact = DerivedArtifact.query.filter_by(key=key).first() or DerivedArtifact(
+        key=key
+    )
+    artifact.renderer = renderer
+    artifact.source_cid = source_cid
+    artifact.result_cid = result_cid
+    db.session.add(artifact)
+    db.session.commit()
+    return artifact
+
+
+def delete_derived_artifacts(*keys: str) -> int:
+    """Delete the artifacts stored under ``keys`` and commit; return how many."""
+    if not keys:
+        return 0
+    deleted = DerivedArtifact.query.filter(DerivedArtifact.key.in_(keys)).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    return deleted
+
+
+def prune_derived_artifacts(max_entries: int) -> int:
+    """Drop the oldest artifacts beyond ``max_entries`` and commit; return how many."""
+    excess = DerivedArtifact.query.count() - max(max_entries, 0)
+    removed = 0
+    if excess > 0:
+        oldest = [
+            artifact_id
+            for (artifact_id,) in db.session.query(DerivedArtifact.id)
+            .order_by(DerivedArtifact.created_at.asc(), DerivedArtifact.id.asc())
+            .limit(excess)
+        ]
+        removed = DerivedArtifact.query.filter(
+            DerivedArtifact.id.in_(oldest)
+        ).delete(synchronize_session=False)
+
+    db.session.commit()
+    return removed
+
+
+def count_derived_artifacts() -> int:
+    """Return the number of recorded artifacts."""
+    return DerivedArtifact.query.count()
@@ -4,7 +4,7 @@ This module provides a generic repository pattern for entities that share common
 attributes (name, template) to eliminate duplication across entity types.
 """
 
-from typing import Generic, List, Optional, Type, TypeVar
+from typing import Generic, Iterable, List, Optional, Type, TypeVar
 from sqlalchemy.orm import Query
 
 # TypeVar for generic entity type
@@ -38,6 +38,24 @@ class GenericEntityRepository(Generic[T]):
         """
         return self.model.query.order_by(self.model.name).all()
 
+    def get_by_ids(self, ids: Iterable[int]) -> List[T]:
+        """Get the entities with the given ids, ordered by name.
+
+        Args:
+            ids: Entity ids; unknown ids are skipped
+
+        Returns:
+            Matching entities ordered alphabetically by name
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        return (
+            self.model.query.filter(self.model.id.in_(ids))
+            .order_by(self.model.name)
+            .all()
+        )
+
     def get_templates(self) -> List[T]:
         """Get template entities, ordered by name.
 
@@ -1,22 +1,246 @@
-"""Page view tracking and analytics."""
+"""Page view tracking and analytics.
 
-from typing import List, Tuple
+Every inserted ``PageView`` also increments an hourly and a daily
+``PageViewRollup`` row for its path, in the same transaction, so history
+statistics can be summed per bucket instead of counted per view. Views added
+through the ORM and through ``insert(PageView)`` statements are both counted.
 
-from datetime import datetime
+Deleting views leaves the rollups alone, so retention can archive old views
+without losing them from the history statistics. Writes that replace the
+views wholesale (snapshot restores) call :func:`rebuild_page_view_rollups`.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from datetime import datetime, timedelta, timezone
 
 from flask_sqlalchemy.pagination import Pagination
-from sqlalchemy import func
+from sqlalchemy import and_, event, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 
 from database import db
-from models import PageView
+from models import PageView, PageViewRollup
 from db_access._common import save_entity
 
+HOUR = "hour"
+DAY = "day"
+_STEPS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
 
 def save_page_view(page_view: PageView) -> PageView:
     """Persist a page view record."""
     return save_entity(page_view)
 
 
+def save_page_views(page_views: Sequence[PageView]) -> int:
+    """Persist ``page_views`` in a single transaction; return how many."""
+    if not page_views:
+        return 0
+    db.session.add_all(page_views)
+    db.session.commit()
+    return len(page_views)
+
+
+def _naive(value: datetime) -> datetime:
+    # Match how DateTime columns store values: wall-clock time without tzinfo.
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+def _floor(value: datetime, granularity: str) -> datetime:
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if granularity == DAY else value
+
+
+def _ceil(value: datetime, granularity: str) -> datetime:
+    floor = _floor(value, granularity)
+    return floor if floor == value else floor + _STEPS[granularity]
+
+
+def _rollup_counts(views: Iterable[Tuple[str, Optional[datetime]]]) -> Counter:
+    """Return view counts keyed by ``(granularity, bucket_start, path)``."""
+    counts: Counter = Counter()
+    for path, viewed_at in views:
+        if not path or viewed_at is None:
+            continue
+        viewed_at = _naive(viewed_at)
+        counts[(HOUR, _floor(viewed_at, HOUR), path)] += 1
+        counts[(DAY, _floor(viewed_at, DAY), path)] += 1
+    return counts
+
+
+def _increment_rollups(connection: Any, counts: Counter) -> None:
+    """Add ``counts`` to the rollup table using ``connection``."""
+    if not counts:
+        return
+    table = PageViewRollup.__table__
+    rows = [
+        {"granularity": granularity, "bucket_start": bucket, "path": path, "count": n}
+        for (granularity, bucket, path), n in counts.items()
+    ]
+    dialect_insert = _UPSERT_INSERTS.get(connection.dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["granularity", "bucket_start", "path"],
+            set_={"count": table.c.count + statement.excluded.count},
+        )
+        connection.execute(statement, rows)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(
+                and_(
+                    table.c.granularity == row["granularity"],
+                    table.c.bucket_start == row["bucket_start"],
+                    table.c.path == row["path"],
+                )
+            )
+            .values(count=table.c.count + row["count"])
+        )
+        if not result.rowcount:
+            connection.execute(insert(table).values(**row))
+
+
+@event.listens_for(Session, "after_flush")
+def _roll_up_new_page_views(session: Session, _flush_context: Any) -> None:
+    counts = _rollup_counts(
+        (instance.path, instance.viewed_at)
+        for instance in session.new
+        if isinstance(instance, PageView)
+    )
+    if counts:
+        _increment_rollups(session.connection(), counts)
+
+
+def _inserted_rows(orm_execute_state: Any) -> List[Dict[str, Any]]:
+    parameters = orm_execute_state.parameters
+    if isinstance(parameters, dict):
+        parameters = [parameters]
+    rows = [row for row in parameters or () if isinstance(row, dict)]
+    if not rows:
+        # Values given with ``insert(PageView).values(...)``.
+        compiled = orm_execute_state.statement.compile().params
+        rows = [compiled] if "path" in compiled else []
+    return rows
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _roll_up_inserted_page_views(orm_execute_state: Any) -> None:
+    table = getattr(orm_execute_state.statement, "table", None)
+    if not orm_execute_state.is_insert or getattr(table, "name", None) != (
+        PageView.__tablename__
+    ):
+        return
+    now = datetime.now(timezone.utc)
+    counts = _rollup_counts(
+        (row.get("path"), row.get("viewed_at") or now)
+        for row in _inserted_rows(orm_execute_state)
+    )
+    if counts:
+        _increment_rollups(orm_execute_state.session.connection(), counts)
+
+
+def rebuild_page_view_rollups() -> int:
+    """Recompute every rollup from the stored page views; return the view count."""
+    PageViewRollup.query.delete(synchronize_session=False)
+    counts = _rollup_counts(
+        db.session.query(PageView.path, PageView.viewed_at).yield_per(1000)
+    )
+    _increment_rollups(db.session.connection(), counts)
+    db.session.commit()
+    return sum(n for (granularity, _, _), n in counts.items() if granularity == DAY)
+
+
+def ensure_page_view_rollups() -> bool:
+    """Build the rollups for page views recorded before rollups existed.
+
+    Returns True when a rebuild was needed.
+    """
+    if db.session.query(PageViewRollup.id).first() is not None:
+        return False
+    if db.session.query(PageView.id).first() is None:
+        return False
+    rebuild_page_view_rollups()
+    return True
+
+
+def _plan_segments(
+    start: datetime | None, end: datetime | None
+) -> List[Tuple[str, datetime | None, datetime | None]]:
+    """Split ``[start, end)`` into raw edges and whole hour/day buckets.
+
+    Each segment is ``(source, lower, upper)`` where ``source`` is ``"raw"``,
+    ``HOUR`` or ``DAY``; a ``None`` bound is unbounded.
+    """
+    hour_lo = None if start is None else _ceil(start, HOUR)
+    hour_hi = None if end is None else _floor(end, HOUR)
+    if hour_lo is not None and hour_hi is not None and hour_lo >= hour_hi:
+        return [("raw", start, end)]
+
+    segments: List[Tuple[str, datetime | None, datetime | None]] = []
+    if start is not None and start < hour_lo:
+        segments.append(("raw", start, hour_lo))
+    if end is not None and hour_hi < end:
+        segments.append(("raw", hour_hi, end))
+
+    day_lo = None if hour_lo is None else _ceil(hour_lo, DAY)
+    day_hi = None if hour_hi is None else _floor(hour_hi, DAY)
+    if day_lo is not None and day_hi is not None and day_lo >= day_hi:
+        segments.append((HOUR, hour_lo, hour_hi))
+        return segments
+
+    if hour_lo is not None and hour_lo < day_lo:
+        segments.append((HOUR, hour_lo, day_lo))
+    if hour_hi is not None and day_hi < hour_hi:
+        segments.append((HOUR, day_hi, hour_hi))
+    segments.append((DAY, day_lo, day_hi))
+    return segments
+
+
+def _segment_counts(
+    source: str, lower: datetime | None, upper: datetime | None
+) -> List[Tuple[str, int]]:
+    if source == "raw":
+        path, column = PageView.path, PageView.viewed_at
+        # pylint: disable=not-callable  # SQLAlchemy func.count is callable
+        query = db.session.query(path, func.count(PageView.id))
+    else:
+        path, column = PageViewRollup.path, PageViewRollup.bucket_start
+        query = db.session.query(path, func.sum(PageViewRollup.count)).filter(
+            PageViewRollup.granularity == source
+        )
+    if lower is not None:
+        query = query.filter(column >= lower)
+    if upper is not None:
+        query = query.filter(column < upper)
+    return query.group_by(path).all()
+
+
+def count_page_views_by_path(
+    start: datetime | None = None, end: datetime | None = None
+) -> Dict[str, int]:
+    """Return views per path between ``start`` and ``end`` (both inclusive).
+
+    Whole days and hours are read from the rollups; only the partial hours
+    at either edge of the range are counted from individual page views.
+    """
+    lower = _naive(start) if start else None
+    # Rollup buckets are half-open, so make the inclusive end exclusive.
+    upper = _naive(end) + timedelta(microseconds=1) if end else None
+
+    totals: Counter = Counter()
+    for source, segment_lower, segment_upper in _plan_segments(lower, upper):
+        for path, count in _segment_counts(source, segment_lower, segment_upper):
+            totals[path] += int(count or 0)
+    return {path: count for path, count in totals.items() if count}
+
+
 def _apply_time_bounds(query, start: datetime | None, end: datetime | None):
     """Apply optional start/end filters to a PageView query."""
     if start:
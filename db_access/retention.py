@@ -0,0 +1,160 @@
+"""Row expiry and CID reference queries used by the retention engine."""
+
+from typing import Any, Iterable, List, Optional, Sequence, Set
+
+from datetime import datetime
+
+from sqlalchemy import or_
+
+from cid_blob_store import get_blob_store
+from database import db
+from models import (
+    CID,
+    Alias,
+    DerivedArtifact,
+    EntityInteraction,
+    Export,
+    RetentionArchive,
+    Server,
+    ServerDefinitionVersion,
+    ServerInvocation,
+    ServerResultMemo,
+    Variable,
+)
+
+# Keeps each ``IN``/``LIKE`` clause well below database parameter limits.
+_REFERENCE_CHUNK = 200
+
+# Columns that hold a bare CID value.
+_CID_COLUMNS = (
+    ServerInvocation.result_cid,
+    ServerInvocation.servers_cid,
+    ServerInvocation.variables_cid,
+    ServerInvocation.secrets_cid,
+    ServerInvocation.request_details_cid,
+    ServerInvocation.invocation_cid,
+    ServerInvocation.external_calls_cid,
+    ServerResultMemo.definition_cid,
+    ServerResultMemo.result_cid,
+    DerivedArtifact.source_cid,
+    DerivedArtifact.result_cid,
+    ServerDefinitionVersion.definition_cid,
+    ServerDefinitionVersion.snapshot_cid,
+    Export.cid,
+    RetentionArchive.manifest_cid,
+)
+
+# Text columns that may mention a CID anywhere in their content.
+_TEXT_COLUMNS = (
+    Alias.definition,
+    Server.definition,
+    Variable.definition,
+    EntityInteraction.content,
+)
+
+
+def count_expired_rows(
+    model: Any,
+    timestamp: Any,
+    *,
+    cutoff: Optional[datetime] = None,
+    max_rows: Optional[int] = None,
+) -> int:
+    """Return how many of the oldest rows fall outside the given limits.
+
+    Rows older than ``cutoff`` and rows beyond the newest ``max_rows`` are
+    both prefixes of the table ordered by ``timestamp``, so their union is
+    simply the longer of the two.
+    """
+    expired = 0
+    if max_rows is not None:
+        expired = max(0, model.query.count() - max_rows)
+    if cutoff is not None:
+        expired = max(expired, model.query.filter(timestamp < cutoff).count())
+    return expired
+
+
+def get_oldest_rows(model: Any, timestamp: Any, limit: int) -> List[Any]:
+    """Return up to ``limit`` rows of ``model``, oldest first."""
+    return model.query.order_by(timestamp.asc(), model.id.asc()).limit(limit).all()
+
+
+def delete_rows_by_id(model: Any, ids: Sequence[int]) -> int:
+    """Delete the ``model`` rows with ``ids`` and commit; return how many."""
+    if not ids:
+        return 0
+    deleted = model.query.filter(model.id.in_(list(ids))).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    return deleted
+
+
+def _chunks(values: Sequence[str]) -> Iterable[Sequence[str]]:
+    for index in range(0, len(values), _REFERENCE_CHUNK):
+        yield values[index : index + _REFERENCE_CHUNK]
+
+
+def find_referenced_cids(candidates: Iterable[str]) -> Set[str]:
+    """Return the ``candidates`` that some row still refers to (the mark phase)."""
+    remaining = sorted({value for value in candidates if value})
+    live: Set[str] = set()
+    for column in _CID_COLUMNS:
+        for chunk in _chunks(remaining):
+            live.update(
+                value
+                for (value,) in db.session.query(column).filter(column.in_(chunk))
+            )
+        remaining = [value for value in remaining if value not in live]
+
+    for column in _TEXT_COLUMNS:
+        for chunk in _chunks(remaining):
+            clauses = [column.contains(value, autoescape=True) for value in chunk]
+            for (text,) in db.session.query(column).filter(or_(*clauses)):
+                live.update(value for value in chunk if value in (text or ""))
+        remaining = [value for value in remaining if value not in live]
+    return live
+
+
+def delete_cids(cid_values: Iterable[str]) -> int:
+    """Delete the CID records for ``cid_values`` and their blobs; commit."""
+    paths = sorted({f"/{value}" for value in cid_values if value})
+    deleted = 0
+    for chunk in _chunks(paths):
+        deleted += CID.query.filter(CID.path.in_(chunk)).delete(
+            synchronize_session=False
+        )
+    db.session.commit()
+
+    store = get_blob_store()
+    if store.external:
+        for path in paths:
+            store.delete(path.lstrip("/"))
+    return deleted
+
+
+def record_retention_archive(
+    manifest_cid: str,
+    archived_rows: int,
+    collected_cids: int,
+    archive: Optional[RetentionArchive] = None,
+) -> RetentionArchive:
+    """Record the manifest of a retention run (updating ``archive``) and commit."""
+    if archive is None:
+        archive = RetentionArchive()
+        db.session.add(archive)
+    archive.manifest_cid = manifest_cid
+    archive.archived_rows = archived_rows
+    archive.collected_cids = collected_cids
+    db.session.commit()
+    return archive
+
+
+def get_retention_archives(limit: Optional[int] = None) -> List[RetentionArchive]:
+    """Return recorded retention runs, newest first."""
+    query = RetentionArchive.query.order_by(
+        RetentionArchive.created_at.desc(), RetentionArchive.id.desc()
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
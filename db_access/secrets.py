@@ -1,6 +1,6 @@
 """Secret CRUD operations."""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from models import Secret
 from db_access.generic_crud import GenericEntityRepository
@@ -14,6 +14,11 @@ def get_secrets() -> List[Secret]:
     return _secret_repo.get_all()
 
 
+def get_secrets_by_ids(ids: Iterable[int]) -> List[Secret]:
+    """Return the secrets with the given ids ordered by name."""
+    return _secret_repo.get_by_ids(ids)
+
+
 def get_template_secrets() -> List[Secret]:
     """Return template secrets from templates variable configuration."""
     from template_manager import (
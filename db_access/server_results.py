@@ -0,0 +1,95 @@
+"""Memoized results of servers that declare themselves cacheable."""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from database import db
+from models import ServerResultMemo
+
+
+def _utcnow() -> datetime:
+    # SQLite hands back naive datetimes, so compare in naive UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def get_server_result_memo(key: str) -> Optional[ServerResultMemo]:
+    """Return the unexpired memo stored under ``key``; expired ones are removed."""
+    memo = ServerResultMemo.query.filter_by(key=key).first()
+    if memo is None:
+        return None
+    if memo.expires_at is not None and memo.expires_at <= _utcnow():
+        delete_server_result_memos(key)
+        return None
+    return memo
+
+
+def record_server_result_memo(
+    key: str,
+    server_name: str,
+    definition_cid: str,
+    result_cid: str,
+    content_type: str,
+    *,
+    ttl_seconds: Optional[int] = None,
+) -> ServerResultMemo:
+    """Store (or replace) the memo for ``key`` and commit."""
+    memo = ServerResultMemo.query.filter_by(key=key).first() or ServerResultMemo(
+        key=key
+    )
+    memo.server_name = server_name
+    memo.definition_cid = definition_cid
+    memo.result_cid = result_cid
+    memo.content_type = content_type
+    memo.created_at = _utcnow()
+    memo.expires_at = (
+        datetime.fromtimestamp(
+            memo.created_at.replace(tzinfo=timezone.utc).timestamp() + ttl_seconds,
+            timezone.utc,
+        ).replace(tzinfo=None)
+        if ttl_seconds
+        else None
+    )
+    db.session.add(memo)
+    db.session.commit()
+    return memo
+
+
+def delete_server_result_memos(*keys: str) -> int:
+    """Delete the memos stored under ``keys`` and commit; return how many."""
+    if not keys:
+        return 0
+    deleted = (
+        ServerResultMemo.query.filter(ServerResultMemo.key.in_(keys)).delete(
+            synchronize_session=False
+        )
+    )
+    db.session.commit()
+    return deleted
+
+
+def prune_server_result_memos(max_entries: int) -> int:
+    """Drop expired memos, then the oldest beyond ``max_entries``; return how many."""
+    removed = ServerResultMemo.query.filter(
+        ServerResultMemo.expires_at.isnot(None),
+        ServerResultMemo.expires_at <= _utcnow(),
+    ).delete(synchronize_session=False)
+
+    excess = ServerResultMemo.query.count() - max(max_entries, 0)
+    if excess > 0:
+        oldest = [
+            memo_id
+            for (memo_id,) in db.session.query(ServerResultMemo.id)
+            .order_by(ServerResultMemo.created_at.asc(), ServerResultMemo.id.asc())
+            .limit(excess)
+        ]
+        removed += ServerResultMemo.query.filter(
+            ServerResultMemo.id.in_(oldest)
+        ).delete(synchronize_session=False)
+
+    db.session.commit()
+    return removed
+
+
+def count_server_result_memos() -> int:
+    """Return the number of stored memos."""
+    return ServerResultMemo.query.count()
@@ -0,0 +1,271 @@
+"""Index of server definition versions recorded in servers snapshots.
+
+Every stored CID whose content is a JSON object is treated as a servers
+snapshot, as server history did before the index: a key naming a server maps
+to its definition. Snapshots are indexed as CIDs are inserted, however they
+arrive (saved definitions, the ``cids/`` directory, imports), and again for
+a new server when it is created after snapshots indexed for other servers.
+Imports backfill the servers they create, and databases that predate the
+index are backfilled at startup.
+
+Only keys naming existing servers are indexed: indexed snapshots are kept by
+retention, which must still collect other JSON content.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import event, func, insert, literal, or_, select
+
+from cid_core import generate_cid
+from database import db
+from models import CID, Server, ServerDefinitionVersion
+
+LOGGER = logging.getLogger(__name__)
+
+# Larger JSON objects are not taken for servers snapshots.
+MAX_SNAPSHOT_BYTES = 8 * 1024 * 1024
+MAX_SNAPSHOT_ENTRIES = 1000
+_SERVER_NAME_LENGTH = ServerDefinitionVersion.server_name.type.length
+
+
+def _definition_cid(definition: Any) -> Optional[str]:
+    if not isinstance(definition, str):
+        return None
+    return generate_cid(definition.encode("utf-8"))
+
+
+def record_server_definition_versions(
+    snapshot_cid: str,
+    definitions: Mapping[str, Any],
+    created_at: Optional[datetime] = None,
+    server_names: Optional[Iterable[str]] = None,
+) -> int:
+    """Index every server in a servers snapshot and return how many were added.
+
+    ``definitions`` is the decoded snapshot (server name to definition text).
+    Servers already indexed for ``snapshot_cid`` are skipped, so recording
+    the same snapshot again is harmless. ``server_names`` limits which
+    entries are indexed.
+    """
+    snapshot_cid = snapshot_cid.lstrip("/")
+    names = set(definitions) if server_names is None else set(server_names)
+    names &= set(definitions)
+    if not snapshot_cid or not names:
+        return 0
+
+    existing = {
+        name
+        for (name,) in db.session.query(ServerDefinitionVersion.server_name).filter(
+            ServerDefinitionVersion.snapshot_cid == snapshot_cid
+        )
+    }
+    added = 0
+    for name in sorted(names - existing):
+        version = ServerDefinitionVersion(
+            server_name=name,
+            definition_cid=_definition_cid(definitions[name]),
+            snapshot_cid=snapshot_cid,
+        )
+        if created_at is not None:
+            version.created_at = created_at
+        db.session.add(version)
+        added += 1
+
+    if added:
+        db.session.commit()
+    return added
+
+
+def snapshot_definitions(data: Any) -> Optional[Dict[str, Any]]:
+    """Return the decoded servers snapshot held by ``data``, if it is one.
+
+    ``data`` is the payload as bytes or a memoryview.
+    """
+    if not data or len(data) > MAX_SNAPSHOT_BYTES:
+        return None
+    if bytes(data[:64]).lstrip()[:1] != b"{":
+        return None
+    try:
+        definitions = json.loads(bytes(data).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(definitions, dict) or len(definitions) > MAX_SNAPSHOT_ENTRIES:
+        return None
+    return {
+        name: value
+        for name, value in definitions.items()
+        if 0 < len(name) <= _SERVER_NAME_LENGTH
+    }
+
+
+def _insert_versions(
+    connection: Any,
+    snapshot_cid: str,
+    definitions: Mapping[str, Any],
+    created_at: Optional[datetime],
+) -> None:
+    """Index ``definitions`` through ``connection``, as flush hooks must."""
+    table = ServerDefinitionVersion.__table__
+    existing = set(
+        connection.execute(
+            select(table.c.server_name).where(table.c.snapshot_cid == snapshot_cid)
+        ).scalars()
+    )
+    rows = [
+        {
+            "server_name": name,
+            "definition_cid": _definition_cid(definition),
+            "snapshot_cid": snapshot_cid,
+            "created_at": created_at,
+        }
+        for name, definition in sorted(definitions.items())
+        if name not in existing
+    ]
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+@event.listens_for(CID, "after_insert")
+def _index_inserted_snapshot(_mapper: Any, connection: Any, target: CID) -> None:
+    if (target.file_size or 0) > MAX_SNAPSHOT_BYTES:
+        return
+    definitions = snapshot_definitions(target.data_view)
+    snapshot_cid = (target.path or "").lstrip("/")
+    if not definitions or not snapshot_cid:
+        return
+    servers = Server.__table__
+    names = set(
+        connection.execute(
+            select(servers.c.name).where(servers.c.name.in_(list(definitions)))
+        ).scalars()
+    )
+    definitions = {name: definitions[name] for name in names}
+    if definitions:
+        _insert_versions(connection, snapshot_cid, definitions, target.created_at)
+
+
+@event.listens_for(Server, "after_insert")
+def _index_snapshots_of_new_server(
+    _mapper: Any, connection: Any, target: Server
+) -> None:
+    """Index ``target`` in snapshots already indexed for other servers.
+
+    Reading only indexed snapshots keeps creating a server cheap; snapshots
+    that named no server when stored (e.g. imported before their servers)
+    are picked up by :func:`backfill_server_definition_versions`.
+    """
+    cids = CID.__table__
+    versions = ServerDefinitionVersion.__table__
+    candidates = connection.execute(
+        select(cids.c.path, cids.c.file_data, cids.c.created_at).where(
+            cids.c.path.in_(
+                select(literal("/") + versions.c.snapshot_cid).distinct()
+            )
+        )
+    )
+    for path, data, created_at in candidates:
+        definitions = snapshot_definitions(data) or {}
+        snapshot_cid = (path or "").lstrip("/")
+        if target.name in definitions and snapshot_cid:
+            _insert_versions(
+                connection,
+                snapshot_cid,
+                {target.name: definitions[target.name]},
+                created_at,
+            )
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def get_server_definition_versions(
+    server_name: str, definition_prefix: Optional[str] = None
+) -> List[ServerDefinitionVersion]:
+    """Return indexed versions of ``server_name``, newest first.
+
+    ``definition_prefix`` restricts the result to definition CIDs starting
+    with it; the range condition lets the ``(server_name, definition_cid)``
+    index answer partial-CID lookups.
+    """
+    query = ServerDefinitionVersion.query.filter(
+        ServerDefinitionVersion.server_name == server_name
+    )
+    if definition_prefix:
+        column = ServerDefinitionVersion.definition_cid
+        query = query.filter(
+            column >= definition_prefix,
+            column < _prefix_upper_bound(definition_prefix),
+            column.startswith(definition_prefix, autoescape=True),
+        )
+    return query.order_by(
+        ServerDefinitionVersion.created_at.desc(),
+        ServerDefinitionVersion.id.desc(),
+    ).all()
+
+
+def backfill_server_definition_versions(
+    batch_size: int = 200, server_names: Optional[Iterable[str]] = None
+) -> int:
+    """Index servers snapshots already stored as CIDs; return rows added.
+
+    Needed for CIDs stored before the index existed (or written around the
+    ORM) and for snapshots stored before their servers, as imports do; other
+    new CIDs are indexed as they are inserted. ``server_names`` limits the
+    servers indexed to those that exist.
+    """
+    existing = {name for (name,) in db.session.query(Server.name)}
+    server_names = existing if server_names is None else existing & set(server_names)
+    if not server_names:
+        return 0
+    added = 0
+    last_id = 0
+    while True:
+        # Payloads in an external blob store are stored empty and checked in
+        # Python; others must start with "{" to be read at all.
+        rows = (
+            db.session.query(CID.id, CID.path, CID.created_at)
+            .filter(
+                CID.id > last_id,
+                or_(
+                    func.substr(CID.stored_data, 1, 1) == b"{",
+                    func.length(CID.stored_data) == 0,
+                ),
+            )
+            .order_by(CID.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return added
+        last_id = rows[-1][0]
+
+        for cid_id, path, created_at in rows:
+            record = db.session.get(CID, cid_id)
+            definitions = snapshot_definitions(
+                record.data_view if record is not None else None
+            )
+            if definitions:
+                added += record_server_definition_versions(
+                    path or "",
+                    definitions,
+                    created_at=created_at,
+                    server_names=server_names,
+                )
+
+
+def ensure_server_definition_versions() -> bool:
+    """Backfill the index when it is empty but servers and CIDs are stored.
+
+    Returns True when a backfill added versions.
+    """
+    if db.session.query(ServerDefinitionVersion.id).first() is not None:
+        return False
+    if db.session.query(Server.id).first() is None:
+        return False
+    if db.session.query(CID.id).first() is None:
+        return False
+    return backfill_server_definition_versions() > 0
@@ -1,6 +1,6 @@
 """Server CRUD operations."""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from models import Server
 from db_access._common import DEFAULT_AI_SERVER_NAME
@@ -15,6 +15,11 @@ def get_servers() -> List[Server]:
     return _server_repo.get_all()
 
 
+def get_servers_by_ids(ids: Iterable[int]) -> List[Server]:
+    """Return the servers with the given ids ordered by name."""
+    return _server_repo.get_by_ids(ids)
+
+
 def get_template_servers() -> List[Server]:
     """Return template servers from templates variable configuration."""
     from template_manager import (
@@ -1,6 +1,6 @@
 """Variable CRUD operations."""
 
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 from models import Variable
 from db_access.generic_crud import GenericEntityRepository
@@ -14,6 +14,11 @@ def get_variables() -> List[Variable]:
     return _variable_repo.get_all()
 
 
+def get_variables_by_ids(ids: Iterable[int]) -> List[Variable]:
+    """Return the variables with the given ids ordered by name."""
+    return _variable_repo.get_by_ids(ids)
+
+
 def get_template_variables() -> List[Variable]:
     """Return template variables from templates variable configuration."""
     from template_manager import (
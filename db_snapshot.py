@@ -1,16 +1,45 @@
 # db_snapshot.py
-"""Snapshot and restore in-memory database state for debugging."""
+"""Snapshot and restore in-memory database state for debugging.
+
+Snapshots are written with :mod:`snapshot_stream`, one row at a time, so
+creating one does not hold the database in memory a second time. A snapshot
+taken with a ``parent`` is differential: rows of the append-only tables
+(page views, interactions, invocations, exports and CIDs) are only written
+when their id is beyond the parent's, while the small definition tables are
+always written in full. Restoring a differential snapshot restores its
+parents first.
+
+Those tables are not strictly append-only: CID eviction and retention
+delete from them. A table is therefore only written as differences when
+none of the parent's rows has been deleted since, judged by the table's
+deletion version (when the parent was taken by this process) and by the
+number of rows at or below the parent's highest id; otherwise the child
+holds that table in full.
+
+Snapshots written by older versions as ``<name>.json`` are still listed and
+described but cannot be restored.
+"""
 
 import json
+import logging
 import os
+import sqlite3
+import uuid
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import undefer
+
+from change_tracking import get_deletion_version, mark_tables_changed
+from database import db
+from db_access import rebuild_page_view_rollups
 from db_config import DatabaseConfig
 from models import (
-    Alias,
     CID,
+    Alias,
     EntityInteraction,
     Export,
     PageView,
@@ -19,22 +48,160 @@ from models import (
     ServerInvocation,
     Variable,
 )
+from snapshot_stream import SnapshotReader, SnapshotWriter
+
+# (snapshot table name, model, append only)
+SNAPSHOT_TABLES = (
+    ("servers", Server, False),
+    ("aliases", Alias, False),
+    ("variables", Variable, False),
+    ("secrets", Secret, False),
+    ("page_views", PageView, True),
+    ("entity_interactions", EntityInteraction, True),
+    ("server_invocations", ServerInvocation, True),
+    ("exports", Export, True),
+    ("cids", CID, True),
+)
+
+SNAPSHOT_FORMAT = 2
+STREAM_BATCH_SIZE = 500
+CID_STREAM_BATCH_SIZE = 50
+RESTORE_BATCH_SIZE = 500
+CID_COLUMNS = ("id", "path", "file_data", "file_size", "created_at")
+
+# Deletion versions (see change_tracking) only mean something in the process
+# that recorded them.
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+logger = logging.getLogger(__name__)
 
 
 class DatabaseSnapshot:
     """Manages snapshots of in-memory database state."""
 
     SNAPSHOT_DIR = "snapshots"
+    SNAPSHOT_SUFFIX = ".snap"
+    LEGACY_SUFFIX = ".json"
+
+    @classmethod
+    def _path(cls, name: str, suffix: Optional[str] = None) -> str:
+        return os.path.join(cls.SNAPSHOT_DIR, f"{name}{suffix or cls.SNAPSHOT_SUFFIX}")
+
+    @classmethod
+    def _read_summary(cls, name: str) -> dict[str, Any]:
+        """Scan a snapshot and return its header merged with its footer."""
+        path = cls._path(name)
+        if not os.path.exists(path):
+            raise RuntimeError(f"Snapshot not found: {name}")
+        with open(path, "rb") as f:
+            reader = SnapshotReader(f)
+            for _info, _rows in reader.tables():
+                pass
+            return {
+                **reader.header,
+                **(reader.footer or {}),
+                "compression": reader.compression,
+            }
+
+    @staticmethod
+    def _stream_rows(model: Any, min_id: int) -> Iterator[list[Any]]:
+        if model is CID:
+            query = (
+                CID.query.options(undefer(CID.stored_data))
+                .filter(CID.id > min_id)
+                .order_by(CID.id)
+                .yield_per(CID_STREAM_BATCH_SIZE)
+            )
+            for cid in query:
+                yield [cid.id, cid.path, cid.data_view, cid.file_size, cid.created_at]
+            return
+
+        table = model.__table__
+        statement = (
+            select(table)
+            .where(table.c.id > min_id)
+            .order_by(table.c.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for row in db.session.execute(statement):
+            yield list(row)
+
+    @staticmethod
+    def _count_rows(model: Any, max_id: Optional[int] = None) -> int:
+        query = db.session.query(func.count(model.id))
+        if max_id is not None:
+            query = query.filter(model.id <= max_id)
+        return int(query.scalar() or 0)
+
+    @classmethod
+    def _unchanged_since(cls, table_name: str, model: Any, parent: dict) -> bool:
+        """Return True if no row in ``parent`` has been deleted from the table."""
+        max_id = parent.get("max_ids", {}).get(table_name)
+        row_count = parent.get("row_counts", {}).get(table_name)
+        if max_id is None or row_count is None:
+            return False
+        if parent.get("process") == _PROCESS_TOKEN and parent.get(
+            "deletion_versions", {}
+        ).get(table_name) != get_deletion_version(model.__tablename__):
+            return False
+        return cls._count_rows(model, max_id) == row_count
+
+    @classmethod
+    def _differential_base(
+        cls, table_name: str, model: Any, parent: Optional[str], parent_summary: dict
+    ) -> Optional[int]:
+        """Return the parent's max id if the table can be written as differences."""
+        if parent is None:
+            return None
+        if not cls._unchanged_since(table_name, model, parent_summary):
+            logger.info(
+                "Rows were deleted from %s since snapshot %s; "
+                "writing the table in full",
+                table_name,
+                parent,
+            )
+            return None
+        return parent_summary["max_ids"][table_name]
 
     @classmethod
-    def create_snapshot(cls, name: Optional[str] = None) -> str:
+    def _write_table(
+        cls, writer: SnapshotWriter, table_name: str, model: Any, min_id: Optional[int]
+    ) -> tuple[int, int]:
+        """Write the rows above ``min_id`` (all when None); return count and max id."""
+        columns = (
+            CID_COLUMNS if model is CID else [c.name for c in model.__table__.columns]
+        )
+        writer.begin_table(
+            table_name, columns, mode="replace" if min_id is None else "append"
+        )
+        count = 0
+        max_id = min_id or 0
+        for values in cls._stream_rows(model, min_id or 0):
+            writer.write_row(values)
+            count += 1
+            max_id = max(max_id, values[0])
+        return count, max_id
+
+    @classmethod
+    def create_snapshot(
+        cls,
+        name: Optional[str] = None,
+        *,
+        parent: Optional[str] = None,
+        compression: str = "none",
+    ) -> str:
         """
         Create a snapshot of the current in-memory database state.
 
+        Args:
+            name: Snapshot name (defaults to a timestamp)
+            parent: Existing snapshot to record the differences from
+            compression: "none", "gzip" or "zstd"
+
         Returns the path to the snapshot file.
 
         Raises:
-            RuntimeError: If not in memory mode
+            RuntimeError: If not in memory mode or the parent does not exist
         """
         if not DatabaseConfig.is_memory_mode():
             raise RuntimeError("Snapshots are only supported in memory mode")
@@ -42,86 +209,181 @@ class DatabaseSnapshot:
         if name is None:
             name = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
 
+        parent_summary: dict[str, Any] = {}
+        if parent is not None:
+            parent_summary = cls._read_summary(parent)
+
         os.makedirs(cls.SNAPSHOT_DIR, exist_ok=True)
-        snapshot_path = os.path.join(cls.SNAPSHOT_DIR, f"{name}.json")
-
-        snapshot_data = {"created_at": datetime.now(UTC).isoformat(), "tables": {}}
-
-        # Export each model's data
-        models = [
-            ("servers", Server),
-            ("aliases", Alias),
-            ("variables", Variable),
-            ("secrets", Secret),
-            ("page_views", PageView),
-            ("entity_interactions", EntityInteraction),
-            ("server_invocations", ServerInvocation),
-            ("exports", Export),
-        ]
-
-        for table_name, model in models:
-            records = []
-            for record in model.query.all():
-                record_dict = {
-                    c.name: getattr(record, c.name)
-                    for c in record.__table__.columns
-                    if c.name != "id"
-                }
-                # Handle datetime serialization
-                for key, value in record_dict.items():
-                    if hasattr(value, "isoformat"):
-                        record_dict[key] = value.isoformat()
-                    elif isinstance(value, bytes):
-                        record_dict[key] = value.hex()
-                records.append(record_dict)
-            snapshot_data["tables"][table_name] = records
-
-        # Handle CIDs separately due to binary data
-        cid_records = []
-        for cid in CID.query.all():
-            cid_records.append(
-                {
-                    "path": cid.path,
-                    "file_data": cid.file_data.hex() if cid.file_data else None,
-                    "file_size": cid.file_size,
-                    "created_at": (
-                        cid.created_at.isoformat() if cid.created_at else None
-                    ),
-                }
-            )
-        snapshot_data["tables"]["cids"] = cid_records
+        snapshot_path = cls._path(name)
+        temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
 
-        with open(snapshot_path, "w", encoding="utf-8") as f:
-            json.dump(snapshot_data, f, indent=2)
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "created_at": datetime.now(UTC).isoformat(),
+            "parent": parent,
+        }
+        footer: dict[str, Any] = {
+            "tables": {},
+            "max_ids": {},
+            "row_counts": {},
+            "process": _PROCESS_TOKEN,
+            "deletion_versions": {},
+        }
+        try:
+            with open(temp_path, "wb") as f:
+                writer = SnapshotWriter(f, header, compression)
+                for table_name, model, append_only in SNAPSHOT_TABLES:
+                    min_id = (
+                        cls._differential_base(
+                            table_name, model, parent, parent_summary
+                        )
+                        if append_only
+                        else None
+                    )
+                    (
+                        footer["tables"][table_name],
+                        footer["max_ids"][table_name],
+                    ) = cls._write_table(writer, table_name, model, min_id)
+                    if append_only:
+                        footer["row_counts"][table_name] = cls._count_rows(model)
+                        footer["deletion_versions"][table_name] = (
+                            get_deletion_version(model.__tablename__)
+                        )
+                writer.close(footer)
+            os.replace(temp_path, snapshot_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
         return snapshot_path
 
+    @classmethod
+    def _snapshot_chain(cls, name: str) -> list[str]:
+        """Return ``name`` and its ancestors, oldest first."""
+        chain: list[str] = []
+        current: Optional[str] = name
+        while current is not None:
+            if current in chain:
+                raise RuntimeError(f"Snapshot parent cycle at {current}")
+            if not os.path.exists(cls._path(current)):
+                if os.path.exists(cls._path(current, cls.LEGACY_SUFFIX)):
+                    raise RuntimeError(
+                        f"Snapshot {current} uses the legacy JSON format "
+                        "and cannot be restored"
+                    )
+                raise RuntimeError(f"Snapshot not found: {current}")
+            chain.append(current)
+            with open(cls._path(current), "rb") as f:
+                current = SnapshotReader(f).header.get("parent")
+        chain.reverse()
+        return chain
+
+    @classmethod
+    def restore_snapshot(cls, name: str) -> dict[str, int]:
+        """
+        Replace the in-memory database contents with a snapshot.
+
+        Differential snapshots are applied on top of their parents. Rows are
+        written with executemany inserts in batches.
+
+        Returns the number of rows restored per table.
+
+        Raises:
+            RuntimeError: If not in memory mode or a snapshot is missing
+        """
+        from cid_memory_manager import CIDMemoryManager  # pylint: disable=import-outside-toplevel
+
+        if not DatabaseConfig.is_memory_mode():
+            raise RuntimeError("Snapshots are only supported in memory mode")
+
+        models = {table_name: model for table_name, model, _ in SNAPSHOT_TABLES}
+        restored = {table_name: 0 for table_name in models}
+        try:
+            for snapshot in cls._snapshot_chain(name):
+                with open(cls._path(snapshot), "rb") as f:
+                    reader = SnapshotReader(f)
+                    for info, rows in reader.tables():
+                        model = models.get(info["name"])
+                        if model is None:
+                            continue
+                        if info.get("mode") != "append":
+                            # Through the ORM so caches watching bulk deletes notice.
+                            db.session.query(model).delete(synchronize_session=False)
+                            restored[info["name"]] = 0
+                        restored[info["name"]] += cls._insert_rows(
+                            model.__table__, info["columns"], rows
+                        )
+            db.session.commit()
+            # Restored views bypass the ORM, which keeps the rollups current.
+            rebuild_page_view_rollups()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            mark_tables_changed(*(model.__tablename__ for model in models.values()))
+            CIDMemoryManager.invalidate()
+
+        return restored
+
+    @staticmethod
+    def _insert_rows(table: Any, columns: list[str], rows: Iterator[list[Any]]) -> int:
+        known = [column for column in columns if column in table.c]
+        statement = insert(table)
+        count = 0
+        batch: list[dict[str, Any]] = []
+        for values in rows:
+            row = dict(zip(columns, values))
+            batch.append({column: row[column] for column in known})
+            if len(batch) >= RESTORE_BATCH_SIZE:
+                db.session.execute(statement, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            db.session.execute(statement, batch)
+            count += len(batch)
+        return count
+
     @classmethod
     def list_snapshots(cls) -> list[str]:
         """List all available snapshots."""
         if not os.path.exists(cls.SNAPSHOT_DIR):
             return []
-        return sorted(
-            [f[:-5] for f in os.listdir(cls.SNAPSHOT_DIR) if f.endswith(".json")]
-        )
+        names = set()
+        for filename in os.listdir(cls.SNAPSHOT_DIR):
+            for suffix in (cls.SNAPSHOT_SUFFIX, cls.LEGACY_SUFFIX):
+                if filename.endswith(suffix):
+                    names.add(filename[: -len(suffix)])
+        return sorted(names)
 
     @classmethod
     def delete_snapshot(cls, name: str) -> bool:
         """Delete a snapshot by name."""
-        snapshot_path = os.path.join(cls.SNAPSHOT_DIR, f"{name}.json")
-        if os.path.exists(snapshot_path):
-            os.remove(snapshot_path)
-            return True
-        return False
+        deleted = False
+        for suffix in (cls.SNAPSHOT_SUFFIX, cls.LEGACY_SUFFIX):
+            snapshot_path = cls._path(name, suffix)
+            if os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+                deleted = True
+        return deleted
 
     @classmethod
     def get_snapshot_info(cls, name: str) -> Optional[dict]:
         """Get information about a snapshot."""
-        snapshot_path = os.path.join(cls.SNAPSHOT_DIR, f"{name}.json")
-        if not os.path.exists(snapshot_path):
+        if os.path.exists(cls._path(name)):
+            summary = cls._read_summary(name)
+            return {
+                "name": name,
+                "created_at": summary.get("created_at"),
+                "parent": summary.get("parent"),
+                "compression": summary.get("compression"),
+                "tables": dict(summary.get("tables", {})),
+            }
+
+        legacy_path = cls._path(name, cls.LEGACY_SUFFIX)
+        if not os.path.exists(legacy_path):
             return None
 
-        with open(snapshot_path, "r", encoding="utf-8") as f:
+        with open(legacy_path, "r", encoding="utf-8") as f:
             data = json.load(f)
 
         info = {
@@ -143,9 +405,6 @@ class DatabaseSnapshot:
         Args:
             target_path: Path to the target SQLite file.
         """
-        import sqlite3
-        from database import db
-
         if not DatabaseConfig.is_memory_mode():
             raise RuntimeError("Snapshots are only supported in memory mode")
 
@@ -155,21 +414,7 @@ class DatabaseSnapshot:
 
         # Get the raw connection from SQLAlchemy
         with db.engine.connect() as connection:
-            raw_connection = connection.connection
-
-            # Handle SQLAlchemy/driver wrappers to get to the actual sqlite3 connection
-            if hasattr(raw_connection, "dbapi_connection"):
-                raw_connection = raw_connection.dbapi_connection
-
-            if not isinstance(raw_connection, sqlite3.Connection):
-                # Try one more level of unwrapping if needed (e.g. for some pool proxies)
-                if hasattr(raw_connection, "connection"):
-                    raw_connection = raw_connection.connection
-
-            if not isinstance(raw_connection, sqlite3.Connection):
-                raise RuntimeError(
-                    f"Could not get raw SQLite connection. Got {type(raw_connection)}"
-                )
+            raw_connection = raw_sqlite_connection(connection)
 
             # Open the target database
             dest_conn = sqlite3.connect(str(target_path))
@@ -179,3 +424,28 @@ class DatabaseSnapshot:
                     raw_connection.backup(dest_conn)
             finally:
                 dest_conn.close()
+
+
+def raw_sqlite_connection(connection) -> sqlite3.Connection:
+    """Return the sqlite3 connection behind a SQLAlchemy connection.
+
+    Raises:
+        RuntimeError: If the connection is not backed by sqlite3
+    """
+
+    raw_connection = connection.connection
+
+    # Handle SQLAlchemy/driver wrappers to get to the actual sqlite3 connection
+    if hasattr(raw_connection, "dbapi_connection"):
+        raw_connection = raw_connection.dbapi_connection
+
+    if not isinstance(raw_connection, sqlite3.Connection):
+        # Try one more level of unwrapping if needed (e.g. for some pool proxies)
+        if hasattr(raw_connection, "connection"):
+            raw_connection = raw_connection.connection
+
+    if not isinstance(raw_connection, sqlite3.Connection):
+        raise RuntimeError(
+            f"Could not get raw SQLite connection. Got {type(raw_connection)}"
+        )
+    return raw_connection
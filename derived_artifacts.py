@@ -0,0 +1,164 @@
+"""Persistent cache of content derived from immutable CIDs.
+
+Rendering a CID (Markdown to HTML, a QR code page, syntax highlighting)
+always produces the same output for the same renderer, so the output is
+stored as a CID of its own and recorded against::
+
+    (renderer, renderer version, options, source CID)
+
+Later requests look the record up and read the stored blob instead of
+rendering again. Bump a renderer's version whenever its output changes so
+stale artifacts are no longer found.
+
+``DERIVED_ARTIFACT_MAX_BYTES`` skips storing outputs that are too large to
+be worth keeping twice, and ``DERIVED_ARTIFACT_MAX_ENTRIES`` bounds the table
+(oldest artifacts are pruned).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, has_app_context
+
+from cid_core import generate_cid
+from cid_memo import CIDMemo, MemoLimits
+from cid_presenter import format_cid
+
+DEFAULT_MAX_ARTIFACT_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def _prune(max_entries: int) -> None:
+    from db_access import prune_derived_artifacts  # pylint: disable=import-outside-toplevel
+
+    prune_derived_artifacts(max_entries)
+
+
+_memo = CIDMemo(
+    "derived artifact",
+    "renderers",
+    MemoLimits(
+        max_bytes_env="DERIVED_ARTIFACT_MAX_BYTES",
+        default_max_bytes=DEFAULT_MAX_ARTIFACT_BYTES,
+        max_entries_env="DERIVED_ARTIFACT_MAX_ENTRIES",
+        default_max_entries=DEFAULT_MAX_ENTRIES,
+    ),
+    _prune,
+)
+
+
+def _database_available() -> bool:
+    return has_app_context() and "sqlalchemy" in current_app.extensions
+
+
+def source_cid_for(data: bytes) -> str:
+    """Return the CID of ``data`` (for renderers whose input is not yet a CID)."""
+    return format_cid(generate_cid(data))
+
+
+def artifact_key(
+    renderer: str, version: str, source_cid: str, options: Any = None
+) -> str:
+    """Return the lookup key for one rendering of ``source_cid``."""
+    payload = json.dumps(
+        [renderer, version, options, source_cid],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _recorder(key: str, renderer: str, source_cid: str) -> Callable[[str], Any]:
+    def record(result_cid: str) -> None:
+        from db_access import record_derived_artifact  # pylint: disable=import-outside-toplevel
+
+        record_derived_artifact(key, renderer, source_cid, result_cid)
+
+    return record
+
+
+def find_derived_cid(
+    renderer: str, version: str, source_cid: str, options: Any = None
+) -> Optional[str]:
+    """Return the recorded result CID without reading its content."""
+    if not _database_available():
+        return None
+    from db_access import get_derived_artifact  # pylint: disable=import-outside-toplevel
+
+    key = artifact_key(renderer, version, source_cid, options)
+    artifact = _memo.find(renderer, lambda: get_derived_artifact(key))
+    return artifact.result_cid if artifact is not None else None
+
+
+def record_derived_cid(
+    renderer: str,
+    version: str,
+    source_cid: str,
+    result_cid: str,
+    options: Any = None,
+) -> bool:
+    """Record an already stored ``result_cid`` as the rendering of ``source_cid``."""
+    if not _database_available():
+        return False
+    key = artifact_key(renderer, version, source_cid, options)
+    return _memo.record(renderer, result_cid, _recorder(key, renderer, source_cid))
+
+
+def render_derived(
+    renderer: str,
+    version: str,
+    source_cid: Optional[str],
+    render: Callable[[], Optional[bytes]],
+    *,
+    options: Any = None,
+    store_if: Optional[Callable[[bytes], bool]] = None,
+) -> Optional[bytes]:
+    """Return ``render()`` for ``source_cid``, reusing a stored result when possible.
+
+    ``render`` may return None to signal that nothing should be stored, and
+    ``store_if`` can reject outputs that are not final (e.g. placeholders).
+    Without a source CID or a database-backed app context it is simply called.
+    """
+    if not source_cid or not _database_available():
+        return render()
+
+    # pylint: disable=import-outside-toplevel
+    from db_access import delete_derived_artifacts, get_derived_artifact
+
+    key = artifact_key(renderer, version, source_cid, options)
+    cached = _memo.lookup(
+        renderer,
+        lambda: get_derived_artifact(key),
+        lambda: delete_derived_artifacts(key),
+    )
+    if cached is not None:
+        return cached[1]
+
+    output = render()
+    if output is not None and (store_if is None or store_if(output)):
+        _memo.store(renderer, output, _recorder(key, renderer, source_cid))
+    return output
+
+
+def get_derived_artifact_stats() -> Dict[str, Any]:
+    """Return overall and per-renderer hit statistics."""
+    return _memo.stats()
+
+
+def reset_derived_artifact_stats() -> None:
+    """Zero the statistics."""
+    _memo.reset()
+
+
+__all__ = [
+    "artifact_key",
+    "find_derived_cid",
+    "get_derived_artifact_stats",
+    "record_derived_cid",
+    "render_derived",
+    "reset_derived_artifact_stats",
+    "source_cid_for",
+]
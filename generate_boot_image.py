@@ -9,8 +9,13 @@ This script:
 5. Converts minimal.boot.source.json to minimal.boot.json (filenames -> CIDs)
 6. Converts default.boot.source.json to default.boot.json (filenames -> CIDs)
 7. Ensures all generated CIDs are stored in /cids
+
+With ``--sqlite`` it also imports each boot CID into an in-memory database and
+saves the result under /boot_images, so in-memory instances can restore it
+instead of replaying the import at startup.
 """
 
+import argparse
 import json
 from pathlib import Path
 from typing import Any, Dict, Optional, Set
@@ -790,10 +795,49 @@ class BootImageGenerator:
         }
 
 
-def main():
+def build_sqlite_images(
+    result: Dict[str, str], base_dir: Path, output_dir: Optional[Path] = None
+) -> Dict[str, Path]:
+    """Build a prebuilt SQLite database for each generated boot CID."""
+    # pylint: disable=import-outside-toplevel
+    from boot_image_db import boot_image_directory, boot_image_path, build_boot_image
+
+    output_dir = output_dir or boot_image_directory()
+    images: Dict[str, Path] = {}
+    print("\nBuilding SQLite boot images")
+    for key in ("minimal_boot_cid", "default_boot_cid", "readonly_boot_cid", "boot_cid"):
+        boot_cid = result.get(key)
+        if not boot_cid or boot_cid in images:
+            continue
+        images[boot_cid] = build_boot_image(
+            boot_cid,
+            boot_image_path(boot_cid, output_dir),
+            cid_directory=base_dir / "cids",
+        )
+        print(f"  {key}: {images[boot_cid]}")
+    return images
+
+
+def main(argv: Optional[list[str]] = None):
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Generate boot images.")
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="Also build a prebuilt SQLite database for each boot CID",
+    )
+    parser.add_argument(
+        "--sqlite-dir",
+        type=Path,
+        default=None,
+        help="Directory for the SQLite images (default: BOOT_IMAGE_DB_DIR or ./boot_images)",
+    )
+    args = parser.parse_args(argv)
+
     generator = BootImageGenerator()
     result = generator.generate()
+    if args.sqlite:
+        build_sqlite_images(result, generator.base_dir, args.sqlite_dir)
     return result
 
 
@@ -1,12 +1,14 @@
 import argparse
+import atexit
 import logging
 import os
 import signal
 import sys
 from functools import lru_cache
-from typing import Any, Mapping
+from typing import Any, Mapping, Optional
 
 from db_config import DatabaseConfig, DatabaseMode
+from startup_timing import report_startup_phases, startup_phase
 
 
 @lru_cache(maxsize=4)
@@ -49,6 +51,30 @@ def configure_logging(debug_enabled: bool) -> int:
 app = None
 
 
+def flush_background_writers() -> None:
+    """Flush queued provenance records and page views, and stop script workers."""
+    from page_view_writer import (  # pylint: disable=import-outside-toplevel
+        shutdown_page_view_writer,
+    )
+    from server_execution.provenance_writer import (  # pylint: disable=import-outside-toplevel
+        shutdown_provenance_writer,
+    )
+    from server_execution.script_workers import (  # pylint: disable=import-outside-toplevel
+        shutdown_script_workers,
+    )
+
+    shutdown_script_workers()
+
+    if not shutdown_provenance_writer(timeout=10.0):
+        print(
+            "Warning: timed out flushing queued server invocation records",
+            file=sys.stderr,
+        )
+
+    if not shutdown_page_view_writer(timeout=10.0):
+        print("Warning: timed out flushing buffered page views", file=sys.stderr)
+
+
 def signal_handler(_sig, _frame):
     print("\nShutting down gracefully...")
     sys.exit(0)
@@ -265,7 +291,9 @@ def handle_list_snapshots_command() -> None:
     sys.exit(0)
 
 
-def handle_create_snapshot_command(name: str) -> None:
+def handle_create_snapshot_command(
+    name: str, parent: Optional[str] = None, compression: str = "none"
+) -> None:
     """Create an in-memory database snapshot and exit."""
     if not DatabaseConfig.is_memory_mode():
         print(
@@ -279,7 +307,9 @@ def handle_create_snapshot_command(name: str) -> None:
     app = get_app()
 
     with app.app_context():
-        snapshot_path = DatabaseSnapshot.create_snapshot(name)
+        snapshot_path = DatabaseSnapshot.create_snapshot(
+            name, parent=parent, compression=compression
+        )
 
     print(f"Snapshot stored at {snapshot_path}")
     sys.exit(0)
@@ -465,6 +495,18 @@ if __name__ == "__main__":
         action="store_true",
         help="List available in-memory database snapshots and exit",
     )
+    parser.add_argument(
+        "--snapshot-parent",
+        type=str,
+        metavar="NAME",
+        help="Make the --snapshot differential against an existing snapshot",
+    )
+    parser.add_argument(
+        "--snapshot-compression",
+        choices=("none", "gzip", "zstd"),
+        default="none",
+        help="Compression for --snapshot files (default: none)",
+    )
     parser.add_argument(
         "--read-only",
         action="store_true",
@@ -476,6 +518,17 @@ if __name__ == "__main__":
         default="1G",
         help="Maximum memory for CID storage in read-only mode (default: 1G, e.g., 100M, 2G)",
     )
+    parser.add_argument(
+        "--cid-eviction-policy",
+        choices=("gds", "lru", "lfu"),
+        default="gds",
+        help="Which CIDs to evict when read-only CID memory is full (default: gds)",
+    )
+    parser.add_argument(
+        "--async-provenance",
+        action="store_true",
+        help="Record server invocation provenance on a background writer thread",
+    )
     parser.add_argument(
         "positional",
         nargs="*",
@@ -501,9 +554,13 @@ if __name__ == "__main__":
         except ValueError as e:
             print(f"Error: Invalid --max-cid-memory value: {e}", file=sys.stderr)
             sys.exit(1)
+        ReadOnlyConfig.set_cid_eviction_policy(args.cid_eviction_policy)
     elif args.in_memory_db:
         DatabaseConfig.set_mode(DatabaseMode.MEMORY)
 
+    if args.async_provenance:
+        os.environ["PROVENANCE_WRITER_MODE"] = "async"
+
     # Handle --help
     if args.help:
         from cli import print_help  # pylint: disable=import-outside-toplevel
@@ -515,7 +572,9 @@ if __name__ == "__main__":
         handle_list_snapshots_command()
 
     if args.snapshot:
-        handle_create_snapshot_command(args.snapshot)
+        handle_create_snapshot_command(
+            args.snapshot, args.snapshot_parent, args.snapshot_compression
+        )
 
     # Handle --list
     if args.list:
@@ -547,11 +606,18 @@ if __name__ == "__main__":
     # Register signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    atexit.register(flush_background_writers)
 
     try:
+        with startup_phase("create_app"):
+            get_app()
+
         # Handle boot CID import if specified
         if cid:
-            handle_boot_cid_import(cid)
+            with startup_phase("boot_import"):
+                handle_boot_cid_import(cid)
+
+        report_startup_phases()
 
         # Handle HTTP GET request if URL specified (without --show)
         if url and not args.show:
@@ -0,0 +1,98 @@
+"""Background worker that renders Mermaid diagrams for one app.
+
+:class:`content_rendering.MermaidRenderer` queues diagrams it has not stored
+yet; the worker thread calls the renderer's ``render_in_background`` for each
+one inside the app's context, so requests never wait on the renderer.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MERMAID_QUEUE_SIZE = 100
+
+
+class MermaidRenderWorker:
+    """Bounded queue plus worker thread that renders diagrams for one app."""
+
+    def __init__(
+        self,
+        renderer: Any,
+        app: Any,
+        max_queue_size: int = MERMAID_QUEUE_SIZE,
+    ) -> None:
+        self.app = app
+        self._renderer = renderer
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max(1, max_queue_size))
+        self._queued: set[str] = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._counts = {"submitted": 0, "rendered": 0, "failed": 0, "dropped": 0}
+        self._thread = threading.Thread(
+            target=self._run, name="mermaid-renderer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, source: str) -> bool:
+        """Queue ``source`` unless it is already queued; False when dropped."""
+        with self._lock:
+            if source in self._queued:
+                return True
+            try:
+                self._queue.put_nowait(source)
+            except queue.Full:
+                # The diagram is still shown from the remote URL and will be
+                # queued again by a later request.
+                self._counts["dropped"] += 1
+                return False
+            self._queued.add(source)
+            self._counts["submitted"] += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        condition = self._queue.all_tasks_done
+        with condition:
+            while self._queue.unfinished_tasks:
+                if deadline is None:
+                    condition.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                condition.wait(remaining)
+        return True
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"queue_depth": self._queue.qsize(), **self._counts}
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                source = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            outcome = "rendered"
+            try:
+                with self.app.app_context():
+                    self._renderer.render_in_background(source)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # A failed diagram keeps its remote URL; the thread must survive.
+                logger.warning("Background Mermaid render failed", exc_info=True)
+                outcome = "failed"
+            finally:
+                with self._lock:
+                    self._queued.discard(source)
+                    self._counts[outcome] += 1
+                self._queue.task_done()
+
+
+__all__ = ["MERMAID_QUEUE_SIZE", "MermaidRenderWorker"]
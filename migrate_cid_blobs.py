@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Move CID payloads from the database into the directory blob store.
+
+Each CID row whose ``file_data`` column still holds bytes is written to
+``<blob-dir>/<prefix>/<cid>`` and the column is emptied, leaving only the
+path, size and creation time in the database.  Rows are processed in
+batches by id, so the migration can be interrupted and re-run safely.
+
+Usage:
+    python migrate_cid_blobs.py [--blob-dir cid_blobs] [--batch-size 500]
+                                [--dry-run] [--vacuum]
+
+Afterwards start the application with ``CID_BLOB_STORE=directory`` (and the
+same ``CID_BLOB_DIR``) so new payloads go to the blob store too.
+"""
+
+import argparse
+import os
+import sys
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add script directory to path to enable imports from the application
+# This must happen before importing app modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# pylint: disable=wrong-import-position
+# Rationale: sys.path manipulation required before app imports for standalone migration script
+from app import create_app
+from cid_blob_store import DEFAULT_BLOB_DIR, DirectoryBlobStore
+from database import db
+from models import CID
+
+
+def migrate_cid_blobs(
+    blob_dir: str, *, batch_size: int = 500, dry_run: bool = False, vacuum: bool = False
+) -> int:
+    """Move payloads into ``blob_dir`` and return how many rows were migrated."""
+
+    store = DirectoryBlobStore(blob_dir)
+    migrated = 0
+    moved_bytes = 0
+    last_id = 0
+
+    while True:
+        # Only ids and sizes are selected so the batch query stays small.
+        rows = (
+            db.session.query(CID.id, CID.path, func.length(CID.file_data))
+            .filter(CID.id > last_id, func.length(CID.file_data) > 0)
+            .order_by(CID.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        for cid_id, path, size in rows:
+            last_id = cid_id
+            migrated += 1
+            moved_bytes += size or 0
+            if dry_run:
+                continue
+
+            record = db.session.get(CID, cid_id)
+            payload = record.stored_data or b""
+            store.write(path.lstrip("/"), payload)
+            if store.read(path.lstrip("/")) != memoryview(payload):
+                raise OSError(f"Blob for {path} did not round-trip")
+            if record.file_size is None:
+                record.file_size = len(payload)
+            record.stored_data = b""
+
+        if not dry_run:
+            db.session.commit()
+            db.session.expunge_all()
+        print(f"✓ Processed {migrated} CIDs ({moved_bytes} bytes)")
+
+    if vacuum and not dry_run and db.engine.dialect.name == "sqlite":
+        db.session.commit()
+        with db.engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT").execute(
+                text("VACUUM")
+            )
+        print("✓ Vacuumed database")
+
+    return migrated
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument(
+        "--blob-dir",
+        default=os.environ.get("CID_BLOB_DIR") or DEFAULT_BLOB_DIR,
+        help="Directory for the sharded blob store (default: %(default)s)",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would move without writing"
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Reclaim database space afterwards (SQLite only)",
+    )
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        try:
+            count = migrate_cid_blobs(
+                args.blob_dir,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+                vacuum=args.vacuum,
+            )
+        except (SQLAlchemyError, OSError) as error:
+            db.session.rollback()
+            print(f"❌ Migration failed: {error}")
+            return 1
+
+    verb = "Would migrate" if args.dry_run else "Migrated"
+    print(f"✅ {verb} {count} CID payloads to {args.blob_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
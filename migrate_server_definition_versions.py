@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Backfill the server_definition_versions index from stored snapshots.
+
+CIDs are indexed as they are stored, and startup backfills the index while
+it is empty. Run this on databases whose index was only partly filled (for
+example CIDs written by other tools) so that server history and
+/<server>/<partial-cid> lookups see every version. It is safe to run
+repeatedly.
+
+Usage:
+    python migrate_server_definition_versions.py [--batch-size 200]
+"""
+
+import argparse
+import os
+import sys
+
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add script directory to path to enable imports from the application
+# This must happen before importing app modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# pylint: disable=wrong-import-position
+# Rationale: sys.path manipulation required before app imports for standalone migration script
+from app import create_app
+from database import db
+from db_access import backfill_server_definition_versions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", 1)[0])
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        try:
+            # create_all adds the index table to databases that predate it.
+            db.create_all()
+            added = backfill_server_definition_versions(batch_size=args.batch_size)
+        except SQLAlchemyError as error:
+            db.session.rollback()
+            print(f"❌ Backfill failed: {error}")
+            return 1
+
+    print(f"✅ Indexed {added} server definition versions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
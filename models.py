@@ -2,24 +2,82 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import Boolean
+from sqlalchemy import Boolean, event
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred
 
 from alias_definition import get_primary_alias_route
 from cid import CID as ValidatedCID
+from cid_blob_store import get_blob_store
 from database import db
 
 
 class CID(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     path = db.Column(db.String(255), unique=True, nullable=False, index=True)
-    file_data = db.Column(db.LargeBinary, nullable=False)  # For actual file bytes
+    # Payload bytes; empty when they live in an external blob store. Deferred
+    # so listings and existence checks do not pull payloads into memory; use
+    # ``undefer(CID.stored_data)`` when a query needs the content of every row.
+    stored_data = deferred(db.Column("file_data", db.LargeBinary, nullable=False))
     file_size = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
+    @hybrid_property
+    def file_data(self) -> Optional[bytes]:  # For actual file bytes
+        pending = self.__dict__.get("_pending_blob")
+        if pending is not None:
+            return pending
+        stored = self.stored_data
+        store = get_blob_store()
+        if stored or not store.external:
+            return stored
+        view = store.read(self.path or "")
+        return bytes(view) if view is not None else stored
+
+    @file_data.inplace.setter
+    def _file_data_setter(self, value: Optional[bytes]) -> None:
+        if value is not None and get_blob_store().external:
+            # Written to the blob store by the before_insert/update hooks,
+            # once the path is known.
+            self.__dict__["_pending_blob"] = bytes(value)
+            self.stored_data = b""
+            return
+        self.__dict__.pop("_pending_blob", None)
+        self.stored_data = value
+
+    @file_data.inplace.expression
+    @classmethod
+    def _file_data_expression(cls):
+        return cls.stored_data
+
+    @property
+    def data_view(self) -> memoryview:
+        """Zero-copy view of the payload (memory-mapped for external blobs)."""
+        pending = self.__dict__.get("_pending_blob")
+        if pending is not None:
+            return memoryview(pending)
+        stored = self.stored_data or b""
+        store = get_blob_store()
+        if stored or not store.external:
+            return memoryview(stored)
+        view = store.read(self.path or "")
+        return view if view is not None else memoryview(stored)
+
     def __repr__(self) -> str:
         return f"<CID {self.path}>"
 
 
+@event.listens_for(CID, "before_insert")
+@event.listens_for(CID, "before_update")
+def _write_pending_blob(_mapper, _connection, target: CID) -> None:
+    pending = target.__dict__.get("_pending_blob")
+    if pending is not None and target.path:
+        # Blobs are content addressed, so a rolled-back flush leaves a
+        # harmless file behind and the pending copy can be released now.
+        get_blob_store().write(target.path.lstrip("/"), pending)
+        target.__dict__.pop("_pending_blob", None)
+
+
 class PageView(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     path = db.Column(db.String(255), nullable=False)
@@ -34,6 +92,22 @@ class PageView(db.Model):
         return f"<PageView {self.path} at {self.viewed_at}>"
 
 
+class PageViewRollup(db.Model):
+    """Number of views of one path during one hour or one day."""
+
+    __tablename__ = "page_view_rollups"
+    __table_args__ = (db.UniqueConstraint("granularity", "bucket_start", "path"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    path = db.Column(db.String(255), nullable=False)
+    granularity = db.Column(db.String(10), nullable=False)  # "hour" or "day"
+    bucket_start = db.Column(db.DateTime, nullable=False, index=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<PageViewRollup {self.path} {self.granularity} {self.bucket_start}: {self.count}>"
+
+
 class Server(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True, index=True)
@@ -53,6 +127,70 @@ class Server(db.Model):
         return f"<Server {self.name}>"
 
 
+class ServerDefinitionVersion(db.Model):
+    """Index of the servers snapshots that contain each server's definition."""
+
+    __tablename__ = "server_definition_versions"
+    __table_args__ = (
+        db.UniqueConstraint("server_name", "snapshot_cid"),
+        db.Index(
+            "ix_server_definition_versions_name_definition",
+            "server_name",
+            "definition_cid",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    server_name = db.Column(db.String(100), nullable=False)
+    # None when the snapshot holds a non-text value for the server
+    definition_cid = db.Column(db.String(255), nullable=True)
+    snapshot_cid = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<ServerDefinitionVersion {self.server_name} {self.definition_cid}>"
+
+
+class ServerResultMemo(db.Model):
+    """Result CID of a cacheable server for one definition and input."""
+
+    __tablename__ = "server_result_memos"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # sha256 over the definition CID, entry point and resolved inputs
+    key = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    server_name = db.Column(db.String(100), nullable=False, index=True)
+    definition_cid = db.Column(db.String(255), nullable=False)
+    result_cid = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(255), nullable=False, default="text/html")
+    created_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), index=True
+    )
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<ServerResultMemo {self.server_name} -> {self.result_cid}>"
+
+
+class DerivedArtifact(db.Model):
+    """CID of content derived from a source CID by a versioned renderer."""
+
+    __tablename__ = "derived_artifacts"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # sha256 over the renderer, its version, its options and the source CID
+    key = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    renderer = db.Column(db.String(100), nullable=False, index=True)
+    source_cid = db.Column(db.String(255), nullable=False)
+    result_cid = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        return f"<DerivedArtifact {self.renderer} {self.source_cid} -> {self.result_cid}>"
+
+
 class Alias(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True, index=True)
@@ -264,3 +402,20 @@ class Export(db.Model):
 
     def __repr__(self) -> str:
         return f"<Export {self.cid} at {self.created_at}>"
+
+
+class RetentionArchive(db.Model):
+    """Manifest CID of one retention run's archived bundles."""
+
+    __tablename__ = "retention_archives"
+
+    id = db.Column(db.Integer, primary_key=True)
+    manifest_cid = db.Column(db.String(255), nullable=False, index=True)
+    archived_rows = db.Column(db.Integer, nullable=False, default=0)
+    collected_cids = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<RetentionArchive {self.manifest_cid} ({self.archived_rows} rows)>"
@@ -0,0 +1,262 @@
+"""Buffered writer for page view records.
+
+In the default ``sync`` mode every tracked request inserts its ``PageView``
+row inside ``after_request``.  Setting ``PAGE_VIEW_WRITER_MODE`` to
+``buffered`` appends the view to an in-memory ring buffer instead; a worker
+thread writes the buffer in batches, one transaction per batch, and the
+hourly and daily rollups are updated in that same transaction.
+
+Page views are analytics, not provenance: when the buffer is full the
+oldest unwritten view is overwritten and counted as ``dropped`` rather than
+slowing the request down.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+from flask import Flask, current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+MODE_SYNC = "sync"
+MODE_BUFFERED = "buffered"
+
+DEFAULT_BUFFER_SIZE = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class PendingPageView:
+    """Request-independent data needed to record one page view later."""
+
+    path: str
+    method: str
+    user_agent: Optional[str]
+    ip_address: Optional[str]
+    viewed_at: datetime
+
+
+BatchRecorder = Callable[[Sequence[PendingPageView]], None]
+
+
+@dataclass
+class _WriterStats:
+    submitted: int = 0
+    written: int = 0
+    failed: int = 0
+    dropped: int = 0
+    batches: int = 0
+    max_buffer_depth: int = 0
+    last_batch_size: int = 0
+    last_flush_ms: float = 0.0
+
+
+class PageViewWriter:
+    """Ring buffer plus worker thread that records page views in batches."""
+
+    def __init__(
+        self,
+        app: Flask,
+        recorder: BatchRecorder,
+        *,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.app = app
+        self._recorder = recorder
+        self._buffer: Deque[PendingPageView] = deque(maxlen=max(1, buffer_size))
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._in_flight = 0
+        self._stats = _WriterStats()
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="page-view-writer", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def capacity(self) -> int:
+        return self._buffer.maxlen or 0
+
+    def submit(self, view: PendingPageView) -> bool:
+        """Buffer ``view``; return False when the writer has been stopped."""
+        if self._stopping.is_set():
+            return False
+        with self._condition:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._stats.dropped += 1
+            self._buffer.append(view)
+            self._stats.submitted += 1
+            self._stats.max_buffer_depth = max(
+                self._stats.max_buffer_depth, len(self._buffer)
+            )
+            if len(self._buffer) >= self._batch_size:
+                self._condition.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything buffered so far.
+
+        Returns False if ``timeout`` seconds pass first.
+        """
+        with self._condition:
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self._buffer and not self._in_flight, timeout
+            )
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> bool:
+        """Flush outstanding views and stop the worker thread."""
+        flushed = self.flush(timeout)
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            stats = self._stats
+            return {
+                "mode": MODE_BUFFERED,
+                "buffer_depth": len(self._buffer),
+                "buffer_capacity": self.capacity,
+                "max_buffer_depth": stats.max_buffer_depth,
+                "submitted": stats.submitted,
+                "written": stats.written,
+                "failed": stats.failed,
+                "dropped": stats.dropped,
+                "batches": stats.batches,
+                "last_batch_size": stats.last_batch_size,
+                "last_flush_ms": round(stats.last_flush_ms, 3),
+            }
+
+    def _next_batch(self) -> List[PendingPageView]:
+        with self._condition:
+            if len(self._buffer) < self._batch_size and not self._stopping.is_set():
+                self._condition.wait(self._flush_interval)
+            batch = [
+                self._buffer.popleft()
+                for _ in range(min(self._batch_size, len(self._buffer)))
+            ]
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            failed = False
+            try:
+                with self.app.app_context():
+                    self._recorder(batch)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Tracking is best-effort, exactly like the synchronous path;
+                # a failed batch must not kill the worker thread.
+                logger.exception("Failed to record %d page view(s)", len(batch))
+                failed = True
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._condition:
+                    self._stats.batches += 1
+                    self._stats.last_batch_size = len(batch)
+                    self._stats.last_flush_ms = elapsed_ms
+                    if failed:
+                        self._stats.failed += len(batch)
+                    else:
+                        self._stats.written += len(batch)
+                    self._in_flight = 0
+                    self._condition.notify_all()
+
+
+_writer_lock = threading.Lock()
+_writer: Optional[PageViewWriter] = None
+
+
+def page_view_mode(app: Optional[Flask] = None) -> str:
+    """Return the configured page view writer mode for ``app``."""
+    if app is None:
+        if not has_app_context():
+            return MODE_SYNC
+        app = current_app._get_current_object()  # pylint: disable=protected-access
+    mode = str(app.config.get("PAGE_VIEW_WRITER_MODE") or MODE_SYNC).lower()
+    return MODE_BUFFERED if mode == MODE_BUFFERED else MODE_SYNC
+
+
+def get_page_view_writer(recorder: BatchRecorder) -> Optional[PageViewWriter]:
+    """Return the writer for the current app, or ``None`` in sync mode."""
+    global _writer  # pylint: disable=global-statement
+
+    if page_view_mode() != MODE_BUFFERED:
+        return None
+
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    with _writer_lock:
+        if _writer is not None and _writer.app is app:
+            return _writer
+        previous = _writer
+        _writer = PageViewWriter(
+            app,
+            recorder,
+            buffer_size=int(app.config.get("PAGE_VIEW_BUFFER_SIZE", DEFAULT_BUFFER_SIZE)),
+            batch_size=int(app.config.get("PAGE_VIEW_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+            flush_interval=float(
+                app.config.get("PAGE_VIEW_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+            ),
+        )
+    if previous is not None:
+        previous.shutdown()
+    return _writer
+
+
+def flush_page_view_writer(timeout: Optional[float] = 5.0) -> bool:
+    """Block until buffered page views are written (no-op in sync mode)."""
+    writer = _writer
+    if writer is None:
+        return True
+    return writer.flush(timeout)
+
+
+def shutdown_page_view_writer(timeout: Optional[float] = 5.0) -> bool:
+    """Flush and stop the background writer; safe to call at process exit."""
+    global _writer  # pylint: disable=global-statement
+
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is None:
+        return True
+    return writer.shutdown(timeout)
+
+
+def get_page_view_writer_stats() -> Dict[str, Any]:
+    """Return buffer depth, throughput and drop counters."""
+    writer = _writer
+    if writer is None:
+        return {"mode": page_view_mode()}
+    return writer.stats()
+
+
+__all__ = [
+    "MODE_BUFFERED",
+    "MODE_SYNC",
+    "PageViewWriter",
+    "PendingPageView",
+    "flush_page_view_writer",
+    "get_page_view_writer",
+    "get_page_view_writer_stats",
+    "page_view_mode",
+    "shutdown_page_view_writer",
+]
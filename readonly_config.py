@@ -6,6 +6,10 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Names accepted by --cid-eviction-policy; see cid_memory_manager.
+CID_EVICTION_POLICIES = ("gds", "lru", "lfu")
+DEFAULT_CID_EVICTION_POLICY = "gds"
+
 
 class ReadOnlyConfig:
     """Centralized read-only mode configuration manager."""
@@ -13,6 +17,7 @@ class ReadOnlyConfig:
     _instance: Optional["ReadOnlyConfig"] = None
     _read_only_mode: bool = False
     _max_cid_memory_bytes: int = 1 * 1024 * 1024 * 1024  # Default: 1GB
+    _cid_eviction_policy: str = DEFAULT_CID_EVICTION_POLICY
 
     @classmethod
     def get_instance(cls) -> "ReadOnlyConfig":
@@ -52,8 +57,30 @@ class ReadOnlyConfig:
         """Get the maximum CID memory size in bytes."""
         return cls._max_cid_memory_bytes
 
+    @classmethod
+    def set_cid_eviction_policy(cls, name: str) -> None:
+        """Set the policy used to evict CIDs when memory is full.
+
+        Args:
+            name: One of ``CID_EVICTION_POLICIES``
+
+        Raises:
+            ValueError: If the policy name is unknown
+        """
+        normalized = name.strip().lower()
+        if normalized not in CID_EVICTION_POLICIES:
+            raise ValueError(f"Unknown CID eviction policy: {name}")
+        cls._cid_eviction_policy = normalized
+        logger.info("CID eviction policy set to %s", normalized)
+
+    @classmethod
+    def get_cid_eviction_policy(cls) -> str:
+        """Get the name of the CID eviction policy."""
+        return cls._cid_eviction_policy
+
     @classmethod
     def reset(cls) -> None:
         """Reset configuration to defaults (useful for testing)."""
         cls._read_only_mode = False
         cls._max_cid_memory_bytes = 1 * 1024 * 1024 * 1024
+        cls._cid_eviction_policy = DEFAULT_CID_EVICTION_POLICY
@@ -37,6 +37,7 @@ from gateway_lib.cid.normalizer import (
     parse_hrx_gateway_args as _parse_hrx_gateway_args,
 )
 from gateway_lib.cid.resolver import CIDResolver
+from gateway_lib.cache import get_cache_stats
 from gateway_lib.transforms.loader import TransformLoader
 from gateway_lib.transforms.validator import TransformValidator
 from gateway_lib.templates.loader import TemplateLoader
@@ -70,7 +71,7 @@ def _resolve_cid_content(cid_value, *, as_bytes: bool = False):
     return _cid_resolver.resolve(cid_value, as_bytes=as_bytes)
 
 
-# Create shared service instances (no caching - always load fresh)
+# Create shared service instances (compiled transforms/templates are cached in gateway_lib.cache)
 _cid_resolver = CIDResolver()
 _transform_loader = TransformLoader(_cid_resolver)
 _transform_validator = TransformValidator(_cid_resolver)
@@ -366,6 +367,7 @@ def _handle_meta_page(server_name, gateways, context):
         get_test_paths_fn=_get_test_paths,
         render_cid_link_fn=render_cid_link,
         render_error_fn=_render_error,
+        get_cache_stats_fn=get_cache_stats,
     )
     return handler.handle(server_name, gateways, context)
 
@@ -633,6 +635,7 @@ def _handle_meta_page_with_test(server_name, test_server_path, gateways, context
         get_test_paths_fn=_get_test_paths,
         render_cid_link_fn=render_cid_link,
         render_error_fn=_render_error,
+        get_cache_stats_fn=get_cache_stats,
     )
     return handler.handle_with_test(server_name, test_server_path, gateways, context)
 
@@ -0,0 +1,158 @@
+"""Bounded caches of compiled gateway artifacts.
+
+Transforms and templates referenced by a gateway config are compiled on
+every request unless cached here. Entries are keyed by where the source
+came from, so a hit never needs to resolve the content again:
+
+- A normalized CID names immutable content, so the CID alone is the key.
+- A filesystem path (development mode) is keyed by path, mtime and size,
+  so editing the file invalidates its entry.
+- Anything else is keyed by the resolved source text, which still saves
+  the compile step.
+
+Design decisions:
+- LRU eviction with a fixed size (GATEWAY_COMPILED_CACHE_SIZE, default 256)
+- Failed loads are never cached
+- Hit and miss counts are kept for the gateway meta page
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def _cache_size() -> int:
+    try:
+        return max(int(os.environ.get("GATEWAY_COMPILED_CACHE_SIZE", DEFAULT_CACHE_SIZE)), 0)
+    except ValueError:
+        return DEFAULT_CACHE_SIZE
+
+
+def _is_normalized_cid(value: str) -> bool:
+    try:
+        from cid_core import is_normalized_cid
+    except ImportError:
+        return False
+    return is_normalized_cid(value.lstrip("/"))
+
+
+def path_key(value: Any) -> Optional[tuple]:
+    """Return a cache key for a filesystem source, or None if ``value`` is not a file."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        path = Path(value)
+        if not path.is_file():
+            path = Path(value.lstrip("/"))
+            if not path.is_file():
+                return None
+        stat = path.stat()
+    except (OSError, ValueError):
+        return None
+    return ("path", str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def source_key(value: Any) -> Optional[tuple]:
+    """Return a key that identifies the content behind ``value`` without loading it.
+
+    Returns None when the content must be resolved first (see :func:`content_key`).
+    """
+    key = path_key(value)
+    if key is not None:
+        return key
+    if isinstance(value, str) and _is_normalized_cid(value):
+        return ("cid", value.lstrip("/"))
+    return None
+
+
+def content_key(source: str) -> tuple:
+    """Return a key for already-resolved source text."""
+    return ("source", source)
+
+
+class CompiledCache:
+    """Thread-safe LRU cache of compiled objects with hit statistics."""
+
+    def __init__(self, name: str, max_entries: Optional[int] = None):
+        """Initialize an empty cache.
+
+        Args:
+            name: Label used on the meta page
+            max_entries: Capacity; defaults to GATEWAY_COMPILED_CACHE_SIZE
+        """
+        self.name = name
+        self.max_entries = _cache_size() if max_entries is None else max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` (counting a hit or miss)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entries."""
+        if value is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, building and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Shared by every loader so compiled objects survive across requests.
+transform_cache = CompiledCache("transforms")
+template_cache = CompiledCache("templates")
+
+
+def get_cache_stats() -> list:
+    """Return statistics for the shared transform and template caches."""
+    return [transform_cache.stats(), template_cache.stats()]
+
+
+def clear_caches() -> None:
+    """Empty the shared caches (used by tests and after bulk imports)."""
+    transform_cache.clear()
+    template_cache.clear()
@@ -1,7 +1,9 @@
 """Internal target execution for gateway requests.
 
 This module handles executing requests against internal servers
-without making external HTTP requests.
+without making external HTTP requests. Internal servers return their
+output in-process; redirects are only followed for targets (such as
+aliases to CIDs) that still answer with one.
 """
 
 import json
@@ -86,15 +88,19 @@ class TargetExecutor:
         # Import here to avoid circular dependencies
         from flask import current_app, request as flask_request
         import server_execution
+        from server_execution.response_handling import INLINE_RESULT_ENVIRON_KEY
 
         # Create a nested request context so server execution that depends on
         # request.path sees the intended internal path (e.g. /man/grep).
+        # Servers hand their output straight back instead of redirecting to a
+        # CID, so no hop needs to read the result back from the database.
         with current_app.test_request_context(
             path,
             method=method,
             headers=request_details.get("headers") or {},
             data=request_details.get("data"),
             json=request_details.get("json"),
+            environ_overrides={INLINE_RESULT_ENVIRON_KEY: True},
         ):
             result = server_execution.try_server_execution(flask_request.path)
             if result is None:
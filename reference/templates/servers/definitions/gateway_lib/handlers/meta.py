@@ -25,6 +25,7 @@ class GatewayMetaHandler:
         get_test_paths_fn,
         render_cid_link_fn,
         render_error_fn,
+        get_cache_stats_fn=None,
     ):
         """Initialize meta handler with dependency functions.
 
@@ -38,6 +39,7 @@ class GatewayMetaHandler:
             get_test_paths_fn: Function to get test paths for server
             render_cid_link_fn: Function to render CID link HTML
             render_error_fn: Function to render error page
+            get_cache_stats_fn: Optional function returning compiled-cache statistics
         """
         self.load_template = load_template_fn
         self.load_and_validate_transform = load_and_validate_transform_fn
@@ -48,6 +50,7 @@ class GatewayMetaHandler:
         self.get_test_paths = get_test_paths_fn
         self.render_cid_link = render_cid_link_fn
         self.render_error = render_error_fn
+        self.get_cache_stats = get_cache_stats_fn or (lambda: [])
 
     def handle(self, server_name: str, gateways: dict, context: dict) -> dict:
         """Handle meta page request.
@@ -163,6 +166,7 @@ class GatewayMetaHandler:
             "response_transform_warnings": response_transform_info["warnings"],
             "templates_info": templates_info,
             "test_paths": test_paths,
+            "cache_stats": self.get_cache_stats(),
         }
 
         # Add test mode specific variables if applicable
@@ -5,7 +5,7 @@ template resolver functions for gateway configurations.
 
 Design decisions:
 - Lazy loading (templates loaded on-demand)
-- No caching (always load fresh)
+- Compiled Template objects cached by CID, or by mtime for file paths
 - Templates stored as CIDs in gateway config
 """
 
@@ -13,20 +13,24 @@ import logging
 from typing import Optional, Tuple, List
 from jinja2 import Template, Environment, meta
 
+from ..cache import content_key, source_key, template_cache
+
 logger = logging.getLogger('gateway')
 
 
 class TemplateLoader:
-    """Loads and validates Jinja2 templates (lazy, no caching)."""
+    """Loads and validates Jinja2 templates (lazy, compiled templates cached)."""
     
-    def __init__(self, cid_resolver, resolve_fn=None):
+    def __init__(self, cid_resolver, resolve_fn=None, cache=None):
         """Initialize template loader.
         
         Args:
             cid_resolver: CIDResolver instance for resolving CIDs
             resolve_fn: Optional custom resolve function (for testing)
+            cache: CompiledCache to use (defaults to the shared template cache)
         """
         self.cid_resolver = cid_resolver
+        self.cache = template_cache if cache is None else cache
         self._resolve_fn = resolve_fn or (lambda cid, as_bytes: cid_resolver.resolve(cid, as_bytes=as_bytes))
     
     def load_and_validate_template(
@@ -97,10 +101,23 @@ class TemplateLoader:
                 )
             
             template_cid = templates_config[template_name]
+            key = source_key(template_cid)
+            if key is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+
             content = self._resolve_fn(template_cid, as_bytes=False)
             if content is None:
                 raise LookupError(f"Could not resolve template CID: {template_cid}")
             
-            return Template(content)
+            if key is None:
+                key = content_key(content)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+            template = Template(content)
+            self.cache.put(key, template)
+            return template
         
         return resolve_template
@@ -4,7 +4,7 @@ This module handles loading transform functions from CIDs and compiling them
 into callable Python functions.
 
 Design decisions:
-- No caching (always load fresh)
+- Compiled transforms cached by CID, or by mtime for file paths (see ..cache)
 - No sandboxing (full Python access)
 - No timeouts (unlimited execution)
 - Loads from database or filesystem (for development)
@@ -14,27 +14,31 @@ import logging
 from pathlib import Path
 from typing import Optional, Callable
 
+from ..cache import content_key, source_key, transform_cache
+
 logger = logging.getLogger('gateway')
 
 
 class TransformLoader:
-    """Loads and compiles transform functions (no caching).
+    """Loads and compiles transform functions.
     
     Resolution strategy:
     1. Try filesystem path (for development)
     2. Try database CID lookup (primary storage)
     
-    No caching - always loads fresh to ensure latest content.
+    Compiled functions are cached; a changed file or a new CID compiles afresh.
     No sandboxing - transforms run with full Python access.
     """
     
-    def __init__(self, cid_resolver):
+    def __init__(self, cid_resolver, cache=None):
         """Initialize transform loader.
         
         Args:
             cid_resolver: CIDResolver instance for resolving CIDs
+            cache: CompiledCache to use (defaults to the shared transform cache)
         """
         self.cid_resolver = cid_resolver
+        self.cache = transform_cache if cache is None else cache
     
     def load_transform(self, cid: str, context: dict) -> Optional[Callable]:
         """Load and compile a transform function from a CID.
@@ -45,20 +49,32 @@ class TransformLoader:
             
         Returns:
             Compiled transform function or None if not found
-            
-        Note: No caching - always loads fresh content
         """
         try:
+            key = source_key(cid)
+            if key is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+
             # Try direct file path first (for development)
             if isinstance(cid, str) and Path(cid).exists():
                 with open(cid, "r", encoding="utf-8") as f:
                     source = f.read()
-                return self.compile_transform(source)
+            else:
+                # Try to load from CID store via resolver
+                source = self.cid_resolver.resolve(cid, as_bytes=False)
+            if not source:
+                return None
             
-            # Try to load from CID store via resolver
-            source = self.cid_resolver.resolve(cid, as_bytes=False)
-            if source:
-                return self.compile_transform(source)
+            if key is None:
+                key = content_key(source)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+            transform_fn = self.compile_transform(source)
+            self.cache.put(key, transform_fn)
+            return transform_fn
                 
         except Exception as e:
             logger.error("Failed to load transform from CID %s: %s", cid, e)
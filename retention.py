@@ -0,0 +1,344 @@
+"""Retention policies that archive and delete old history rows.
+
+``page_views``, ``server_invocations`` and ``entity_interactions`` each take
+an optional maximum age and maximum row count.  A retention run takes the
+oldest rows outside those limits in batches; every batch is written as a
+gzip-compressed JSON-lines bundle stored as a CID of its own and then
+deleted.  A JSON manifest listing the run's bundles is stored as a CID too
+and recorded in ``retention_archives`` before each batch is deleted, so
+archived rows stay retrievable through :func:`iter_archived_rows` even
+after an interrupted run (whose manifest says ``"complete": false``).
+
+Archived invocations carry the contents of their request details, external
+calls and invocation JSON CIDs inside the bundle.  Once the rows are gone
+those small CIDs are swept unless something still refers to them.
+
+Limits come from ``RETENTION_<TABLE>_MAX_AGE_DAYS`` and
+``RETENTION_<TABLE>_MAX_ROWS`` in the app config or the environment, e.g.
+``RETENTION_PAGE_VIEWS_MAX_AGE_DAYS=90``.  Tables without limits are kept.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Set
+
+from cid_core import generate_cid
+from cid_presenter import cid_path, format_cid
+from db_access import (
+    count_expired_rows,
+    create_cid_record,
+    delete_cids,
+    delete_rows_by_id,
+    find_referenced_cids,
+    get_cid_by_path,
+    get_oldest_rows,
+    record_retention_archive,
+)
+from models import EntityInteraction, PageView, RetentionArchive, ServerInvocation
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+MANIFEST_VERSION = 1
+
+# Small JSON CIDs written for every invocation and inlined into its bundle.
+INVOCATION_METADATA_FIELDS = (
+    "request_details_cid",
+    "external_calls_cid",
+    "invocation_cid",
+)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Limits for one table; ``None`` means unlimited."""
+
+    table: str
+    max_age: Optional[timedelta] = None
+    max_rows: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age is not None or self.max_rows is not None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "table": self.table,
+            "max_age_days": self.max_age.total_seconds() / 86400
+            if self.max_age is not None
+            else None,
+            "max_rows": self.max_rows,
+        }
+
+
+@dataclass(frozen=True)
+class _RetainedTable:
+    model: Any
+    timestamp: Any
+
+
+RETAINED_TABLES: Dict[str, _RetainedTable] = {
+    "page_views": _RetainedTable(PageView, PageView.viewed_at),
+    "server_invocations": _RetainedTable(ServerInvocation, ServerInvocation.invoked_at),
+    "entity_interactions": _RetainedTable(
+        EntityInteraction, EntityInteraction.created_at
+    ),
+}
+
+
+@dataclass
+class RetentionReport:
+    """What a retention run archived and deleted."""
+
+    archived: Dict[str, int] = field(default_factory=dict)
+    bundles: List[Dict[str, Any]] = field(default_factory=list)
+    collected_cids: List[str] = field(default_factory=list)
+    manifest_cid: Optional[str] = None
+
+    @property
+    def archived_rows(self) -> int:
+        return sum(self.archived.values())
+
+
+def _config_int(config: Mapping[str, Any], key: str) -> Optional[int]:
+    raw = config.get(key, os.environ.get(key))
+    if raw is None or raw == "":
+        return None
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        LOGGER.warning("Ignoring non-integer %s=%r", key, raw)
+        return None
+    return value if value >= 0 else None
+
+
+def policies_from_config(config: Mapping[str, Any]) -> List[RetentionPolicy]:
+    """Return the policy configured for each retained table."""
+    policies = []
+    for table in RETAINED_TABLES:
+        prefix = f"RETENTION_{table.upper()}"
+        days = _config_int(config, f"{prefix}_MAX_AGE_DAYS")
+        policies.append(
+            RetentionPolicy(
+                table,
+                max_age=timedelta(days=days) if days is not None else None,
+                max_rows=_config_int(config, f"{prefix}_MAX_ROWS"),
+            )
+        )
+    return policies
+
+
+def _utc_naive(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC wall-clock values.
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _serialize_row(row: Any) -> Dict[str, Any]:
+    return {
+        column.name: _json_value(getattr(row, column.key))
+        for column in row.__mapper__.columns
+    }
+
+
+def _read_cid(cid_value: str) -> Optional[bytes]:
+    record = get_cid_by_path(cid_path(cid_value) or "")
+    data = getattr(record, "file_data", None)
+    return bytes(data) if data is not None else None
+
+
+def _store(data: bytes) -> str:
+    cid_value = format_cid(generate_cid(data))
+    path = cid_path(cid_value)
+    if path and get_cid_by_path(path) is None:
+        create_cid_record(cid_value, data)
+    return cid_value
+
+
+def _inline_invocation_payloads(
+    row: ServerInvocation, candidates: Set[str]
+) -> Dict[str, str]:
+    payloads: Dict[str, str] = {}
+    for name in INVOCATION_METADATA_FIELDS:
+        cid_value = getattr(row, name)
+        if not cid_value:
+            continue
+        candidates.add(cid_value)
+        data = _read_cid(cid_value)
+        if data is not None:
+            payloads[cid_value] = data.decode("utf-8", errors="replace")
+    return payloads
+
+
+def _archive_batch(
+    table_name: str, rows: Sequence[Any], candidates: Set[str]
+) -> Dict[str, Any]:
+    """Store ``rows`` as one compressed bundle and return its manifest entry."""
+    lines = []
+    for row in rows:
+        record = _serialize_row(row)
+        if isinstance(row, ServerInvocation):
+            record["payloads"] = _inline_invocation_payloads(row, candidates)
+        lines.append(json.dumps(record, sort_keys=True, separators=(",", ":")))
+
+    # mtime=0 keeps the bytes, and therefore the CID, deterministic.
+    bundle = gzip.compress("\n".join(lines).encode("utf-8"), mtime=0)
+    timestamp = RETAINED_TABLES[table_name].timestamp.key
+    return {
+        "table": table_name,
+        "cid": _store(bundle),
+        "rows": len(rows),
+        "first_id": rows[0].id,
+        "last_id": rows[-1].id,
+        "oldest": _json_value(getattr(rows[0], timestamp)),
+        "newest": _json_value(getattr(rows[-1], timestamp)),
+    }
+
+
+def count_expired(policy: RetentionPolicy, *, now: Optional[datetime] = None) -> int:
+    """Return how many rows ``policy`` would archive."""
+    table = RETAINED_TABLES.get(policy.table)
+    if table is None:
+        raise ValueError(f"Unknown retention table: {policy.table}")
+    if not policy.enabled:
+        return 0
+    cutoff = None
+    if policy.max_age is not None:
+        cutoff = _utc_naive((now or datetime.now(timezone.utc)) - policy.max_age)
+    return count_expired_rows(
+        table.model, table.timestamp, cutoff=cutoff, max_rows=policy.max_rows
+    )
+
+
+def collect_invocation_garbage(candidates: Set[str]) -> List[str]:
+    """Delete the ``candidates`` CIDs nothing refers to; return those deleted."""
+    if not candidates:
+        return []
+    garbage = sorted(candidates - find_referenced_cids(candidates))
+    delete_cids(garbage)
+    return garbage
+
+
+def _write_manifest(
+    report: RetentionReport,
+    policies: Sequence[RetentionPolicy],
+    now: datetime,
+    *,
+    complete: bool,
+    archive: Optional[RetentionArchive],
+) -> RetentionArchive:
+    """Store the manifest for ``report`` so far and point the archive row at it."""
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": now.isoformat(),
+        "complete": complete,
+        "policies": [policy.as_dict() for policy in policies if policy.enabled],
+        "bundles": report.bundles,
+        "collected_cids": report.collected_cids,
+    }
+    previous = report.manifest_cid
+    report.manifest_cid = _store(
+        json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    )
+    archive = record_retention_archive(
+        report.manifest_cid,
+        report.archived_rows,
+        len(report.collected_cids),
+        archive,
+    )
+    if previous and previous != report.manifest_cid:
+        # Superseded manifests of this run are listed nowhere else.
+        collect_invocation_garbage({previous})
+    return archive
+
+
+def run_retention(
+    policies: Sequence[RetentionPolicy],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> RetentionReport:
+    """Archive and delete every row outside ``policies``.
+
+    Each batch's bundle is stored and listed in the run's manifest (recorded
+    in ``retention_archives``) before its rows are deleted, so an interrupted
+    run leaves an incomplete manifest that still covers every deleted row;
+    at worst a batch is archived twice rather than lost.
+    """
+    now = now or datetime.now(timezone.utc)
+    batch_size = max(1, batch_size)
+    report = RetentionReport()
+    candidates: Set[str] = set()
+    archive: Optional[RetentionArchive] = None
+
+    for policy in policies:
+        remaining = count_expired(policy, now=now)
+        table = RETAINED_TABLES[policy.table]
+        while remaining > 0:
+            rows = get_oldest_rows(
+                table.model, table.timestamp, min(batch_size, remaining)
+            )
+            if not rows:
+                break
+            report.bundles.append(_archive_batch(policy.table, rows, candidates))
+            archived = report.archived.get(policy.table, 0) + len(rows)
+            report.archived[policy.table] = archived
+            archive = _write_manifest(
+                report, policies, now, complete=False, archive=archive
+            )
+            delete_rows_by_id(table.model, [row.id for row in rows])
+            remaining -= len(rows)
+
+    report.collected_cids = collect_invocation_garbage(candidates)
+
+    if report.bundles:
+        _write_manifest(report, policies, now, complete=True, archive=archive)
+    return report
+
+
+def load_manifest(manifest_cid: str) -> Dict[str, Any]:
+    """Return the manifest stored under ``manifest_cid``."""
+    data = _read_cid(manifest_cid)
+    if data is None:
+        raise LookupError(f"Retention manifest {manifest_cid} not found")
+    return json.loads(data)
+
+
+def iter_archived_rows(
+    manifest_cid: str, table: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield the archived rows listed in a manifest, optionally for one table."""
+    for bundle in load_manifest(manifest_cid).get("bundles", []):
+        if table is not None and bundle.get("table") != table:
+            continue
+        data = _read_cid(bundle["cid"])
+        if data is None:
+            raise LookupError(f"Retention bundle {bundle['cid']} not found")
+        for line in gzip.decompress(data).decode("utf-8").splitlines():
+            if line:
+                yield json.loads(line)
+
+
+__all__ = [
+    "DEFAULT_BATCH_SIZE",
+    "RETAINED_TABLES",
+    "RetentionPolicy",
+    "RetentionReport",
+    "collect_invocation_garbage",
+    "count_expired",
+    "iter_archived_rows",
+    "load_manifest",
+    "policies_from_config",
+    "run_retention",
+]
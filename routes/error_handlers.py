@@ -6,7 +6,7 @@ from flask import current_app, redirect, render_template, request
 from alias_routing import is_potential_alias_path, try_alias_redirect
 from cid_utils import serve_cid_content
 from constants import RESERVED_ROUTES
-from db_access import get_cid_by_path, rollback_session
+from db_access import get_streamable_cid_by_path, rollback_session
 from server_execution import (
     is_potential_server_path,
     is_potential_versioned_server_path,
@@ -79,7 +79,7 @@ def not_found_error(error):  # pylint: disable=unused-argument  # Required by Fl
             return server_result
 
     base_path = path.split(".")[0] if "." in path else path
-    cid_content = get_cid_by_path(base_path)
+    cid_content = get_streamable_cid_by_path(base_path)
     if cid_content:
         result = serve_cid_content(cid_content, path)
         if result is not None:
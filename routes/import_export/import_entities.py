@@ -13,6 +13,7 @@ from alias_definition import (
 )
 from cid_utils import save_server_definition_as_cid
 from db_access import (
+    backfill_server_definition_versions,
     get_alias_by_name,
     get_secret_by_name,
     get_server_by_name,
@@ -389,6 +390,7 @@ def impl_import_servers(
     errors: list[str] = []
     imported = 0
     names: list[str] = []
+    created: list[str] = []
     if raw_servers is None:
         return 0, ["No server data found in import file."], []
     if not isinstance(raw_servers, list):
@@ -414,10 +416,14 @@ def impl_import_servers(
                 enabled=prepared.enabled,
             )
             save_entity(server)
+            created.append(prepared.name)
         imported += 1
         names.append(prepared.name)
     if imported:
         update_server_definitions_cid_safe()
+    if created:
+        # Snapshots imported before these servers existed were not indexed.
+        backfill_server_definition_versions(server_names=created)
     return imported, errors, names
 
 
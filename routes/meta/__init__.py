@@ -2,6 +2,16 @@
 
 from __future__ import annotations
 
+from .meta_caches import gather_cache_stats, meta_caches
 from .meta_core import inspect_path_metadata, meta_route
+from .meta_page_views import meta_page_views
+from .meta_provenance import meta_provenance
 
-__all__ = ["inspect_path_metadata", "meta_route"]
+__all__ = [
+    "gather_cache_stats",
+    "inspect_path_metadata",
+    "meta_caches",
+    "meta_page_views",
+    "meta_provenance",
+    "meta_route",
+]
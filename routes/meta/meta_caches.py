@@ -0,0 +1,37 @@
+"""Diagnostics for the in-process caches used on request hot paths."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from flask import jsonify
+
+from cid_memory_manager import CIDMemoryManager
+from content_rendering import get_mermaid_render_stats
+from derived_artifacts import get_derived_artifact_stats
+from routes import main_bp
+from server_execution.context_snapshot import get_context_snapshot_stats
+from server_execution.module_instances import get_module_instance_stats
+from server_execution.result_memo import get_result_memo_stats
+from server_execution.script_workers import get_script_worker_stats
+from text_function_runner import get_compiled_code_cache_stats
+
+
+def gather_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss statistics for each hot-path cache."""
+    return {
+        "user_context_snapshot": get_context_snapshot_stats(),
+        "compiled_code": get_compiled_code_cache_stats(),
+        "module_instances": get_module_instance_stats(),
+        "script_workers": get_script_worker_stats(),
+        "cid_memory": CIDMemoryManager.get_stats(),
+        "server_results": get_result_memo_stats(),
+        "derived_artifacts": get_derived_artifact_stats(),
+        "mermaid": get_mermaid_render_stats(),
+    }
+
+
+@main_bp.route("/meta/caches")
+def meta_caches():
+    """Return cache statistics as JSON."""
+    return jsonify(gather_cache_stats())
@@ -0,0 +1,14 @@
+"""Diagnostics for the buffered page view writer."""
+
+from __future__ import annotations
+
+from flask import jsonify
+
+from page_view_writer import get_page_view_writer_stats
+from routes import main_bp
+
+
+@main_bp.route("/meta/page-views")
+def meta_page_views():
+    """Return page view buffer depth and drop counters as JSON."""
+    return jsonify(get_page_view_writer_stats())
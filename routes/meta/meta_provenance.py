@@ -0,0 +1,14 @@
+"""Diagnostics for the background provenance writer."""
+
+from __future__ import annotations
+
+from flask import jsonify
+
+from routes import main_bp
+from server_execution.provenance_writer import get_provenance_writer_stats
+
+
+@main_bp.route("/meta/provenance")
+def meta_provenance():
+    """Return provenance writer queue and backpressure metrics as JSON."""
+    return jsonify(get_provenance_writer_stats())
@@ -3,20 +3,22 @@
 from __future__ import annotations
 
 import re
-from datetime import datetime, timezone
-from typing import Any
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable
 
 from flask import jsonify, render_template, request, url_for
 
+import search_index
 from alias_definition import collect_alias_routes
 from cid_presenter import cid_path, format_cid
 from db_access import (
     get_aliases,
-    get_secrets,
-    get_servers,
-    get_uploads,
-    get_variables,
+    get_secrets_by_ids,
+    get_servers_by_ids,
+    get_variables_by_ids,
 )
+from search_index import SearchHit, SearchPage
 
 from . import main_bp
 from .text_highlighter import TextHighlighter
@@ -32,7 +34,8 @@ _CATEGORY_CONFIG: dict[str, dict[str, Any]] = {
 
 # Search and display constants
 SEARCH_CONTEXT_CHARS: int = 60
-MAX_UPLOAD_HISTORY: int = 100
+SEARCH_RESULT_LIMIT: int = 100
+MAX_SEARCH_RESULT_LIMIT: int = 500
 PREVIEW_LENGTH: int = 20
 
 _ALIAS_NAME_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
@@ -182,273 +185,202 @@ def _parse_enabled(value: str | None) -> bool:
     return normalized not in _FALSY_VALUES
 
 
-def _alias_results(
-    query_lower: str,
-    alias_lookup: AliasLookup | None = None,
-    aliases: list[Any] | None = None,
-) -> list[dict[str, Any]]:
-    results: list[dict[str, Any]] = []
-    source = aliases if aliases is not None else []
+def _index_page(kind: str, query_lower: str, offset: int, limit: int) -> SearchPage:
+    return search_index.search(
+        kind, query_lower, limit=limit, offset=offset, context=SEARCH_CONTEXT_CHARS
+    )
 
-    for alias in source:
-        name_text = getattr(alias, "name", "") or ""
-        routes = collect_alias_routes(alias)
-        if not routes:
-            continue
 
-        target_paths = [
-            route.target_path or "" for route in routes if route.target_path
-        ]
-        match_patterns = [
-            route.match_pattern or "" for route in routes if route.match_pattern
-        ]
-
-        if not (
-            TextHighlighter.has_match(name_text, query_lower)
-            or any(
-                TextHighlighter.has_match(path, query_lower) for path in target_paths
-            )
-            or any(
-                TextHighlighter.has_match(pattern, query_lower)
-                for pattern in match_patterns
-            )
-        ):
-            continue
+def _hit_snippet(hit: SearchHit, query_lower: str) -> str:
+    return TextHighlighter.highlight_excerpt(
+        hit.snippet,
+        query_lower,
+        start=hit.snippet_start,
+        text_length=hit.body_length,
+    )
 
-        details: list[dict[str, str]] = []
-        for label, values in (
-            ("Target Path", target_paths),
-            ("Match Pattern", match_patterns),
-        ):
-            for value in values:
-                highlighted = TextHighlighter.highlight_full(value, query_lower)
-                if "<mark>" in highlighted:
-                    details.append({"label": label, "value": highlighted})
-                    break
-
-        primary_route = routes[0]
-        canonical_path = (primary_route.target_path or "").strip() or None
-        results.append(
-            {
-                "id": getattr(alias, "id", None),
-                "name": name_text,
-                "name_highlighted": TextHighlighter.highlight_full(
-                    name_text, query_lower
-                ),
-                "url": url_for("main.view_alias", alias_name=name_text)
-                if name_text
-                else None,
-                "details": details,
-                "aliases": _alias_matches_for(canonical_path, alias_lookup),
-                "alias_form_url": _alias_form_url(canonical_path),
-                "enabled": bool(getattr(alias, "enabled", True)),
-            }
-        )
-    return results
 
+@dataclass(frozen=True)
+class _SearchRequest:
+    """One category lookup: the query, the page and the alias context."""
+
+    query_lower: str
+    alias_lookup: AliasLookup | None = None
+    aliases: list[Any] = field(default_factory=list)
+    offset: int = 0
+    limit: int = SEARCH_RESULT_LIMIT
+
+
+def _alias_result(
+    alias: Any, routes: list[Any], search: _SearchRequest
+) -> dict[str, Any] | None:
+    """Return the result item for ``alias`` when one of its routes matches."""
+    query_lower = search.query_lower
+    name_text = getattr(alias, "name", "") or ""
+    target_paths = [route.target_path for route in routes if route.target_path]
+    match_patterns = [route.match_pattern for route in routes if route.match_pattern]
+    if not any(
+        TextHighlighter.has_match(value, query_lower)
+        for value in (name_text, *target_paths, *match_patterns)
+    ):
+        return None
 
-def _server_results(
-    query_lower: str,
-    alias_lookup: AliasLookup | None = None,
-    _unused_aliases: list[Any] | None = None,
-) -> list[dict[str, Any]]:
-    results: list[dict[str, Any]] = []
-    for server in get_servers():
-        name_text = getattr(server, "name", "") or ""
-        definition = getattr(server, "definition", "") or ""
-
-        if not (
-            TextHighlighter.has_match(name_text, query_lower)
-            or TextHighlighter.has_match(definition, query_lower)
-        ):
-            continue
+    details: list[dict[str, str]] = []
+    for label, values in (
+        ("Target Path", target_paths),
+        ("Match Pattern", match_patterns),
+    ):
+        for value in values:
+            highlighted = TextHighlighter.highlight_full(value, query_lower)
+            if "<mark>" in highlighted:
+                details.append({"label": label, "value": highlighted})
+                break
+
+    canonical_path = (routes[0].target_path or "").strip() or None
+    return {
+        "id": getattr(alias, "id", None),
+        "name": name_text,
+        "name_highlighted": TextHighlighter.highlight_full(name_text, query_lower),
+        "url": url_for("main.view_alias", alias_name=name_text) if name_text else None,
+        "details": details,
+        "aliases": _alias_matches_for(canonical_path, search.alias_lookup),
+        "alias_form_url": _alias_form_url(canonical_path),
+        "enabled": bool(getattr(alias, "enabled", True)),
+    }
 
-        details: list[dict[str, str]] = []
-        snippet = TextHighlighter.highlight_snippet(definition, query_lower)
-        if snippet:
-            details.append({"label": "Definition", "value": snippet})
-
-        canonical_path = (
-            url_for("main.view_server", server_name=name_text) if name_text else None
-        )
-
-        results.append(
-            {
-                "id": getattr(server, "id", None),
-                "name": name_text,
-                "name_highlighted": TextHighlighter.highlight_full(
-                    name_text, query_lower
-                ),
-                "url": canonical_path,
-                "details": details,
-                "aliases": _alias_matches_for(canonical_path, alias_lookup),
-                "alias_form_url": _alias_form_url(canonical_path, name_text),
-                "enabled": bool(getattr(server, "enabled", True)),
-            }
-        )
-    return results
 
+def _alias_results(search: _SearchRequest) -> tuple[list[dict[str, Any]], int]:
+    # The index narrows candidates to aliases whose name or definition text
+    # contains the query; the parsed routes below decide the actual match.
+    candidates = {
+        hit.key
+        for hit in _index_page(
+            "aliases", search.query_lower, 0, max(len(search.aliases), 1)
+        ).hits
+    }
 
-def _variable_results(
-    query_lower: str,
-    alias_lookup: AliasLookup | None = None,
-    _unused_aliases: list[Any] | None = None,
-) -> list[dict[str, Any]]:
     results: list[dict[str, Any]] = []
-    for variable in get_variables():
-        name_text = getattr(variable, "name", "") or ""
-        definition = getattr(variable, "definition", "") or ""
-
-        if not (
-            TextHighlighter.has_match(name_text, query_lower)
-            or TextHighlighter.has_match(definition, query_lower)
-        ):
+    for alias in search.aliases:
+        if (getattr(alias, "name", "") or "") not in candidates:
             continue
+        routes = collect_alias_routes(alias)
+        result = _alias_result(alias, routes, search) if routes else None
+        if result is not None:
+            results.append(result)
+    return results[search.offset : search.offset + search.limit], len(results)
+
+
+@dataclass(frozen=True)
+class _DefinitionKind:
+    """How to load and link one kind of named definition."""
+
+    kind: str
+    load_by_ids: Callable[[list[int]], list[Any]]
+    endpoint: str
+    name_arg: str
+
+
+def _definition_result(
+    hit: SearchHit, record: Any, definition: _DefinitionKind, search: _SearchRequest
+) -> dict[str, Any]:
+    name_text = hit.key
+    details: list[dict[str, str]] = []
+    snippet = _hit_snippet(hit, search.query_lower)
+    if snippet:
+        details.append({"label": "Definition", "value": snippet})
+
+    canonical_path = (
+        url_for(definition.endpoint, **{definition.name_arg: name_text})
+        if name_text
+        else None
+    )
+    return {
+        "id": getattr(record, "id", None),
+        "name": name_text,
+        "name_highlighted": TextHighlighter.highlight_full(
+            name_text, search.query_lower
+        ),
+        "url": canonical_path,
+        "details": details,
+        "aliases": _alias_matches_for(canonical_path, search.alias_lookup),
+        "alias_form_url": _alias_form_url(canonical_path, name_text),
+        "enabled": bool(getattr(record, "enabled", True)),
+    }
 
-        details: list[dict[str, str]] = []
-        snippet = TextHighlighter.highlight_snippet(definition, query_lower)
-        if snippet:
-            details.append({"label": "Definition", "value": snippet})
-
-        canonical_path = (
-            url_for("main.view_variable", variable_name=name_text)
-            if name_text
-            else None
-        )
-
-        results.append(
-            {
-                "id": getattr(variable, "id", None),
-                "name": name_text,
-                "name_highlighted": TextHighlighter.highlight_full(
-                    name_text, query_lower
-                ),
-                "url": canonical_path,
-                "details": details,
-                "aliases": _alias_matches_for(canonical_path, alias_lookup),
-                "alias_form_url": _alias_form_url(canonical_path, name_text),
-                "enabled": bool(getattr(variable, "enabled", True)),
-            }
-        )
-    return results
 
+def _definition_results(
+    definition: _DefinitionKind, search: _SearchRequest
+) -> tuple[list[dict[str, Any]], int]:
+    """Build result items for servers, variables or secrets from index hits.
 
-def _secret_results(
-    query_lower: str,
-    alias_lookup: AliasLookup | None = None,
-    _unused_aliases: list[Any] | None = None,
-) -> list[dict[str, Any]]:
-    results: list[dict[str, Any]] = []
-    for secret in get_secrets():
-        name_text = getattr(secret, "name", "") or ""
-        definition = getattr(secret, "definition", "") or ""
-
-        if not (
-            TextHighlighter.has_match(name_text, query_lower)
-            or TextHighlighter.has_match(definition, query_lower)
-        ):
-            continue
+    Only the records behind the hits on this page are loaded.
+    """
+    page = _index_page(
+        definition.kind, search.query_lower, search.offset, search.limit
+    )
+    records = {
+        record.id: record
+        for record in definition.load_by_ids([hit.entity_id for hit in page.hits])
+    }
+    results = [
+        _definition_result(hit, records[hit.entity_id], definition, search)
+        for hit in page.hits
+        if hit.entity_id in records
+    ]
+    return results, page.total
 
-        details: list[dict[str, str]] = []
-        snippet = TextHighlighter.highlight_snippet(definition, query_lower)
-        if snippet:
-            details.append({"label": "Definition", "value": snippet})
-
-        canonical_path = (
-            url_for("main.view_secret", secret_name=name_text) if name_text else None
-        )
-
-        results.append(
-            {
-                "id": getattr(secret, "id", None),
-                "name": name_text,
-                "name_highlighted": TextHighlighter.highlight_full(
-                    name_text, query_lower
-                ),
-                "url": canonical_path,
-                "details": details,
-                "aliases": _alias_matches_for(canonical_path, alias_lookup),
-                "alias_form_url": _alias_form_url(canonical_path, name_text),
-                "enabled": bool(getattr(secret, "enabled", True)),
-            }
-        )
-    return results
 
+_SERVERS = _DefinitionKind(
+    "servers", get_servers_by_ids, "main.view_server", "server_name"
+)
+_VARIABLES = _DefinitionKind(
+    "variables", get_variables_by_ids, "main.view_variable", "variable_name"
+)
+_SECRETS = _DefinitionKind(
+    "secrets", get_secrets_by_ids, "main.view_secret", "secret_name"
+)
 
-def _cid_results(
-    query_lower: str,
-    alias_lookup: AliasLookup | None = None,
-    _unused_aliases: list[Any] | None = None,
-) -> list[dict[str, Any]]:
-    results: list[dict[str, Any]] = []
 
-    def created_at_value(record: Any) -> datetime:
-        value = getattr(record, "created_at", None)
-        if value is None:
-            return datetime.fromtimestamp(0, tz=timezone.utc)
-        if value.tzinfo is None:
-            return value.replace(tzinfo=timezone.utc)
-        return value
-
-    uploads = sorted(
-        get_uploads(),
-        key=created_at_value,
-        reverse=True,
-    )[:MAX_UPLOAD_HISTORY]
-
-    for cid_record in uploads:
-        path = getattr(cid_record, "path", "") or ""
-        cid_value = format_cid(path)
-        display_name = path or (f"/{cid_value}" if cid_value else "")
-
-        file_data = getattr(cid_record, "file_data", b"") or b""
-        try:
-            content_text = file_data.decode("utf-8", errors="replace")
-        except UnicodeDecodeError:  # pragma: no cover - errors="replace" prevents this
-            content_text = ""
-
-        if not (
-            TextHighlighter.has_match(display_name, query_lower)
-            or TextHighlighter.has_match(cid_value, query_lower)
-            or TextHighlighter.has_match(content_text, query_lower)
-        ):
-            continue
+def _cid_result(hit: SearchHit, search: _SearchRequest) -> dict[str, Any]:
+    path = hit.key
+    cid_value = format_cid(path)
+    display_name = path or (f"/{cid_value}" if cid_value else "")
 
-        details: list[dict[str, str]] = []
-        snippet = TextHighlighter.highlight_snippet(content_text, query_lower)
-        if snippet:
-            details.append({"label": "Content", "value": snippet})
-
-        canonical_path = cid_path(cid_value) if cid_value else (display_name or None)
-        alias_name_suggestion = (
-            cid_value
-            if cid_value and _ALIAS_NAME_PATTERN.fullmatch(cid_value)
-            else None
-        )
-
-        results.append(
-            {
-                "id": getattr(cid_record, "id", None),
-                "name": display_name,
-                "name_highlighted": TextHighlighter.highlight_full(
-                    display_name, query_lower
-                ),
-                "url": canonical_path,
-                "details": details,
-                "aliases": _alias_matches_for(canonical_path, alias_lookup),
-                "alias_form_url": _alias_form_url(
-                    canonical_path, alias_name_suggestion
-                ),
-            }
-        )
-    return results
+    details: list[dict[str, str]] = []
+    snippet = _hit_snippet(hit, search.query_lower)
+    if snippet:
+        details.append({"label": "Content", "value": snippet})
+
+    canonical_path = cid_path(cid_value) if cid_value else (display_name or None)
+    alias_name_suggestion = (
+        cid_value if cid_value and _ALIAS_NAME_PATTERN.fullmatch(cid_value) else None
+    )
+    return {
+        "id": hit.entity_id,
+        "name": display_name,
+        "name_highlighted": TextHighlighter.highlight_full(
+            display_name, search.query_lower
+        ),
+        "url": canonical_path,
+        "details": details,
+        "aliases": _alias_matches_for(canonical_path, search.alias_lookup),
+        "alias_form_url": _alias_form_url(canonical_path, alias_name_suggestion),
+    }
 
 
-_COLLECTORS = {
+def _cid_results(search: _SearchRequest) -> tuple[list[dict[str, Any]], int]:
+    # Everything shown comes from the index, so no CID payload is loaded.
+    page = _index_page("cids", search.query_lower, search.offset, search.limit)
+    return [_cid_result(hit, search) for hit in page.hits], page.total
+
+
+_COLLECTORS: dict[
+    str, Callable[[_SearchRequest], tuple[list[dict[str, Any]], int]]
+] = {
     "aliases": _alias_results,
-    "servers": _server_results,
-    "variables": _variable_results,
-    "secrets": _secret_results,
+    "servers": partial(_definition_results, _SERVERS),
+    "variables": partial(_definition_results, _VARIABLES),
+    "secrets": partial(_definition_results, _SECRETS),
     "cids": _cid_results,
 }
 
@@ -467,7 +399,7 @@ def _extract_search_query() -> tuple[str, str]:
         tuple: (original_query, lowercase_query)
     """
     query = (request.args.get("q") or "").strip()
-    query_lower = query.lower()
+    query_lower = search_index.fold_case(query)
     return query, query_lower
 
 
@@ -494,6 +426,8 @@ def _empty_search_response(applied_filters: dict[str, bool]) -> dict[str, Any]:
         response_categories[key] = {
             "label": config["label"],
             "count": 0,
+            "total": 0,
+            "offset": 0,
             "items": [],
         }
     return {
@@ -504,19 +438,27 @@ def _empty_search_response(applied_filters: dict[str, bool]) -> dict[str, Any]:
     }
 
 
+def _parse_pagination() -> tuple[int, int]:
+    """Parse the per-category ``offset`` and ``limit`` request parameters.
+
+    Returns:
+        tuple: (offset, limit), clamped to sensible bounds
+    """
+    offset = request.args.get("offset", 0, type=int) or 0
+    limit = request.args.get("limit", SEARCH_RESULT_LIMIT, type=int)
+    if limit is None or limit <= 0:
+        limit = SEARCH_RESULT_LIMIT
+    return max(offset, 0), min(limit, MAX_SEARCH_RESULT_LIMIT)
+
+
 def _execute_search(
-    query_lower: str,
-    applied_filters: dict[str, bool],
-    alias_lookup: AliasLookup,
-    alias_records: list[Any],
+    search: _SearchRequest, applied_filters: dict[str, bool]
 ) -> tuple[dict[str, dict[str, Any]], int]:
     """Execute search across all enabled categories.
 
     Args:
-        query_lower: Lowercase search query
+        search: Query, alias context and per-category page
         applied_filters: Category filter configuration
-        alias_lookup: Precomputed alias lookup table
-        alias_records: List of user aliases
 
     Returns:
         tuple: (response_categories, total_count)
@@ -526,14 +468,12 @@ def _execute_search(
 
     for key, config in _CATEGORY_CONFIG.items():
         include = applied_filters.get(key, True)
+        items: list[dict[str, Any]] = []
+        total = 0
         if include:
             collector = _COLLECTORS.get(key)
             if collector:
-                items = collector(query_lower, alias_lookup, alias_records)
-            else:
-                items = []
-        else:
-            items = []
+                items, total = collector(search)
 
         count = len(items)
         if include:
@@ -542,6 +482,8 @@ def _execute_search(
         response_categories[key] = {
             "label": config["label"],
             "count": count,
+            "total": total,
+            "offset": search.offset,
             "items": items,
         }
 
@@ -557,12 +499,12 @@ def search_results():
     if not query_lower:
         return jsonify(_empty_search_response(applied_filters))
 
+    offset, limit = _parse_pagination()
     alias_records = get_aliases()
     alias_lookup = _build_alias_lookup(alias_records)
 
-    response_categories, total_count = _execute_search(
-        query_lower, applied_filters, alias_lookup, alias_records
-    )
+    search = _SearchRequest(query_lower, alias_lookup, alias_records, offset, limit)
+    response_categories, total_count = _execute_search(search, applied_filters)
 
     return jsonify(
         {
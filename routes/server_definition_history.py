@@ -0,0 +1,125 @@
+"""Server definition history read from the definition version index."""
+
+import json
+from typing import Any
+
+from cid_presenter import cid_path, format_cid
+from cid_utils import generate_cid
+from db_access import get_cids_by_paths, get_server_definition_versions
+
+
+def _parse_server_snapshot(cid, server_name: str) -> dict[str, Any] | None:
+    """Parse a server definition snapshot from a CID record.
+
+    Args:
+        cid: CID record containing server definitions
+        server_name: Name of the server to extract
+
+    Returns:
+        dict: Parsed snapshot data, or None if parsing fails
+    """
+    try:
+        content = cid.file_data.decode("utf-8")
+    except (UnicodeDecodeError, AttributeError):
+        return None
+
+    try:
+        server_definitions = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+    if (
+        not isinstance(server_definitions, dict)
+        or server_name not in server_definitions
+    ):
+        return None
+
+    definition_text = server_definitions[server_name]
+
+    if not isinstance(definition_text, str):
+        try:
+            snapshot_cid_for_error = format_cid(cid.path)
+        except Exception:
+            snapshot_cid_for_error = None
+
+        value_preview = repr(definition_text)
+        if len(value_preview) > 500:
+            value_preview = f"{value_preview[:500]}...<truncated>"
+
+        snapshot_path = (
+            cid_path(snapshot_cid_for_error) if snapshot_cid_for_error else None
+        )
+
+        return {
+            "definition": None,
+            "definition_cid": None,
+            "snapshot_cid": snapshot_cid_for_error,
+            "snapshot_path": snapshot_path,
+            "created_at": cid.created_at,
+            "is_current": False,
+            "is_invalid": True,
+            "error": (
+                "Expected server definition text to be a str in server definitions snapshot "
+                f"(server_name={server_name!r}, snapshot_cid={snapshot_cid_for_error!r}). "
+                f"Got {type(definition_text).__name__}: {value_preview}"
+            ),
+        }
+
+    definition_bytes = definition_text.encode("utf-8")
+    per_server_cid = format_cid(generate_cid(definition_bytes))
+
+    snapshot_cid = format_cid(cid.path)
+    snapshot_path = cid_path(snapshot_cid) if snapshot_cid else None
+
+    return {
+        "definition": definition_text,
+        "definition_cid": per_server_cid,
+        "snapshot_cid": snapshot_cid,
+        "snapshot_path": snapshot_path,
+        "created_at": cid.created_at,
+        "is_current": False,
+    }
+
+
+def get_server_definition_history(
+    server_name: str, definition_prefix: str | None = None
+) -> list[dict[str, Any]]:
+    """Get historical server definitions for a specific server.
+
+    Versions come from the ``server_definition_versions`` index; only the
+    snapshots it points at are loaded and decoded.
+
+    Args:
+        server_name: Name of the server
+        definition_prefix: Only include versions whose definition CID starts
+            with this prefix
+
+    Returns:
+        list: History of server definitions, most recent first
+    """
+    versions = get_server_definition_versions(server_name, definition_prefix)
+    if not versions:
+        return []
+
+    snapshot_paths = [cid_path(version.snapshot_cid) for version in versions]
+    records = {
+        format_cid(record.path): record
+        for record in get_cids_by_paths(path for path in snapshot_paths if path)
+    }
+
+    history = []
+    for version in versions:
+        record = records.get(format_cid(version.snapshot_cid))
+        if record is None:
+            continue
+        snapshot = _parse_server_snapshot(record, server_name)
+        if snapshot:
+            history.append(snapshot)
+
+    if history and not definition_prefix:
+        history[0]["is_current"] = True
+
+    return history
+
+
+__all__ = ["get_server_definition_history"]
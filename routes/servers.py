@@ -23,7 +23,6 @@ from db_access import (
     get_server_invocations_by_server,
     get_servers,
     get_template_servers,
-    get_uploads,
     get_variables,
 )
 from entity_references import extract_references_from_text
@@ -43,6 +42,7 @@ from . import main_bp
 from .core import derive_name_from_path
 from .crud_factory import EntityRouteConfig, register_standard_crud_routes
 from .history import _load_request_referers
+from .server_definition_history import get_server_definition_history
 from .server_definition_parser import ServerDefinitionParser
 
 
@@ -469,108 +469,6 @@ def upload_server_test_page(server_name):
     return response
 
 
-def _parse_server_snapshot(cid, server_name: str) -> dict[str, Any] | None:
-    """Parse a server definition snapshot from a CID record.
-
-    Args:
-        cid: CID record containing server definitions
-        server_name: Name of the server to extract
-
-    Returns:
-        dict: Parsed snapshot data, or None if parsing fails
-    """
-    try:
-        content = cid.file_data.decode("utf-8")
-    except (UnicodeDecodeError, AttributeError):
-        return None
-
-    try:
-        server_definitions = json.loads(content)
-    except (json.JSONDecodeError, TypeError):
-        return None
-
-    if (
-        not isinstance(server_definitions, dict)
-        or server_name not in server_definitions
-    ):
-        return None
-
-    definition_text = server_definitions[server_name]
-
-    if not isinstance(definition_text, str):
-        try:
-            snapshot_cid_for_error = format_cid(cid.path)
-        except Exception:
-            snapshot_cid_for_error = None
-
-        value_preview = repr(definition_text)
-        if len(value_preview) > 500:
-            value_preview = f"{value_preview[:500]}...<truncated>"
-
-        snapshot_path = (
-            cid_path(snapshot_cid_for_error) if snapshot_cid_for_error else None
-        )
-
-        return {
-            "definition": None,
-            "definition_cid": None,
-            "snapshot_cid": snapshot_cid_for_error,
-            "snapshot_path": snapshot_path,
-            "created_at": cid.created_at,
-            "is_current": False,
-            "is_invalid": True,
-            "error": (
-                "Expected server definition text to be a str in server definitions snapshot "
-                f"(server_name={server_name!r}, snapshot_cid={snapshot_cid_for_error!r}). "
-                f"Got {type(definition_text).__name__}: {value_preview}"
-            ),
-        }
-
-    definition_bytes = definition_text.encode("utf-8")
-    per_server_cid = _generate_and_format_cid(definition_bytes)
-
-    snapshot_cid = format_cid(cid.path)
-    snapshot_path = cid_path(snapshot_cid) if snapshot_cid else None
-
-    return {
-        "definition": definition_text,
-        "definition_cid": per_server_cid,
-        "snapshot_cid": snapshot_cid,
-        "snapshot_path": snapshot_path,
-        "created_at": cid.created_at,
-        "is_current": False,
-    }
-
-
-def get_server_definition_history(server_name: str) -> list[dict[str, Any]]:
-    """Get historical server definitions for a specific server.
-
-    Args:
-        server_name: Name of the server
-
-    Returns:
-        list: History of server definitions, most recent first
-    """
-    cids = get_uploads()
-
-    history = []
-
-    try:
-        iterator = iter(cids)
-    except TypeError:
-        return history
-
-    for cid in iterator:
-        snapshot = _parse_server_snapshot(cid, server_name)
-        if snapshot:
-            history.append(snapshot)
-
-    if history:
-        history[0]["is_current"] = True
-
-    return history
-
-
 def update_server_definitions_cid() -> str | None:
     """Update the server definitions CID after server changes.
 
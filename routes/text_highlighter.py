@@ -3,6 +3,8 @@
 from typing import List
 from markupsafe import escape
 
+from search_index import fold_case
+
 
 # Default context length for snippets
 DEFAULT_CONTEXT_CHARS: int = 60
@@ -16,7 +18,7 @@ class TextHighlighter:
         """Return True when the search term appears in the supplied text."""
         if not text or not query_lower:
             return False
-        return query_lower in text.lower()
+        return query_lower in fold_case(text)
 
     @staticmethod
     def highlight_full(text: str | None, query_lower: str) -> str:
@@ -26,7 +28,7 @@ class TextHighlighter:
         if not query_lower:
             return str(escape(text))
 
-        lower_text = text.lower()
+        lower_text = fold_case(text)
         query_length = len(query_lower)
         if query_length == 0:
             return str(escape(text))
@@ -59,7 +61,7 @@ class TextHighlighter:
         if not text or not query_lower:
             return ""
 
-        lower_text = text.lower()
+        lower_text = fold_case(text)
         match_index = lower_text.find(query_lower)
         if match_index == -1:
             return ""
@@ -74,5 +76,23 @@ class TextHighlighter:
         suffix = "..." if end < len(text) else ""
         return f"{prefix}{highlighted}{suffix}"
 
+    @staticmethod
+    def highlight_excerpt(
+        excerpt: str | None, query_lower: str, *, start: int, text_length: int
+    ) -> str:
+        """Return a highlighted snippet for a pre-cut excerpt of a longer text.
+
+        ``start`` is the excerpt's offset in the original text and
+        ``text_length`` the original length, used to add the ellipses
+        :meth:`highlight_snippet` would.
+        """
+        if not excerpt or not query_lower:
+            return ""
+
+        highlighted = TextHighlighter.highlight_full(excerpt, query_lower)
+        prefix = "..." if start > 0 else ""
+        suffix = "..." if start + len(excerpt) < text_length else ""
+        return f"{prefix}{highlighted}{suffix}"
+
 
 __all__ = ["TextHighlighter", "DEFAULT_CONTEXT_CHARS"]
@@ -33,7 +33,8 @@ from db_access import (
     get_cid_by_path,
     get_server_invocations,
     get_template_uploads,
-    get_uploads,
+    get_upload_totals,
+    get_uploads_page,
     get_variables,
     get_variable_by_name,
     record_entity_interaction,
@@ -374,17 +375,12 @@ def upload():
 
 @main_bp.route("/uploads")
 def uploads():
-    """Display uploaded files."""
-    uploads_list = get_uploads()
-
-    _attach_creation_sources(uploads_list)
-
-    uploads_list = [
-        upload
-        for upload in uploads_list
-        if getattr(upload, "creation_method", EntityType.UPLOAD.value)
-        != EntityType.SERVER_EVENT.value
-    ]
+    """Display uploaded files, one keyset-paginated page at a time."""
+    before = request.args.get("before", type=int)
+    # Server event CIDs are excluded by the query, so pages stay full.
+    page = get_uploads_page(before=before, exclude_server_events=True)
+    uploads_list = page.items
+    _attach_creation_sources(uploads_list, invocation_by_cid={})
 
     for upload_record in uploads_list:
         if upload_record.file_data:
@@ -404,13 +400,15 @@ def uploads():
             getattr(upload_record, "file_data", None),
         )
 
-    total_storage = sum(upload.file_size or 0 for upload in uploads_list)
+    total_uploads, total_storage = get_upload_totals(exclude_server_events=True)
 
     return render_template(
         "uploads.html",
         uploads=uploads_list,
-        total_uploads=len(uploads_list),
+        total_uploads=total_uploads,
         total_storage=total_storage,
+        next_cursor=page.next_cursor,
+        is_first_page=before is None,
     )
 
 
@@ -686,19 +684,10 @@ def screenshot_server_events_demo():
     abort(404)
 
 
-def _attach_creation_sources(uploads_list: list[Any]) -> None:
-    """Annotate uploads with information about how they were created.
-
-    Args:
-        uploads_list: List of upload records to annotate
-    """
-    if not uploads_list:
-        return
-
-    invocations = get_server_invocations()
-
-    invocation_by_cid = {}
-    for invocation in invocations:
+def _server_invocations_by_cid() -> dict[str, Any]:
+    """Map every CID produced by a server invocation to that invocation."""
+    invocation_by_cid: dict[str, Any] = {}
+    for invocation in get_server_invocations():
         for attr in (
             "result_cid",
             "invocation_cid",
@@ -709,6 +698,24 @@ def _attach_creation_sources(uploads_list: list[Any]) -> None:
             cid_key = format_cid(cid_value)
             if cid_key and cid_key not in invocation_by_cid:
                 invocation_by_cid[cid_key] = invocation
+    return invocation_by_cid
+
+
+def _attach_creation_sources(
+    uploads_list: list[Any],
+    invocation_by_cid: dict[str, Any] | None = None,
+) -> None:
+    """Annotate uploads with information about how they were created.
+
+    Args:
+        uploads_list: List of upload records to annotate
+        invocation_by_cid: Precomputed result of ``_server_invocations_by_cid``
+    """
+    if not uploads_list:
+        return
+
+    if invocation_by_cid is None:
+        invocation_by_cid = _server_invocations_by_cid()
 
     for upload_record in uploads_list:
         upload_record.creation_method = EntityType.UPLOAD.value
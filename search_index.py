@@ -0,0 +1,769 @@
+"""Persistent full-text index behind ``/search/results``.
+
+Search used to decode every upload and load every alias, server, variable
+and secret on each keystroke.  This module keeps one document per entity
+(name plus definition or CID text) in an index that is updated by ORM
+events as rows are written:
+
+* on SQLite an FTS5 table with the ``trigram`` tokenizer, so the existing
+  case-insensitive substring semantics are kept,
+* on PostgreSQL a plain table with ``pg_trgm`` GIN indexes, which answer
+  the same substring queries,
+* elsewhere (or with ``SEARCH_INDEX_BACKEND=memory``) an in-process trigram
+  inverted index.
+
+Results are ranked name matches first, then newest first, and carry the
+offset of the first body match plus a short window around it so callers can
+render snippets without reading the document.  Each search compares index
+and table row counts whenever :mod:`change_tracking` reports a change, and
+rebuilds a kind whose counts disagree (raw SQL writes, bulk deletes, or a
+database populated before the index existed).
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Optional
+
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from change_tracking import get_table_versions
+from database import db
+from models import CID, Alias, Secret, Server, Variable
+
+INDEX_TABLE = "search_index"
+MIN_TRIGRAM_QUERY = 3
+DEFAULT_SNIPPET_CONTEXT = 60
+DEFAULT_MAX_INDEXED_BYTES = 1024 * 1024
+REBUILD_BATCH_SIZE = 500
+
+# Document kind -> model.  The position doubles as the kind's slot in rowids.
+_MODELS = {
+    "aliases": Alias,
+    "servers": Server,
+    "variables": Variable,
+    "secrets": Secret,
+    "cids": CID,
+}
+KINDS = tuple(_MODELS)
+_KIND_SLOTS = len(KINDS)
+_SOURCE_TABLES = tuple(model.__tablename__ for model in _MODELS.values())
+
+
+def _max_indexed_bytes() -> int:
+    try:
+        return int(
+            os.environ.get("SEARCH_INDEX_MAX_BYTES", DEFAULT_MAX_INDEXED_BYTES)
+        )
+    except ValueError:
+        return DEFAULT_MAX_INDEXED_BYTES
+
+
+@dataclass(frozen=True)
+class Document:
+    kind: str
+    rowid: int
+    key: str
+    name: str
+    body: str
+    created: float
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One ranked match.
+
+    ``offset`` is the character offset of the first match in the body (None
+    when only the name matched); ``snippet`` is the body text starting at
+    ``snippet_start`` around that match.
+    """
+
+    kind: str
+    key: str
+    entity_id: int
+    name_match: bool
+    offset: Optional[int]
+    snippet: str
+    snippet_start: int
+    body_length: int
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    hits: list[SearchHit]
+    total: int
+
+
+# ============================================================================
+# DOCUMENTS
+# ============================================================================
+
+
+def _rowid(kind: str, entity_id: int) -> int:
+    return int(entity_id) * _KIND_SLOTS + KINDS.index(kind)
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _cid_text(data: Any) -> str:
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        return ""
+    if len(data) > _max_indexed_bytes():
+        return ""
+    try:
+        return bytes(data).decode("utf-8")
+    except UnicodeDecodeError:
+        return ""
+
+
+def _kind_for(instance: Any) -> Optional[str]:
+    for kind, model in _MODELS.items():
+        if type(instance) is model:  # pylint: disable=unidiomatic-typecheck
+            return kind
+    return None
+
+
+def document_for(instance: Any) -> Optional[Document]:
+    """Return the index document for a model instance, if it is indexed."""
+    kind = _kind_for(instance)
+    if kind is None or getattr(instance, "id", None) is None:
+        return None
+    if kind == "cids":
+        key = instance.path or ""
+        body = _cid_text(instance.file_data)
+    else:
+        key = instance.name or ""
+        body = instance.definition or ""
+    return Document(
+        kind=kind,
+        rowid=_rowid(kind, instance.id),
+        key=key,
+        name=key,
+        body=body,
+        created=_timestamp(instance.created_at),
+    )
+
+
+def _source_documents(session: Session, kind: str) -> Iterator[Document]:
+    """Yield documents for every row of ``kind`` without holding them all."""
+    if kind != "cids":
+        model = _MODELS[kind]
+        rows = session.query(
+            model.id, model.name, model.definition, model.created_at
+        ).all()
+        for entity_id, name, definition, created_at in rows:
+            yield Document(
+                kind, _rowid(kind, entity_id), name or "", name or "",
+                definition or "", _timestamp(created_at),
+            )
+        return
+
+    # Imported lazily: db_access imports this module's neighbours.
+    from db_access import read_cid_data  # pylint: disable=import-outside-toplevel
+
+    limit = _max_indexed_bytes()
+    last_id = 0
+    while True:
+        rows = (
+            session.query(
+                CID.id,
+                CID.path,
+                CID.created_at,
+                func.coalesce(CID.file_size, func.length(CID.file_data)),
+            )
+            .filter(CID.id > last_id)
+            .order_by(CID.id.asc())
+            .limit(REBUILD_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            return
+        for cid_id, path, created_at, size in rows:
+            size = int(size or 0)
+            data = read_cid_data(cid_id, 0, size, path=path) if size <= limit else b""
+            yield Document(
+                "cids", _rowid("cids", cid_id), path or "", path or "",
+                _cid_text(data), _timestamp(created_at),
+            )
+        last_id = rows[-1][0]
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+
+def fold_case(value: str) -> str:
+    """Lowercase ``value`` without changing its length.
+
+    Offsets found in the folded text then index the original text. The few
+    characters whose lowercase form is longer (``"İ"``) are kept as they are.
+    """
+    lowered = value.lower()
+    if len(lowered) == len(value):
+        return lowered
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in value)
+
+
+def _snippet_bounds(position: int, query_length: int, context: int) -> tuple[int, int]:
+    start = max(position - context, 0)
+    return start, position + query_length + context
+
+
+class MemoryIndex:
+    """Pure-Python trigram inverted index, one per database engine."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._documents: dict[int, Document] = {}
+        self._lowered: dict[int, tuple[str, str]] = {}
+        self._postings: dict[str, set[int]] = {}
+
+    @staticmethod
+    def _trigrams(value: str) -> set[str]:
+        return {value[i : i + 3] for i in range(len(value) - 2)}
+
+    def create(self, _connection: Any) -> None:
+        return None
+
+    def drop(self, _connection: Any) -> None:
+        with self._lock:
+            self._documents.clear()
+            self._lowered.clear()
+            self._postings.clear()
+
+    def _remove_locked(self, rowid: int) -> None:
+        lowered = self._lowered.pop(rowid, None)
+        self._documents.pop(rowid, None)
+        if lowered is None:
+            return
+        for trigram in self._trigrams(lowered[0]) | self._trigrams(lowered[1]):
+            bucket = self._postings.get(trigram)
+            if bucket is not None:
+                bucket.discard(rowid)
+                if not bucket:
+                    del self._postings[trigram]
+
+    def upsert(self, _connection: Any, documents: Iterable[Document]) -> None:
+        with self._lock:
+            for document in documents:
+                self._remove_locked(document.rowid)
+                lowered = (fold_case(document.name), fold_case(document.body))
+                self._documents[document.rowid] = document
+                self._lowered[document.rowid] = lowered
+                for trigram in self._trigrams(lowered[0]) | self._trigrams(lowered[1]):
+                    self._postings.setdefault(trigram, set()).add(document.rowid)
+
+    def delete(self, _connection: Any, rowids: Iterable[int]) -> None:
+        with self._lock:
+            for rowid in rowids:
+                self._remove_locked(rowid)
+
+    def clear_kind(self, _connection: Any, kind: str) -> None:
+        with self._lock:
+            for rowid in [r for r, d in self._documents.items() if d.kind == kind]:
+                self._remove_locked(rowid)
+
+    def counts(self, _connection: Any) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        with self._lock:
+            for document in self._documents.values():
+                counts[document.kind] = counts.get(document.kind, 0) + 1
+        return counts
+
+    def _candidates_locked(self, query: str) -> set[int]:
+        if len(query) < MIN_TRIGRAM_QUERY:
+            return set(self._documents)
+        candidates: Optional[set[int]] = None
+        for trigram in self._trigrams(query):
+            bucket = self._postings.get(trigram, set())
+            candidates = bucket if candidates is None else candidates & bucket
+            if not candidates:
+                break
+        return candidates or set()
+
+    def search(
+        self, _connection: Any, kind: str, query: str, *, limit: int, offset: int,
+        context: int,
+    ) -> SearchPage:
+        with self._lock:
+            matches = []
+            for rowid in self._candidates_locked(query):
+                document = self._documents[rowid]
+                if document.kind != kind:
+                    continue
+                name_lower, body_lower = self._lowered[rowid]
+                name_match = query in name_lower
+                position = body_lower.find(query)
+                if name_match or position >= 0:
+                    matches.append((document, name_match, position))
+
+        matches.sort(key=lambda m: (not m[1], -m[0].created, m[0].key))
+        hits = [
+            _document_hit(
+                kind, document, name_match=name_match, position=position,
+                query_length=len(query), context=context,
+            )
+            for document, name_match, position in matches[offset : offset + limit]
+        ]
+        return SearchPage(hits=hits, total=len(matches))
+
+
+def _document_hit(
+    kind: str,
+    document: Document,
+    *,
+    name_match: bool,
+    position: int,
+    query_length: int,
+    context: int,
+) -> SearchHit:
+    if position >= 0:
+        start, end = _snippet_bounds(position, query_length, context)
+        snippet = document.body[start:end]
+    else:
+        start, snippet = 0, ""
+    return SearchHit(
+        kind=kind,
+        key=document.key,
+        entity_id=document.rowid // _KIND_SLOTS,
+        name_match=name_match,
+        offset=position if position >= 0 else None,
+        snippet=snippet,
+        snippet_start=start,
+        body_length=len(document.body),
+    )
+
+
+def _rows_to_page(kind: str, rows: Iterable[Any], total: int) -> SearchPage:
+    hits = []
+    for rowid, key, name_match, position, snippet_start, snippet, body_length in rows:
+        position = int(position or 0)
+        hits.append(
+            SearchHit(
+                kind=kind,
+                key=key,
+                entity_id=int(rowid) // _KIND_SLOTS,
+                name_match=bool(name_match),
+                offset=position - 1 if position > 0 else None,
+                snippet=snippet or "",
+                snippet_start=max(int(snippet_start or 1) - 1, 0),
+                body_length=int(body_length or 0),
+            )
+        )
+    return SearchPage(hits=hits, total=total)
+
+
+class _SQLIndex(ABC):
+    """Shared statements for the SQL-backed indexes."""
+
+    name = "sql"
+    _position_sql = "instr"
+    _max_sql = "max"
+    _fold_sql = "lower"
+
+    def upsert(self, connection: Any, documents: Iterable[Document]) -> None:
+        documents = list(documents)
+        if not documents:
+            return
+        self.delete(connection, [document.rowid for document in documents])
+        connection.execute(
+            text(
+                f"INSERT INTO {INDEX_TABLE} (rowid, kind, key, created, name, body) "
+                "VALUES (:rowid, :kind, :key, :created, :name, :body)"
+            ),
+            [
+                {
+                    "rowid": d.rowid,
+                    "kind": d.kind,
+                    "key": d.key,
+                    "created": d.created,
+                    "name": d.name,
+                    "body": d.body,
+                }
+                for d in documents
+            ],
+        )
+
+    def delete(self, connection: Any, rowids: Iterable[int]) -> None:
+        for rowid in rowids:
+            connection.execute(
+                text(f"DELETE FROM {INDEX_TABLE} WHERE rowid = :rowid"),
+                {"rowid": rowid},
+            )
+
+    def clear_kind(self, connection: Any, kind: str) -> None:
+        connection.execute(
+            text(f"DELETE FROM {INDEX_TABLE} WHERE kind = :kind"), {"kind": kind}
+        )
+
+    def counts(self, connection: Any) -> dict[str, int]:
+        rows = connection.execute(
+            text(f"SELECT kind, count(*) FROM {INDEX_TABLE} GROUP BY kind")
+        )
+        return {kind: int(count) for kind, count in rows}
+
+    def drop(self, connection: Any) -> None:
+        connection.execute(text(f"DROP TABLE IF EXISTS {INDEX_TABLE}"))
+
+    @abstractmethod
+    def _match_clause(self, query: str, params: dict[str, Any]) -> str:
+        """Return the WHERE fragment matching ``query``, adding its params."""
+
+    def search(
+        self, connection: Any, kind: str, query: str, *, limit: int, offset: int,
+        context: int,
+    ) -> SearchPage:
+        pos, greatest, fold = self._position_sql, self._max_sql, self._fold_sql
+        params: dict[str, Any] = {
+            "kind": kind,
+            "q": query,
+            "qlen": len(query),
+            "ctx": context,
+            "limit": limit,
+            "offset": offset,
+        }
+        where = f"kind = :kind AND {self._match_clause(query, params)}"
+        total = connection.execute(
+            text(f"SELECT count(*) FROM {INDEX_TABLE} WHERE {where}"), params
+        ).scalar()
+        rows = connection.execute(
+            text(
+                f"""
+                SELECT doc_id, key, name_match, pos,
+                       {greatest}(pos - :ctx, 1) AS snippet_start,
+                       CASE WHEN pos > 0 THEN substr(
+                           body,
+                           {greatest}(pos - :ctx, 1),
+                           pos - {greatest}(pos - :ctx, 1) + :qlen + :ctx
+                       ) END AS snippet,
+                       length(body) AS body_length
+                FROM (
+                    SELECT rowid AS doc_id, key, created, body,
+                           {pos}({fold}(name), :q) > 0 AS name_match,
+                           {pos}({fold}(body), :q) AS pos
+                    FROM {INDEX_TABLE}
+                    WHERE {where}
+                ) AS matches
+                ORDER BY name_match DESC, created DESC, key
+                LIMIT :limit OFFSET :offset
+                """
+            ),
+            params,
+        )
+        return _rows_to_page(kind, rows, int(total or 0))
+
+
+class SQLiteFTSIndex(_SQLIndex):
+    """FTS5 table using the trigram tokenizer (substring matching)."""
+
+    name = "sqlite-fts5"
+    # SQLite's lower() only folds ASCII; positions are taken in Python's
+    # folding of the body, as the query is folded.
+    _fold_sql = "search_fold"
+
+    def create(self, connection: Any) -> None:
+        connection.execute(
+            text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+                "kind UNINDEXED, key UNINDEXED, created UNINDEXED, name, body, "
+                "tokenize='trigram')"
+            )
+        )
+
+    def _match_clause(self, query: str, params: dict[str, Any]) -> str:
+        if len(query) >= MIN_TRIGRAM_QUERY:
+            params["match"] = '"' + query.replace('"', '""') + '"'
+            return f"{INDEX_TABLE} MATCH :match"
+        # Trigrams cannot answer one- and two-character queries.
+        return (
+            "(instr(search_fold(name), :q) > 0 OR instr(search_fold(body), :q) > 0)"
+        )
+
+    def search(
+        self, connection: Any, kind: str, query: str, *, limit: int, offset: int,
+        context: int,
+    ) -> SearchPage:
+        connection.connection.driver_connection.create_function(
+            "search_fold", 1, _sql_fold, deterministic=True
+        )
+        return super().search(
+            connection, kind, query, limit=limit, offset=offset, context=context
+        )
+
+
+def _sql_fold(value: Optional[str]) -> Optional[str]:
+    return fold_case(value) if isinstance(value, str) else value
+
+
+class PostgresIndex(_SQLIndex):
+    """Plain table with ``pg_trgm`` GIN indexes on the lowered name and body.
+
+    Trigram indexes answer ``LIKE '%term%'`` directly, which keeps substring
+    semantics; a ``tsvector`` would only match whole words or prefixes.
+    """
+
+    name = "postgresql-trigram"
+    _position_sql = "strpos"
+    _max_sql = "greatest"
+
+    def create(self, connection: Any) -> None:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {INDEX_TABLE} (
+                    rowid BIGINT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    created DOUBLE PRECISION NOT NULL,
+                    name TEXT NOT NULL,
+                    body TEXT NOT NULL
+                )
+                """
+            )
+        )
+        connection.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{INDEX_TABLE}_kind "
+                f"ON {INDEX_TABLE} (kind, created)"
+            )
+        )
+        try:
+            # The extension needs privileges the app role may lack; without
+            # it searches still work, just by scanning.
+            with connection.begin_nested():
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for column in ("name", "body"):
+                    connection.execute(
+                        text(
+                            f"CREATE INDEX IF NOT EXISTS ix_{INDEX_TABLE}_{column}_trgm "
+                            f"ON {INDEX_TABLE} USING GIN (lower({column}) gin_trgm_ops)"
+                        )
+                    )
+        except SQLAlchemyError:
+            pass
+
+    def _match_clause(self, query: str, params: dict[str, Any]) -> str:
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params["like"] = f"%{escaped}%"
+        return "(lower(name) LIKE :like OR lower(body) LIKE :like)"
+
+
+# ============================================================================
+# BACKEND SELECTION AND LIFECYCLE
+# ============================================================================
+
+
+@lru_cache(maxsize=1)
+def _sqlite_supports_trigram() -> bool:
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        return False
+    try:
+        connection = sqlite3.connect(":memory:")
+        try:
+            connection.execute(
+                "CREATE VIRTUAL TABLE probe USING fts5(body, tokenize='trigram')"
+            )
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+_lock = threading.Lock()
+_memory_indexes: "weakref.WeakKeyDictionary[Any, MemoryIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+_synced: "weakref.WeakKeyDictionary[Any, tuple[int, ...]]" = weakref.WeakKeyDictionary()
+# Engines whose index table is known to exist. Row events are only written
+# through once it does, so models used against a partial schema still flush.
+_ready: "weakref.WeakKeyDictionary[Any, bool]" = weakref.WeakKeyDictionary()
+# Kinds touched by bulk ORM updates/deletes, which bypass the row events.
+_stale_kinds: set[str] = set()
+
+
+def _engine_of(bind: Any) -> Any:
+    return getattr(bind, "engine", bind)
+
+
+def backend_for(bind: Any) -> Any:
+    """Return the index backend for an engine or connection."""
+    engine = _engine_of(bind)
+    dialect = engine.dialect.name
+    forced = os.environ.get("SEARCH_INDEX_BACKEND", "").strip().lower()
+    if forced != "memory":
+        if dialect == "sqlite" and _sqlite_supports_trigram():
+            return SQLiteFTSIndex()
+        if dialect == "postgresql":
+            return PostgresIndex()
+    with _lock:
+        index = _memory_indexes.get(engine)
+        if index is None:
+            index = _memory_indexes[engine] = MemoryIndex()
+        return index
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_index(_target: Any, connection: Any, **_kwargs: Any) -> None:
+    backend_for(connection).create(connection)
+    with _lock:
+        _ready[_engine_of(connection)] = True
+
+
+@event.listens_for(db.metadata, "before_drop")
+def _drop_index(_target: Any, connection: Any, **_kwargs: Any) -> None:
+    backend_for(connection).drop(connection)
+    with _lock:
+        _synced.pop(_engine_of(connection), None)
+        _ready.pop(_engine_of(connection), None)
+
+
+def _is_ready(connection: Any) -> bool:
+    with _lock:
+        return _ready.get(_engine_of(connection), False)
+
+
+def _after_write(_mapper: Any, connection: Any, target: Any) -> None:
+    if not _is_ready(connection):
+        return
+    document = document_for(target)
+    if document is not None:
+        backend_for(connection).upsert(connection, [document])
+
+
+def _after_update(mapper: Any, connection: Any, target: Any) -> None:
+    state = inspect(target)
+    watched = ("path", "stored_data") if isinstance(target, CID) else (
+        "name", "definition",
+    )
+    if any(state.attrs[attr].history.has_changes() for attr in watched):
+        _after_write(mapper, connection, target)
+
+
+def _after_delete(_mapper: Any, connection: Any, target: Any) -> None:
+    kind = _kind_for(target)
+    if not _is_ready(connection):
+        return
+    if kind is not None and getattr(target, "id", None) is not None:
+        backend_for(connection).delete(connection, [_rowid(kind, target.id)])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_statement(orm_execute_state: Any) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    for kind, model in _MODELS.items():
+        if mapper is not None and mapper.class_ is model:
+            with _lock:
+                _stale_kinds.add(kind)
+
+
+for _model in _MODELS.values():
+    event.listen(_model, "after_insert", _after_write)
+    event.listen(_model, "after_update", _after_update)
+    event.listen(_model, "after_delete", _after_delete)
+
+
+def ensure_index(session: Optional[Session] = None) -> Any:
+    """Create the index if needed and rebuild kinds that are out of step.
+
+    Cheap when nothing changed: the table versions are compared first and
+    row counts are only checked after a write. An index this process did not
+    create (so writes may have bypassed it) is rebuilt in full once.
+    """
+    session = session or db.session
+    engine = _engine_of(session.get_bind())
+    stamp = get_table_versions(*_SOURCE_TABLES)
+    backend = backend_for(engine)
+    with _lock:
+        if _synced.get(engine) == stamp:
+            return backend
+        trusted = _ready.get(engine, False)
+        stale = set(_stale_kinds)
+        _stale_kinds.difference_update(stale)
+
+    connection = session.connection()
+    backend.create(connection)
+    indexed = backend.counts(connection) if trusted else {}
+    rebuilt = False
+    for kind, model in _MODELS.items():
+        actual = session.query(func.count(model.id)).scalar() or 0
+        if trusted and kind not in stale and indexed.get(kind, 0) == actual:
+            continue
+        backend.clear_kind(connection, kind)
+        batch: list[Document] = []
+        for document in _source_documents(session, kind):
+            batch.append(document)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                backend.upsert(connection, batch)
+                batch = []
+        backend.upsert(connection, batch)
+        rebuilt = True
+    if rebuilt:
+        session.commit()
+
+    with _lock:
+        _synced[engine] = stamp
+        _ready[engine] = True
+    return backend
+
+
+def search(
+    kind: str,
+    query: str,
+    *,
+    limit: int = 100,
+    offset: int = 0,
+    context: int = DEFAULT_SNIPPET_CONTEXT,
+    session: Optional[Session] = None,
+) -> SearchPage:
+    """Return ranked matches of ``query`` (case-insensitive) within ``kind``."""
+    query = fold_case(query or "")
+    if not query or kind not in _MODELS or limit <= 0:
+        return SearchPage(hits=[], total=0)
+    session = session or db.session
+    backend = ensure_index(session)
+    return backend.search(
+        session.connection(),
+        kind,
+        query,
+        limit=limit,
+        offset=max(offset, 0),
+        context=context,
+    )
+
+
+__all__ = [
+    "Document",
+    "INDEX_TABLE",
+    "KINDS",
+    "MemoryIndex",
+    "PostgresIndex",
+    "SQLiteFTSIndex",
+    "SearchHit",
+    "SearchPage",
+    "backend_for",
+    "document_for",
+    "ensure_index",
+    "fold_case",
+    "search",
+]
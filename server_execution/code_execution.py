@@ -8,7 +8,6 @@ import re
 import textwrap
 import shutil
 import subprocess
-import tempfile
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import db_access
@@ -37,6 +36,7 @@ from db_access import (
 )
 
 # pylint: disable=no-name-in-module  # False positive: submodules exist but pylint doesn't recognize them
+from server_execution.context_snapshot import get_user_context_snapshot
 from server_execution.error_handling import _handle_execution_exception
 from server_execution.function_analysis import (
     FunctionDetails,
@@ -44,11 +44,21 @@ from server_execution.function_analysis import (
     _analyze_server_definition_for_function,
 )
 from server_execution.language_detection import detect_server_language
+from server_execution.module_instances import get_persistent_function
+from server_execution.script_workers import (
+    BABASHKA,
+    DENO,
+    SCRIPT_TIMEOUT_SECONDS,
+    WorkerRuntime,
+    cached_script_path,
+    run_in_worker,
+)
 from server_execution.invocation_tracking import request_details
 from server_execution.external_call_tracking import (
     capture_external_calls,
     sanitize_external_calls,
 )
+from server_execution import result_memo
 from server_execution.request_parsing import (
     _build_missing_parameter_response,
     _build_multi_parameter_error_page,
@@ -60,7 +70,7 @@ from server_execution.response_handling import (
     _log_server_output,
 )
 from server_execution.variable_resolution import (
-    _resolve_variable_values,
+    LazyVariables,
     _should_skip_variable_prefetch,
 )
 
@@ -440,7 +450,9 @@ def _execute_python_code_to_value(
             return prepared
 
         try:
-            result = run_text_function(code_to_run, args_to_use)
+            result = _run_prepared_code(
+                code, code_to_run, args_to_use, "main", server_name
+            )
         except Exception as exc:  # pylint: disable=broad-exception-caught
             # Catch all exceptions from user code execution
             return _handle_execution_exception(
@@ -1265,6 +1277,55 @@ def _prepare_invocation(
     return combined_code, new_args
 
 
+def _run_prepared_code(
+    definition: str,
+    code_to_run: str,
+    args_to_use: Dict[str, Any],
+    function_name: Optional[str],
+    server_name: Optional[str],
+) -> Any:
+    """Run prepared server code, calling into a persistent module when possible.
+
+    Only invocations that resolved parameters for ``function_name`` qualify;
+    everything else (and definitions that read request arguments as free
+    names) keeps the per-request wrapped execution. The same invocations are
+    memoized when the definition is marked ``@cacheable``.
+    """
+    if not (function_name and AUTO_MAIN_PARAMS_NAME in args_to_use):
+        return run_text_function(code_to_run, args_to_use)
+
+    params = args_to_use[AUTO_MAIN_PARAMS_NAME]
+    slot = result_memo.memo_slot(
+        definition, server_name or "", function_name, params
+    )
+    if slot is not None:
+        cached = result_memo.lookup(slot)
+        if cached is not None:
+            return cached
+
+    function = get_persistent_function(definition, function_name, server_name)
+    if function is not None:
+        result = function(**params)
+    else:
+        result = run_text_function(code_to_run, args_to_use)
+
+    if slot is not None:
+        _memoize_python_result(slot, result)
+    return result
+
+
+def _memoize_python_result(slot: result_memo.MemoSlot, result: Any) -> None:
+    """Store a successful plain result; redirects, errors and generators are skipped."""
+    if isinstance(result, dict):
+        status = result.get("status")
+        if result.get("redirect") or status not in (None, 200, "200"):
+            return
+    output, content_type = _normalize_execution_result(result)
+    if not isinstance(output, (str, bytes, dict, list, tuple)):
+        return
+    result_memo.store(slot, _encode_output(output), content_type)
+
+
 def model_as_dict(model_objects: Optional[Iterable[Any]]) -> Dict[str, Any]:
     """Convert SQLAlchemy model objects to a name->definition mapping."""
     if not model_objects:
@@ -1282,13 +1343,14 @@ def model_as_dict(model_objects: Optional[Iterable[Any]]) -> Dict[str, Any]:
 
 
 def _load_user_context() -> Dict[str, Dict[str, Any]]:
-    variables = model_as_dict(get_variables())
-    if _should_skip_variable_prefetch():
-        variables = dict(variables)
-    else:
-        variables = _resolve_variable_values(variables)
-    secrets = model_as_dict(get_secrets())
-    servers = model_as_dict(get_servers())
+    snapshot = get_user_context_snapshot(
+        (get_variables, get_secrets, get_servers), model_as_dict
+    )
+    variables: Dict[str, Any] = dict(snapshot.variables)
+    if not _should_skip_variable_prefetch():
+        variables = LazyVariables(variables)
+    secrets = dict(snapshot.secrets)
+    servers = dict(snapshot.servers)
     return {"variables": variables, "secrets": secrets, "servers": servers}
 
 
@@ -1334,6 +1396,7 @@ def _build_bash_stdin_payload(chained_input: Optional[str]) -> bytes:
     return json.dumps(payload, ensure_ascii=False).encode("utf-8")
 
 
+@result_memo.memoize_script_runner("bash")
 def _run_bash_script(
     code: str,
     server_name: str,
@@ -1355,9 +1418,7 @@ def _run_bash_script(
     code = _expand_bash_templates(code, server_name)
     stdin_payload = _build_bash_stdin_payload(chained_input)
 
-    with tempfile.NamedTemporaryFile("w", delete=False, suffix=".sh") as script_file:
-        script_file.write(code)
-        script_path = script_file.name
+    script_path = cached_script_path(code, ".sh")
 
     # Build the command with optional script arguments
     cmd = ["bash", script_path]
@@ -1370,15 +1431,10 @@ def _run_bash_script(
             input=stdin_payload,
             capture_output=True,
             check=False,
-            timeout=30,
+            timeout=SCRIPT_TIMEOUT_SECONDS,
         )
     except subprocess.TimeoutExpired:
         return b"Script execution timed out", 504, b""
-    finally:
-        try:
-            os.remove(script_path)
-        except OSError:
-            pass
 
     status_code = _map_exit_code_to_status(result.returncode)
     return result.stdout or b"", status_code, result.stderr or b""
@@ -1424,6 +1480,29 @@ def _extract_stubbed_output(code: str, markers: tuple[str, ...]) -> Optional[byt
     return None
 
 
+def _run_in_warm_worker(
+    runtime: WorkerRuntime,
+    runner: list[str],
+    executable_name: str,
+    code: str,
+    stdin_payload: bytes,
+) -> Optional[tuple[bytes, int, bytes]]:
+    """Run ``code`` on a pooled interpreter when ``runner`` is that interpreter."""
+    if os.path.basename(runner[0]) != executable_name:
+        return None
+
+    try:
+        warm = run_in_worker(runtime, runner[0], code, stdin_payload)
+    except subprocess.TimeoutExpired:
+        return b"Script execution timed out", 504, b""
+    if warm is None:
+        return None
+
+    stdout, exit_code, stderr = warm
+    return stdout, _map_exit_code_to_status(exit_code), stderr
+
+
+@result_memo.memoize_script_runner("clojure")
 def _run_clojure_script(
     code: str, server_name: str, *, chained_input: Optional[str] = None
 ) -> tuple[bytes, int, bytes]:
@@ -1444,9 +1523,11 @@ def _run_clojure_script(
             b"clojure executable not found",
         )
 
-    with tempfile.NamedTemporaryFile("w", delete=False, suffix=".clj") as script_file:
-        script_file.write(code)
-        script_path = script_file.name
+    warm = _run_in_warm_worker(BABASHKA, runner, "bb", code, stdin_payload)
+    if warm is not None:
+        return warm
+
+    script_path = cached_script_path(code, ".clj")
 
     try:
         result = subprocess.run(
@@ -1454,7 +1535,7 @@ def _run_clojure_script(
             input=stdin_payload,
             capture_output=True,
             check=False,
-            timeout=30,
+            timeout=SCRIPT_TIMEOUT_SECONDS,
         )
     except subprocess.TimeoutExpired:
         return b"Script execution timed out", 504, b""
@@ -1464,16 +1545,12 @@ def _run_clojure_script(
             500,
             b"clojure executable not found",
         )
-    finally:
-        try:
-            os.remove(script_path)
-        except OSError:
-            pass
 
     status_code = _map_exit_code_to_status(result.returncode)
     return result.stdout or b"", status_code, result.stderr or b""
 
 
+@result_memo.memoize_script_runner("clojurescript")
 def _run_clojurescript_script(
     code: str, server_name: str, *, chained_input: Optional[str] = None
 ) -> tuple[bytes, int, bytes]:
@@ -1494,9 +1571,7 @@ def _run_clojurescript_script(
             b"clojurescript executable not found",
         )
 
-    with tempfile.NamedTemporaryFile("w", delete=False, suffix=".cljs") as script_file:
-        script_file.write(code)
-        script_path = script_file.name
+    script_path = cached_script_path(code, ".cljs")
 
     try:
         result = subprocess.run(
@@ -1504,7 +1579,7 @@ def _run_clojurescript_script(
             input=stdin_payload,
             capture_output=True,
             check=False,
-            timeout=30,
+            timeout=SCRIPT_TIMEOUT_SECONDS,
         )
     except subprocess.TimeoutExpired:
         return b"Script execution timed out", 504, b""
@@ -1514,16 +1589,12 @@ def _run_clojurescript_script(
             500,
             b"clojurescript executable not found",
         )
-    finally:
-        try:
-            os.remove(script_path)
-        except OSError:
-            pass
 
     status_code = _map_exit_code_to_status(result.returncode)
     return result.stdout or b"", status_code, result.stderr or b""
 
 
+@result_memo.memoize_script_runner("typescript")
 def _run_typescript_script(
     code: str, server_name: str, *, chained_input: Optional[str] = None
 ) -> tuple[bytes, int, bytes]:
@@ -1544,9 +1615,11 @@ def _run_typescript_script(
             b"deno executable not found",
         )
 
-    with tempfile.NamedTemporaryFile("w", delete=False, suffix=".ts") as script_file:
-        script_file.write(code)
-        script_path = script_file.name
+    warm = _run_in_warm_worker(DENO, runner, "deno", code, stdin_payload)
+    if warm is not None:
+        return warm
+
+    script_path = cached_script_path(code, ".ts")
 
     try:
         result = subprocess.run(
@@ -1554,7 +1627,7 @@ def _run_typescript_script(
             input=stdin_payload,
             capture_output=True,
             check=False,
-            timeout=30,
+            timeout=SCRIPT_TIMEOUT_SECONDS,
         )
     except subprocess.TimeoutExpired:
         return b"Script execution timed out", 504, b""
@@ -1564,11 +1637,6 @@ def _run_typescript_script(
             500,
             b"deno executable not found",
         )
-    finally:
-        try:
-            os.remove(script_path)
-        except OSError:
-            pass
 
     status_code = _map_exit_code_to_status(result.returncode)
     return result.stdout or b"", status_code, result.stderr or b""
@@ -1683,7 +1751,9 @@ def _execute_server_code_common(
     try:
         with capture_external_calls() as call_log:
             try:
-                result = run_text_function(code_to_run, args_to_use)
+                result = _run_prepared_code(
+                    code, code_to_run, args_to_use, function_name, server_name
+                )
             except Exception as exc:  # pylint: disable=broad-exception-caught
                 external_calls = sanitize_external_calls(call_log, secrets_context)
                 return _handle_execution_exception(
@@ -0,0 +1,142 @@
+"""Memoized snapshot of the variables, secrets and servers given to server code.
+
+Every server invocation (including each pipeline segment) used to load the
+variable, secret and server tables and convert them to dictionaries.  The
+snapshot below is built once per set of table versions (see
+:mod:`change_tracking`) and reused until one of those tables is written to.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from change_tracking import current_engine, get_table_versions
+
+CONTEXT_TABLES = ("variable", "secret", "server")
+
+Loader = Callable[[], Iterable[Any]]
+Converter = Callable[[Optional[Iterable[Any]]], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class UserContextSnapshot:
+    """Immutable name->definition mappings for one set of table versions."""
+
+    versions: Tuple[int, ...]
+    variables: Mapping[str, Any]
+    secrets: Mapping[str, Any]
+    servers: Mapping[str, Any]
+
+
+@dataclass
+class _SnapshotStats:
+    hits: int = 0
+    misses: int = 0
+    last_rebuild_ms: float = 0.0
+    total_rebuild_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        rebuilds = self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "last_rebuild_ms": round(self.last_rebuild_ms, 3),
+            "average_rebuild_ms": (
+                round(self.total_rebuild_ms / rebuilds, 3) if rebuilds else 0.0
+            ),
+        }
+
+
+@dataclass
+class _CacheEntry:
+    sources: Tuple[Loader, ...]
+    snapshot: UserContextSnapshot
+
+
+_lock = threading.Lock()
+_cache: "weakref.WeakKeyDictionary[Any, _CacheEntry]" = weakref.WeakKeyDictionary()
+_stats = _SnapshotStats()
+
+
+def _build_snapshot(
+    versions: Tuple[int, ...],
+    loaders: Tuple[Loader, Loader, Loader],
+    convert: Converter,
+) -> UserContextSnapshot:
+    variables_loader, secrets_loader, servers_loader = loaders
+    started = time.perf_counter()
+    snapshot = UserContextSnapshot(
+        versions=versions,
+        variables=MappingProxyType(convert(variables_loader())),
+        secrets=MappingProxyType(convert(secrets_loader())),
+        servers=MappingProxyType(convert(servers_loader())),
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        _stats.misses += 1
+        _stats.last_rebuild_ms = elapsed_ms
+        _stats.total_rebuild_ms += elapsed_ms
+    return snapshot
+
+
+def get_user_context_snapshot(
+    loaders: Tuple[Loader, Loader, Loader],
+    convert: Converter,
+) -> UserContextSnapshot:
+    """Return the context snapshot for the current database.
+
+    ``loaders`` return the variable, secret and server rows respectively and
+    ``convert`` turns each result into a name->definition dictionary.  The
+    snapshot is rebuilt when any of the three tables changes or when
+    different loaders are supplied.
+    """
+
+    versions = get_table_versions(*CONTEXT_TABLES)
+    engine = current_engine()
+    if engine is None:
+        return _build_snapshot(versions, loaders, convert)
+
+    with _lock:
+        entry = _cache.get(engine)
+        if (
+            entry is not None
+            and entry.snapshot.versions == versions
+            and entry.sources == loaders
+        ):
+            _stats.hits += 1
+            return entry.snapshot
+
+    snapshot = _build_snapshot(versions, loaders, convert)
+    with _lock:
+        _cache[engine] = _CacheEntry(sources=loaders, snapshot=snapshot)
+    return snapshot
+
+
+def get_context_snapshot_stats() -> Dict[str, Any]:
+    """Return hit/miss counters and rebuild latency for the snapshot cache."""
+
+    with _lock:
+        return _stats.as_dict()
+
+
+def reset_context_snapshot_cache() -> None:
+    """Drop cached snapshots and zero the statistics."""
+
+    global _stats  # pylint: disable=global-statement
+    with _lock:
+        _cache.clear()
+        _stats = _SnapshotStats()
+
+
+__all__ = [
+    "CONTEXT_TABLES",
+    "UserContextSnapshot",
+    "get_context_snapshot_stats",
+    "get_user_context_snapshot",
+    "reset_context_snapshot_cache",
+]
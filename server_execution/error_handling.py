@@ -115,6 +115,7 @@ def _render_execution_error_html(
             code_text,
             filename=f"{server_name or 'server'}.py",
             fallback_lexer="python",
+            cache=False,
         )
         if highlighted_inner is not None:
             highlighted_code = _wrap_highlighted_lines(highlighted_inner, mapped_lineno)
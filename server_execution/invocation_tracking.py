@@ -1,7 +1,8 @@
 """Server invocation record creation and tracking."""
 
 import json
-from typing import Optional, Union
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence, Union
 
 from flask import request
 from sqlalchemy.exc import SQLAlchemyError
@@ -13,6 +14,7 @@ from cid_utils import (
     get_current_secret_definitions_cid,
     get_current_server_definitions_cid,
     get_current_variable_definitions_cid,
+    get_definitions_snapshot_cids,
 )
 from db_access import (
     ServerInvocationInput,
@@ -21,7 +23,12 @@ from db_access import (
     get_cid_by_path,
     save_entity,
 )
-from models import ServerInvocation
+from database import db
+from models import CID, ServerInvocation
+from server_execution.provenance_writer import (
+    PendingInvocation,
+    get_provenance_writer,
+)
 
 
 def request_details():
@@ -69,13 +76,148 @@ def _normalize_cid_input(value: Union[str, ValidatedCID, None]) -> str:
     return value or ""
 
 
+def _json_cid(value: Any) -> tuple[str, bytes]:
+    """Return the CID and bytes of ``value`` serialized as indented JSON."""
+    payload = json.dumps(value, indent=2, sort_keys=True).encode("utf-8")
+    return format_cid(generate_cid(payload)), payload
+
+
+def record_invocation_batch(entries: Sequence[PendingInvocation]) -> None:
+    """Persist queued invocations and their metadata CIDs in one transaction."""
+    if not entries:
+        return
+
+    payloads: Dict[str, bytes] = {}
+    invocations: list[ServerInvocation] = []
+
+    for entry in entries:
+        if entry.result_payload is not None and entry.result_cid:
+            payloads[entry.result_cid] = entry.result_payload
+
+        req_cid: Optional[str] = None
+        try:
+            req_cid, req_bytes = _json_cid(entry.request_details)
+            payloads[req_cid] = req_bytes
+        except (TypeError, ValueError):
+            req_cid = None
+
+        calls_cid: Optional[str] = None
+        if entry.external_calls is not None:
+            try:
+                calls_cid, calls_bytes = _json_cid(entry.external_calls)
+                payloads[calls_cid] = calls_bytes
+            except (TypeError, ValueError):
+                calls_cid = None
+
+        inv_cid, inv_bytes = _json_cid(
+            {
+                "server_name": entry.server_name,
+                "result_cid": entry.result_cid,
+                "servers_cid": entry.servers_cid,
+                "variables_cid": entry.variables_cid,
+                "secrets_cid": entry.secrets_cid,
+                "request_details_cid": req_cid,
+                "external_calls_cid": calls_cid,
+                "invoked_at": entry.invoked_at.isoformat(),
+            }
+        )
+        payloads[inv_cid] = inv_bytes
+
+        invocations.append(
+            ServerInvocation(
+                server_name=entry.server_name,
+                result_cid=entry.result_cid,
+                servers_cid=entry.servers_cid,
+                variables_cid=entry.variables_cid,
+                secrets_cid=entry.secrets_cid,
+                request_details_cid=req_cid,
+                external_calls_cid=calls_cid,
+                invocation_cid=inv_cid,
+                invoked_at=entry.invoked_at,
+            )
+        )
+
+    paths = {f"/{cid_value}": cid_value for cid_value in payloads}
+    existing = {
+        path
+        for (path,) in db.session.query(CID.path).filter(CID.path.in_(list(paths)))
+    }
+    missing = [path for path in paths if path not in existing]
+
+    from readonly_config import ReadOnlyConfig  # pylint: disable=import-outside-toplevel
+
+    if missing and ReadOnlyConfig.is_read_only_mode():
+        from cid_memory_manager import CIDMemoryManager  # pylint: disable=import-outside-toplevel
+
+        CIDMemoryManager.ensure_memory_available(
+            sum(len(payloads[paths[path]]) for path in missing)
+        )
+
+    try:
+        db.session.add_all(
+            CID(
+                path=path,
+                file_data=payloads[paths[path]],
+                file_size=len(payloads[paths[path]]),
+            )
+            for path in missing
+        )
+        db.session.add_all(invocations)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+
+
+def _enqueue_invocation_record(
+    server_name: str,
+    result_cid: Union[str, ValidatedCID],
+    external_calls: Optional[list[dict[str, object]]],
+    result_payload: Optional[bytes] = None,
+) -> bool:
+    """Hand the invocation to the background writer when one is configured."""
+    writer = get_provenance_writer(record_invocation_batch)
+    if writer is None:
+        return False
+    snapshots = get_definitions_snapshot_cids()
+    entry = PendingInvocation(
+        server_name=server_name,
+        result_cid=_normalize_cid_input(result_cid),
+        request_details=request_details(),
+        external_calls=list(external_calls) if external_calls is not None else None,
+        invoked_at=datetime.now(timezone.utc),
+        result_payload=result_payload,
+        servers_cid=snapshots["servers"],
+        variables_cid=snapshots["variables"],
+        secrets_cid=snapshots["secrets"],
+    )
+    return writer.submit(entry)
+
+
 def create_server_invocation_record(
     server_name: str,
     result_cid: Union[str, ValidatedCID],
     *,
     external_calls: Optional[list[dict[str, object]]] = None,
+    result_payload: Optional[bytes] = None,
 ) -> Optional[ServerInvocation]:
-    """Create a ServerInvocation record and persist related metadata."""
+    """Create a ServerInvocation record and persist related metadata.
+
+    When the asynchronous provenance writer is enabled the record is queued
+    and written later, and ``None`` is returned. ``result_payload`` is the
+    result content when the caller has not stored ``result_cid`` itself; it is
+    written alongside the invocation.
+    """
+    if _enqueue_invocation_record(
+        server_name, result_cid, external_calls, result_payload
+    ):
+        return None
+
+    if result_payload is not None:
+        result_path = cid_path(_normalize_cid_input(result_cid))
+        if result_path and not get_cid_by_path(result_path):
+            create_cid_record(_normalize_cid_input(result_cid), result_payload)
+
     servers_cid = get_current_server_definitions_cid()
     variables_cid = get_current_variable_definitions_cid()
     secrets_cid = get_current_secret_definitions_cid()
@@ -0,0 +1,236 @@
+"""Long-lived module namespaces for self-contained Python server definitions.
+
+Normally a server definition is wrapped in a function and re-executed on every
+request, so module-level objects such as ``_DEFAULT_CLIENT = ExternalApiClient()``
+are rebuilt each time and never reuse a connection.  When a definition only
+depends on its own module-level names (plus builtins and the ``save``/``load``
+helpers), it is executed once into a namespace keyed by its definition CID and
+later requests only call the target function.  A server's instance is dropped
+as soon as it is invoked with a different definition.
+"""
+
+from __future__ import annotations
+
+import ast
+import builtins
+import os
+import symtable
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set
+
+from cid_core import generate_cid
+from text_function_runner import base_namespace
+
+DEFAULT_MODULE_INSTANCE_LIMIT = 64
+
+_MODULE_DUNDERS = {"__name__", "__doc__", "__file__", "__builtins__", "__spec__"}
+
+
+def _default_limit() -> int:
+    try:
+        return int(
+            os.environ.get("SERVER_MODULE_INSTANCES", DEFAULT_MODULE_INSTANCE_LIMIT)
+        )
+    except ValueError:
+        return DEFAULT_MODULE_INSTANCE_LIMIT
+
+
+@dataclass
+class _Instance:
+    """A loaded definition, or ``namespace=None`` when it cannot be shared."""
+
+    namespace: Optional[Dict[str, Any]]
+
+
+def _has_module_level_flow(tree: ast.Module) -> bool:
+    """Return True when ``return``/``yield``/``await`` appear outside functions."""
+
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, (ast.Return, ast.Yield, ast.YieldFrom, ast.Await)):
+            return True
+        pending.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _unresolved_globals(table: symtable.SymbolTable, defined: Set[str]) -> Set[str]:
+    unresolved: Set[str] = set()
+    for symbol in table.get_symbols():
+        name = symbol.get_name()
+        if not symbol.is_referenced() or name in defined:
+            continue
+        if table.get_type() == "module" or symbol.is_global():
+            unresolved.add(name)
+    for child in table.get_children():
+        unresolved |= _unresolved_globals(child, defined)
+    return unresolved
+
+
+def is_self_contained(definition: str) -> bool:
+    """Return True when ``definition`` can run once as an ordinary module.
+
+    Definitions that return at module level, or that read request arguments
+    (``request``, ``context``, variables, ...) as free names, rely on being
+    wrapped in a per-request function and are excluded.
+    """
+
+    try:
+        tree = ast.parse(definition)
+        table = symtable.symtable(definition, "<string>", "exec")
+    except (SyntaxError, ValueError):
+        return False
+
+    if _has_module_level_flow(tree):
+        return False
+
+    defined = set(dir(builtins)) | set(base_namespace()) | _MODULE_DUNDERS
+    defined.update(
+        symbol.get_name()
+        for symbol in table.get_symbols()
+        if symbol.is_assigned() or symbol.is_imported() or symbol.is_namespace()
+    )
+    return not _unresolved_globals(table, defined)
+
+
+class ModuleInstanceCache:
+    """LRU of executed server modules keyed by definition CID."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Instance]" = OrderedDict()
+        self._server_cids: Dict[str, str] = {}
+        self.max_entries = max(0, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_function(
+        self, definition: str, function_name: str, server_name: Optional[str] = None
+    ) -> Optional[Callable[..., Any]]:
+        """Return ``function_name`` from the shared module, or None to fall back.
+
+        Exceptions raised while executing the module body propagate to the
+        caller and nothing is cached, so the next request retries the load.
+        """
+
+        if self.max_entries == 0:
+            return None
+
+        definition_cid = generate_cid(definition.encode("utf-8"))
+        with self._lock:
+            if server_name:
+                self._forget_previous(server_name, definition_cid)
+            instance = self._entries.get(definition_cid)
+            if instance is not None:
+                self._entries.move_to_end(definition_cid)
+                self.hits += 1
+        if instance is None:
+            instance = self._load(definition_cid, definition, server_name)
+
+        if instance.namespace is None:
+            return None
+        function = instance.namespace.get(function_name)
+        return function if callable(function) else None
+
+    def _forget_previous(self, server_name: str, definition_cid: str) -> None:
+        previous = self._server_cids.get(server_name)
+        if previous == definition_cid:
+            return
+        self._server_cids[server_name] = definition_cid
+        if previous is not None and self._entries.pop(previous, None) is not None:
+            self.invalidations += 1
+
+    def _load(
+        self, definition_cid: str, definition: str, server_name: Optional[str]
+    ) -> _Instance:
+        with self._load_lock:
+            with self._lock:
+                instance = self._entries.get(definition_cid)
+                if instance is not None:
+                    self.hits += 1
+                    return instance
+                self.misses += 1
+
+            instance = _Instance(namespace=None)
+            if is_self_contained(definition):
+                namespace = base_namespace()
+                namespace["__name__"] = f"viewer_server_{server_name or 'anonymous'}"
+                # The leading newline keeps line numbers aligned with the wrapped
+                # form so error pages highlight the same source line.
+                code = compile("\n" + definition, "<string>", "exec")
+                # pylint: disable=exec-used
+                # Same trust model as run_text_function: server code is authored
+                # by authenticated users and runs in the app context by design.
+                exec(code, namespace)
+                instance = _Instance(namespace=namespace)
+
+            with self._lock:
+                if instance.namespace is not None:
+                    self.loads += 1
+                self._entries[definition_cid] = instance
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return instance
+
+    def resize(self, max_entries: int) -> None:
+        with self._lock:
+            self.max_entries = max(0, max_entries)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._server_cids.clear()
+            self.hits = self.misses = self.loads = 0
+            self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "shared": sum(
+                    1 for entry in self._entries.values() if entry.namespace is not None
+                ),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_module_instances = ModuleInstanceCache(_default_limit())
+
+
+def get_persistent_function(
+    definition: str, function_name: str, server_name: Optional[str] = None
+) -> Optional[Callable[..., Any]]:
+    """Return a long-lived ``function_name`` for ``definition`` if it can be shared."""
+    return _module_instances.get_function(definition, function_name, server_name)
+
+
+def configure_module_instances(max_entries: int) -> None:
+    """Set how many server modules stay loaded (0 disables persistent mode)."""
+    _module_instances.resize(max_entries)
+
+
+def get_module_instance_stats() -> Dict[str, int]:
+    """Return entry, hit/miss, load and invalidation counters."""
+    return _module_instances.stats()
+
+
+def clear_module_instances() -> None:
+    """Drop every loaded server module and reset the counters."""
+    _module_instances.clear()
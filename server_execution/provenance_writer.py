@@ -0,0 +1,280 @@
+"""Background writer for ServerInvocation provenance records.
+
+In the default ``sync`` mode every server invocation records its provenance
+inside the request.  Setting ``PROVENANCE_WRITER_MODE`` to ``async`` queues
+the invocation metadata instead; a worker thread drains the queue in batches
+and writes the CID payloads and ``ServerInvocation`` rows for each batch in a
+single transaction.
+
+The queue is bounded.  When it is full the caller records the invocation
+synchronously, so provenance is never dropped and the backpressure shows up
+in the ``sync_fallbacks`` counter reported by :func:`get_provenance_writer_stats`.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from flask import Flask, current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+MODE_SYNC = "sync"
+MODE_ASYNC = "async"
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 0.25
+
+
+@dataclass(frozen=True)
+class PendingInvocation:
+    """Request-independent data needed to record one invocation later."""
+
+    server_name: str
+    result_cid: str
+    request_details: Dict[str, Any]
+    external_calls: Optional[List[Dict[str, Any]]]
+    invoked_at: datetime
+    # Result bytes not yet stored under ``result_cid`` (inline results only).
+    result_payload: Optional[bytes] = None
+    # Definitions snapshots current when the server ran, not when the batch
+    # is written.
+    servers_cid: Optional[str] = None
+    variables_cid: Optional[str] = None
+    secrets_cid: Optional[str] = None
+
+
+BatchRecorder = Callable[[Sequence[PendingInvocation]], None]
+
+
+@dataclass
+class _WriterStats:
+    submitted: int = 0
+    written: int = 0
+    failed: int = 0
+    batches: int = 0
+    sync_fallbacks: int = 0
+    max_queue_depth: int = 0
+    last_batch_size: int = 0
+    last_flush_ms: float = 0.0
+
+
+class ProvenanceWriter:
+    """Bounded queue plus worker thread that records invocations in batches."""
+
+    def __init__(
+        self,
+        app: Flask,
+        recorder: BatchRecorder,
+        *,
+        max_queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.app = app
+        self._recorder = recorder
+        self._queue: "queue.Queue[PendingInvocation]" = queue.Queue(
+            maxsize=max(1, max_queue_size)
+        )
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._stats = _WriterStats()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="provenance-writer", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def capacity(self) -> int:
+        return self._queue.maxsize
+
+    def submit(self, entry: PendingInvocation) -> bool:
+        """Queue ``entry``; return False when the caller must write it itself."""
+        if self._stopping.is_set():
+            return False
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats.sync_fallbacks += 1
+            return False
+        with self._stats_lock:
+            self._stats.submitted += 1
+            self._stats.max_queue_depth = max(
+                self._stats.max_queue_depth, self._queue.qsize()
+            )
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued invocation is written.
+
+        Returns False if ``timeout`` seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        condition = self._queue.all_tasks_done
+        with condition:
+            while self._queue.unfinished_tasks:
+                if deadline is None:
+                    condition.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> bool:
+        """Flush outstanding work and stop the worker thread."""
+        flushed = self.flush(timeout)
+        self._stopping.set()
+        self._thread.join(timeout)
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = self._stats
+            return {
+                "mode": MODE_ASYNC,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.capacity,
+                "max_queue_depth": stats.max_queue_depth,
+                "submitted": stats.submitted,
+                "written": stats.written,
+                "failed": stats.failed,
+                "batches": stats.batches,
+                "sync_fallbacks": stats.sync_fallbacks,
+                "last_batch_size": stats.last_batch_size,
+                "last_flush_ms": round(stats.last_flush_ms, 3),
+            }
+
+    def _next_batch(self) -> List[PendingInvocation]:
+        try:
+            first = self._queue.get(timeout=self._flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            failed = False
+            try:
+                with self.app.app_context():
+                    self._recorder(batch)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # Provenance is best-effort, exactly like the synchronous path;
+                # a failed batch must not kill the worker thread.
+                logger.exception("Failed to record %d server invocation(s)", len(batch))
+                failed = True
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._stats_lock:
+                    self._stats.batches += 1
+                    self._stats.last_batch_size = len(batch)
+                    self._stats.last_flush_ms = elapsed_ms
+                    if failed:
+                        self._stats.failed += len(batch)
+                    else:
+                        self._stats.written += len(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_writer_lock = threading.Lock()
+_writer: Optional[ProvenanceWriter] = None
+
+
+def provenance_mode(app: Optional[Flask] = None) -> str:
+    """Return the configured provenance writer mode for ``app``."""
+    if app is None:
+        if not has_app_context():
+            return MODE_SYNC
+        app = current_app._get_current_object()  # pylint: disable=protected-access
+    mode = str(app.config.get("PROVENANCE_WRITER_MODE") or MODE_SYNC).lower()
+    return MODE_ASYNC if mode == MODE_ASYNC else MODE_SYNC
+
+
+def get_provenance_writer(recorder: BatchRecorder) -> Optional[ProvenanceWriter]:
+    """Return the writer for the current app, or ``None`` in sync mode."""
+    global _writer  # pylint: disable=global-statement
+
+    if provenance_mode() != MODE_ASYNC:
+        return None
+
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+    with _writer_lock:
+        if _writer is not None and _writer.app is app:
+            return _writer
+        previous = _writer
+        _writer = ProvenanceWriter(
+            app,
+            recorder,
+            max_queue_size=int(
+                app.config.get("PROVENANCE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+            ),
+            batch_size=int(app.config.get("PROVENANCE_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+            flush_interval=float(
+                app.config.get("PROVENANCE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)
+            ),
+        )
+    if previous is not None:
+        previous.shutdown()
+    return _writer
+
+
+def flush_provenance_writer(timeout: Optional[float] = 5.0) -> bool:
+    """Block until queued invocations are written (no-op in sync mode)."""
+    writer = _writer
+    if writer is None:
+        return True
+    return writer.flush(timeout)
+
+
+def shutdown_provenance_writer(timeout: Optional[float] = 5.0) -> bool:
+    """Flush and stop the background writer; safe to call at process exit."""
+    global _writer  # pylint: disable=global-statement
+
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is None:
+        return True
+    return writer.shutdown(timeout)
+
+
+def get_provenance_writer_stats() -> Dict[str, Any]:
+    """Return queue depth, throughput and backpressure counters."""
+    writer = _writer
+    if writer is None:
+        return {"mode": provenance_mode()}
+    return writer.stats()
+
+
+__all__ = [
+    "MODE_ASYNC",
+    "MODE_SYNC",
+    "PendingInvocation",
+    "ProvenanceWriter",
+    "flush_provenance_writer",
+    "get_provenance_writer",
+    "get_provenance_writer_stats",
+    "provenance_mode",
+    "shutdown_provenance_writer",
+]
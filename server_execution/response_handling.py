@@ -4,12 +4,17 @@ import json
 import traceback
 from typing import Any, Dict, List, Optional
 
-from flask import Response, redirect
+from flask import Response, redirect, request
 
 from cid_presenter import cid_path, format_cid
 from cid_utils import generate_cid, get_extension_from_mime_type
 from db_access import create_cid_record, get_cid_by_path
 
+# Set in the WSGI environ of an in-process request (e.g. a gateway calling its
+# target) to receive the server's output directly instead of a CID redirect.
+INLINE_RESULT_ENVIRON_KEY = "viewer.inline_result"
+RESULT_CID_HEADER = "X-Result-CID"
+
 
 def _encode_output(output: Any) -> bytes:
     if isinstance(output, bytes):
@@ -89,6 +94,35 @@ def _log_server_output(
         traceback.print_exc()
 
 
+def wants_inline_result() -> bool:
+    """Return True when the current request asked for results without redirects."""
+    try:
+        return bool(request.environ.get(INLINE_RESULT_ENVIRON_KEY))
+    except RuntimeError:
+        return False
+
+
+def _inline_result_response(
+    output_bytes: bytes,
+    content_type: str,
+    server_name: str,
+    cid_value: str,
+    external_calls: Optional[List[Dict[str, Any]]],
+) -> Response:
+    """Return the output itself; the result CID is stored with its provenance."""
+    from server_execution.invocation_tracking import create_server_invocation_record  # pylint: disable=no-name-in-module
+
+    create_server_invocation_record(
+        server_name,
+        cid_value,
+        external_calls=external_calls,
+        result_payload=output_bytes,
+    )
+    response = Response(output_bytes, status=200, content_type=content_type)
+    response.headers[RESULT_CID_HEADER] = cid_value
+    return response
+
+
 def _handle_successful_execution(
     output: Any,
     content_type: str,
@@ -99,6 +133,11 @@ def _handle_successful_execution(
     output_bytes = _encode_output(output)
     cid_value = format_cid(generate_cid(output_bytes))
 
+    if wants_inline_result():
+        return _inline_result_response(
+            output_bytes, content_type, server_name, cid_value, external_calls
+        )
+
     cid_record_path = cid_path(cid_value)
     existing = get_cid_by_path(cid_record_path) if cid_record_path else None
     if not existing and cid_record_path:
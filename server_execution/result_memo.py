@@ -0,0 +1,216 @@
+"""Content-addressed memoization of results from pure servers.
+
+A server opts in with a comment line anywhere in its definition::
+
+    # @cacheable
+    # @cacheable ttl=3600
+
+(``//`` and ``;;`` comments work too.) Its result is then stored under a key
+derived from the definition CID, the entry point and the resolved inputs
+(function parameters for Python, chained input and arguments for scripts),
+and later calls with the same key reuse the stored result CID instead of
+executing. Pipeline segments reach the same runners, so a repeated
+``/markdown/uppercase/<cid>`` becomes lookups only.
+
+Limits come from the environment: ``SERVER_RESULT_CACHE_MAX_ENTRIES`` bounds
+the memo table (oldest entries are pruned) and ``SERVER_RESULT_CACHE_MAX_BYTES``
+skips results that are too large to be worth storing twice.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import has_app_context
+
+from cid_core import generate_cid
+from cid_memo import CIDMemo, MemoLimits
+from cid_presenter import format_cid
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_RESULT_BYTES = 1024 * 1024
+
+_CACHEABLE_PATTERN = re.compile(
+    r"^[ \t]*(?:#|//|;+)[ \t]*@cacheable\b(?:[ \t]+ttl=(?P<ttl>\d+))?",
+    re.MULTILINE,
+)
+
+ScriptResult = Tuple[bytes, int, bytes]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How a cacheable definition's results may be reused."""
+
+    definition_cid: str
+    ttl_seconds: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class MemoSlot:
+    """Where the result of one call to a cacheable server is memoized."""
+
+    server_name: str
+    key: str
+    policy: CachePolicy
+
+
+def _prune(max_entries: int) -> None:
+    from db_access import prune_server_result_memos  # pylint: disable=import-outside-toplevel
+
+    prune_server_result_memos(max_entries)
+
+
+_memo = CIDMemo(
+    "server result memo",
+    "servers",
+    MemoLimits(
+        max_bytes_env="SERVER_RESULT_CACHE_MAX_BYTES",
+        default_max_bytes=DEFAULT_MAX_RESULT_BYTES,
+        max_entries_env="SERVER_RESULT_CACHE_MAX_ENTRIES",
+        default_max_entries=DEFAULT_MAX_ENTRIES,
+    ),
+    _prune,
+)
+
+
+@functools.lru_cache(maxsize=256)
+def cache_policy(definition: str) -> Optional[CachePolicy]:
+    """Return the cache policy declared by ``definition``, if any."""
+    if not definition or "@cacheable" not in definition:
+        return None
+    match = _CACHEABLE_PATTERN.search(definition)
+    if match is None:
+        return None
+    ttl = match.group("ttl")
+    return CachePolicy(
+        definition_cid=format_cid(generate_cid(definition.encode("utf-8"))),
+        ttl_seconds=int(ttl) if ttl else None,
+    )
+
+
+def _encode_input(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"cid": generate_cid(bytes(value))}
+    raise TypeError(f"{type(value).__name__} inputs are not memoizable")
+
+
+def memo_slot(
+    definition: str, server_name: str, entry_point: str, inputs: Any
+) -> Optional[MemoSlot]:
+    """Return the memo slot for this call, or None when it cannot be memoized.
+
+    Calls are only memoized for cacheable definitions, inside an app context,
+    and when ``inputs`` can be serialised deterministically.
+    """
+    policy = cache_policy(definition)
+    if policy is None or not has_app_context():
+        return None
+    try:
+        payload = json.dumps(
+            [policy.definition_cid, entry_point, inputs],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=_encode_input,
+        )
+    except (TypeError, ValueError):
+        return None
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return MemoSlot(server_name=server_name, key=key, policy=policy)
+
+
+def lookup(slot: MemoSlot) -> Optional[Tuple[bytes, str]]:
+    """Return the memoized ``(output, content_type)`` for ``slot``, if stored."""
+    # pylint: disable=import-outside-toplevel
+    from db_access import delete_server_result_memos, get_server_result_memo
+
+    found = _memo.lookup(
+        slot.server_name,
+        lambda: get_server_result_memo(slot.key),
+        lambda: delete_server_result_memos(slot.key),
+    )
+    if found is None:
+        return None
+    memo, output = found
+    return output, memo.content_type
+
+
+def store(slot: MemoSlot, output: bytes, content_type: str) -> None:
+    """Memoize ``output`` for ``slot`` (skipped when it is over the size limit)."""
+
+    def record(result_cid: str) -> None:
+        from db_access import record_server_result_memo  # pylint: disable=import-outside-toplevel
+
+        record_server_result_memo(
+            slot.key,
+            slot.server_name,
+            slot.policy.definition_cid,
+            result_cid,
+            content_type,
+            ttl_seconds=slot.policy.ttl_seconds,
+        )
+
+    _memo.store(slot.server_name, output, record)
+
+
+def memoize_script_runner(
+    entry_point: str,
+) -> Callable[[Callable[..., ScriptResult]], Callable[..., ScriptResult]]:
+    """Memoize successful runs of a ``(stdout, status, stderr)`` script runner."""
+
+    def decorator(run: Callable[..., ScriptResult]) -> Callable[..., ScriptResult]:
+        @functools.wraps(run)
+        def wrapper(
+            code: str,
+            server_name: str,
+            *,
+            chained_input: Optional[str] = None,
+            **kwargs: Any,
+        ) -> ScriptResult:
+            slot = memo_slot(
+                code, server_name, entry_point, {"input": chained_input, **kwargs}
+            )
+            if slot is not None:
+                cached = lookup(slot)
+                if cached is not None:
+                    return cached[0], 200, b""
+
+            stdout, status_code, stderr = run(
+                code, server_name, chained_input=chained_input, **kwargs
+            )
+            if slot is not None and status_code == 200:
+                store(slot, bytes(stdout or b""), "text/plain")
+            return stdout, status_code, stderr
+
+        return wrapper
+
+    return decorator
+
+
+def get_result_memo_stats() -> Dict[str, Any]:
+    """Return overall and per-server hit statistics."""
+    return _memo.stats()
+
+
+def reset_result_memo_stats() -> None:
+    """Zero the statistics and forget parsed cache policies."""
+    _memo.reset()
+    cache_policy.cache_clear()
+
+
+__all__ = [
+    "CachePolicy",
+    "MemoSlot",
+    "cache_policy",
+    "get_result_memo_stats",
+    "lookup",
+    "memo_slot",
+    "memoize_script_runner",
+    "reset_result_memo_stats",
+    "store",
+]
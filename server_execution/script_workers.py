@@ -0,0 +1,614 @@
+"""Cached script files and warm interpreter workers for non-Python servers.
+
+Bash, Clojure, ClojureScript and TypeScript servers are run from files named
+after the script's CID, so each distinct script is written to disk once
+instead of on every request.
+
+Babashka (``bb``) and Deno start slowly enough that interpreter startup
+dominates short scripts.  For those runtimes a small pool of long-lived
+workers runs a bootstrap loop that reads one JSON request per line
+(``{"script": path, "stdin": base64}``), evaluates the script with its output
+captured and answers with ``{"stdout": base64, "stderr": base64, "exit": n}``.
+Deno workers run without permissions, like a cold ``deno run``: they receive
+the script source instead of its path, hand the script the request's stdin,
+and prefix each reply with a per-worker token so that output escaping the
+capture is skipped instead of read as a reply.
+Workers are replaced after ``SCRIPT_WORKER_MAX_RUNS`` scripts or when a script
+times out; a worker that dies mid-request is discarded and the script is
+reported as a failed run rather than repeated.  Scripts that exit the process
+or talk to the raw process streams cannot share a worker and keep the
+one-process-per-request path, as do all requests that arrive while every
+worker is busy.
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import json
+import logging
+import os
+import secrets
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from cid_core import generate_cid
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_TIMEOUT_SECONDS = 30
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_RUNS = 100
+
+ScriptResult = Tuple[bytes, int, bytes]
+
+_BABASHKA_BOOTSTRAP = """\
+(require '[cheshire.core :as json] '[clojure.java.io :as io])
+(import '[java.util Base64] '[java.io ByteArrayInputStream ByteArrayOutputStream OutputStreamWriter])
+
+(defn- run-script [script stdin]
+  (let [out (ByteArrayOutputStream.)
+        err (ByteArrayOutputStream.)
+        out-writer (OutputStreamWriter. out "UTF-8")
+        err-writer (OutputStreamWriter. err "UTF-8")
+        script-ns (create-ns (gensym "viewer-script-"))
+        exit (binding [*in* (io/reader (ByteArrayInputStream. (.decode (Base64/getDecoder) ^String stdin)))
+                       *out* out-writer
+                       *err* err-writer
+                       *ns* script-ns]
+               (try
+                 (clojure.core/refer-clojure)
+                 (load-file script)
+                 0
+                 (catch Throwable e
+                   (binding [*out* err-writer] (println (str e)))
+                   1)
+                 (finally
+                   (.flush out-writer)
+                   (.flush err-writer))))]
+    (remove-ns (ns-name script-ns))
+    {"stdout" (.encodeToString (Base64/getEncoder) (.toByteArray out))
+     "stderr" (.encodeToString (Base64/getEncoder) (.toByteArray err))
+     "exit" exit}))
+
+(loop []
+  (when-let [line (read-line)]
+    (let [{:strs [script stdin]} (json/parse-string line)]
+      (println (json/generate-string (run-script script stdin)))
+      (flush)
+      (recur))))
+"""
+
+_DENO_BOOTSTRAP = """\
+const encoder = new TextEncoder();
+const decoder = new TextDecoder();
+const token = Deno.args[0];
+const requests = Deno.stdin.readable;
+const processStdin = Deno.stdin;
+const processStdout = Deno.stdout;
+
+function toBase64(bytes: Uint8Array): string {
+  let binary = "";
+  for (let i = 0; i < bytes.length; i += 0x8000) {
+    binary += String.fromCharCode(...bytes.subarray(i, i + 0x8000));
+  }
+  return btoa(binary);
+}
+
+function fromBase64(text: string): Uint8Array {
+  const binary = atob(text);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+}
+
+function format(values: unknown[]): string {
+  return values
+    .map((value) => (typeof value === "string" ? value : Deno.inspect(value)))
+    .join(" ") + "\\n";
+}
+
+// Console output belongs to the running script and is dropped between runs,
+// so timers that fire later never write to the reply stream.
+let capture: { out: string[]; err: string[] } | null = null;
+const toOut = (...values: unknown[]) => { capture?.out.push(format(values)); };
+const toErr = (...values: unknown[]) => { capture?.err.push(format(values)); };
+console.log = console.info = console.debug = toOut;
+console.dir = console.dirxml = console.table = toOut;
+console.error = console.warn = console.trace = toErr;
+globalThis.addEventListener("error", (event) => {
+  event.preventDefault();
+  toErr(event.error);
+});
+globalThis.addEventListener("unhandledrejection", (event) => {
+  event.preventDefault();
+  toErr(event.reason);
+});
+
+class PayloadStdin {
+  #data: Uint8Array;
+  #offset = 0;
+
+  constructor(data: Uint8Array) {
+    this.#data = data;
+  }
+
+  #take(limit: number): Uint8Array | null {
+    if (this.#offset >= this.#data.length) return null;
+    const chunk = this.#data.subarray(this.#offset, this.#offset + limit);
+    this.#offset += chunk.length;
+    return chunk;
+  }
+
+  get readable(): ReadableStream<Uint8Array> {
+    const chunk = this.#take(Infinity);
+    return new ReadableStream({
+      start(controller) {
+        if (chunk) controller.enqueue(chunk);
+        controller.close();
+      },
+    });
+  }
+
+  readSync(buffer: Uint8Array): number | null {
+    const chunk = this.#take(buffer.length);
+    if (chunk === null) return null;
+    buffer.set(chunk);
+    return chunk.length;
+  }
+
+  read(buffer: Uint8Array): Promise<number | null> {
+    return Promise.resolve(this.readSync(buffer));
+  }
+
+  isTerminal(): boolean {
+    return false;
+  }
+
+  setRaw(): void {}
+
+  close(): void {}
+}
+
+function setStdin(value: unknown): boolean {
+  try {
+    Object.defineProperty(Deno, "stdin", { value, configurable: true, writable: true });
+    return Deno.stdin === value;
+  } catch {
+    return false;
+  }
+}
+
+let runs = 0;
+
+async function runScript(source: string, stdin: string) {
+  if (!setStdin(new PayloadStdin(fromBase64(stdin))) && source.includes("Deno.stdin")) {
+    return { cold: true };
+  }
+  const run = { out: [] as string[], err: [] as string[] };
+  capture = run;
+  let exit = 0;
+  try {
+    runs += 1;
+    // data: imports need no read permission; the comment makes each run a new module.
+    const encoded = toBase64(encoder.encode(`${source}\\n// run ${runs}\\n`));
+    await import(`data:application/typescript;base64,${encoded}`);
+  } catch (error) {
+    run.err.push(`${(error as Error)?.stack ?? error}\\n`);
+    exit = 1;
+  } finally {
+    capture = null;
+    setStdin(processStdin);
+  }
+  return {
+    stdout: toBase64(encoder.encode(run.out.join(""))),
+    stderr: toBase64(encoder.encode(run.err.join(""))),
+    exit,
+  };
+}
+
+async function reply(message: unknown) {
+  const bytes = encoder.encode(`${token} ${JSON.stringify(message)}\\n`);
+  let written = 0;
+  while (written < bytes.length) {
+    written += await processStdout.write(bytes.subarray(written));
+  }
+}
+
+let buffer = "";
+for await (const chunk of requests) {
+  buffer += decoder.decode(chunk, { stream: true });
+  let newline = buffer.indexOf("\\n");
+  while (newline >= 0) {
+    const line = buffer.slice(0, newline);
+    buffer = buffer.slice(newline + 1);
+    if (line.trim()) {
+      const request = JSON.parse(line);
+      await reply(await runScript(request.script, request.stdin));
+    }
+    newline = buffer.indexOf("\\n");
+  }
+}
+"""
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+_cache_dir_lock = threading.Lock()
+_private_cache_dir: Optional[str] = None
+
+
+def script_cache_dir() -> str:
+    """Return the directory holding CID-named script files.
+
+    Defaults to a private (0700) directory created for this process, so other
+    local users cannot plant files under the names scripts will be run from.
+    """
+    global _private_cache_dir  # pylint: disable=global-statement
+
+    configured = os.environ.get("VIEWER_SCRIPT_CACHE_DIR")
+    if configured:
+        return configured
+    with _cache_dir_lock:
+        if _private_cache_dir is None or not os.path.isdir(_private_cache_dir):
+            _private_cache_dir = tempfile.mkdtemp(prefix="viewer-scripts-")
+            atexit.register(shutil.rmtree, _private_cache_dir, True)
+        return _private_cache_dir
+
+
+def _has_content(path: str, expected: bytes) -> bool:
+    try:
+        with open(path, "rb") as existing:
+            return existing.read(len(expected) + 1) == expected
+    except OSError:
+        return False
+
+
+def cached_script_path(code: str, suffix: str) -> str:
+    """Return a file containing ``code``, writing it only if it is not cached.
+
+    A file already at the CID-named path is used only when its contents still
+    match ``code``; anything else is replaced.
+    """
+
+    directory = script_cache_dir()
+    encoded = code.encode("utf-8")
+    path = os.path.join(directory, generate_cid(encoded) + suffix)
+    if _has_content(path, encoded):
+        return path
+
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "wb", delete=False, dir=directory, suffix=suffix
+    ) as script_file:
+        script_file.write(encoded)
+        temp_path = script_file.name
+    os.replace(temp_path, path)
+    return path
+
+
+@dataclass(frozen=True)
+class WorkerRuntime:
+    """How to start a warm worker and which scripts it must not run.
+
+    A ``sandboxed`` runtime gets no file access: scripts are sent as source
+    rather than as a cached file path, and its replies start with a token
+    passed as the last command argument so stray output can be skipped.
+    """
+
+    name: str
+    bootstrap: str
+    suffix: str
+    incompatible_markers: Tuple[str, ...]
+    arguments: Tuple[str, ...] = ()
+    sandboxed: bool = False
+
+    def command(self, executable: str, bootstrap_path: str, token: str) -> List[str]:
+        command = [executable, *self.arguments, bootstrap_path]
+        if self.sandboxed:
+            command.append(token)
+        return command
+
+    def accepts(self, code: str) -> bool:
+        return not any(marker in code for marker in self.incompatible_markers)
+
+
+BABASHKA = WorkerRuntime(
+    name="bb",
+    bootstrap=_BABASHKA_BOOTSTRAP,
+    suffix=".clj",
+    incompatible_markers=("System/exit", "*command-line-args*"),
+)
+
+DENO = WorkerRuntime(
+    name="deno",
+    bootstrap=_DENO_BOOTSTRAP,
+    suffix=".ts",
+    incompatible_markers=(
+        "Deno.exit",
+        "Deno.stdout",
+        "Deno.stderr",
+        "Deno.args",
+        # Imports need permissions the worker does not have.
+        "import ",
+        "import(",
+        # These read the worker's own stdin.
+        "prompt(",
+        "confirm(",
+        "alert(",
+    ),
+    # Same permissions as ``deno run --quiet script.ts``: none.
+    arguments=("run", "--quiet"),
+    sandboxed=True,
+)
+
+
+class _WorkerError(Exception):
+    """The worker died or answered with something other than a reply line."""
+
+
+class _Worker:
+    def __init__(self, command: List[str], reply_prefix: bytes = b"") -> None:
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        self.runs = 0
+        self._reply_prefix = reply_prefix
+        self._buffer = b""
+
+    def run(
+        self, script: str, stdin_payload: bytes, timeout: float
+    ) -> Optional[ScriptResult]:
+        """Send ``script`` to the worker and return its result.
+
+        Returns None when the worker declined the script before running it.
+        """
+        request_line = json.dumps(
+            {
+                "script": script,
+                "stdin": base64.b64encode(stdin_payload).decode("ascii"),
+            }
+        )
+        try:
+            self.process.stdin.write(request_line.encode("utf-8") + b"\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise _WorkerError("worker is not accepting requests") from exc
+
+        reply = json.loads(self._read_reply(timeout))
+        if reply.get("cold"):
+            return None
+        self.runs += 1
+        return (
+            base64.b64decode(reply.get("stdout", "")),
+            int(reply.get("exit", 1)),
+            base64.b64decode(reply.get("stderr", "")),
+        )
+
+    def _read_reply(self, timeout: float) -> bytes:
+        """Return the next reply line, skipping lines without the prefix."""
+        stream = self.process.stdout
+        deadline = time.monotonic() + timeout
+        while True:
+            while b"\n" not in self._buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(self.process.args, timeout)
+                ready, _, _ = select.select([stream], [], [], remaining)
+                if not ready:
+                    continue
+                chunk = os.read(stream.fileno(), 65536)
+                if not chunk:
+                    raise _WorkerError("worker exited")
+                self._buffer += chunk
+            line, self._buffer = self._buffer.split(b"\n", 1)
+            if line.startswith(self._reply_prefix):
+                return line[len(self._reply_prefix) :]
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self) -> None:
+        if self.alive():
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class WorkerPool:
+    """Bounded set of warm workers for one runtime executable."""
+
+    def __init__(
+        self, runtime: WorkerRuntime, executable: str, size: int, max_runs: int
+    ) -> None:
+        self.runtime = runtime
+        self.executable = executable
+        self.size = max(0, size)
+        self.max_runs = max(1, max_runs)
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._count = 0
+        self.runs = 0
+        self.started = 0
+        self.recycled = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.busy_fallbacks = 0
+
+    def run(
+        self, script: str, stdin_payload: bytes, timeout: float = SCRIPT_TIMEOUT_SECONDS
+    ) -> Optional[ScriptResult]:
+        """Run a script on a warm worker, or return None to run it cold.
+
+        ``script`` is the cached script path, or the source for a sandboxed
+        runtime.  None is only returned when no worker could be acquired or
+        the worker declined the script without running it.  Once a script
+        has been sent to a worker it may already have had side effects, so a
+        worker that dies or answers with garbage yields an error result rather
+        than a second, cold run.  Raises :class:`subprocess.TimeoutExpired`
+        after killing a worker that did not answer within ``timeout`` seconds.
+        """
+
+        worker = self._acquire()
+        if worker is None:
+            return None
+
+        try:
+            result = worker.run(script, stdin_payload, timeout)
+        except subprocess.TimeoutExpired:
+            self._discard(worker, timed_out=True)
+            raise
+        except (_WorkerError, ValueError) as exc:
+            logger.warning("%s worker failed: %s", self.runtime.name, exc)
+            self._discard(worker)
+            return b"", 1, f"Script worker failed: {exc}\n".encode("utf-8")
+
+        with self._lock:
+            if result is None:
+                self._idle.append(worker)
+                return None
+            self.runs += 1
+            if worker.runs < self.max_runs and worker.alive():
+                self._idle.append(worker)
+                return result
+            self.recycled += 1
+            self._count -= 1
+        worker.close()
+        return result
+
+    def _acquire(self) -> Optional[_Worker]:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive():
+                    return worker
+                self._count -= 1
+            if self._count >= self.size:
+                self.busy_fallbacks += 1
+                return None
+            self._count += 1
+
+        try:
+            bootstrap_path = cached_script_path(
+                self.runtime.bootstrap, self.runtime.suffix
+            )
+            token = secrets.token_hex(16)
+            worker = _Worker(
+                self.runtime.command(self.executable, bootstrap_path, token),
+                f"{token} ".encode("ascii") if self.runtime.sandboxed else b"",
+            )
+        except OSError as exc:
+            logger.warning("Could not start %s worker: %s", self.runtime.name, exc)
+            with self._lock:
+                self._count -= 1
+                self.failures += 1
+            return None
+
+        with self._lock:
+            self.started += 1
+        return worker
+
+    def _discard(self, worker: _Worker, *, timed_out: bool = False) -> None:
+        worker.close()
+        with self._lock:
+            self._count -= 1
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.failures += 1
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for worker in idle:
+            worker.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self._count,
+                "idle": len(self._idle),
+                "size": self.size,
+                "max_runs": self.max_runs,
+                "runs": self.runs,
+                "started": self.started,
+                "recycled": self.recycled,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "busy_fallbacks": self.busy_fallbacks,
+            }
+
+
+_pools_lock = threading.Lock()
+_pools: Dict[Tuple[str, str], WorkerPool] = {}
+
+
+def run_in_worker(
+    runtime: WorkerRuntime, executable: str, code: str, stdin_payload: bytes
+) -> Optional[ScriptResult]:
+    """Run ``code`` on a warm ``runtime`` worker when the pool allows it.
+
+    Returns ``(stdout, exit_code, stderr)``, or None when the caller should
+    start a dedicated process instead.  Timeouts raise
+    :class:`subprocess.TimeoutExpired` like :func:`subprocess.run`.
+    """
+
+    size = _int_env("SCRIPT_WORKER_POOL_SIZE", DEFAULT_POOL_SIZE)
+    if size <= 0 or not runtime.accepts(code):
+        return None
+
+    key = (runtime.name, executable)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = WorkerPool(
+                runtime,
+                executable,
+                size,
+                _int_env("SCRIPT_WORKER_MAX_RUNS", DEFAULT_MAX_RUNS),
+            )
+            _pools[key] = pool
+
+    script = code if runtime.sandboxed else cached_script_path(code, runtime.suffix)
+    return pool.run(script, stdin_payload)
+
+
+def get_script_worker_stats() -> Dict[str, Dict[str, int]]:
+    """Return per-runtime pool counters."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.runtime.name: pool.stats() for pool in pools}
+
+
+def shutdown_script_workers() -> None:
+    """Stop every idle worker and forget the pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
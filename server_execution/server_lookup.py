@@ -38,9 +38,13 @@ def is_potential_versioned_server_path(
 
 def try_server_execution_with_partial(
     path: str,
-    history_fetcher: Callable[[str], Iterable[Dict[str, Any]]],
+    history_fetcher: Callable[..., Iterable[Dict[str, Any]]],
 ) -> Optional[Any]:
-    """Execute a server version referenced by a partial CID."""
+    """Execute a server version referenced by a partial CID.
+
+    ``history_fetcher(server_name, definition_prefix=partial)`` should return
+    the matching versions; results are still filtered here by prefix.
+    """
     parts = [segment for segment in path.split("/") if segment]
     if len(parts) not in {2, 3}:
         return None
@@ -53,7 +57,7 @@ def try_server_execution_with_partial(
     if not server:
         return None
 
-    history = history_fetcher(server_name)
+    history = history_fetcher(server_name, definition_prefix=partial)
     matches = [
         h
         for h in history
@@ -1,13 +1,40 @@
-"""Variable resolution and prefetching for server execution."""
-
-from typing import Any, Dict, Optional
+"""Variable resolution and prefetching for server execution.
+
+Variables whose value is a ``/path`` are replaced by the content served at
+that path. :class:`LazyVariables` does this on first access, so a server
+only pays for the variables it reads. Fetched values are shared by every
+invocation within a request, and values of CID paths (which never change)
+are also kept across requests.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
 from urllib.parse import urljoin, urlsplit
 
-from flask import current_app, has_app_context, has_request_context, request, session
+from flask import (
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+    session,
+)
+
+from cid_core import is_normalized_cid, split_cid_path
+from db_config import DatabaseConfig
 
 VARIABLE_PREFETCH_SESSION_KEY = "__viewer_variable_prefetch__"
 _MAX_VARIABLE_REDIRECTS = 5
 _REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+_REQUEST_CACHE_ATTR = "_viewer_variable_values"
+CID_VALUE_CACHE_SIZE = 256
+DEFAULT_PREFETCH_WORKERS = 4
+
+_cid_values: "OrderedDict[str, str]" = OrderedDict()
+_cid_values_lock = threading.Lock()
 
 
 def _normalize_variable_path(value: Any) -> Optional[str]:
@@ -122,7 +149,11 @@ def _fetch_variable_content(path: str) -> Optional[str]:
 
 
 def _resolve_variable_values(variable_map: Dict[str, Any]) -> Dict[str, Any]:
-    """Resolve variable values, prefetching paths that look like server references."""
+    """Resolve every variable value now, prefetching paths that look like server references.
+
+    Server code receives :class:`LazyVariables` instead, which only fetches
+    the variables that are read.
+    """
     if not variable_map:
         return {}
 
@@ -141,3 +172,234 @@ def _resolve_variable_values(variable_map: Dict[str, Any]) -> Dict[str, Any]:
         resolved[name] = value
 
     return resolved
+
+
+def _is_cid_path(path: str) -> bool:
+    """Return True for ``/<cid>`` or ``/<cid>.<ext>``, whose content never changes."""
+    if "?" in path or "#" in path:
+        return False
+    parts = split_cid_path(path)
+    return parts is not None and is_normalized_cid(parts[0])
+
+
+def _request_cache() -> Optional[Dict[str, Optional[str]]]:
+    if not has_app_context():
+        return None
+    cache = getattr(g, _REQUEST_CACHE_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(g, _REQUEST_CACHE_ATTR, cache)
+    return cache
+
+
+def _cached_variable_value(path: str) -> tuple[bool, Optional[str]]:
+    """Return ``(found, value)`` from the request or CID caches."""
+    cache = _request_cache()
+    if cache is not None and path in cache:
+        return True, cache[path]
+    if _is_cid_path(path):
+        with _cid_values_lock:
+            if path in _cid_values:
+                _cid_values.move_to_end(path)
+                return True, _cid_values[path]
+    return False, None
+
+
+def _remember_variable_value(path: str, value: Optional[str]) -> None:
+    cache = _request_cache()
+    if cache is not None:
+        cache[path] = value
+    if value is not None and _is_cid_path(path):
+        with _cid_values_lock:
+            _cid_values[path] = value
+            _cid_values.move_to_end(path)
+            while len(_cid_values) > CID_VALUE_CACHE_SIZE:
+                _cid_values.popitem(last=False)
+
+
+def fetch_variable_values(paths: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Fetch the content at each path, using the caches where possible.
+
+    Uncached paths are fetched concurrently (``VARIABLE_PREFETCH_WORKERS``
+    threads). In-memory databases share a single connection, so there the
+    fetches run one after another.
+    """
+    results: Dict[str, Optional[str]] = {}
+    missing = []
+    for path in dict.fromkeys(paths):
+        found, value = _cached_variable_value(path)
+        if found:
+            results[path] = value
+        else:
+            missing.append(path)
+
+    if has_request_context():
+        # Never fetch the request being served (that would recurse).
+        for path in [path for path in missing if path == request.path]:
+            missing.remove(path)
+            results[path] = None
+
+    try:
+        workers = int(
+            os.environ.get("VARIABLE_PREFETCH_WORKERS", DEFAULT_PREFETCH_WORKERS)
+        )
+    except ValueError:
+        workers = DEFAULT_PREFETCH_WORKERS
+    if len(missing) < 2 or workers < 2 or DatabaseConfig.is_memory_mode():
+        fetched = {path: _fetch_variable_content(path) for path in missing}
+    else:
+        app = current_app._get_current_object()  # pylint: disable=protected-access
+
+        def fetch(path: str) -> Optional[str]:
+            with app.app_context():
+                return _fetch_variable_content(path)
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            fetched = dict(zip(missing, pool.map(fetch, missing)))
+
+    for path, value in fetched.items():
+        _remember_variable_value(path, value)
+    results.update(fetched)
+    return results
+
+
+class LazyVariables(dict):
+    """Variable values that fetch ``/path`` values on first access.
+
+    Behaves like the dictionary of resolved values: indexing resolves one
+    variable, while bulk access (``keys()``, ``items()``, ``values()``,
+    comparisons, ``dict(v)``, ``{**v}``, ``v | other`` and other copies)
+    resolves everything still pending in one concurrent batch.
+    Values whose fetch fails keep their original ``/path`` text.
+    """
+
+    def __init__(
+        self,
+        variables: Mapping[str, Any],
+        fetch: Callable[[Iterable[str]], Dict[str, Optional[str]]] = fetch_variable_values,
+    ) -> None:
+        super().__init__(variables)
+        self._fetch = fetch
+        self._lock = threading.RLock()
+        self._pending: Dict[str, str] = {}
+        for name, value in variables.items():
+            path = _normalize_variable_path(value)
+            if path:
+                self._pending[name] = path
+
+    def _resolve(self, names: Iterable[Any]) -> None:
+        with self._lock:
+            wanted = {
+                name: self._pending.pop(name)
+                for name in names
+                if name in self._pending
+            }
+            if not wanted:
+                return
+            fetched = self._fetch(wanted.values())
+            for name, path in wanted.items():
+                value = fetched.get(path)
+                if value is not None:
+                    super().__setitem__(name, value)
+
+    def resolve_all(self) -> None:
+        """Fetch every variable that has not been resolved yet."""
+        if self._pending:
+            self._resolve(list(self._pending))
+
+    @property
+    def pending(self) -> frozenset:
+        """Names of variables that have not been fetched yet."""
+        return frozenset(self._pending)
+
+    def __getitem__(self, name: Any) -> Any:
+        if name in self._pending:
+            self._resolve((name,))
+        return super().__getitem__(name)
+
+    def get(self, name: Any, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def __setitem__(self, name: Any, value: Any) -> None:
+        self._pending.pop(name, None)
+        super().__setitem__(name, value)
+
+    def __delitem__(self, name: Any) -> None:
+        self._pending.pop(name, None)
+        super().__delitem__(name)
+
+    def pop(self, name: Any, *default: Any) -> Any:
+        if name in self._pending:
+            self._resolve((name,))
+        return super().pop(name, *default)
+
+    def setdefault(self, name: Any, default: Any = None) -> Any:
+        if name in self:
+            return self[name]
+        return super().setdefault(name, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        updates = dict(*args, **kwargs)
+        for name in updates:
+            self._pending.pop(name, None)
+        super().update(updates)
+
+    def popitem(self) -> Any:
+        self.resolve_all()
+        return super().popitem()
+
+    def items(self):  # type: ignore[override]
+        self.resolve_all()
+        return super().items()
+
+    def values(self):  # type: ignore[override]
+        self.resolve_all()
+        return super().values()
+
+    def keys(self):  # type: ignore[override]
+        self.resolve_all()
+        return super().keys()
+
+    def __iter__(self):  # pylint: disable=useless-parent-delegation
+        # Overriding __iter__ (with keys) stops CPython copying the raw
+        # storage in dict(v), {**v} and dict.update(v); they call keys()
+        # and __getitem__ instead, so copies hold resolved values.
+        return super().__iter__()
+
+    def copy(self) -> Dict[str, Any]:  # type: ignore[override]
+        self.resolve_all()
+        return dict(super().items())
+
+    def __or__(self, other: Any) -> Any:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        merged = self.copy()
+        merged.update(other)
+        return merged
+
+    def __ior__(self, other: Any) -> "LazyVariables":
+        self.update(other)
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        self.resolve_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        self.resolve_all()
+        return super().__repr__()
+
+    def __reduce__(self) -> Any:
+        # Copies and pickles become plain dictionaries of resolved values.
+        return (dict, (self.copy(),))
+
+
+def clear_variable_value_cache() -> None:
+    """Forget variable values cached for CID paths."""
+    with _cid_values_lock:
+        _cid_values.clear()
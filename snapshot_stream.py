@@ -0,0 +1,269 @@
+# snapshot_stream.py
+"""Streaming binary container used by database snapshots.
+
+A snapshot file is an 8-byte magic, one byte naming the compression, and then
+a (possibly compressed) stream of length-prefixed records::
+
+    kind (1 byte) | payload length (4 bytes, big-endian) | payload
+
+The first record is a JSON header and the last a JSON footer. In between,
+each table starts with a JSON table record followed by one row record per
+row. Row values are tagged and written back to back; blobs are stored as raw
+bytes, so nothing needs hex encoding and rows can be written and read one at
+a time.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import struct
+from datetime import datetime
+from typing import Any, BinaryIO, Iterator, Optional, Sequence
+
+MAGIC = b"VWSNAP\x00\x01"
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+RECORD_HEADER = b"H"
+RECORD_TABLE = b"T"
+RECORD_ROW = b"R"
+RECORD_FOOTER = b"F"
+
+_RECORD_PREFIX = struct.Struct(">cI")
+_LENGTH = struct.Struct(">I")
+_INT = struct.Struct(">q")
+_FLOAT = struct.Struct(">d")
+_MAX_LENGTH = 0xFFFFFFFF
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a snapshot stream is truncated or malformed."""
+
+
+def _require_zstd() -> Any:
+    try:
+        import zstandard  # type: ignore[import-not-found]  # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        raise ValueError(
+            "zstd snapshot compression requires the zstandard library. "
+            "Install it with: pip install zstandard"
+        ) from exc
+    return zstandard
+
+
+def _compressing_writer(fileobj: BinaryIO, compression: str) -> BinaryIO:
+    if compression == "none":
+        return fileobj
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6)
+    if compression == "zstd":
+        return _require_zstd().ZstdCompressor().stream_writer(fileobj, closefd=False)
+    raise ValueError(
+        f"Unknown snapshot compression {compression!r}; "
+        f"expected one of {', '.join(COMPRESSIONS)}"
+    )
+
+
+def _decompressing_reader(fileobj: BinaryIO, compression: str) -> BinaryIO:
+    if compression == "none":
+        return fileobj
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if compression == "zstd":
+        return _require_zstd().ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    raise SnapshotFormatError(f"Unknown snapshot compression {compression!r}")
+
+
+def _encode_value(value: Any, parts: list[Any]) -> int:
+    """Append the encoding of ``value`` to ``parts`` and return its length."""
+    if value is None:
+        parts.append(b"N")
+        return 1
+    if value is True or value is False:
+        parts.append(b"T" if value else b"F")
+        return 1
+    if isinstance(value, int):
+        parts.append(b"I" + _INT.pack(value))
+        return 1 + _INT.size
+    if isinstance(value, float):
+        parts.append(b"D" + _FLOAT.pack(value))
+        return 1 + _FLOAT.size
+    if isinstance(value, datetime):
+        encoded = value.isoformat().encode("ascii")
+        parts.append(b"t" + _LENGTH.pack(len(encoded)) + encoded)
+        return 1 + _LENGTH.size + len(encoded)
+    if isinstance(value, str):
+        encoded = value.encode("utf-8")
+        parts.append(b"S" + _LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+        return 1 + _LENGTH.size + len(encoded)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        view = memoryview(value)
+        parts.append(b"B" + _LENGTH.pack(view.nbytes))
+        parts.append(view)
+        return 1 + _LENGTH.size + view.nbytes
+    raise TypeError(f"Cannot store {type(value).__name__} values in a snapshot")
+
+
+def decode_row(payload: bytes) -> list[Any]:
+    """Decode the values of a row record."""
+    values: list[Any] = []
+    view = memoryview(payload)
+    position = 0
+    try:
+        while position < len(view):
+            tag = bytes(view[position : position + 1])
+            position += 1
+            if tag == b"N":
+                values.append(None)
+            elif tag in (b"T", b"F"):
+                values.append(tag == b"T")
+            elif tag == b"I":
+                values.append(_INT.unpack_from(view, position)[0])
+                position += _INT.size
+            elif tag == b"D":
+                values.append(_FLOAT.unpack_from(view, position)[0])
+                position += _FLOAT.size
+            elif tag in (b"S", b"B", b"t"):
+                (length,) = _LENGTH.unpack_from(view, position)
+                position += _LENGTH.size
+                chunk = view[position : position + length]
+                if len(chunk) != length:
+                    raise SnapshotFormatError("Row value runs past the end of its record")
+                position += length
+                if tag == b"B":
+                    values.append(bytes(chunk))
+                elif tag == b"S":
+                    values.append(str(chunk, "utf-8"))
+                else:
+                    values.append(datetime.fromisoformat(str(chunk, "ascii")))
+            else:
+                raise SnapshotFormatError(f"Unknown value tag {tag!r}")
+    except struct.error as exc:
+        raise SnapshotFormatError("Row value runs past the end of its record") from exc
+    return values
+
+
+class SnapshotWriter:
+    """Write snapshot records to a binary file object, one row at a time."""
+
+    def __init__(
+        self, fileobj: BinaryIO, header: dict[str, Any], compression: str = "none"
+    ) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown snapshot compression {compression!r}; "
+                f"expected one of {', '.join(COMPRESSIONS)}"
+            )
+        fileobj.write(MAGIC + bytes([COMPRESSIONS.index(compression)]))
+        self._raw = fileobj
+        self._stream = _compressing_writer(fileobj, compression)
+        self._closed = False
+        self._write_json(RECORD_HEADER, header)
+
+    def _write_record(self, kind: bytes, parts: Sequence[Any], length: int) -> None:
+        if length > _MAX_LENGTH:
+            raise ValueError(f"Snapshot record of {length} bytes is too large")
+        self._stream.write(_RECORD_PREFIX.pack(kind, length))
+        for part in parts:
+            self._stream.write(part)
+
+    def _write_json(self, kind: bytes, data: dict[str, Any]) -> None:
+        encoded = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self._write_record(kind, (encoded,), len(encoded))
+
+    def begin_table(self, name: str, columns: Sequence[str], **extra: Any) -> None:
+        """Start the section holding the rows of ``name``."""
+        self._write_json(RECORD_TABLE, {"name": name, "columns": list(columns), **extra})
+
+    def write_row(self, values: Sequence[Any]) -> None:
+        """Append one row; blobs are written without being copied."""
+        parts: list[Any] = []
+        length = sum(_encode_value(value, parts) for value in values)
+        self._write_record(RECORD_ROW, parts, length)
+
+    def close(self, footer: Optional[dict[str, Any]] = None) -> None:
+        """Write the footer and flush the compressor (the file stays open)."""
+        if self._closed:
+            return
+        self._write_json(RECORD_FOOTER, footer or {})
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        self._closed = True
+
+
+class SnapshotReader:
+    """Read snapshot records from a binary file object."""
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        prefix = fileobj.read(len(MAGIC) + 1)
+        if len(prefix) != len(MAGIC) + 1 or prefix[: len(MAGIC)] != MAGIC:
+            raise SnapshotFormatError("Not a database snapshot")
+        code = prefix[-1]
+        if code >= len(COMPRESSIONS):
+            raise SnapshotFormatError(f"Unknown snapshot compression code {code}")
+        self.compression = COMPRESSIONS[code]
+        self._stream = _decompressing_reader(fileobj, self.compression)
+        self._pending: Optional[tuple[bytes, bytes]] = None
+        self.footer: Optional[dict[str, Any]] = None
+
+        kind, payload = self._next_record()
+        if kind != RECORD_HEADER:
+            raise SnapshotFormatError("Snapshot does not start with a header")
+        self.header: dict[str, Any] = json.loads(payload)
+
+    def _read_exact(self, size: int) -> bytes:
+        chunks = []
+        remaining = size
+        while remaining:
+            chunk = self._stream.read(remaining)
+            if not chunk:
+                raise SnapshotFormatError("Snapshot is truncated")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def _next_record(self) -> tuple[bytes, bytes]:
+        if self._pending is not None:
+            record, self._pending = self._pending, None
+            return record
+        kind, length = _RECORD_PREFIX.unpack(self._read_exact(_RECORD_PREFIX.size))
+        return kind, self._read_exact(length)
+
+    def _rows(self) -> Iterator[list[Any]]:
+        while True:
+            kind, payload = self._next_record()
+            if kind != RECORD_ROW:
+                self._pending = (kind, payload)
+                return
+            yield decode_row(payload)
+
+    def tables(self) -> Iterator[tuple[dict[str, Any], Iterator[list[Any]]]]:
+        """Yield ``(table_info, rows)`` for each table section in order.
+
+        ``rows`` streams the table's rows; anything left unread is skipped
+        when the next table is requested. The footer is available as
+        :attr:`footer` once iteration finishes.
+        """
+        while True:
+            kind, payload = self._next_record()
+            if kind == RECORD_FOOTER:
+                self.footer = json.loads(payload)
+                return
+            if kind != RECORD_TABLE:
+                raise SnapshotFormatError(f"Unexpected {kind!r} record between tables")
+            rows = self._rows()
+            yield json.loads(payload), rows
+            for _ in rows:
+                pass
+
+
+__all__ = [
+    "COMPRESSIONS",
+    "MAGIC",
+    "SnapshotFormatError",
+    "SnapshotReader",
+    "SnapshotWriter",
+    "decode_row",
+]
@@ -0,0 +1,62 @@
+"""Wall-clock timing of startup phases.
+
+Code that runs during startup wraps its expensive steps in
+:func:`startup_phase`; ``main.py`` logs the collected timings once the app is
+ready so slow boots can be attributed to a phase.  Apps created after startup
+(tests, benchmarks) keep recording phases, so only the most recent
+``MAX_PHASES`` are kept.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_PHASES = 256
+
+_lock = threading.Lock()
+# (name, depth, seconds) in the order phases started; seconds is None while running.
+_phases: Deque[list] = deque(maxlen=MAX_PHASES)
+_depth = threading.local()
+
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as a named startup phase (phases may nest)."""
+    depth = getattr(_depth, "value", 0)
+    entry: list = [name, depth, None]
+    with _lock:
+        _phases.append(entry)
+    _depth.value = depth + 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry[2] = time.perf_counter() - started
+        _depth.value = depth
+
+
+def get_startup_phases() -> list[tuple[str, int, Optional[float]]]:
+    """Return ``(name, depth, seconds)`` for each recorded phase."""
+    with _lock:
+        return [tuple(entry) for entry in _phases]
+
+
+def reset_startup_phases() -> None:
+    """Forget recorded phases, e.g. before timing a new startup."""
+    with _lock:
+        _phases.clear()
+
+
+def report_startup_phases(logger: logging.Logger = LOGGER) -> None:
+    """Log one line per recorded phase, indented by nesting depth."""
+    for name, depth, seconds in get_startup_phases():
+        if seconds is None:
+            continue
+        logger.info("Startup %s%s: %.3fs", "  " * depth, name, seconds)
@@ -2,20 +2,30 @@
 
 from __future__ import annotations
 
+import json
 from typing import Optional
 
+import pygments
 from pygments import highlight
 from pygments.formatters import HtmlFormatter  # pylint: disable=no-name-in-module  # HtmlFormatter exists
 from pygments.lexers import get_lexer_by_name, get_lexer_for_filename
 from pygments.lexers.special import TextLexer
 from pygments.util import ClassNotFound
 
+from derived_artifacts import render_derived, source_cid_for
+
+# Shorter sources are cheaper to highlight than to look up.
+MIN_CACHED_SOURCE_CHARS = 512
+# Bump when the highlighted output changes (see derived_artifacts).
+HIGHLIGHT_RENDERER_VERSION = f"1/pygments-{pygments.__version__}"
+
 
 def highlight_source(
     content: str,
     *,
     filename: Optional[str] = None,
     fallback_lexer: Optional[str] = None,
+    cache: bool = True,
 ) -> tuple[Optional[str], Optional[str]]:
     """Return highlighted HTML and CSS for the provided source content.
 
@@ -25,6 +35,8 @@ def highlight_source(
         fallback_lexer: Optional lexer name to use when the filename
             cannot be resolved. When omitted, plain text rendering is
             used.
+        cache: Reuse and store the result as a derived artifact of the
+            content's CID. Disable it where the database may be unusable.
 
     Returns:
         A tuple of ``(highlighted_html, syntax_css)``. Either value can be
@@ -34,6 +46,31 @@ def highlight_source(
     if content is None:
         return None, None
 
+    if not cache or len(content) < MIN_CACHED_SOURCE_CHARS:
+        return _highlight(content, filename, fallback_lexer)
+
+    def render() -> Optional[bytes]:
+        highlighted, css = _highlight(content, filename, fallback_lexer)
+        if highlighted is None:
+            return None
+        return json.dumps({"html": highlighted, "css": css}).encode("utf-8")
+
+    payload = render_derived(
+        "syntax_highlight",
+        HIGHLIGHT_RENDERER_VERSION,
+        source_cid_for(content.encode("utf-8")),
+        render,
+        options={"filename": filename, "fallback_lexer": fallback_lexer},
+    )
+    if payload is None:
+        return None, None
+    stored = json.loads(payload)
+    return stored["html"], stored["css"]
+
+
+def _highlight(
+    content: str, filename: Optional[str], fallback_lexer: Optional[str]
+) -> tuple[Optional[str], Optional[str]]:
     lexer = None
 
     if filename:
@@ -0,0 +1,193 @@
+"""Tests for the prebuilt alias routing index."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from alias_definition import (
+    AliasRouteRule,
+    collect_alias_routes,
+    format_primary_alias_line,
+)
+from alias_matching import matches_path
+from alias_routing import find_matching_alias
+from alias_routing_index import AliasRoutingIndex, build_alias_routing_index
+from change_tracking import get_deletion_version, get_table_version
+from database import db
+from models import Alias, Variable
+
+
+def _alias(alias_id, name, match_type, pattern, target, *, ignore_case=False):
+    definition = format_primary_alias_line(
+        match_type, pattern, target, ignore_case=ignore_case, alias_name=name
+    )
+    return SimpleNamespace(id=alias_id, name=name, definition=definition, enabled=True)
+
+
+ALIASES = [
+    _alias(1, "api", "glob", "/api/*", "/api-glob"),
+    _alias(2, "api-v1", "literal", "/api/v1", "/v1"),
+    _alias(3, "article", "regex", r"/article/\d+", "/articles"),
+    _alias(4, "docs", "literal", "/Docs/", "/documentation", ignore_case=True),
+    _alias(5, "files", "glob", "/FILES/*.txt", "/text", ignore_case=True),
+    _alias(6, "profile", "flask", "/user/<int:id>", "/profile/<id>"),
+    _alias(7, "question", "glob", "/q?", "/question"),
+    _alias(8, "root-glob", "glob", "*", "/everything"),
+    _alias(9, "users", "flask", "/user/<name>", "/users/<name>"),
+]
+
+PATHS = [
+    "",
+    "/",
+    "/api",
+    "/api/v1",
+    "/api/v1/",
+    "/api/v2/items",
+    "/article/42",
+    "/article/abc",
+    "/docs",
+    "/DOCS/",
+    "/files/notes.TXT",
+    "/user/12",
+    "/user/bob",
+    "/user/",
+    "/qa",
+    "/qaa",
+    "relative/path",
+]
+
+
+def _linear_scan(aliases, path):
+    for alias in aliases:
+        for route in collect_alias_routes(alias, variables={}):
+            if matches_path(
+                route.match_type, route.match_pattern, path, route.ignore_case
+            ):
+                return alias.id, route
+    return None
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_index_matches_linear_scan(path):
+    index = build_alias_routing_index(ALIASES, {})
+
+    entry = index.match(path)
+    expected = _linear_scan(ALIASES, path)
+
+    if expected is None:
+        assert entry is None
+    else:
+        assert entry is not None
+        assert (entry.alias_id, entry.route) == expected
+
+
+def test_index_respects_declaration_order_over_literal_hits():
+    aliases = [
+        _alias(1, "catch-all", "glob", "/shop/*", "/catch-all"),
+        _alias(2, "exact", "literal", "/shop/cart", "/cart"),
+    ]
+
+    entry = build_alias_routing_index(aliases, {}).match("/shop/cart")
+
+    assert entry is not None
+    assert entry.alias_id == 1
+
+
+def test_index_skips_disabled_aliases():
+    disabled = _alias(1, "off", "literal", "/off", "/target")
+    disabled.enabled = False
+
+    index = build_alias_routing_index([disabled], {})
+
+    assert index.route_count == 0
+    assert index.match("/off") is None
+
+
+def test_index_skips_routes_that_can_never_match():
+    route = AliasRouteRule(
+        alias_path="bad",
+        match_type="regex",
+        match_pattern="(",
+        target_path="/target",
+        ignore_case=False,
+    )
+
+    index = AliasRoutingIndex([(1, route)])
+
+    assert index.route_count == 0
+    assert index.match("(") is None
+
+
+def test_find_matching_alias_rebuilds_after_alias_and_variable_changes(
+    memory_db_app,
+):
+    with memory_db_app.test_request_context("/"):
+        db.session.add(
+            Alias(
+                name="latest",
+                definition=format_primary_alias_line(
+                    "literal", None, "/{target}", alias_name="latest"
+                ),
+            )
+        )
+        db.session.add(Variable(name="target", definition="first"))
+        db.session.commit()
+
+        match = find_matching_alias("/latest")
+        assert match is not None
+        assert match.alias.name == "latest"
+        assert match.route.target_path == "/first"
+
+        variable = Variable.query.filter_by(name="target").one()
+        variable.definition = "second"
+        db.session.commit()
+
+        match = find_matching_alias("/latest")
+        assert match is not None
+        assert match.route.target_path == "/second"
+
+        alias = Alias.query.filter_by(name="latest").one()
+        db.session.delete(alias)
+        db.session.commit()
+
+        assert find_matching_alias("/latest") is None
+
+
+def test_table_version_changes_on_flush_and_rollback(memory_db_app):
+    with memory_db_app.app_context():
+        before = get_table_version("alias")
+
+        db.session.add(Alias(name="pending", definition="pending -> /target"))
+        db.session.flush()
+        after_flush = get_table_version("alias")
+        db.session.rollback()
+        after_rollback = get_table_version("alias")
+
+        assert before < after_flush < after_rollback
+        assert get_table_version("server") < after_flush
+
+
+def test_table_version_changes_again_on_commit(disk_db_app):
+    with disk_db_app.app_context():
+        db.session.add(Alias(name="pending", definition="pending -> /target"))
+        db.session.flush()
+
+        # Another connection reads between the flush and the commit: it still
+        # sees the old rows and caches them under the flushed version.
+        with db.engine.connect() as other:
+            seen = other.execute(db.select(db.func.count(Alias.id))).scalar()
+            cached_version = get_table_version("alias")
+        assert seen == 0
+
+        db.session.commit()
+        assert get_table_version("alias") > cached_version
+
+        deletion_version = get_deletion_version("alias")
+        db.session.delete(Alias.query.filter_by(name="pending").one())
+        db.session.flush()
+        flushed_deletion = get_deletion_version("alias")
+        db.session.commit()
+
+        assert deletion_version < flushed_deletion < get_deletion_version("alias")
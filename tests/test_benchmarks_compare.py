@@ -0,0 +1,115 @@
+"""Tests for the benchmark scenarios, results summary and baseline comparison."""
+
+from __future__ import annotations
+
+import json
+
+import benchmarks.__main__ as benchmarks_cli
+from benchmarks.__main__ import main
+from benchmarks.compare import compare_results, format_comparisons, has_regressions
+from benchmarks.datasets import build_dataset
+from benchmarks.runner import summarize
+from benchmarks.scenarios import SCENARIOS_BY_NAME
+
+
+def _results(**medians):
+    return {
+        "dataset": {"size": "10"},
+        "results": {
+            name: {"median_ms": value, "failures": 0}
+            for name, value in medians.items()
+        },
+    }
+
+
+def test_summarize_reports_order_statistics():
+    summary = summarize([4.0, 1.0, 3.0, 2.0])
+
+    assert summary["min_ms"] == 1.0
+    assert summary["median_ms"] == 2.5
+    assert summary["max_ms"] == 4.0
+    assert summary["p95_ms"] == 4.0
+    assert summarize([5.0])["stdev_ms"] == 0.0
+
+
+def test_compare_classifies_each_scenario():
+    baseline = _results(steady=10.0, slower=10.0, faster=10.0, noisy=1.0, gone=1.0)
+    current = _results(steady=11.0, slower=20.0, faster=5.0, noisy=1.4, added=1.0)
+
+    statuses = {
+        item.scenario: item.status for item in compare_results(baseline, current)
+    }
+
+    assert statuses == {
+        "added": "new",
+        "faster": "improvement",
+        "gone": "missing",
+        "noisy": "ok",
+        "slower": "regression",
+        "steady": "ok",
+    }
+
+
+def test_failing_scenarios_count_as_regressions():
+    baseline = _results(cid_serve=1.0)
+    current = _results(cid_serve=1.0)
+    current["results"]["cid_serve"]["failures"] = 3
+
+    comparisons = compare_results(baseline, current)
+
+    assert [item.status for item in comparisons] == ["failing"]
+    assert has_regressions(comparisons)
+
+
+def test_format_shows_relative_change():
+    comparisons = compare_results(_results(pipeline=10.0), _results(pipeline=15.0))
+
+    table = format_comparisons(comparisons)
+
+    assert "+50.0%" in table
+    assert "regression" in table
+
+
+def test_compare_command_exits_nonzero_on_regression(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    current = tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(export=10.0)), encoding="utf-8")
+    current.write_text(json.dumps(_results(export=10.5)), encoding="utf-8")
+
+    assert main(["compare", str(baseline), str(current)]) == 0
+
+    current.write_text(json.dumps(_results(export=30.0)), encoding="utf-8")
+    assert main(["compare", str(baseline), str(current)]) == 1
+    assert "regression" in capsys.readouterr().out
+
+
+def test_io_chain_scenario_runs_the_chain(memory_db_app):
+    dataset = build_dataset("10")
+    scenario = SCENARIOS_BY_NAME["io_chain"]
+
+    operation = scenario.prepare(memory_db_app, memory_db_app.test_client(), dataset)
+
+    assert operation() in scenario.ok_statuses
+
+
+def test_run_command_refuses_to_write_scenarios_that_only_fail(
+    tmp_path, monkeypatch, capsys
+):
+    document = _results(io_chain=1.0, export=1.0)
+    for result in document["results"].values():
+        result["iterations"] = 3
+    document["results"]["io_chain"]["failures"] = 3
+
+    def fake_run(*_args, **_kwargs):
+        return document
+
+    monkeypatch.setattr(benchmarks_cli, "run_benchmarks", fake_run)
+    output = tmp_path / "results.json"
+
+    assert main(["run", "--size", "10", "--output", str(output)]) == 1
+    assert not output.exists()
+    assert "io_chain" in capsys.readouterr().err
+
+    document["results"]["io_chain"]["failures"] = 1
+    assert main(["run", "--size", "10", "--output", str(output)]) == 1
+    assert output.exists()
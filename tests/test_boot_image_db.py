@@ -0,0 +1,68 @@
+# tests/test_boot_image_db.py
+"""Tests for prebuilt SQLite boot images."""
+
+import sqlite3
+
+from app import create_app
+from boot_image_db import boot_image_path, restore_boot_image, write_boot_image
+from database import db
+from db_config import DatabaseConfig, DatabaseMode
+from models import Variable
+
+BOOT_CID = "AAAAboottestcid"
+
+
+class TestBootImageDB:
+    """Round trips through write_boot_image and restore_boot_image."""
+
+    def setup_method(self):
+        """Run every test against a fresh in-memory database."""
+        DatabaseConfig.reset()
+        DatabaseConfig.set_mode(DatabaseMode.MEMORY)
+
+    def teardown_method(self):
+        """Reset config after each test."""
+        DatabaseConfig.reset()
+
+    def _write_image(self, tmp_path):
+        source_app = create_app({"TESTING": True})
+        with source_app.app_context():
+            db.session.add(Variable(name="greeting", definition="hello"))
+            db.session.commit()
+            return write_boot_image(BOOT_CID, boot_image_path(BOOT_CID, tmp_path))
+
+    def test_restore_replaces_in_memory_database(self, tmp_path):
+        self._write_image(tmp_path)
+
+        app = create_app({"TESTING": True})
+        with app.app_context():
+            assert Variable.query.count() == 0
+            assert restore_boot_image(BOOT_CID, tmp_path) is True
+            assert Variable.query.filter_by(name="greeting").one().definition == "hello"
+
+    def test_missing_image_is_ignored(self, tmp_path):
+        app = create_app({"TESTING": True})
+        with app.app_context():
+            assert restore_boot_image(BOOT_CID, tmp_path) is False
+
+    def test_image_for_other_boot_cid_is_ignored(self, tmp_path):
+        path = self._write_image(tmp_path)
+        path.rename(boot_image_path("AAAAothercid", tmp_path))
+
+        app = create_app({"TESTING": True})
+        with app.app_context():
+            assert restore_boot_image("AAAAothercid", tmp_path) is False
+            assert Variable.query.count() == 0
+
+    def test_image_with_stale_schema_is_ignored(self, tmp_path):
+        path = self._write_image(tmp_path)
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                "UPDATE boot_image_info SET value = 'old' WHERE key = 'schema'"
+            )
+        connection.close()
+
+        app = create_app({"TESTING": True})
+        with app.app_context():
+            assert restore_boot_image(BOOT_CID, tmp_path) is False
+            assert Variable.query.count() == 0
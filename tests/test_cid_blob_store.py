@@ -0,0 +1,134 @@
+"""Tests for the pluggable CID blob store and its migration tool."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Configure environment before importing app
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["SESSION_SECRET"] = "test-secret-key"
+os.environ["TESTING"] = "True"
+
+from app import create_app
+from cid_blob_store import (
+    DatabaseBlobStore,
+    DirectoryBlobStore,
+    configure_blob_store,
+    get_blob_store,
+)
+from cid_core import generate_cid
+from db_access import get_cid_by_path, get_streamable_cid_by_path
+from migrate_cid_blobs import migrate_cid_blobs
+from models import CID, db
+
+PAYLOAD = b"blob store payload " * 16
+PAYLOAD_CID = generate_cid(PAYLOAD)
+
+
+class TestDirectoryBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.store = DirectoryBlobStore(self.tmp)
+
+    def test_paths_are_sharded_after_the_length_prefix(self):
+        path = self.store.path_for(f"/{PAYLOAD_CID}")
+
+        self.assertEqual(path.name, PAYLOAD_CID)
+        self.assertEqual(path.parent.name, PAYLOAD_CID[8:10])
+        self.assertEqual(path.parent.parent, Path(self.tmp))
+
+    def test_read_returns_a_memory_mapped_view(self):
+        self.store.write(PAYLOAD_CID, PAYLOAD)
+
+        view = self.store.read(PAYLOAD_CID)
+
+        self.assertIsInstance(view, memoryview)
+        self.assertTrue(view.readonly)
+        self.assertEqual(view.tobytes(), PAYLOAD)
+        self.assertEqual(self.store.read("missing-cid"), None)
+        self.assertEqual(len(os.listdir(self.store.path_for(PAYLOAD_CID).parent)), 1)
+
+    def test_existing_blobs_are_not_rewritten(self):
+        self.store.write(PAYLOAD_CID, PAYLOAD)
+        target = self.store.path_for(PAYLOAD_CID)
+        mtime = target.stat().st_mtime_ns
+
+        self.store.write(PAYLOAD_CID, PAYLOAD)
+
+        self.assertEqual(target.stat().st_mtime_ns, mtime)
+        self.store.delete(PAYLOAD_CID)
+        self.assertFalse(self.store.exists(PAYLOAD_CID))
+
+
+class TestCIDModelWithBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.app = create_app(
+            {"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"}
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        configure_blob_store(None)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_payload(self):
+        db.session.add(
+            CID(path=f"/{PAYLOAD_CID}", file_data=PAYLOAD, file_size=len(PAYLOAD))
+        )
+        db.session.commit()
+        db.session.expunge_all()
+
+    def test_database_store_is_the_default(self):
+        configure_blob_store(None)
+        self.assertIsInstance(get_blob_store(), DatabaseBlobStore)
+
+        self._add_payload()
+
+        record = get_cid_by_path(f"/{PAYLOAD_CID}")
+        self.assertEqual(record.stored_data, PAYLOAD)
+        self.assertEqual(record.file_data, PAYLOAD)
+        self.assertEqual(record.data_view.tobytes(), PAYLOAD)
+
+    def test_directory_store_keeps_only_metadata_in_the_row(self):
+        store = DirectoryBlobStore(self.tmp)
+        configure_blob_store(store)
+
+        self._add_payload()
+
+        record = get_cid_by_path(f"/{PAYLOAD_CID}")
+        self.assertEqual(record.stored_data, b"")
+        self.assertEqual(record.file_size, len(PAYLOAD))
+        self.assertEqual(record.file_data, PAYLOAD)
+        self.assertEqual(record.data_view.tobytes(), PAYLOAD)
+        self.assertTrue(store.exists(PAYLOAD_CID))
+
+        streamed = get_streamable_cid_by_path(f"/{PAYLOAD_CID}")
+        self.assertEqual(b"".join(streamed.iter_data(start=5, end=40)), PAYLOAD[5:40])
+
+    def test_migration_moves_existing_payloads(self):
+        self._add_payload()
+        store = DirectoryBlobStore(self.tmp)
+
+        self.assertEqual(migrate_cid_blobs(self.tmp, dry_run=True), 1)
+        self.assertFalse(store.exists(PAYLOAD_CID))
+
+        self.assertEqual(migrate_cid_blobs(self.tmp, batch_size=1), 1)
+        self.assertEqual(store.read(PAYLOAD_CID).tobytes(), PAYLOAD)
+        self.assertEqual(db.session.get(CID, 1).stored_data, b"")
+        self.assertEqual(migrate_cid_blobs(self.tmp), 0)
+
+        configure_blob_store(store)
+        self.assertEqual(get_cid_by_path(f"/{PAYLOAD_CID}").file_data, PAYLOAD)
+
+
+if __name__ == "__main__":
+    unittest.main()
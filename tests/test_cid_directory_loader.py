@@ -1,10 +1,13 @@
 """Tests for CID directory loader functionality."""
 
 import json
+import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
+import cid_directory_loader
 from app import create_app, db
 from cid_directory_loader import load_cids_from_directory
 from cid_utils import generate_cid
@@ -28,8 +31,14 @@ class TestCidDirectoryLoader(unittest.TestCase):
 
         # Create a temporary directory for CID files
         self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
-        self.cid_dir = Path(self.temp_dir.name)
+        self.cid_dir = Path(self.temp_dir.name) / "cids"
+        self.cid_dir.mkdir()
         self.app.config["CID_DIRECTORY"] = str(self.cid_dir)
+        self.manifest_path = Path(self.temp_dir.name) / "manifest.json"
+        self._manifest_env = patch.dict(
+            os.environ, {"VIEWER_CID_MANIFEST": str(self.manifest_path)}
+        )
+        self._manifest_env.start()
 
         with self.app.app_context():
             db.create_all()
@@ -39,6 +48,7 @@ class TestCidDirectoryLoader(unittest.TestCase):
         with self.app.app_context():
             db.session.remove()
             db.drop_all()
+        self._manifest_env.stop()
         self.temp_dir.cleanup()
 
     def test_load_cids_from_empty_directory(self):
@@ -319,6 +329,129 @@ class TestCidDirectoryLoader(unittest.TestCase):
             error_message = str(context.exception)
             self.assertIn(str(self.cid_dir), error_message)
 
+    def _write_cids(self, count):
+        cid_values = []
+        for index in range(count):
+            content = f"stored CID fixture {index} ".encode() * 8
+            cid_value = generate_cid(content)
+            (self.cid_dir / cid_value).write_bytes(content)
+            cid_values.append(cid_value)
+        return cid_values
+
+    def test_unchanged_files_are_not_rehashed(self):
+        """Files recorded in the manifest should skip hashing on the next load."""
+        with self.app.app_context():
+            cid_values = self._write_cids(2)
+            load_cids_from_directory(self.app)
+
+            manifest = json.loads(self.manifest_path.read_text())
+            self.assertEqual(
+                sorted(entry[2] for entry in manifest["entries"].values()),
+                sorted(cid_values),
+            )
+
+            with patch.object(
+                cid_directory_loader, "_hash_file", side_effect=AssertionError
+            ):
+                load_cids_from_directory(self.app)
+
+    def test_changed_file_is_rehashed(self):
+        """A file whose size or mtime changed must be verified again."""
+        with self.app.app_context():
+            cid_values = self._write_cids(1)
+            self.assertEqual(len(cid_values), 1)
+            cid_value = cid_values[0]
+            load_cids_from_directory(self.app)
+
+            (self.cid_dir / cid_value).write_bytes(b"tampered content " * 8)
+
+            with self.assertRaises(RuntimeError) as context:
+                load_cids_from_directory(self.app)
+            self.assertIn("mismatch", str(context.exception).lower())
+
+    def test_manifest_is_not_trusted_for_files_new_to_the_database(self):
+        """A matching manifest entry must not skip hashing a file not yet stored."""
+        with self.app.app_context():
+            cid_values = self._write_cids(1)
+            self.assertEqual(len(cid_values), 1)
+            cid_value = cid_values[0]
+            load_cids_from_directory(self.app)
+            CID.query.filter_by(path=f"/{cid_value}").delete()
+            db.session.commit()
+
+            file_path = self.cid_dir / cid_value
+            stat = file_path.stat()
+            file_path.write_bytes(b"x" * stat.st_size)
+            os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+            with self.assertRaises(RuntimeError) as context:
+                load_cids_from_directory(self.app)
+            self.assertIn("mismatch", str(context.exception).lower())
+            self.assertIsNone(get_cid_by_path(f"/{cid_value}"))
+
+    def test_shared_writable_manifest_is_ignored(self):
+        """A manifest other users can write must not be trusted."""
+        with self.app.app_context():
+            self._write_cids(2)
+            load_cids_from_directory(self.app)
+            self.assertEqual(self.manifest_path.stat().st_mode & 0o777, 0o600)
+
+            self.manifest_path.chmod(0o666)
+            with patch.object(
+                cid_directory_loader, "_hash_file", wraps=cid_directory_loader._hash_file
+            ) as hash_file:
+                load_cids_from_directory(self.app)
+            self.assertEqual(hash_file.call_count, 2)
+
+    def test_manifest_defaults_to_the_instance_folder(self):
+        """Without VIEWER_CID_MANIFEST the manifest lives in the instance folder."""
+        instance_dir = Path(self.temp_dir.name) / "instance"
+        self.app.instance_path = str(instance_dir)
+        with patch.dict(os.environ, {"VIEWER_CID_MANIFEST": ""}):
+            self.assertEqual(
+                cid_directory_loader.cid_manifest_path(self.app),
+                str(instance_dir / "cid-manifest.json"),
+            )
+
+    def test_missing_files_are_inserted_in_batches(self):
+        """Large loads should not read every missing file into one flush."""
+        with self.app.app_context():
+            cid_values = self._write_cids(5)
+
+            with patch.object(cid_directory_loader, "INSERT_BATCH_SIZE", 2), patch.object(
+                cid_directory_loader,
+                "_insert_batch",
+                wraps=cid_directory_loader._insert_batch,
+            ) as insert_batch:
+                load_cids_from_directory(self.app)
+
+            self.assertEqual(
+                [len(call.args[0]) for call in insert_batch.call_args_list], [2, 2, 1]
+            )
+            self.assertEqual(
+                CID.query.filter(
+                    CID.path.in_([f"/{value}" for value in cid_values])
+                ).count(),
+                5,
+            )
+
+    def test_files_are_verified_in_a_process_pool(self):
+        """Large directories should be hashed by worker processes."""
+        with self.app.app_context():
+            cid_values = self._write_cids(4)
+
+            with patch.object(cid_directory_loader, "PARALLEL_MIN_FILES", 2), patch.dict(
+                os.environ, {"CID_LOADER_WORKERS": "2"}
+            ):
+                load_cids_from_directory(self.app)
+
+            self.assertEqual(
+                CID.query.filter(
+                    CID.path.in_([f"/{value}" for value in cid_values])
+                ).count(),
+                4,
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
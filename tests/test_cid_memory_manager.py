@@ -5,7 +5,13 @@ import pytest
 
 from app import create_app
 from cid import CID
-from cid_memory_manager import CIDMemoryManager
+from cid_memory_manager import (
+    CIDMemoryManager,
+    EvictionPolicy,
+    GreedyDualSizePolicy,
+    LFUPolicy,
+    LRUPolicy,
+)
 from db_config import DatabaseConfig, DatabaseMode
 from readonly_config import ReadOnlyConfig
 
@@ -152,3 +158,137 @@ class TestCIDMemoryManager:
             # The other two should still exist
             assert CIDModel.query.filter_by(path=f"/{cid1}").first() is not None
             assert CIDModel.query.filter_by(path=f"/{cid3}").first() is not None
+
+    def test_ensure_memory_available_tracks_bytes_without_summing(self):
+        """Committed inserts and evictions should update the byte counter."""
+        ReadOnlyConfig.set_read_only_mode(True)
+        ReadOnlyConfig.set_max_cid_memory(100)
+        DatabaseConfig.set_mode(DatabaseMode.MEMORY)
+
+        app = create_app({"TESTING": True})
+
+        with app.app_context():
+            from db_access.cids import create_cid_record
+
+            contents = [b"a" * 30, b"b" * 30, b"c" * 30]
+            for content in contents:
+                create_cid_record(CID.from_bytes(content).value, content)
+
+            assert CIDMemoryManager.get_total_cid_size() == 90
+
+            content = b"d" * 40
+            create_cid_record(CID.from_bytes(content).value, content)
+
+            stats = CIDMemoryManager.get_stats()
+            assert CIDMemoryManager.get_total_cid_size() == 100
+            assert stats["evictions"] == 1
+            assert stats["bytes_evicted"] == 30
+
+    def test_recently_read_cids_survive_lru_eviction(self):
+        """LRU should evict the CID that was read least recently."""
+        ReadOnlyConfig.set_read_only_mode(True)
+        ReadOnlyConfig.set_max_cid_memory(300)
+        ReadOnlyConfig.set_cid_eviction_policy("lru")
+        DatabaseConfig.set_mode(DatabaseMode.MEMORY)
+
+        app = create_app({"TESTING": True})
+
+        with app.app_context():
+            from db_access.cids import create_cid_record, get_cid_by_path
+            from models import CID as CIDModel
+
+            # Larger than 64 bytes so lookups are not served as literal CIDs
+            old, new = b"o" * 100, b"n" * 100
+            old_cid = CID.from_bytes(old).value
+            new_cid = CID.from_bytes(new).value
+            create_cid_record(old_cid, old)
+            create_cid_record(new_cid, new)
+
+            assert get_cid_by_path(f"/{old_cid}") is not None
+            assert get_cid_by_path(f"/{CID.from_bytes(b'z' * 100).value}") is None
+            CIDMemoryManager.ensure_memory_available(150)
+
+            assert CIDModel.query.filter_by(path=f"/{new_cid}").first() is None
+            assert CIDModel.query.filter_by(path=f"/{old_cid}").first() is not None
+            stats = CIDMemoryManager.get_stats()
+            assert stats["policy"] == "lru"
+            assert stats["hits"] == 1
+            assert stats["misses"] == 1
+            assert stats["hit_ratio"] == 0.5
+
+    def test_pinned_cids_are_never_evicted(self):
+        """Eviction should skip pinned CIDs and abort if nothing else is left."""
+        ReadOnlyConfig.set_read_only_mode(True)
+        ReadOnlyConfig.set_max_cid_memory(100)
+        DatabaseConfig.set_mode(DatabaseMode.MEMORY)
+
+        app = create_app({"TESTING": True})
+
+        with app.app_context():
+            from werkzeug.exceptions import RequestEntityTooLarge
+
+            from db_access.cids import create_cid_record
+            from models import CID as CIDModel
+
+            boot = b"b" * 80
+            boot_cid = CID.from_bytes(boot).value
+            create_cid_record(boot_cid, boot)
+            CIDMemoryManager.pin_cids([boot_cid])
+
+            with pytest.raises(RequestEntityTooLarge):
+                CIDMemoryManager.ensure_memory_available(50)
+
+            assert CIDModel.query.filter_by(path=f"/{boot_cid}").first() is not None
+
+
+class TestEvictionPolicies:
+    """Tests for the eviction policy implementations."""
+
+    @staticmethod
+    def _drain(policy):
+        victims = []
+        while (path := policy.pop_victim()) is not None:
+            victims.append(path)
+        return victims
+
+    def test_policies_must_implement_every_operation(self):
+        class Partial(EvictionPolicy):  # pylint: disable=abstract-method
+            def add(self, path, size):
+                pass
+
+        with pytest.raises(TypeError):
+            EvictionPolicy()  # pylint: disable=abstract-class-instantiated
+        with pytest.raises(TypeError):
+            Partial()  # pylint: disable=abstract-class-instantiated
+
+    def test_lru_evicts_least_recently_used(self):
+        policy = LRUPolicy()
+        for path in ("a", "b", "c"):
+            policy.add(path, 10)
+        policy.access("a")
+        policy.remove("b")
+
+        assert self._drain(policy) == ["c", "a"]
+
+    def test_lfu_evicts_least_frequently_used(self):
+        policy = LFUPolicy()
+        for path in ("a", "b", "c"):
+            policy.add(path, 10)
+        policy.access("a")
+        policy.access("a")
+        policy.access("c")
+
+        assert self._drain(policy) == ["b", "c", "a"]
+
+    def test_greedy_dual_size_prefers_large_cold_entries(self):
+        policy = GreedyDualSizePolicy()
+        policy.add("small", 10)
+        for path in ("a", "b", "c"):
+            policy.add(path, 100)
+
+        assert policy.pop_victim() == "a"
+        # Inflation rose to the victim's priority, so reading "b" now lifts
+        # it above the equally sized "c".
+        policy.access("b")
+
+        assert self._drain(policy) == ["c", "b", "small"]
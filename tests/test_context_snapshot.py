@@ -0,0 +1,95 @@
+"""Tests for the memoized user context snapshot."""
+
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+
+from database import db
+from models import Secret, Server, Variable
+from server_execution.code_execution import _load_user_context, model_as_dict
+from server_execution.context_snapshot import (
+    get_context_snapshot_stats,
+    get_user_context_snapshot,
+    reset_context_snapshot_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    reset_context_snapshot_cache()
+    yield
+    reset_context_snapshot_cache()
+
+
+def _counting_loaders():
+    return (
+        Mock(side_effect=lambda: list(Variable.query.all())),
+        Mock(side_effect=lambda: list(Secret.query.all())),
+        Mock(side_effect=lambda: list(Server.query.all())),
+    )
+
+
+def test_snapshot_is_reused_until_a_table_changes(memory_db_app):
+    with memory_db_app.app_context():
+        db.session.add(Variable(name="city", definition="Paris"))
+        db.session.commit()
+        loaders = _counting_loaders()
+
+        first = get_user_context_snapshot(loaders, model_as_dict)
+        second = get_user_context_snapshot(loaders, model_as_dict)
+
+        assert second is first
+        assert [loader.call_count for loader in loaders] == [1, 1, 1]
+        assert dict(first.variables) == {"city": "Paris"}
+
+        db.session.add(Secret(name="token", definition="abc"))
+        db.session.commit()
+
+        third = get_user_context_snapshot(loaders, model_as_dict)
+
+        assert third is not first
+        assert dict(third.secrets) == {"token": "abc"}
+        assert [loader.call_count for loader in loaders] == [2, 2, 2]
+
+        stats = get_context_snapshot_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+
+def test_snapshot_is_read_only(memory_db_app):
+    with memory_db_app.app_context():
+        snapshot = get_user_context_snapshot(_counting_loaders(), model_as_dict)
+
+        with pytest.raises(TypeError):
+            snapshot.variables["new"] = "value"  # type: ignore[index]
+
+
+def test_load_user_context_returns_independent_copies(memory_db_app):
+    with memory_db_app.app_context():
+        db.session.add(Server(name="echo", definition="def main():\n    return 1\n"))
+        db.session.commit()
+
+        with memory_db_app.test_request_context("/echo"):
+            first = _load_user_context()
+            first["servers"]["injected"] = "value"
+            second = _load_user_context()
+
+        assert "injected" not in second["servers"]
+        assert "echo" in second["servers"]
+
+
+def test_meta_caches_reports_snapshot_stats(memory_client):
+    response = memory_client.get("/meta/caches")
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert set(payload["user_context_snapshot"]) >= {
+        "hits",
+        "misses",
+        "last_rebuild_ms",
+        "average_rebuild_ms",
+    }
+    assert "source_bytes" in payload["compiled_code"]
+    assert "invalidations" in payload["module_instances"]
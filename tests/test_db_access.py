@@ -36,12 +36,19 @@ from db_access import (
     get_server_invocations,
     get_server_invocations_by_result_cids,
     get_server_invocations_by_server,
+    get_streamable_cid_by_path,
     get_uploads,
+    get_upload_totals,
+    get_uploads_page,
     get_variable_by_name,
     EntityInteractionLookup,
     EntityInteractionRequest,
     ServerInvocationInput,
+    StreamedCIDRecord,
+    iter_cid_metadata,
+    iter_cid_paths,
     paginate_page_views,
+    read_cid_data,
     record_entity_interaction,
     save_entity,
     save_page_view,
@@ -140,6 +147,78 @@ class TestDBAccess(unittest.TestCase):
         uploads = get_uploads()
         self.assertEqual([cid.path for cid in uploads], ["/second", "/first"])
         self.assertEqual(uploads[0].file_size, len(b"2"))
+        self.assertEqual([cid.path for cid in get_uploads(limit=1)], ["/second"])
+
+    def test_uploads_page_uses_keyset_cursor(self):
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for index in range(5):
+            db.session.add(
+                CID(
+                    path=f"/upload{index}",
+                    file_data=b"x" * index,
+                    file_size=index,
+                    # Two uploads share a timestamp so the id breaks the tie.
+                    created_at=created_at + timedelta(minutes=min(index, 3)),
+                )
+            )
+        db.session.commit()
+
+        first = get_uploads_page(per_page=2)
+        second = get_uploads_page(before=first.next_cursor, per_page=2)
+        third = get_uploads_page(before=second.next_cursor, per_page=2)
+
+        self.assertEqual([cid.path for cid in first.items], ["/upload4", "/upload3"])
+        self.assertEqual([cid.path for cid in second.items], ["/upload2", "/upload1"])
+        self.assertEqual([cid.path for cid in third.items], ["/upload0"])
+        self.assertIsNone(third.next_cursor)
+
+    def test_uploads_page_and_totals_exclude_server_events(self):
+        for index in range(4):
+            db.session.add(
+                CID(path=f"/event{index}", file_data=b"e" * 10, file_size=10)
+            )
+        db.session.add(CID(path="/upload0", file_data=b"u", file_size=1))
+        db.session.add(
+            ServerInvocation(
+                server_name="echo",
+                result_cid="event0",
+                invocation_cid="event1",
+                request_details_cid="event2",
+                servers_cid="event3",
+            )
+        )
+        db.session.commit()
+
+        page = get_uploads_page(per_page=1, exclude_server_events=True)
+
+        self.assertEqual([cid.path for cid in page.items], ["/upload0"])
+        self.assertIsNone(page.next_cursor)
+        self.assertEqual(get_upload_totals(exclude_server_events=True), (1, 1))
+        self.assertEqual(get_upload_totals(), (5, 41))
+
+    def test_metadata_helpers_do_not_load_payloads(self):
+        for index in range(3):
+            db.session.add(
+                CID(path=f"/meta{index}", file_data=b"y" * (index + 1), file_size=None)
+            )
+        db.session.commit()
+        db.session.expunge_all()
+
+        self.assertEqual(
+            list(iter_cid_paths(batch_size=2)), ["/meta0", "/meta1", "/meta2"]
+        )
+        records = list(iter_cid_metadata(per_page=2))
+        self.assertEqual([record.file_size for record in records], [1, 2, 3])
+        self.assertTrue(all(isinstance(r, StreamedCIDRecord) for r in records))
+        self.assertEqual(
+            [record.path for record in iter_cid_metadata(page=2, per_page=2)],
+            ["/meta2"],
+        )
+        self.assertEqual(records[1].file_data, b"yy")
+
+        record = CID.query.filter_by(path="/meta0").first()
+        self.assertNotIn("stored_data", record.__dict__)
+        self.assertEqual(record.file_data, b"y")
 
     def test_duplicate_cid_creation_raises_integrity_error(self):
         """Test that creating a duplicate CID raises IntegrityError.
@@ -476,6 +555,22 @@ class TestDBAccess(unittest.TestCase):
         self.assertEqual(first.path, "/gamma")
         self.assertEqual(count_cids(), 2)
 
+    def test_streamable_cid_reads_content_in_slices(self):
+        data = bytes(range(256)) * 3
+        db.session.add(CID(path="/streamed", file_data=data, file_size=len(data)))
+        db.session.commit()
+
+        record = get_streamable_cid_by_path("/streamed")
+        self.assertIsInstance(record, StreamedCIDRecord)
+        self.assertEqual(record.file_size, len(data))
+        self.assertEqual(read_cid_data(record.id, 250, 10), data[250:260])
+        self.assertEqual(
+            list(record.iter_data(100, 400, chunk_size=128)),
+            [data[100:228], data[228:356], data[356:400]],
+        )
+        self.assertEqual(record.file_data, data)
+        self.assertIsNone(get_streamable_cid_by_path("/missing"))
+
     def test_record_export_accepts_validated_cid(self):
         """record_export should accept ValidatedCID inputs and persist value."""
         cid_obj = ValidatedCID.from_bytes(b"export-data")
@@ -6,10 +6,12 @@ import os
 
 import pytest
 
+from analytics import get_history_statistics
 from database import db
 from db_config import DatabaseConfig
 from db_snapshot import DatabaseSnapshot
-from models import Server
+from models import CID, PageView, Server
+from snapshot_stream import SnapshotReader
 
 
 @pytest.mark.memory_db
@@ -44,12 +46,15 @@ class TestDatabaseSnapshot:
             assert os.path.exists(path)
 
             # Verify content
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
+            with open(path, "rb") as f:
+                tables = {
+                    info["name"]: [dict(zip(info["columns"], row)) for row in rows]
+                    for info, rows in SnapshotReader(f).tables()
+                }
 
-            assert "servers" in data["tables"]
-            assert len(data["tables"]["servers"]) == 1
-            assert data["tables"]["servers"][0]["name"] == "test-server"
+            assert "servers" in tables
+            assert len(tables["servers"]) == 1
+            assert tables["servers"][0]["name"] == "test-server"
 
     def test_create_snapshot_auto_name(self, memory_db_app, tmp_path):
         """Snapshot should generate name if not provided."""
@@ -60,7 +65,7 @@ class TestDatabaseSnapshot:
             assert os.path.exists(path)
             # Name should be timestamp-based
             filename = os.path.basename(path)
-            assert filename.endswith(".json")
+            assert filename.endswith(".snap")
             assert len(filename) > 10  # Timestamp is reasonably long
 
     def test_list_snapshots(self, memory_db_app, tmp_path):
@@ -132,8 +137,7 @@ class TestDatabaseSnapshot:
         with memory_db_app.app_context():
             DatabaseSnapshot.create_snapshot("all_tables")
 
-            with open(tmp_path / "all_tables.json", encoding="utf-8") as f:
-                data = json.load(f)
+            data = DatabaseSnapshot.get_snapshot_info("all_tables")
 
             expected_tables = [
                 "servers",
@@ -150,6 +154,146 @@ class TestDatabaseSnapshot:
             for table in expected_tables:
                 assert table in data["tables"], f"Missing table: {table}"
 
+    def test_restore_snapshot_round_trip(self, memory_db_app, tmp_path):
+        """Restoring should bring back rows and raw CID bytes."""
+        DatabaseSnapshot.SNAPSHOT_DIR = str(tmp_path)
+        payload = bytes(range(256)) * 4
+
+        with memory_db_app.app_context():
+            db.session.add(Server(name="kept", definition="def"))
+            db.session.add(CID(path="/AAAAblob", file_data=payload, file_size=len(payload)))
+            db.session.commit()
+            DatabaseSnapshot.create_snapshot("round_trip", compression="gzip")
+
+            db.session.add(Server(name="discarded", definition="def"))
+            Server.query.filter_by(name="kept").delete()
+            db.session.commit()
+
+            restored = DatabaseSnapshot.restore_snapshot("round_trip")
+
+            assert restored["servers"] == 1
+            assert [s.name for s in Server.query.all()] == ["kept"]
+            assert CID.query.filter_by(path="/AAAAblob").one().file_data == payload
+
+    def test_restore_rebuilds_page_view_rollups(self, memory_db_app, tmp_path):
+        """History statistics should count the restored views only."""
+        DatabaseSnapshot.SNAPSHOT_DIR = str(tmp_path)
+
+        with memory_db_app.app_context():
+            db.session.add_all(PageView(path="/kept") for _ in range(3))
+            db.session.commit()
+            DatabaseSnapshot.create_snapshot("views")
+
+            db.session.add_all(PageView(path="/discarded") for _ in range(5))
+            db.session.commit()
+            DatabaseSnapshot.restore_snapshot("views")
+
+            stats = get_history_statistics()
+            assert PageView.query.count() == 3
+            assert stats["total_views"] == 3
+            assert stats["popular_paths"] == [("/kept", 3)]
+
+    def test_differential_snapshot_records_only_new_rows(
+        self, memory_db_app, tmp_path
+    ):
+        """A child snapshot should hold only append-only rows added since its parent."""
+        DatabaseSnapshot.SNAPSHOT_DIR = str(tmp_path)
+
+        with memory_db_app.app_context():
+            db.session.add(Server(name="s1", definition="def"))
+            db.session.add(PageView(path="/one"))
+            db.session.commit()
+            DatabaseSnapshot.create_snapshot("base")
+
+            db.session.add(PageView(path="/two"))
+            db.session.commit()
+            DatabaseSnapshot.create_snapshot("child", parent="base")
+
+            info = DatabaseSnapshot.get_snapshot_info("child")
+            assert info["parent"] == "base"
+            assert info["tables"]["page_views"] == 1
+            assert info["tables"]["servers"] == 1
+
+            PageView.query.delete()
+            db.session.commit()
+
+            restored = DatabaseSnapshot.restore_snapshot("child")
+
+            assert restored["page_views"] == 2
+            assert sorted(v.path for v in PageView.query.all()) == ["/one", "/two"]
+
+    def test_rows_deleted_since_the_parent_stay_deleted(
+        self, memory_db_app, tmp_path, monkeypatch
+    ):
+        """Tables with deletions since the parent are written in full."""
+        import db_snapshot  # pylint: disable=import-outside-toplevel
+
+        DatabaseSnapshot.SNAPSHOT_DIR = str(tmp_path)
+
+        with memory_db_app.app_context():
+            db.session.add_all(PageView(path=f"/{index}") for index in range(3))
+            db.session.commit()
+            DatabaseSnapshot.create_snapshot("base")
+
+            PageView.query.filter_by(path="/0").delete()
+            db.session.add(PageView(path="/3"))
+            db.session.commit()
+            # Also detected from row counts when the parent came from another process.
+            monkeypatch.setattr(db_snapshot, "_PROCESS_TOKEN", "other-process")
+            DatabaseSnapshot.create_snapshot("child", parent="base")
+
+            info = DatabaseSnapshot.get_snapshot_info("child")
+            assert info["tables"]["page_views"] == 3
+
+            restored = DatabaseSnapshot.restore_snapshot("child")
+
+            assert restored["page_views"] == 3
+            assert sorted(v.path for v in PageView.query.all()) == ["/1", "/2", "/3"]
+
+    def test_reused_ids_are_detected_in_the_same_process(
+        self, memory_db_app, tmp_path
+    ):
+        """Deleting the newest row lets SQLite reuse its id for the next one."""
+        DatabaseSnapshot.SNAPSHOT_DIR = str(tmp_path)
+
+        with memory_db_app.app_context():
+            db.session.add_all(PageView(path=f"/{index}") for index in range(2))
+            db.session.commit()
+            DatabaseSnapshot.create_snapshot("base")
+
+            PageView.query.filter_by(path="/1").delete()
+            db.session.add(PageView(path="/replacement"))
+            db.session.commit()
+            DatabaseSnapshot.create_snapshot("child", parent="base")
+            DatabaseSnapshot.restore_snapshot("child")
+
+            paths = sorted(v.path for v in PageView.query.all())
+            assert paths == ["/0", "/replacement"]
+
+    def test_restore_missing_parent_fails(self, memory_db_app, tmp_path):
+        """Restoring should fail clearly when a parent snapshot is gone."""
+        DatabaseSnapshot.SNAPSHOT_DIR = str(tmp_path)
+
+        with memory_db_app.app_context():
+            DatabaseSnapshot.create_snapshot("base")
+            DatabaseSnapshot.create_snapshot("child", parent="base")
+            DatabaseSnapshot.delete_snapshot("base")
+
+            with pytest.raises(RuntimeError, match="Snapshot not found: base"):
+                DatabaseSnapshot.restore_snapshot("child")
+
+    def test_legacy_json_snapshots_are_listed(self, memory_db_app, tmp_path):
+        """Snapshots written in the old JSON format should still be described."""
+        DatabaseSnapshot.SNAPSHOT_DIR = str(tmp_path)
+        (tmp_path / "old.json").write_text(
+            json.dumps({"created_at": "2024-01-01", "tables": {"servers": [{}]}}),
+            encoding="utf-8",
+        )
+
+        with memory_db_app.app_context():
+            assert "old" in DatabaseSnapshot.list_snapshots()
+            assert DatabaseSnapshot.get_snapshot_info("old")["tables"] == {"servers": 1}
+
     def test_dump_to_sqlite(self, memory_db_app, tmp_path):
         """Test dumping in-memory DB to SQLite file."""
         import sqlite3
@@ -0,0 +1,66 @@
+"""Tests for the cached servers/variables/secrets definitions snapshot CIDs."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import cid_storage
+from cid_utils import get_definitions_snapshot_cids
+from database import db
+from models import CID, Secret, Server, Variable
+
+
+def test_snapshot_cids_are_reused_until_a_table_changes(memory_db_app):
+    with memory_db_app.app_context():
+        db.session.add(Server(name="echo", definition="def main():\n    return 1\n"))
+        db.session.commit()
+
+        first = get_definitions_snapshot_cids()
+
+        with patch.object(
+            cid_storage,
+            "generate_all_server_definitions_json",
+            side_effect=AssertionError("definitions were regenerated"),
+        ):
+            assert get_definitions_snapshot_cids() == first
+
+        db.session.add(Variable(name="city", definition="Paris"))
+        db.session.commit()
+        second = get_definitions_snapshot_cids()
+
+        assert second["servers"] == first["servers"]
+        assert second["variables"] != first["variables"]
+
+        db.session.add(Secret(name="token", definition="abc"))
+        db.session.commit()
+
+        assert get_definitions_snapshot_cids()["secrets"] != first["secrets"]
+
+
+def test_snapshot_cid_is_restored_after_cid_rows_are_deleted(memory_db_app):
+    with memory_db_app.app_context():
+        # Large enough that the CID is stored rather than a literal.
+        definition = "def main():\n" + "    x = 1\n" * 20 + "    return x\n"
+        db.session.add(Server(name="echo", definition=definition))
+        db.session.commit()
+
+        servers_cid = get_definitions_snapshot_cids()["servers"]
+        assert CID.query.filter_by(path=f"/{servers_cid}").count() == 1
+
+        CID.query.filter_by(path=f"/{servers_cid}").delete()
+        db.session.commit()
+
+        assert get_definitions_snapshot_cids()["servers"] == servers_cid
+        assert CID.query.filter_by(path=f"/{servers_cid}").count() == 1
+
+
+def test_store_updates_the_cached_snapshot(memory_db_app):
+    with memory_db_app.app_context():
+        stored = cid_storage.store_server_definitions_cid()
+
+        with patch.object(
+            cid_storage,
+            "generate_all_server_definitions_json",
+            side_effect=AssertionError("definitions were regenerated"),
+        ):
+            assert cid_storage.get_current_server_definitions_cid() == stored
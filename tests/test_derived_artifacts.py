@@ -0,0 +1,155 @@
+"""Tests for the persistent cache of rendered CID content."""
+
+from __future__ import annotations
+
+import pytest
+
+from content_serving import _serve_markdown_html, _serve_qr_code
+from derived_artifacts import (
+    get_derived_artifact_stats,
+    render_derived,
+    reset_derived_artifact_stats,
+    source_cid_for,
+)
+from models import DerivedArtifact
+from syntax_highlighting import MIN_CACHED_SOURCE_CHARS, highlight_source
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats():
+    reset_derived_artifact_stats()
+    yield
+    reset_derived_artifact_stats()
+
+
+def _counting_renderer(output):
+    calls = []
+
+    def render():
+        calls.append(1)
+        return output
+
+    return render, calls
+
+
+def test_rendered_output_is_reused(memory_db_app):
+    render, calls = _counting_renderer(b"<p>hi</p>")
+    source = source_cid_for(b"hi")
+
+    with memory_db_app.app_context():
+        assert render_derived("test", "1", source, render) == b"<p>hi</p>"
+        assert render_derived("test", "1", source, render) == b"<p>hi</p>"
+        assert DerivedArtifact.query.one().source_cid == source
+
+    assert len(calls) == 1
+    stats = get_derived_artifact_stats()["renderers"]["test"]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+def test_new_version_or_options_render_again(memory_db_app):
+    render, calls = _counting_renderer(b"out")
+    source = source_cid_for(b"in")
+
+    with memory_db_app.app_context():
+        render_derived("test", "1", source, render)
+        render_derived("test", "2", source, render)
+        render_derived("test", "2", source, render, options={"wide": True})
+
+    assert len(calls) == 3
+
+
+def test_none_output_is_not_stored(memory_db_app):
+    render, calls = _counting_renderer(None)
+
+    with memory_db_app.app_context():
+        assert render_derived("test", "1", source_cid_for(b"x"), render) is None
+        assert render_derived("test", "1", source_cid_for(b"x"), render) is None
+        assert DerivedArtifact.query.count() == 0
+
+    assert len(calls) == 2
+
+
+def test_without_app_context_render_is_called_directly():
+    render, calls = _counting_renderer(b"out")
+
+    assert render_derived("test", "1", source_cid_for(b"x"), render) == b"out"
+    assert get_derived_artifact_stats()["renderers"] == {}
+    assert len(calls) == 1
+
+
+def test_markdown_page_is_rendered_once_per_source(memory_db_app, monkeypatch):
+    import content_serving  # pylint: disable=import-outside-toplevel
+
+    renders = []
+
+    def fake_render(text):
+        renders.append(text)
+        return f"<h1>{text}</h1>"
+
+    monkeypatch.setattr(content_serving, "render_markdown_document", fake_render)
+    body = b"Title"
+
+    with memory_db_app.app_context():
+        first = _serve_markdown_html(body, source_cid_for(body))
+        second = _serve_markdown_html(body, source_cid_for(body))
+
+    assert first == second == b"<h1>Title</h1>"
+    assert renders == ["Title"]
+
+
+def test_qr_page_reuses_only_the_image(memory_db_app, monkeypatch):
+    import content_serving  # pylint: disable=import-outside-toplevel
+
+    images, pages = [], []
+
+    def fake_image(url):
+        images.append(url)
+        return "data:image/png;base64,AAAA"
+
+    def fake_template(name, **context):
+        pages.append(context["qr_image_url"])
+        return f"<p>{name} {len(pages)}</p>"
+
+    monkeypatch.setattr(content_serving, "generate_qr_data_url", fake_image)
+    monkeypatch.setattr(content_serving, "render_template", fake_template)
+    target = source_cid_for(b"x" * 100)
+
+    with memory_db_app.app_context():
+        first = _serve_qr_code(target)
+        second = _serve_qr_code(target)
+
+    # The layout around the image (navigation, version) is never reused.
+    assert (first, second) == (b"<p>cid_qr.html 1</p>", b"<p>cid_qr.html 2</p>")
+    assert images == [f"https://256t.org/{target}"]
+    assert pages == ["data:image/png;base64,AAAA"] * 2
+
+
+def test_highlighted_source_round_trips_through_cache(memory_db_app):
+    source = "x = 1\n" * (MIN_CACHED_SOURCE_CHARS // 6 + 1)
+
+    with memory_db_app.app_context():
+        direct = highlight_source(source, filename="a.py", cache=False)
+        first = highlight_source(source, filename="a.py")
+        second = highlight_source(source, filename="a.py")
+
+    assert first == second == direct
+    stats = get_derived_artifact_stats()["renderers"]["syntax_highlight"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_oldest_artifacts_are_pruned(memory_db_app, monkeypatch):
+    import cid_memo  # pylint: disable=import-outside-toplevel
+
+    monkeypatch.setattr(cid_memo, "PRUNE_INTERVAL", 1)
+    monkeypatch.setenv("DERIVED_ARTIFACT_MAX_ENTRIES", "2")
+
+    with memory_db_app.app_context():
+        for index in range(4):
+            source = source_cid_for(f"in {index}".encode())
+            render_derived("test", "1", source, lambda i=index: f"out {i}".encode())
+
+        remaining = [artifact.result_cid for artifact in DerivedArtifact.query.all()]
+
+    assert sorted(remaining) == sorted(
+        source_cid_for(f"out {index}".encode()) for index in (2, 3)
+    )
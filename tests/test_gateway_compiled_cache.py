@@ -0,0 +1,110 @@
+"""Tests for the gateway's compiled transform and template caches."""
+
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from cid_core import generate_cid
+from definitions.gateway_lib.cache import CompiledCache, source_key
+from definitions.gateway_lib.templates.loader import TemplateLoader
+from definitions.gateway_lib.transforms.loader import TransformLoader
+
+TRANSFORM_SOURCE = "def transform_request(request_details, context):\n    return {'n': 1}\n"
+
+
+@pytest.fixture
+def cache():
+    return CompiledCache("test", max_entries=2)
+
+
+def test_lru_evicts_least_recently_used(cache):
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_source_key_uses_cid_or_file_mtime(tmp_path):
+    cid = generate_cid(TRANSFORM_SOURCE.encode("utf-8"))
+    assert source_key(cid) == ("cid", cid)
+    assert source_key(f"/{cid}") == ("cid", cid)
+    assert source_key("not a cid") is None
+
+    path = tmp_path / "transform.py"
+    path.write_text(TRANSFORM_SOURCE)
+    first = source_key(str(path))
+    os.utime(path, ns=(0, 1_000_000_000))
+    assert first[0] == "path"
+    assert source_key(str(path)) != first
+
+
+def test_transform_compiled_once_per_cid(cache):
+    cid = generate_cid(TRANSFORM_SOURCE.encode("utf-8"))
+    resolver = Mock()
+    resolver.resolve.return_value = TRANSFORM_SOURCE
+    loader = TransformLoader(resolver, cache=cache)
+
+    first = loader.load_transform(cid, {})
+    second = loader.load_transform(cid, {})
+
+    assert first is second
+    assert first({}, {}) == {"n": 1}
+    resolver.resolve.assert_called_once()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_transform_file_recompiled_after_edit(cache, tmp_path):
+    path = tmp_path / "transform.py"
+    path.write_text(TRANSFORM_SOURCE)
+    loader = TransformLoader(Mock(), cache=cache)
+
+    first = loader.load_transform(str(path), {})
+    assert loader.load_transform(str(path), {}) is first
+
+    path.write_text(TRANSFORM_SOURCE.replace("1", "2"))
+    os.utime(path, ns=(0, 1_000_000_000))
+    second = loader.load_transform(str(path), {})
+
+    assert second({}, {}) == {"n": 2}
+
+
+def test_missing_transform_is_not_cached(cache):
+    resolver = Mock()
+    resolver.resolve.return_value = None
+    loader = TransformLoader(resolver, cache=cache)
+
+    assert loader.load_transform("missing", {}) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_template_compiled_once_per_cid(cache):
+    content = "Hello {{ name }}"
+    cid = generate_cid(content.encode("utf-8"))
+    resolve = Mock(return_value=content)
+    loader = TemplateLoader(Mock(), resolve_fn=resolve, cache=cache)
+    resolve_template = loader.create_template_resolver(
+        {"templates": {"page.html": cid}}, {}
+    )
+
+    first = resolve_template("page.html")
+
+    assert resolve_template("page.html") is first
+    assert first.render(name="you") == "Hello you"
+    resolve.assert_called_once()
+
+
+def test_unresolvable_template_still_raises(cache):
+    loader = TemplateLoader(Mock(), resolve_fn=Mock(return_value=None), cache=cache)
+    resolve_template = loader.create_template_resolver(
+        {"templates": {"page.html": "AAAAAFAKE_NONEXISTENT"}}, {}
+    )
+
+    with pytest.raises(LookupError):
+        resolve_template("page.html")
+    assert cache.stats()["entries"] == 0
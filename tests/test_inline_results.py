@@ -0,0 +1,65 @@
+"""Tests for in-process server results that skip the CID redirect."""
+
+from __future__ import annotations
+
+import pytest
+
+from models import CID, ServerInvocation
+from server_execution.provenance_writer import (
+    flush_provenance_writer,
+    shutdown_provenance_writer,
+)
+from server_execution.response_handling import (
+    INLINE_RESULT_ENVIRON_KEY,
+    RESULT_CID_HEADER,
+    _handle_successful_execution,
+)
+
+INLINE = {INLINE_RESULT_ENVIRON_KEY: True}
+# Longer than DIRECT_CONTENT_EMBED_LIMIT, so the result is a stored CID
+# rather than a literal one.
+OUTPUT = "inline output " * 8
+
+
+@pytest.fixture(autouse=True)
+def _stop_writer():
+    yield
+    shutdown_provenance_writer()
+
+
+def test_default_requests_still_redirect(memory_db_app):
+    with memory_db_app.test_request_context("/echo"):
+        response = _handle_successful_execution("hi", "text/plain", "echo")
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith(".txt")
+
+
+def test_inline_request_receives_output_directly(memory_db_app):
+    with memory_db_app.test_request_context("/echo", environ_overrides=INLINE):
+        response = _handle_successful_execution(OUTPUT, "text/plain", "echo")
+
+        assert response.status_code == 200
+        assert response.get_data() == OUTPUT.encode("utf-8")
+        assert response.content_type == "text/plain"
+
+        cid_value = response.headers[RESULT_CID_HEADER]
+        stored = CID.query.filter_by(path=f"/{cid_value}").one()
+        assert stored.file_data == OUTPUT.encode("utf-8")
+        assert ServerInvocation.query.one().result_cid == cid_value
+
+
+def test_inline_result_cid_is_written_by_async_writer(memory_db_app):
+    memory_db_app.config["PROVENANCE_WRITER_MODE"] = "async"
+
+    with memory_db_app.test_request_context("/echo", environ_overrides=INLINE):
+        response = _handle_successful_execution(OUTPUT, "text/plain", "echo")
+        cid_value = response.headers[RESULT_CID_HEADER]
+
+    assert response.get_data() == OUTPUT.encode("utf-8")
+    assert flush_provenance_writer(timeout=5)
+
+    with memory_db_app.app_context():
+        stored = CID.query.filter_by(path=f"/{cid_value}").one()
+        assert stored.file_data == OUTPUT.encode("utf-8")
+        assert ServerInvocation.query.one().result_cid == cid_value
@@ -0,0 +1,123 @@
+"""Tests for background Mermaid rendering against a local stand-in renderer."""
+
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from content_rendering import MERMAID_PENDING_ATTRIBUTE, MermaidRenderer
+from models import DerivedArtifact
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg"><text>stub</text></svg>'
+DIAGRAM = "graph TD\n    A --> B"
+
+
+@pytest.fixture
+def stub_renderer():
+    """Serve a fixed SVG for every POST, recording the posted sources."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802 - http.server naming
+            length = int(self.headers.get("Content-Length", 0))
+            received.append(self.rfile.read(length).decode("utf-8"))
+            self.send_response(200)
+            self.send_header("Content-Type", "image/svg+xml")
+            self.send_header("Content-Length", str(len(SVG)))
+            self.end_headers()
+            self.wfile.write(SVG)
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/svg", received
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_endpoint_is_configurable(memory_db_app, stub_renderer):
+    url, _ = stub_renderer
+    memory_db_app.config["MERMAID_RENDERER_URL"] = url
+
+    assert MermaidRenderer("http://example.test/svg/").endpoint == "http://example.test/svg"
+    with memory_db_app.app_context():
+        assert MermaidRenderer().endpoint == url
+
+
+def test_unseen_diagram_renders_in_background_and_is_shared(disk_db_app, stub_renderer):
+    url, received = stub_renderer
+    disk_db_app.config["MERMAID_RENDERER_URL"] = url
+    renderer = MermaidRenderer()
+
+    with disk_db_app.app_context():
+        first = renderer.render_html(DIAGRAM)
+    assert MERMAID_PENDING_ATTRIBUTE in first
+    assert f'src="{url}/' in first
+
+    assert renderer.wait_for_background_renders(timeout=10)
+    assert received == [DIAGRAM]
+
+    # A fresh renderer stands in for another worker process.
+    with disk_db_app.app_context():
+        shared = MermaidRenderer().render_html(DIAGRAM)
+        svg_cid = DerivedArtifact.query.filter_by(renderer="mermaid_svg").one().result_cid
+
+    assert MERMAID_PENDING_ATTRIBUTE not in shared
+    assert f'src="/{svg_cid}.svg"' in shared
+    assert received == [DIAGRAM]
+    assert renderer.stats()["rendered"] == 1
+
+
+def test_sync_mode_renders_inline(memory_db_app, stub_renderer):
+    url, received = stub_renderer
+    memory_db_app.config.update(MERMAID_RENDERER_URL=url, MERMAID_RENDER_MODE="sync")
+
+    with memory_db_app.app_context():
+        html = MermaidRenderer().render_html(DIAGRAM)
+
+    assert MERMAID_PENDING_ATTRIBUTE not in html
+    assert ".svg" in html
+    assert received == [DIAGRAM]
+
+
+def test_memory_databases_render_inline(memory_db_app, stub_renderer):
+    url, received = stub_renderer
+    memory_db_app.config["MERMAID_RENDERER_URL"] = url
+
+    with memory_db_app.app_context():
+        html = MermaidRenderer().render_html(DIAGRAM)
+
+    assert memory_db_app.config["MERMAID_RENDER_MODE"] == "background"
+    assert MERMAID_PENDING_ATTRIBUTE not in html
+    assert received == [DIAGRAM]
+
+
+def test_markdown_page_with_pending_diagram_is_not_stored(
+    disk_db_app, stub_renderer, monkeypatch
+):
+    import content_rendering  # pylint: disable=import-outside-toplevel
+    from content_serving import _serve_markdown_html  # pylint: disable=import-outside-toplevel
+    from derived_artifacts import source_cid_for  # pylint: disable=import-outside-toplevel
+
+    url, _ = stub_renderer
+    disk_db_app.config["MERMAID_RENDERER_URL"] = url
+    renderer = MermaidRenderer()
+    monkeypatch.setattr(content_rendering, "_mermaid_renderer", renderer)
+    body = f"# Flow\n\n```mermaid\n{DIAGRAM}\n```\n".encode("utf-8")
+
+    with disk_db_app.app_context():
+        pending = _serve_markdown_html(body, source_cid_for(body))
+        assert renderer.wait_for_background_renders(timeout=10)
+        final = _serve_markdown_html(body, source_cid_for(body))
+        stored_pages = DerivedArtifact.query.filter_by(renderer="markdown_html").count()
+
+    assert MERMAID_PENDING_ATTRIBUTE.encode() in pending
+    assert MERMAID_PENDING_ATTRIBUTE.encode() not in final
+    assert stored_pages == 1
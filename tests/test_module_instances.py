@@ -0,0 +1,111 @@
+"""Tests for persistent per-server module instances."""
+
+from __future__ import annotations
+
+import pytest
+
+from server_execution import code_execution
+from server_execution.module_instances import (
+    ModuleInstanceCache,
+    clear_module_instances,
+    get_module_instance_stats,
+    is_self_contained,
+)
+
+COUNTER_DEFINITION = """
+import itertools
+
+_CALLS = itertools.count(1)
+
+
+def main(name="world"):
+    return {"output": f"{name}:{next(_CALLS)}", "content_type": "text/plain"}
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fresh_instances():
+    clear_module_instances()
+    yield
+    clear_module_instances()
+
+
+@pytest.mark.parametrize(
+    "definition, expected",
+    [
+        (COUNTER_DEFINITION, True),
+        ("from __future__ import annotations\n\ndef main():\n    return 1\n", True),
+        ("def main():\n    return request['path']\n", False),
+        ("print(context)\n\ndef main():\n    return 1\n", False),
+        ("def main():\n    return 1\n\nreturn main()\n", False),
+        ("def main(:\n", False),
+    ],
+)
+def test_is_self_contained(definition, expected):
+    assert is_self_contained(definition) is expected
+
+
+def test_module_body_runs_once_per_definition():
+    cache = ModuleInstanceCache(4)
+
+    main = cache.get_function(COUNTER_DEFINITION, "main", "counter")
+    again = cache.get_function(COUNTER_DEFINITION, "main", "counter")
+
+    assert main is again
+    assert [main()["output"], again(name="x")["output"]] == ["world:1", "x:2"]
+    stats = cache.stats()
+    assert (stats["loads"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_changed_definition_invalidates_previous_instance():
+    cache = ModuleInstanceCache(4)
+    cache.get_function(COUNTER_DEFINITION, "main", "counter")
+
+    updated = COUNTER_DEFINITION.replace("count(1)", "count(100)")
+    main = cache.get_function(updated, "main", "counter")
+
+    assert main()["output"] == "world:100"
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["invalidations"] == 1
+
+
+def test_unshareable_definitions_fall_back():
+    cache = ModuleInstanceCache(4)
+
+    assert cache.get_function("def main():\n    return request\n", "main") is None
+    assert cache.get_function(COUNTER_DEFINITION, "helper") is None
+    assert cache.stats()["shared"] == 1
+
+
+def test_failed_load_is_not_cached():
+    cache = ModuleInstanceCache(4)
+    definition = "raise RuntimeError('boom')\n\ndef main():\n    return 1\n"
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.get_function(definition, "main")
+
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["misses"] == 2
+
+
+def test_zero_limit_disables_persistent_mode():
+    cache = ModuleInstanceCache(0)
+
+    assert cache.get_function(COUNTER_DEFINITION, "main") is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_prepared_main_calls_reuse_module_state():
+    args = {code_execution.AUTO_MAIN_PARAMS_NAME: {"name": "a"}}
+
+    outputs = [
+        code_execution._run_prepared_code(
+            COUNTER_DEFINITION, "unused", args, "main", "counter"
+        )["output"]
+        for _ in range(2)
+    ]
+
+    assert outputs == ["a:1", "a:2"]
+    assert get_module_instance_stats()["loads"] == 1
@@ -0,0 +1,161 @@
+"""Tests for buffered page view writes and the hourly/daily rollups."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from analytics import get_history_statistics, track_page_view
+from database import db
+from db_access import count_page_views_by_path, rebuild_page_view_rollups
+from models import PageView, PageViewRollup
+from page_view_writer import (
+    PageViewWriter,
+    PendingPageView,
+    flush_page_view_writer,
+    get_page_view_writer_stats,
+    shutdown_page_view_writer,
+)
+
+BASE = datetime(2024, 3, 1, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def _stop_writer():
+    yield
+    shutdown_page_view_writer()
+
+
+def _add_views(*entries):
+    db.session.add_all(
+        PageView(path=path, viewed_at=BASE + offset) for path, offset in entries
+    )
+    db.session.commit()
+
+
+def _rollup(granularity, path):
+    return PageViewRollup.query.filter_by(granularity=granularity, path=path).all()
+
+
+def test_inserted_views_update_hourly_and_daily_rollups(memory_db_app):
+    _add_views(
+        ("/a", timedelta(minutes=5)),
+        ("/a", timedelta(minutes=55)),
+        ("/a", timedelta(hours=1, minutes=5)),
+    )
+
+    hours = sorted((row.bucket_start.hour, row.count) for row in _rollup("hour", "/a"))
+    days = _rollup("day", "/a")
+
+    assert hours == [(10, 2), (11, 1)]
+    assert [(row.bucket_start.day, row.count) for row in days] == [(1, 3)]
+
+
+def test_counts_combine_rollups_with_partial_edges(memory_db_app):
+    _add_views(
+        ("/early", timedelta(minutes=10)),
+        ("/a", timedelta(minutes=40)),
+        ("/a", timedelta(hours=3)),
+        ("/b", timedelta(days=2, hours=1)),
+        ("/late", timedelta(days=2, hours=1, minutes=50)),
+    )
+
+    start = BASE + timedelta(minutes=30)
+    end = BASE + timedelta(days=2, hours=1, minutes=20)
+
+    assert count_page_views_by_path(start, end) == {"/a": 2, "/b": 1}
+    assert count_page_views_by_path() == {
+        "/early": 1,
+        "/a": 2,
+        "/b": 1,
+        "/late": 1,
+    }
+
+
+def test_end_bound_is_inclusive(memory_db_app):
+    _add_views(("/a", timedelta(hours=1)))
+
+    assert count_page_views_by_path(BASE, BASE + timedelta(hours=1)) == {"/a": 1}
+    assert count_page_views_by_path(BASE, BASE + timedelta(minutes=59)) == {}
+
+
+def test_history_statistics_survive_deleted_raw_views(memory_db_app):
+    _add_views(("/a", timedelta(0)), ("/a", timedelta(minutes=1)), ("/b", timedelta(0)))
+    PageView.query.delete()
+    db.session.commit()
+
+    stats = get_history_statistics()
+
+    assert stats["total_views"] == 3
+    assert stats["unique_paths"] == 2
+    assert stats["popular_paths"][0] == ("/a", 2)
+    assert stats["popular_paths"][0].count == 2
+
+
+def test_insert_statements_update_rollups(memory_db_app):
+    db.session.execute(
+        insert(PageView),
+        [
+            {"path": "/a", "viewed_at": BASE},
+            {"path": "/a", "viewed_at": BASE + timedelta(hours=1)},
+        ],
+    )
+    db.session.execute(
+        insert(PageView.__table__).values(path="/b", viewed_at=BASE + timedelta(days=1))
+    )
+    db.session.commit()
+
+    assert sorted((row.bucket_start.hour, row.count) for row in _rollup("hour", "/a")) == [
+        (10, 1),
+        (11, 1),
+    ]
+    assert count_page_views_by_path() == {"/a": 2, "/b": 1}
+    assert get_history_statistics()["total_views"] == 3
+
+
+def test_rebuild_recomputes_rollups(memory_db_app):
+    _add_views(("/a", timedelta(0)), ("/b", timedelta(days=1)))
+    PageViewRollup.query.delete()
+    db.session.commit()
+
+    assert rebuild_page_view_rollups() == 2
+    assert count_page_views_by_path() == {"/a": 1, "/b": 1}
+
+
+def test_buffered_mode_writes_views_in_batches(memory_db_app):
+    memory_db_app.config.update(PAGE_VIEW_WRITER_MODE="buffered", PAGE_VIEW_BATCH_SIZE=10)
+
+    for path in ("/one", "/two", "/one"):
+        with memory_db_app.test_request_context(path):
+            track_page_view(memory_db_app.response_class(status=200))
+
+    assert flush_page_view_writer(timeout=5)
+    with memory_db_app.app_context():
+        assert PageView.query.count() == 3
+        assert count_page_views_by_path() == {"/one": 2, "/two": 1}
+
+    stats = get_page_view_writer_stats()
+    assert stats["mode"] == "buffered"
+    assert (stats["written"], stats["dropped"]) == (3, 0)
+
+
+def test_full_buffer_overwrites_oldest_view(memory_db_app):
+    recorded = []
+    writer = PageViewWriter(
+        memory_db_app,
+        lambda batch: recorded.extend(view.path for view in batch),
+        buffer_size=2,
+        batch_size=100,
+        flush_interval=60,
+    )
+    try:
+        for path in ("/1", "/2", "/3"):
+            writer.submit(PendingPageView(path, "GET", None, None, BASE))
+        assert writer.flush(timeout=5)
+    finally:
+        writer.shutdown()
+
+    assert recorded == ["/2", "/3"]
+    assert writer.stats()["dropped"] == 1
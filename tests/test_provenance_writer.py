@@ -0,0 +1,156 @@
+"""Tests for the asynchronous ServerInvocation provenance writer."""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from cid_utils import get_definitions_snapshot_cids
+from database import db
+from models import CID, Server, ServerInvocation
+from server_execution import invocation_tracking
+from server_execution.invocation_tracking import (
+    create_server_invocation_record,
+    record_invocation_batch,
+)
+from server_execution.provenance_writer import (
+    PendingInvocation,
+    ProvenanceWriter,
+    flush_provenance_writer,
+    get_provenance_writer_stats,
+    shutdown_provenance_writer,
+)
+
+
+@pytest.fixture(autouse=True)
+def _stop_writer():
+    yield
+    shutdown_provenance_writer()
+
+
+def _pending(server_name="echo", result_cid="AAAAAAAA"):
+    return PendingInvocation(
+        server_name=server_name,
+        result_cid=result_cid,
+        request_details={"path": f"/{server_name}"},
+        external_calls=[{"url": "https://example.com"}],
+        invoked_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        servers_cid="SERVERS",
+        variables_cid="VARIABLES",
+        secrets_cid="SECRETS",
+    )
+
+
+def test_record_invocation_batch_writes_rows_and_cids_in_one_commit(memory_db_app):
+    with memory_db_app.app_context():
+        commits = []
+
+        def _count(_session):
+            commits.append(1)
+
+        record_invocation_batch([_pending("first"), _pending("second")])
+        invocations = ServerInvocation.query.order_by(ServerInvocation.id).all()
+        assert [inv.server_name for inv in invocations] == ["first", "second"]
+        assert {
+            (inv.servers_cid, inv.variables_cid, inv.secrets_cid)
+            for inv in invocations
+        } == {("SERVERS", "VARIABLES", "SECRETS")}
+
+        event.listen(Session, "after_commit", _count)
+        try:
+            record_invocation_batch([_pending("third"), _pending("fourth")])
+        finally:
+            event.remove(Session, "after_commit", _count)
+
+        assert len(commits) == 1
+        for invocation in ServerInvocation.query.all():
+            for cid_value in (
+                invocation.request_details_cid,
+                invocation.external_calls_cid,
+                invocation.invocation_cid,
+            ):
+                assert CID.query.filter_by(path=f"/{cid_value}").count() == 1
+
+
+def test_async_mode_queues_and_flushes(memory_db_app):
+    memory_db_app.config["PROVENANCE_WRITER_MODE"] = "async"
+
+    with memory_db_app.test_request_context("/echo"):
+        result = create_server_invocation_record("echo", "AAAAAAAA")
+        assert result is None
+
+    assert flush_provenance_writer(timeout=5)
+
+    with memory_db_app.app_context():
+        invocation = ServerInvocation.query.one()
+        assert invocation.server_name == "echo"
+        assert invocation.request_details_cid
+
+    stats = get_provenance_writer_stats()
+    assert stats["mode"] == "async"
+    assert stats["written"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_queued_invocations_keep_the_definitions_they_ran_with(
+    memory_db_app, monkeypatch
+):
+    queued = []
+
+    class _Writer:
+        def submit(self, entry):
+            queued.append(entry)
+            return True
+
+    monkeypatch.setattr(
+        invocation_tracking, "get_provenance_writer", lambda _recorder: _Writer()
+    )
+
+    with memory_db_app.test_request_context("/echo"):
+        before = get_definitions_snapshot_cids()
+        assert create_server_invocation_record("echo", "AAAAAAAA") is None
+
+        # Definitions change before the batch is written.
+        db.session.add(Server(name="later", definition="print(1)"))
+        db.session.commit()
+        assert get_definitions_snapshot_cids()["servers"] != before["servers"]
+        record_invocation_batch(queued)
+
+        invocation = ServerInvocation.query.one()
+        assert invocation.servers_cid == before["servers"]
+        assert invocation.variables_cid == before["variables"]
+        assert invocation.secrets_cid == before["secrets"]
+
+
+def test_full_queue_reports_backpressure(memory_db_app):
+    release = threading.Event()
+    recorded = []
+
+    def _slow_recorder(batch):
+        release.wait(5)
+        recorded.extend(batch)
+
+    writer = ProvenanceWriter(
+        memory_db_app, _slow_recorder, max_queue_size=1, batch_size=1
+    )
+    try:
+        accepted = [writer.submit(_pending(str(index))) for index in range(4)]
+        release.set()
+        assert writer.flush(timeout=5)
+    finally:
+        writer.shutdown()
+
+    stats = writer.stats()
+    assert accepted.count(False) == stats["sync_fallbacks"] > 0
+    assert stats["written"] == len(recorded) == accepted.count(True)
+
+
+def test_meta_provenance_reports_sync_mode(memory_client):
+    response = memory_client.get("/meta/provenance")
+
+    assert response.status_code == 200
+    assert response.get_json()["mode"] == "sync"
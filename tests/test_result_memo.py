@@ -0,0 +1,131 @@
+"""Tests for memoized results of cacheable servers."""
+
+from __future__ import annotations
+
+import pytest
+
+from models import ServerResultMemo
+from server_execution import code_execution
+from server_execution.module_instances import clear_module_instances
+from server_execution.result_memo import (
+    cache_policy,
+    get_result_memo_stats,
+    memo_slot,
+    memoize_script_runner,
+    reset_result_memo_stats,
+)
+
+CACHEABLE_COUNTER = """
+# @cacheable
+import itertools
+
+_CALLS = itertools.count(1)
+
+
+def main(name="world"):
+    return {"output": f"{name}:{next(_CALLS)}", "content_type": "text/plain"}
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    clear_module_instances()
+    reset_result_memo_stats()
+    yield
+    clear_module_instances()
+    reset_result_memo_stats()
+
+
+@pytest.mark.parametrize(
+    "definition, ttl",
+    [
+        ("# @cacheable\ndef main():\n    return 1\n", None),
+        ("#!/bin/bash\n# @cacheable ttl=60\necho hi\n", 60),
+        (";; @cacheable\n(println 1)\n", None),
+        ("// @cacheable ttl=5\nconsole.log(1)\n", 5),
+    ],
+)
+def test_cache_policy_reads_marker(definition, ttl):
+    policy = cache_policy(definition)
+
+    assert policy is not None
+    assert policy.ttl_seconds == ttl
+
+
+def test_definitions_without_marker_are_not_cached():
+    assert cache_policy("def main():\n    return '@cacheable'\n") is None
+    assert cache_policy("def main():\n    return 1\n") is None
+
+
+def test_memo_slot_requires_app_context():
+    assert memo_slot(CACHEABLE_COUNTER, "counter", "main", {"name": "a"}) is None
+
+
+def test_memo_slot_depends_on_inputs(memory_db_app):
+    with memory_db_app.app_context():
+        first = memo_slot(CACHEABLE_COUNTER, "counter", "main", {"name": "a"})
+        same = memo_slot(CACHEABLE_COUNTER, "counter", "main", {"name": "a"})
+        other = memo_slot(CACHEABLE_COUNTER, "counter", "main", {"name": "b"})
+        unhashable = memo_slot(CACHEABLE_COUNTER, "counter", "main", {"f": object()})
+
+    assert first is not None and first.key == same.key
+    assert other is not None and other.key != first.key
+    assert unhashable is None
+
+
+def test_cacheable_python_server_runs_once_per_input(memory_db_app):
+    def run(name):
+        args = {code_execution.AUTO_MAIN_PARAMS_NAME: {"name": name}}
+        result = code_execution._run_prepared_code(
+            CACHEABLE_COUNTER, "unused", args, "main", "counter"
+        )
+        return code_execution._normalize_execution_result(result)
+
+    with memory_db_app.app_context():
+        assert run("a") == ("a:1", "text/plain")
+        assert run("a") == (b"a:1", "text/plain")
+        assert run("b") == ("b:2", "text/plain")
+        assert ServerResultMemo.query.count() == 2
+
+    stats = get_result_memo_stats()["servers"]["counter"]
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 2, 2)
+
+
+def test_script_runner_memoizes_only_successful_runs(memory_db_app):
+    calls = []
+
+    @memoize_script_runner("bash")
+    def run(code, server_name, *, chained_input=None, script_args=None):
+        calls.append((chained_input, script_args))
+        status = 500 if chained_input == "fail" else 200
+        return f"{chained_input}!".encode(), status, b""
+
+    code = "# @cacheable\ncat\n"
+    with memory_db_app.app_context():
+        assert run(code, "shout", chained_input="x") == (b"x!", 200, b"")
+        assert run(code, "shout", chained_input="x") == (b"x!", 200, b"")
+        assert run(code, "shout", chained_input="x", script_args=["1"])[0] == b"x!"
+        run(code, "shout", chained_input="fail")
+        run(code, "shout", chained_input="fail")
+
+    assert calls == [("x", None), ("x", ["1"]), ("fail", None), ("fail", None)]
+
+
+def test_expired_memo_is_recomputed(memory_db_app):
+    definition = CACHEABLE_COUNTER.replace("# @cacheable", "# @cacheable ttl=60")
+    args = {code_execution.AUTO_MAIN_PARAMS_NAME: {"name": "a"}}
+
+    with memory_db_app.app_context():
+        code_execution._run_prepared_code(definition, "unused", args, "main", "c")
+        memo = ServerResultMemo.query.one()
+        assert memo.expires_at is not None
+        memo.expires_at = memo.created_at.replace(year=2000)
+        from database import db  # pylint: disable=import-outside-toplevel
+
+        db.session.commit()
+
+        result = code_execution._run_prepared_code(
+            definition, "unused", args, "main", "c"
+        )
+
+    assert result["output"] == "a:2"
@@ -0,0 +1,221 @@
+"""Tests for archiving expired history rows into CID bundles."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database import db
+from db_access import create_cid_record, get_cid_by_path
+from models import (
+    CID,
+    Alias,
+    EntityInteraction,
+    PageView,
+    RetentionArchive,
+    ServerInvocation,
+)
+from retention import (
+    RetentionPolicy,
+    iter_archived_rows,
+    load_manifest,
+    policies_from_config,
+    run_retention,
+)
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def _views(*ages_in_days):
+    db.session.add_all(
+        PageView(path=f"/p{index}", viewed_at=NOW - timedelta(days=age))
+        for index, age in enumerate(ages_in_days)
+    )
+    db.session.commit()
+
+
+def _json_cid(value):
+    from cid_core import generate_cid  # pylint: disable=import-outside-toplevel
+    from cid_presenter import format_cid  # pylint: disable=import-outside-toplevel
+
+    payload = json.dumps(value, indent=2, sort_keys=True).encode("utf-8")
+    cid_value = format_cid(generate_cid(payload))
+    if CID.query.filter_by(path=f"/{cid_value}").first() is None:
+        create_cid_record(cid_value, payload)
+    return cid_value
+
+
+def _invocation(name, age_in_days, details):
+    invocation = ServerInvocation(
+        server_name=name,
+        result_cid="AAAAAAAA",
+        request_details_cid=_json_cid({"path": details, "padding": "x" * 100}),
+        invocation_cid=_json_cid({"server_name": name, "padding": "x" * 100}),
+        invoked_at=NOW - timedelta(days=age_in_days),
+    )
+    db.session.add(invocation)
+    db.session.commit()
+    return invocation
+
+
+def test_policies_read_config_and_environment(monkeypatch):
+    monkeypatch.setenv("RETENTION_PAGE_VIEWS_MAX_ROWS", "100")
+
+    policies = {
+        policy.table: policy
+        for policy in policies_from_config(
+            {"RETENTION_SERVER_INVOCATIONS_MAX_AGE_DAYS": "30"}
+        )
+    }
+
+    assert policies["page_views"].max_rows == 100
+    assert policies["server_invocations"].max_age == timedelta(days=30)
+    assert not policies["entity_interactions"].enabled
+
+
+def test_expired_rows_are_archived_then_deleted(memory_db_app):
+    _views(40, 35, 5, 1)
+
+    report = run_retention(
+        [RetentionPolicy("page_views", max_age=timedelta(days=30))],
+        batch_size=1,
+        now=NOW,
+    )
+
+    assert report.archived == {"page_views": 2}
+    assert len(report.bundles) == 2
+    assert sorted(view.path for view in PageView.query) == ["/p2", "/p3"]
+    assert RetentionArchive.query.one().manifest_cid == report.manifest_cid
+    archived = [row["path"] for row in iter_archived_rows(report.manifest_cid)]
+    assert archived == ["/p0", "/p1"]
+
+
+def test_interrupted_run_leaves_a_manifest_for_deleted_rows(
+    memory_db_app, monkeypatch
+):
+    import retention  # pylint: disable=import-outside-toplevel
+
+    _views(40, 35, 33)
+    real_delete = retention.delete_rows_by_id
+    calls = []
+
+    def delete_then_fail(model, ids):
+        calls.append(ids)
+        if len(calls) > 1:
+            raise RuntimeError("interrupted")
+        return real_delete(model, ids)
+
+    monkeypatch.setattr(retention, "delete_rows_by_id", delete_then_fail)
+
+    with pytest.raises(RuntimeError):
+        run_retention(
+            [RetentionPolicy("page_views", max_age=timedelta(days=30))],
+            batch_size=1,
+            now=NOW,
+        )
+
+    archive = RetentionArchive.query.one()
+    manifest = load_manifest(archive.manifest_cid)
+    assert manifest["complete"] is False
+    assert len(manifest["bundles"]) == 2
+    assert [row["path"] for row in iter_archived_rows(archive.manifest_cid)] == [
+        "/p0",
+        "/p1",
+    ]
+    assert sorted(view.path for view in PageView.query) == ["/p1", "/p2"]
+    # Only the latest manifest of the run is kept.
+    manifests = [
+        path
+        for (path,) in db.session.query(CID.path)
+        if b'"bundles"' in (get_cid_by_path(path).file_data or b"")
+    ]
+    assert manifests == [f"/{archive.manifest_cid}"]
+
+
+def test_max_rows_keeps_newest_rows(memory_db_app):
+    _views(4, 3, 2, 1)
+    db.session.add(
+        EntityInteraction(
+            entity_type="alias",
+            entity_name="old",
+            action="save",
+            content="x",
+            created_at=NOW - timedelta(days=400),
+        )
+    )
+    db.session.commit()
+
+    report = run_retention(
+        [
+            RetentionPolicy("page_views", max_rows=1),
+            RetentionPolicy("entity_interactions", max_age=timedelta(days=365)),
+        ],
+        now=NOW,
+    )
+
+    assert report.archived == {"page_views": 3, "entity_interactions": 1}
+    assert [view.path for view in PageView.query] == ["/p3"]
+    assert EntityInteraction.query.count() == 0
+    manifest = load_manifest(report.manifest_cid)
+    assert [bundle["table"] for bundle in manifest["bundles"]] == [
+        "page_views",
+        "entity_interactions",
+    ]
+
+
+def test_nothing_expired_writes_no_manifest(memory_db_app):
+    _views(1)
+
+    report = run_retention(
+        [RetentionPolicy("page_views", max_age=timedelta(days=30))], now=NOW
+    )
+
+    assert report.manifest_cid is None
+    assert RetentionArchive.query.count() == 0
+
+
+def test_orphaned_invocation_cids_are_collected(memory_db_app):
+    old = _invocation("old", 60, "/old")
+    kept_reference = _invocation("referenced", 60, "/referenced")
+    recent = _invocation("recent", 1, "/recent")
+    old_details, old_invocation_cid = old.request_details_cid, old.invocation_cid
+    pinned = kept_reference.request_details_cid
+    recent_details = recent.request_details_cid
+    db.session.add(Alias(name="pinned", definition=f"pinned -> /{pinned}"))
+    db.session.commit()
+
+    report = run_retention(
+        [RetentionPolicy("server_invocations", max_age=timedelta(days=30))],
+        now=NOW,
+    )
+
+    remaining = [invocation.server_name for invocation in ServerInvocation.query]
+    assert remaining == ["recent"]
+    assert old_details in report.collected_cids
+    assert old_invocation_cid in report.collected_cids
+    assert pinned not in report.collected_cids
+    remaining_paths = {path for (path,) in db.session.query(CID.path)}
+    assert f"/{old_details}" not in remaining_paths
+    assert f"/{pinned}" in remaining_paths
+    assert f"/{recent_details}" in remaining_paths
+
+    archived = {
+        row["server_name"]: row
+        for row in iter_archived_rows(report.manifest_cid, "server_invocations")
+    }
+    assert json.loads(archived["old"]["payloads"][old_details])["path"] == "/old"
+
+
+def test_archived_page_views_stay_in_history_statistics(memory_db_app):
+    from analytics import get_history_statistics  # pylint: disable=import-outside-toplevel
+
+    _views(40, 1)
+
+    run_retention(
+        [RetentionPolicy("page_views", max_age=timedelta(days=30))], now=NOW
+    )
+
+    assert PageView.query.count() == 1
+    assert get_history_statistics()["total_views"] == 2
@@ -17,6 +17,7 @@ from types import SimpleNamespace
 from unittest.mock import patch
 
 from flask import current_app
+from sqlalchemy import event
 
 # Set up test environment before importing app
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
@@ -940,6 +941,44 @@ def main(request):
         self.assertEqual(cids_category["items"][0]["name"], "/needle-104")
         self.assertEqual(cids_category["items"][-1]["name"], "/needle-005")
 
+    def test_definition_results_load_only_the_servers_on_the_page(self):
+        """Server search should read just the rows behind the returned hits."""
+
+        now = datetime.now(timezone.utc)
+        db.session.add_all(
+            Server(
+                name=f"needle-{index:02d}",
+                definition="pass",
+                created_at=now + timedelta(minutes=index),
+            )
+            for index in range(30)
+        )
+        db.session.add(Server(name="haystack", definition="pass"))
+        db.session.commit()
+        db.session.expunge_all()
+
+        loaded = []
+
+        def listener(target, _context):
+            loaded.append(target.name)
+
+        event.listen(Server, "load", listener)
+        try:
+            response = self.client.get(
+                "/search/results",
+                query_string={"q": "needle", "limit": 3, "offset": 2},
+            )
+        finally:
+            event.remove(Server, "load", listener)
+
+        servers = response.get_json()["categories"]["servers"]
+        self.assertEqual(servers["total"], 30)
+        self.assertEqual(
+            [item["name"] for item in servers["items"]],
+            ["needle-27", "needle-26", "needle-25"],
+        )
+        self.assertEqual(sorted(loaded), ["needle-25", "needle-26", "needle-27"])
+
     def test_index_cross_reference_skips_cids_without_named_server(self):
         """Servers lacking a name should not introduce orphan CID entries."""
         self.authenticate()
@@ -0,0 +1,230 @@
+"""Tests for CID-cached script files and the warm interpreter pool."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from server_execution import script_workers
+from server_execution.script_workers import (
+    DENO,
+    WorkerPool,
+    WorkerRuntime,
+    cached_script_path,
+    run_in_worker,
+)
+
+# A Python stand-in that speaks the same line protocol as the bb/deno bootstraps.
+_PYTHON_BOOTSTRAP = """\
+import base64, contextlib, io, json, os, sys
+
+for line in sys.stdin:
+    request = json.loads(line)
+    out, err = io.StringIO(), io.StringIO()
+    sys.stdin_payload = base64.b64decode(request["stdin"]).decode()
+    exit_code = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            exec(open(request["script"]).read(), {"pid": os.getpid()})
+        except Exception as exc:
+            print(exc, file=sys.stderr)
+            exit_code = 1
+    reply = {
+        "stdout": base64.b64encode(out.getvalue().encode()).decode(),
+        "stderr": base64.b64encode(err.getvalue().encode()).decode(),
+        "exit": exit_code,
+    }
+    sys.stdout.write(json.dumps(reply) + "\\n")
+    sys.stdout.flush()
+"""
+
+PYTHON = WorkerRuntime(
+    name="python",
+    bootstrap=_PYTHON_BOOTSTRAP,
+    suffix=".py",
+    incompatible_markers=("sys.exit",),
+)
+
+
+# A sandboxed stand-in: receives source, writes stray lines around its replies
+# and declines scripts mentioning COLD, as the Deno bootstrap does when it
+# cannot hand a script its stdin.
+_SANDBOXED_BOOTSTRAP = """\
+import base64, contextlib, io, json, sys
+
+token = sys.argv[-1]
+for line in sys.stdin:
+    request = json.loads(line)
+    print("stray output", flush=True)
+    if "COLD" in request["script"]:
+        print(token, json.dumps({"cold": True}), flush=True)
+        continue
+    out = io.StringIO()
+    sys.stdin_payload = base64.b64decode(request["stdin"]).decode()
+    with contextlib.redirect_stdout(out):
+        exec(request["script"], {})
+    reply = {
+        "stdout": base64.b64encode(out.getvalue().encode()).decode(),
+        "stderr": "",
+        "exit": 0,
+    }
+    print("not a reply", json.dumps(reply), flush=True)
+    print(token, json.dumps(reply), flush=True)
+"""
+
+SANDBOXED_PYTHON = WorkerRuntime(
+    name="sandboxed-python",
+    bootstrap=_SANDBOXED_BOOTSTRAP,
+    suffix=".py",
+    incompatible_markers=(),
+    sandboxed=True,
+)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("VIEWER_SCRIPT_CACHE_DIR", str(tmp_path))
+    yield
+    script_workers.shutdown_script_workers()
+
+
+def _run(pool, code, stdin=b"", timeout=5.0):
+    return pool.run(cached_script_path(code, ".py"), stdin, timeout=timeout)
+
+
+def test_cached_script_path_writes_each_script_once(tmp_path):
+    first = cached_script_path("echo hi\n", ".sh")
+    mtime = os.stat(first).st_mtime_ns
+
+    assert cached_script_path("echo hi\n", ".sh") == first
+    assert os.stat(first).st_mtime_ns == mtime
+    assert cached_script_path("echo bye\n", ".sh") != first
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(path)
+        for path in (first, cached_script_path("echo bye\n", ".sh"))
+    )
+
+
+def test_cached_script_path_replaces_tampered_files():
+    path = cached_script_path("echo hi\n", ".sh")
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write("echo pwned\n")
+
+    assert cached_script_path("echo hi\n", ".sh") == path
+    with open(path, encoding="utf-8") as handle:
+        assert handle.read() == "echo hi\n"
+
+
+def test_default_cache_dir_is_private(monkeypatch):
+    monkeypatch.delenv("VIEWER_SCRIPT_CACHE_DIR")
+
+    directory = script_workers.script_cache_dir()
+
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    assert script_workers.script_cache_dir() == directory
+
+
+def test_worker_is_reused_between_runs():
+    pool = WorkerPool(PYTHON, sys.executable, size=1, max_runs=10)
+
+    first = _run(pool, "print(pid)")
+    second = _run(pool, "import sys\nprint(sys.stdin_payload)", stdin=b"payload")
+
+    assert first[1:] == (0, b"")
+    assert second == (b"payload\n", 0, b"")
+    stats = pool.stats()
+    assert (stats["started"], stats["runs"], stats["idle"]) == (1, 2, 1)
+    assert _run(pool, "print(pid)")[0] == first[0]
+
+
+def test_worker_is_recycled_after_max_runs():
+    pool = WorkerPool(PYTHON, sys.executable, size=1, max_runs=2)
+
+    pids = {_run(pool, "print(pid)")[0] for _ in range(4)}
+
+    assert len(pids) == 2
+    assert pool.stats()["recycled"] == 2
+
+
+def test_script_errors_report_a_non_zero_exit():
+    pool = WorkerPool(PYTHON, sys.executable, size=1, max_runs=10)
+
+    stdout, exit_code, stderr = _run(pool, "raise ValueError('bad input')")
+
+    assert (stdout, exit_code) == (b"", 1)
+    assert b"bad input" in stderr
+
+
+def test_timeout_kills_the_worker():
+    pool = WorkerPool(PYTHON, sys.executable, size=1, max_runs=10)
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        _run(pool, "import time\ntime.sleep(10)", timeout=0.5)
+
+    stats = pool.stats()
+    assert (stats["workers"], stats["timeouts"]) == (0, 1)
+    assert _run(pool, "print('after')")[0] == b"after\n"
+
+
+def test_worker_dying_mid_run_is_not_retried_cold():
+    pool = WorkerPool(PYTHON, sys.executable, size=1, max_runs=10)
+
+    stdout, exit_code, stderr = _run(pool, "import os\nos._exit(0)")
+
+    assert (stdout, exit_code) == (b"", 1)
+    assert b"Script worker failed" in stderr
+    assert pool.stats()["failures"] == 1
+    assert _run(pool, "print('after')")[0] == b"after\n"
+
+
+def test_busy_pool_falls_back_to_a_dedicated_process():
+    pool = WorkerPool(PYTHON, sys.executable, size=0, max_runs=10)
+
+    assert _run(pool, "print(1)") is None
+    assert pool.stats()["busy_fallbacks"] == 1
+
+
+def test_incompatible_scripts_are_not_pooled(monkeypatch):
+    monkeypatch.setenv("SCRIPT_WORKER_POOL_SIZE", "1")
+
+    assert run_in_worker(PYTHON, sys.executable, "import sys\nsys.exit(3)", b"") is None
+    assert run_in_worker(PYTHON, sys.executable, "print(2)", b"") == (b"2\n", 0, b"")
+    assert script_workers.get_script_worker_stats()["python"]["runs"] == 1
+
+
+def test_sandboxed_workers_get_source_and_skip_stray_output(monkeypatch, tmp_path):
+    monkeypatch.setenv("SCRIPT_WORKER_POOL_SIZE", "1")
+    code = "import sys\nprint(sys.stdin_payload.upper())"
+
+    first = run_in_worker(SANDBOXED_PYTHON, sys.executable, code, b"chained")
+    second = run_in_worker(SANDBOXED_PYTHON, sys.executable, code, b"again")
+
+    assert (first, second) == ((b"CHAINED\n", 0, b""), (b"AGAIN\n", 0, b""))
+    stats = script_workers.get_script_worker_stats()["sandboxed-python"]
+    assert (stats["started"], stats["runs"]) == (1, 2)
+    # Only the bootstrap is written to disk; scripts travel as source.
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_declined_scripts_run_cold_and_keep_the_worker(monkeypatch):
+    monkeypatch.setenv("SCRIPT_WORKER_POOL_SIZE", "1")
+
+    assert run_in_worker(SANDBOXED_PYTHON, sys.executable, "COLD = 1", b"") is None
+    assert run_in_worker(SANDBOXED_PYTHON, sys.executable, "print(1)", b"") == (
+        b"1\n",
+        0,
+        b"",
+    )
+    stats = script_workers.get_script_worker_stats()["sandboxed-python"]
+    assert (stats["started"], stats["runs"], stats["failures"]) == (1, 1, 0)
+
+
+def test_deno_workers_get_no_permissions():
+    command = DENO.command("deno", "/cache/bootstrap.ts", "token")
+
+    assert command == ["deno", "run", "--quiet", "/cache/bootstrap.ts", "token"]
+    assert DENO.accepts("const input = await new Response(Deno.stdin.readable).text();")
+    assert not DENO.accepts('import { join } from "https://deno.land/std/path/mod.ts";')
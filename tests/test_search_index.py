@@ -0,0 +1,172 @@
+"""Tests for the persistent full-text search index."""
+
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Configure environment before importing app
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["SESSION_SECRET"] = "test-secret-key"
+os.environ["TESTING"] = "True"
+
+from sqlalchemy import text
+
+import search_index
+from app import create_app
+from change_tracking import mark_tables_changed
+from models import CID, Server, Variable, db
+
+
+class SearchIndexTestMixin:
+    backend_name = None
+
+    def setUp(self):
+        self._previous_backend = os.environ.get("SEARCH_INDEX_BACKEND")
+        if self.backend_name:
+            os.environ["SEARCH_INDEX_BACKEND"] = self.backend_name
+        self.app = create_app(
+            {"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"}
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        if self._previous_backend is None:
+            os.environ.pop("SEARCH_INDEX_BACKEND", None)
+        else:
+            os.environ["SEARCH_INDEX_BACKEND"] = self._previous_backend
+
+    def test_ranks_name_matches_first_then_newest(self):
+        now = datetime.now(timezone.utc)
+        db.session.add_all(
+            [
+                Server(name="other", definition="uses Needle", created_at=now),
+                Server(
+                    name="old-needle",
+                    definition="x",
+                    created_at=now - timedelta(days=1),
+                ),
+                Server(name="new-needle", definition="x", created_at=now),
+            ]
+        )
+        db.session.commit()
+
+        page = search_index.search("servers", "NEEDLE")
+
+        self.assertEqual(page.total, 3)
+        self.assertEqual(
+            [hit.key for hit in page.hits], ["new-needle", "old-needle", "other"]
+        )
+        self.assertEqual(page.hits[2].offset, 5)
+        self.assertEqual(page.hits[2].snippet, "uses Needle")
+
+    def test_pagination_and_snippet_window(self):
+        body = "a" * 200 + "needle" + "b" * 200
+        db.session.add_all(
+            [Variable(name=f"var{i}", definition=body) for i in range(5)]
+        )
+        db.session.commit()
+
+        page = search_index.search("variables", "needle", limit=2, offset=3, context=10)
+
+        self.assertEqual(page.total, 5)
+        self.assertEqual(len(page.hits), 2)
+        hit = page.hits[0]
+        self.assertEqual(hit.offset, 200)
+        self.assertEqual(hit.snippet_start, 190)
+        self.assertEqual(hit.snippet, "a" * 10 + "needle" + "b" * 10)
+        self.assertEqual(hit.body_length, len(body))
+
+    def test_updates_and_deletes_are_reflected(self):
+        server = Server(name="srv", definition="first version")
+        db.session.add(server)
+        db.session.commit()
+        self.assertEqual(search_index.search("servers", "first").total, 1)
+
+        server.definition = "second version"
+        db.session.commit()
+        self.assertEqual(search_index.search("servers", "first").total, 0)
+        self.assertEqual(search_index.search("servers", "second").total, 1)
+
+        db.session.delete(server)
+        db.session.commit()
+        self.assertEqual(search_index.search("servers", "second").total, 0)
+
+    def test_cid_content_and_short_queries(self):
+        cid = CID(path="/example", file_data=b"hello indexed world", file_size=19)
+        binary = CID(path="/binary", file_data=b"\xff\xfe hello", file_size=8)
+        db.session.add_all([cid, binary])
+        db.session.commit()
+
+        hits = search_index.search("cids", "indexed").hits
+        self.assertEqual([(hit.key, hit.entity_id) for hit in hits], [("/example", cid.id)])
+        self.assertEqual(
+            [hit.key for hit in search_index.search("cids", "lo").hits], ["/example"]
+        )
+
+    def test_non_ascii_matches_keep_their_offsets(self):
+        db.session.add_all(
+            [
+                Server(name="École", definition="Çà et là: Grüße aus İzmir, ÉCOLE"),
+                Server(name="plain", definition="nothing here"),
+            ]
+        )
+        db.session.commit()
+
+        (hit,) = search_index.search("servers", "écol").hits
+        self.assertTrue(hit.name_match)
+        self.assertEqual(hit.offset, 27)
+        self.assertEqual(hit.snippet[hit.offset - hit.snippet_start :][:5], "ÉCOLE")
+
+        # Short queries are matched without the trigram index.
+        (hit,) = search_index.search("servers", "çà").hits
+        self.assertEqual(hit.offset, 0)
+
+        # "İ" lowercases to two characters; offsets after it still line up.
+        (hit,) = search_index.search("servers", "ZMIR").hits
+        self.assertEqual(hit.offset, 21)
+
+    def test_rebuilds_kinds_written_around_the_orm(self):
+        db.session.add(Server(name="srv", definition="tracked"))
+        db.session.commit()
+        self.assertEqual(search_index.search("servers", "untracked").total, 0)
+
+        db.session.execute(
+            text(
+                "INSERT INTO server (name, definition, enabled) "
+                "VALUES ('raw', 'untracked text', 1)"
+            )
+        )
+        db.session.commit()
+        mark_tables_changed("server")
+
+        self.assertEqual(
+            [hit.key for hit in search_index.search("servers", "untracked").hits],
+            ["raw"],
+        )
+
+        Server.query.filter_by(name="srv").update({"definition": "bulk edit"})
+        db.session.commit()
+
+        self.assertEqual(search_index.search("servers", "bulk").total, 1)
+
+
+class TestSQLiteSearchIndex(SearchIndexTestMixin, unittest.TestCase):
+    def test_uses_fts5_when_available(self):
+        if not search_index._sqlite_supports_trigram():
+            self.skipTest("SQLite build lacks the FTS5 trigram tokenizer")
+        self.assertIsInstance(
+            search_index.backend_for(db.engine), search_index.SQLiteFTSIndex
+        )
+
+
+class TestMemorySearchIndex(SearchIndexTestMixin, unittest.TestCase):
+    backend_name = "memory"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,8 @@ import unittest
 from datetime import datetime, timezone
 from types import SimpleNamespace
 
-from flask import Flask
+import pytest
+from flask import Flask, redirect
 
 from cid_utils import serve_cid_content
 
@@ -228,5 +229,174 @@ class TestServeCidContent(unittest.TestCase):
         self.assertIn("Plain text rendered as markdown", body)
 
 
+    def test_full_response_advertises_byte_ranges(self):
+        response = self._serve("/bafybeihelloworld123456789012345678901234567890123456")
+        self.assertEqual(response.headers.get("Accept-Ranges"), "bytes")
+
+    def test_single_range_returns_partial_content(self):
+        path = "/bafybeihelloworld123456789012345678901234567890123456.pdf"
+        response = self._serve(path, headers={"Range": "bytes=5-11"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), b"content")
+        self.assertEqual(response.headers.get("Content-Range"), "bytes 5-11/12")
+        self.assertEqual(response.headers.get("Content-Length"), "7")
+        self.assertEqual(
+            response.headers.get("ETag"),
+            '"bafybeihelloworld123456789012345678901234567890123456"',
+        )
+        self.assertIn("immutable", response.headers.get("Cache-Control"))
+
+    def test_suffix_range_returns_tail(self):
+        path = "/bafybeihelloworld123456789012345678901234567890123456.pdf"
+        response = self._serve(path, headers={"Range": "bytes=-4"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), b"tent")
+        self.assertEqual(response.headers.get("Content-Range"), "bytes 8-11/12")
+
+    def test_unsatisfiable_range_returns_416(self):
+        path = "/bafybeihelloworld123456789012345678901234567890123456.pdf"
+        response = self._serve(path, headers={"Range": "bytes=50-60"})
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers.get("Content-Range"), "bytes */12")
+
+    def test_multiple_ranges_return_multipart_byteranges(self):
+        path = "/bafybeihelloworld123456789012345678901234567890123456.pdf"
+        response = self._serve(path, headers={"Range": "bytes=0-3,5-11"})
+
+        self.assertEqual(response.status_code, 206)
+        content_type = response.headers.get("Content-Type")
+        self.assertTrue(content_type.startswith("multipart/byteranges; boundary="))
+        boundary = content_type.split("boundary=", 1)[1]
+        body = response.get_data()
+        self.assertEqual(int(response.headers.get("Content-Length")), len(body))
+        self.assertIn(b"Content-Range: bytes 0-3/12\r\n\r\ntest\r\n", body)
+        self.assertIn(b"Content-Range: bytes 5-11/12\r\n\r\ncontent\r\n", body)
+        self.assertTrue(body.endswith(f"--{boundary}--\r\n".encode()))
+
+    def test_if_range_with_matching_etag_applies_range(self):
+        path = "/bafybeihelloworld123456789012345678901234567890123456.pdf"
+        response = self._serve(
+            path,
+            headers={
+                "Range": "bytes=0-3",
+                "If-Range": '"bafybeihelloworld123456789012345678901234567890123456"',
+            },
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), b"test")
+
+    def test_if_range_with_stale_validator_returns_full_body(self):
+        path = "/bafybeihelloworld123456789012345678901234567890123456.pdf"
+        for validator in ('"some-other-cid"', "Wed, 21 Oct 2015 07:28:00 GMT"):
+            with self.subTest(validator=validator):
+                response = self._serve(
+                    path, headers={"Range": "bytes=0-3", "If-Range": validator}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get_data(), b"test content")
+
+    def test_streamable_records_are_read_in_slices(self):
+        data = bytes(range(256)) * 4
+        reads = []
+
+        class StreamedRecord:
+            path = "/bafybeihelloworld123456789012345678901234567890123456"
+            file_size = len(data)
+            created_at = self.cid_content.created_at
+
+            @property
+            def file_data(self):
+                raise AssertionError("raw content should not be materialized")
+
+            def iter_data(self, start=0, end=None):
+                stop = len(data) if end is None else end
+                for offset in range(start, stop, 100):
+                    reads.append(offset)
+                    yield data[offset : min(offset + 100, stop)]
+
+        path = "/bafybeihelloworld123456789012345678901234567890123456.pdf"
+        full = self._serve(path, content=StreamedRecord())
+        self.assertEqual(full.get_data(), data)
+        self.assertEqual(full.headers.get("Content-Length"), str(len(data)))
+        self.assertEqual(len(reads), 11)
+
+        partial = self._serve(
+            path, headers={"Range": "bytes=300-309"}, content=StreamedRecord()
+        )
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.get_data(), data[300:310])
+    def test_bare_cids_are_labelled_from_the_whole_stream(self):
+        text = "é".encode("utf-8") * 20000
+        cases = [
+            (text, "text/plain; charset=utf-8"),
+            (text + b"\xff", "application/octet-stream"),
+            (b"\xff\xfe" + bytes(range(256)) * 100, "application/octet-stream"),
+        ]
+        for data, expected_type in cases:
+            with self.subTest(expected_type=expected_type):
+                reads = []
+
+                class StreamedRecord:
+                    path = "/bafybeihelloworld123456789012345678901234567890123456"
+                    payload = data
+                    file_size = len(data)
+                    created_at = self.cid_content.created_at
+                    read_log = reads
+
+                    @property
+                    def file_data(self):
+                        raise AssertionError("raw content should not be materialized")
+
+                    def iter_data(self, start=0, end=None):
+                        stop = len(self.payload) if end is None else end
+                        self.read_log.append((start, stop))
+                        for offset in range(start, stop, 4096):
+                            yield self.payload[offset : min(offset + 4096, stop)]
+
+                response = self._serve(
+                    "/bafybeihelloworld123456789012345678901234567890123456",
+                    headers={"Range": "bytes=0-9"},
+                    content=StreamedRecord(),
+                )
+
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.headers.get("Content-Type"), expected_type)
+                self.assertEqual(response.get_data(), data[:10])
+                self.assertEqual(reads, [(0, len(data)), (0, 10)])
+
+
+@pytest.mark.parametrize("database", ["memory", "disk"])
+def test_redirect_to_a_streamed_cid_is_followed_in_process(tmp_path, database):
+    # pylint: disable=import-outside-toplevel
+    from app import create_app
+    from cid_presenter import format_cid
+    from cid_utils import generate_cid
+    from database import db
+    from db_access import create_cid_record
+
+    uri = (
+        "sqlite:///:memory:"
+        if database == "memory"
+        else f"sqlite:///{tmp_path / 'streamed.db'}"
+    )
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": uri})
+    content = b"streamed after a redirect\n" * 20000
+    cid_value = format_cid(generate_cid(content))
+    with app.app_context():
+        db.create_all()
+        create_cid_record(cid_value, content)
+    app.add_url_rule(
+        "/redirect-to-cid", "redirect_to_cid", lambda: redirect(f"/{cid_value}.txt")
+    )
+
+    # No app context is pushed here, as in the one-shot CLI.
+    with app.test_client() as client:
+        response = client.get("/redirect-to-cid", follow_redirects=True)
+        assert response.status_code == 200
+        assert response.get_data() == content
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,202 @@
+"""Tests for the server definition version index."""
+
+import json
+import os
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+# Configure environment before importing app
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+os.environ["SESSION_SECRET"] = "test-secret-key"
+os.environ["TESTING"] = "True"
+
+from app import create_app
+from cid_core import generate_cid
+from cid_utils import store_server_definitions_cid
+from db_access import server_versions
+from db_access import (
+    backfill_server_definition_versions,
+    create_cid_record,
+    ensure_server_definition_versions,
+    get_server_definition_versions,
+    record_server_definition_versions,
+)
+from models import CID, Server, db
+from routes.import_export.import_entities import impl_import_servers
+from routes.server_definition_history import get_server_definition_history
+
+LONG_BODY = "def main():\n    return {'output': '%s'}\n" % ("x" * 80)
+
+
+class TestServerDefinitionVersions(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(
+            {"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"}
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_recording_is_idempotent_and_skips_other_names(self):
+        definitions = {"alpha": LONG_BODY, "beta": {"not": "text"}}
+
+        self.assertEqual(record_server_definition_versions("/SNAP", definitions), 2)
+        self.assertEqual(record_server_definition_versions("SNAP", definitions), 0)
+        self.assertEqual(
+            record_server_definition_versions(
+                "OTHER", definitions, server_names=["alpha", "missing"]
+            ),
+            1,
+        )
+
+        beta = get_server_definition_versions("beta")
+        self.assertEqual(
+            [(v.snapshot_cid, v.definition_cid) for v in beta], [("SNAP", None)]
+        )
+        self.assertEqual(len(get_server_definition_versions("alpha")), 2)
+
+    def test_prefix_lookup_matches_definition_cids(self):
+        first, second = LONG_BODY, LONG_BODY.replace("x", "y")
+        record_server_definition_versions("SNAP1", {"srv": first})
+        record_server_definition_versions("SNAP2", {"srv": second})
+        first_cid = generate_cid(first.encode("utf-8"))
+
+        matches = get_server_definition_versions("srv", first_cid[:12])
+
+        self.assertEqual([v.definition_cid for v in matches], [first_cid])
+        self.assertEqual(get_server_definition_versions("srv", "zz_%"), [])
+        self.assertEqual(get_server_definition_versions("other", first_cid[:12]), [])
+
+    def test_saving_servers_indexes_the_snapshot(self):
+        db.session.add(Server(name="srv", definition=LONG_BODY))
+        db.session.commit()
+
+        snapshot_cid = store_server_definitions_cid()
+
+        history = get_server_definition_history("srv")
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0]["snapshot_cid"], snapshot_cid)
+        self.assertEqual(history[0]["definition"], LONG_BODY)
+        self.assertTrue(history[0]["is_current"])
+
+        prefix = history[0]["definition_cid"][:10]
+        self.assertEqual(len(get_server_definition_history("srv", prefix)), 1)
+
+    def _insert_unindexed_cid(self, data):
+        """Store ``data`` as a CID the way older databases hold it."""
+        cid_value = generate_cid(data)
+        db.session.execute(
+            CID.__table__.insert().values(
+                path=f"/{cid_value}",
+                file_data=data,
+                file_size=len(data),
+                created_at=datetime.now(timezone.utc),
+            )
+        )
+        db.session.commit()
+        return cid_value
+
+    def test_inserted_snapshot_cids_are_indexed(self):
+        db.session.add(Server(name="srv", definition=LONG_BODY.replace("x", "y")))
+        db.session.commit()
+        snapshot = json.dumps(
+            {"srv": LONG_BODY, "later": "print(1)", "other": "print(2)"}
+        ).encode("utf-8")
+        snapshot_cid = generate_cid(snapshot)
+        create_cid_record(snapshot_cid, snapshot)
+        create_cid_record(generate_cid(b"{" * 80), b"{" * 80)
+
+        (version,) = get_server_definition_versions("srv")
+        self.assertEqual(version.snapshot_cid, snapshot_cid)
+        self.assertEqual(
+            version.definition_cid, generate_cid(LONG_BODY.encode("utf-8"))
+        )
+        history = get_server_definition_history("srv")
+        self.assertEqual([entry["snapshot_cid"] for entry in history], [snapshot_cid])
+        self.assertEqual(history[0]["definition"], LONG_BODY)
+        # Keys that name no server are not indexed.
+        self.assertEqual(get_server_definition_versions("later"), [])
+
+        # A server created after its snapshot was stored still sees it.
+        db.session.add(Server(name="later", definition="print(3)"))
+        db.session.commit()
+        (later,) = get_server_definition_versions("later")
+        self.assertEqual(later.snapshot_cid, snapshot_cid)
+        self.assertEqual(get_server_definition_versions("other"), [])
+
+    def test_creating_a_server_reads_only_indexed_snapshots(self):
+        for index in range(5):
+            payload = json.dumps({"new": "print(1)", "index": index}).encode("utf-8")
+            create_cid_record(generate_cid(payload), payload)
+
+        with patch.object(
+            server_versions,
+            "snapshot_definitions",
+            wraps=server_versions.snapshot_definitions,
+        ) as parsed:
+            db.session.add(Server(name="new", definition="print(2)"))
+            db.session.commit()
+
+        parsed.assert_not_called()
+
+    def test_imported_servers_see_snapshots_stored_before_them(self):
+        snapshot = json.dumps({"srv": LONG_BODY}).encode("utf-8")
+        snapshot_cid = generate_cid(snapshot)
+        create_cid_record(snapshot_cid, snapshot)
+        self.assertEqual(get_server_definition_versions("srv"), [])
+
+        imported, errors, _names = impl_import_servers(
+            [{"name": "srv", "definition": "print(1)"}]
+        )
+
+        self.assertEqual((imported, errors), (1, []))
+        snapshots = {
+            version.snapshot_cid for version in get_server_definition_versions("srv")
+        }
+        self.assertIn(snapshot_cid, snapshots)
+
+    def test_backfill_indexes_existing_snapshots(self):
+        db.session.add(Server(name="srv", definition=LONG_BODY))
+        db.session.commit()
+        snapshot = json.dumps({"srv": LONG_BODY, "gone": "print(1)"}).encode("utf-8")
+        snapshot_cid = self._insert_unindexed_cid(snapshot)
+        self._insert_unindexed_cid(b"[" * 80)
+        self.assertEqual(get_server_definition_versions("srv"), [])
+
+        self.assertEqual(backfill_server_definition_versions(batch_size=1), 1)
+        self.assertEqual(backfill_server_definition_versions(), 0)
+
+        (version,) = get_server_definition_versions("srv")
+        self.assertEqual(version.snapshot_cid, snapshot_cid)
+        self.assertEqual(
+            version.definition_cid, generate_cid(LONG_BODY.encode("utf-8"))
+        )
+        self.assertIsNotNone(version.created_at)
+        self.assertLessEqual(
+            version.created_at.replace(tzinfo=timezone.utc),
+            datetime.now(timezone.utc),
+        )
+        self.assertEqual(get_server_definition_versions("gone"), [])
+
+    def test_ensure_backfills_only_an_empty_index(self):
+        self.assertFalse(ensure_server_definition_versions())
+        db.session.add(Server(name="srv", definition=LONG_BODY))
+        db.session.commit()
+
+        self._insert_unindexed_cid(json.dumps({"srv": LONG_BODY}).encode("utf-8"))
+        self.assertTrue(ensure_server_definition_versions())
+        self.assertEqual(len(get_server_definition_versions("srv")), 1)
+
+        self._insert_unindexed_cid(json.dumps({"srv": "print(2)"}).encode("utf-8"))
+        self.assertFalse(ensure_server_definition_versions())
+        self.assertEqual(len(get_server_definition_versions("srv")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -757,17 +757,15 @@ class TestMissingParameterError(unittest.TestCase):
         assert "param2" in str(error)
 
 
-def test_run_bash_script_times_out(monkeypatch):
-    removed_paths: list[str] = []
+def test_run_bash_script_times_out(monkeypatch, tmp_path):
+    commands: list[list[str]] = []
 
     def fake_run(cmd, input=None, capture_output=None, check=None, timeout=None):  # noqa: A002  # pylint: disable=redefined-builtin
+        commands.append(cmd)
         raise subprocess.TimeoutExpired(cmd, timeout)
 
     monkeypatch.setattr("server_execution.code_execution.subprocess.run", fake_run)
-    monkeypatch.setattr(
-        "server_execution.code_execution.os.remove",
-        removed_paths.append,
-    )
+    monkeypatch.setenv("VIEWER_SCRIPT_CACHE_DIR", str(tmp_path))
 
     def empty_request_args():
         return {}
@@ -785,7 +783,8 @@ def test_run_bash_script_times_out(monkeypatch):
     assert status_code == 504
     assert b"timed out" in stdout
     assert stderr == b""
-    assert removed_paths
+    # The script stays cached under its CID for the next invocation.
+    assert commands[0][1].startswith(str(tmp_path))
 
 
 def test_execute_bash_server_response_returns_non_200_success(monkeypatch):
@@ -110,3 +110,91 @@ def test_resolve_variable_values_returns_copy_when_prefetch_skipped(monkeypatch)
 
 def test_fetch_variable_content_returns_none_without_app_context():
     assert server_execution._fetch_variable_content("/value") is None
+
+
+def test_lazy_variables_fetch_only_what_is_read():
+    from server_execution.variable_resolution import LazyVariables  # pylint: disable=no-name-in-module
+
+    batches = []
+
+    def fetch(paths):
+        paths = list(paths)
+        batches.append(paths)
+        return {path: f"content of {path}" for path in paths if path != "/missing"}
+
+    variables = LazyVariables(
+        {"a": "/one", "b": "/two", "c": "plain", "d": "/missing"}, fetch
+    )
+
+    assert variables["a"] == "content of /one"
+    assert variables["c"] == "plain"
+    assert variables["a"] == "content of /one"
+    assert batches == [["/one"]]
+    assert variables.pending == {"b", "d"}
+
+    assert dict(variables.items()) == {
+        "a": "content of /one",
+        "b": "content of /two",
+        "c": "plain",
+        "d": "/missing",
+    }
+    assert batches == [["/one"], ["/two", "/missing"]]
+
+
+def test_lazy_variables_copy_is_a_resolved_dict():
+    import copy
+
+    from server_execution.variable_resolution import LazyVariables  # pylint: disable=no-name-in-module
+
+    variables = LazyVariables({"a": "/one"}, lambda paths: {p: "x" for p in paths})
+
+    copied = copy.deepcopy(variables)
+
+    assert isinstance(copied, dict)
+    assert not isinstance(copied, LazyVariables)
+    assert copied == {"a": "x"}
+
+
+def test_lazy_variables_builtin_copies_are_resolved():
+    from server_execution.variable_resolution import LazyVariables  # pylint: disable=no-name-in-module
+
+    def make():
+        return LazyVariables(
+            {"a": "/one", "b": "plain"}, lambda paths: {p: "x" for p in paths}
+        )
+
+    expected = {"a": "x", "b": "plain"}
+    assert dict(make()) == expected
+    assert {**make()} == expected
+    assert make() | {} == expected
+    assert {} | make() == expected
+    updated = {}
+    updated.update(make())
+    assert updated == expected
+
+    variables = make()
+    variables |= {"a": "override"}
+    assert variables["a"] == "override"
+
+
+def test_fetch_variable_values_reuses_request_and_cid_caches(flask_app, monkeypatch):
+    from server_execution import variable_resolution  # pylint: disable=no-name-in-module
+
+    calls = []
+    monkeypatch.setattr(
+        variable_resolution,
+        "_fetch_variable_content",
+        lambda path: calls.append(path) or f"value:{path}",
+    )
+    monkeypatch.setattr(variable_resolution, "_is_cid_path", lambda path: path == "/cid")
+    variable_resolution.clear_variable_value_cache()
+
+    with flask_app.test_request_context("/first"):
+        variable_resolution.fetch_variable_values(["/server", "/cid"])
+        variable_resolution.fetch_variable_values(["/server"])
+    with flask_app.test_request_context("/second"):
+        result = variable_resolution.fetch_variable_values(["/server", "/cid"])
+
+    variable_resolution.clear_variable_value_cache()
+    assert result == {"/server": "value:/server", "/cid": "value:/cid"}
+    assert sorted(calls) == ["/cid", "/server", "/server"]
@@ -15,7 +15,16 @@ import json
 from datetime import datetime, timezone
 
 # Import route helper for testing
-from routes.servers import get_server_definition_history
+from routes.server_definition_history import get_server_definition_history
+
+
+def _index(snapshots):
+    """Return patch targets serving ``snapshots`` as indexed versions."""
+    versions = [Mock(snapshot_cid=cid.path) for cid in snapshots]
+    return (
+        patch("routes.server_definition_history.get_server_definition_versions", return_value=versions),
+        patch("routes.server_definition_history.get_cids_by_paths", return_value=list(snapshots)),
+    )
 
 
 class TestServerHistory(unittest.TestCase):
@@ -25,18 +34,16 @@ class TestServerHistory(unittest.TestCase):
         """Set up test fixtures"""
         self.server_name = "test_server"
 
-    @patch("routes.servers.get_uploads")
-    def test_get_server_definition_history_empty(self, mock_get_uploads):
-        """Test getting history when no CIDs exist"""
-        # Mock empty query result
-        mock_get_uploads.return_value = []
+    @patch("routes.server_definition_history.get_server_definition_versions")
+    def test_get_server_definition_history_empty(self, mock_get_versions):
+        """Test getting history when no versions are indexed"""
+        mock_get_versions.return_value = []
 
         history = get_server_definition_history(self.server_name)
 
         self.assertEqual(history, [])
 
-    @patch("routes.servers.get_uploads")
-    def test_get_server_definition_history_with_data(self, mock_get_uploads):
+    def test_get_server_definition_history_with_data(self):
         """Test getting history with actual server definitions"""
         # Create mock CID objects
         mock_cid1 = Mock()
@@ -56,10 +63,10 @@ class TestServerHistory(unittest.TestCase):
             }
         ).encode("utf-8")
 
-        # Mock query to return CIDs in reverse chronological order (newest first)
-        mock_get_uploads.return_value = [mock_cid2, mock_cid1]
-
-        history = get_server_definition_history(self.server_name)
+        # The index returns versions in reverse chronological order (newest first)
+        versions_patch, records_patch = _index([mock_cid2, mock_cid1])
+        with versions_patch, records_patch:
+            history = get_server_definition_history(self.server_name)
 
         # Should return 2 entries, newest first
         self.assertEqual(len(history), 2)
@@ -82,8 +89,7 @@ class TestServerHistory(unittest.TestCase):
             datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
         )
 
-    @patch("routes.servers.get_uploads")
-    def test_get_server_definition_history_ignores_invalid_json(self, mock_get_uploads):
+    def test_get_server_definition_history_ignores_invalid_json(self):
         """Test that invalid JSON CIDs are ignored"""
         # Create mock CID with invalid JSON
         mock_cid_invalid = Mock()
@@ -101,17 +107,16 @@ class TestServerHistory(unittest.TestCase):
             "utf-8"
         )
 
-        mock_get_uploads.return_value = [mock_cid_valid, mock_cid_invalid]
-
-        history = get_server_definition_history(self.server_name)
+        versions_patch, records_patch = _index([mock_cid_valid, mock_cid_invalid])
+        with versions_patch, records_patch:
+            history = get_server_definition_history(self.server_name)
 
         # Should only return the valid entry
         self.assertEqual(len(history), 1)
         self.assertEqual(history[0]["snapshot_cid"], "cid_valid")
         self.assertEqual(history[0]["definition"], "print('valid')")
 
-    @patch("routes.servers.get_uploads")
-    def test_get_server_definition_history_server_not_in_cid(self, mock_get_uploads):
+    def test_get_server_definition_history_server_not_in_cid(self):
         """Test that CIDs without the requested server are ignored"""
         # Create mock CID that doesn't contain our server
         mock_cid = Mock()
@@ -121,16 +126,15 @@ class TestServerHistory(unittest.TestCase):
             {"other_server": "print('other')", "another_server": "print('another')"}
         ).encode("utf-8")
 
-        mock_get_uploads.return_value = [mock_cid]
-
-        history = get_server_definition_history(self.server_name)
+        versions_patch, records_patch = _index([mock_cid])
+        with versions_patch, records_patch:
+            history = get_server_definition_history(self.server_name)
 
         # Should return empty list since our server isn't in any CID
         self.assertEqual(history, [])
 
-    @patch("routes.servers.get_uploads")
     def test_get_server_definition_history_raises_helpful_error_for_non_string_definition(
-        self, mock_get_uploads
+        self,
     ):
         mock_cid = Mock()
         mock_cid.path = "cid_bad_value"
@@ -139,9 +143,9 @@ class TestServerHistory(unittest.TestCase):
             {"test_server": {"not": "a string"}, "other_server": "print('other')"}
         ).encode("utf-8")
 
-        mock_get_uploads.return_value = [mock_cid]
-
-        history = get_server_definition_history(self.server_name)
+        versions_patch, records_patch = _index([mock_cid])
+        with versions_patch, records_patch:
+            history = get_server_definition_history(self.server_name)
         self.assertEqual(len(history), 1)
         entry = history[0]
 
@@ -0,0 +1,39 @@
+"""Tests for startup phase timing."""
+
+from __future__ import annotations
+
+from startup_timing import (
+    MAX_PHASES,
+    get_startup_phases,
+    reset_startup_phases,
+    startup_phase,
+)
+
+
+def test_nested_phases_record_their_depth():
+    reset_startup_phases()
+
+    with startup_phase("outer"):
+        with startup_phase("inner"):
+            pass
+
+    phases = get_startup_phases()
+    assert [(name, depth) for name, depth, _seconds in phases] == [
+        ("outer", 0),
+        ("inner", 1),
+    ]
+    assert all(seconds is not None for _name, _depth, seconds in phases)
+
+
+def test_only_the_most_recent_phases_are_kept():
+    reset_startup_phases()
+
+    for index in range(MAX_PHASES + 10):
+        with startup_phase(f"phase-{index}"):
+            pass
+
+    phases = get_startup_phases()
+    assert len(phases) == MAX_PHASES
+    assert phases[0][0] == "phase-10"
+    reset_startup_phases()
+    assert not get_startup_phases()
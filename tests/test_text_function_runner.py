@@ -10,7 +10,8 @@ class TestRunTextFunction(unittest.TestCase):
     def setUp(self):
         """Ensure we're testing the actual run_text_function implementation."""
         module = importlib.import_module("text_function_runner")
-        self.run_text_function = importlib.reload(module).run_text_function
+        self.module = importlib.reload(module)
+        self.run_text_function = self.module.run_text_function
 
     def test_basic_functionality(self):
         """Test basic function execution with simple arguments."""
@@ -271,6 +272,41 @@ return value["number"]
             with self.assertRaises(ValueError):
                 self.run_text_function(body, argmap)
 
+    def test_repeated_bodies_skip_compilation(self):
+        """The same body and parameters should reuse the compiled code."""
+        body = "counter = globals().setdefault('counter', [])\ncounter.append(x)\nreturn len(counter)"
+
+        with patch("builtins.compile", wraps=compile) as mock_compile:
+            first = self.run_text_function(body, {"x": 1})
+            second = self.run_text_function(body, {"x": 2})
+
+        self.assertEqual(mock_compile.call_count, 1)
+        # Globals are still fresh for every call.
+        self.assertEqual((first, second), (1, 1))
+        stats = self.module.get_compiled_code_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_different_parameters_compile_separately(self):
+        """The parameter list is part of the cache key."""
+        body = "return sorted(locals())"
+
+        self.assertEqual(self.run_text_function(body, {"a": 1}), ["a"])
+        self.assertEqual(self.run_text_function(body, {"a": 1, "b": 2}), ["a", "b"])
+        self.assertEqual(self.module.get_compiled_code_cache_stats()["entries"], 2)
+
+    def test_cache_evicts_least_recently_used(self):
+        """Only the configured number of code objects is retained."""
+        self.module.configure_compiled_code_cache(2)
+
+        for value in range(3):
+            self.run_text_function(f"return {value}", {})
+        self.run_text_function("return 2", {})
+
+        stats = self.module.get_compiled_code_cache_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 1)
+
 
 if __name__ == "__main__":
     unittest.main()
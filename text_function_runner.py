@@ -1,9 +1,14 @@
 import builtins
 import hashlib
+import os
 import textwrap
+import threading
 import typing
+from collections import OrderedDict
+from types import CodeType
 from typing import (
     Any,
+    Callable,
     Dict,
     Iterable,
     List,
@@ -75,6 +80,119 @@ _SAFE_TYPING_GLOBALS = {
 }
 
 
+DEFAULT_COMPILED_CODE_CACHE_SIZE = 256
+
+
+def _default_cache_size() -> int:
+    try:
+        return int(
+            os.environ.get(
+                "TEXT_FUNCTION_CACHE_SIZE", DEFAULT_COMPILED_CODE_CACHE_SIZE
+            )
+        )
+    except ValueError:
+        return DEFAULT_COMPILED_CODE_CACHE_SIZE
+
+
+CacheKey = Tuple[str, Tuple[str, ...]]
+
+
+class CompiledCodeCache:
+    """LRU of compiled function definitions keyed by body hash and parameters.
+
+    Only the code object is cached; each call still executes it in a fresh
+    namespace, so user code never shares globals between requests.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, Tuple[CodeType, int]]" = OrderedDict()
+        self.max_entries = max(0, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._source_bytes = 0
+
+    def get_or_compile(self, key: CacheKey, build_source: Callable[[], str]) -> CodeType:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        src = build_source()
+        code = compile(src, "<string>", "exec")
+        if self.max_entries == 0:
+            return code
+
+        with self._lock:
+            if key not in self._entries:
+                size = len(src.encode("utf-8"))
+                self._entries[key] = (code, size)
+                self._source_bytes += size
+                while len(self._entries) > self.max_entries:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._source_bytes -= evicted_size
+                    self.evictions += 1
+        return code
+
+    def resize(self, max_entries: int) -> None:
+        with self._lock:
+            self.max_entries = max(0, max_entries)
+            while len(self._entries) > self.max_entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._source_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._source_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "source_bytes": self._source_bytes,
+            }
+
+
+_compiled_code_cache = CompiledCodeCache(_default_cache_size())
+
+
+def configure_compiled_code_cache(max_entries: int) -> None:
+    """Set how many compiled server bodies are kept (0 disables caching)."""
+    _compiled_code_cache.resize(max_entries)
+
+
+def get_compiled_code_cache_stats() -> Dict[str, int]:
+    """Return size, hit/miss and eviction counters for the compiled-code LRU."""
+    return _compiled_code_cache.stats()
+
+
+def clear_compiled_code_cache() -> None:
+    """Drop every cached code object and reset the counters."""
+    _compiled_code_cache.clear()
+
+
+def base_namespace() -> Dict[str, Any]:
+    """Return the globals every server body starts with: builtins and helpers."""
+    ns: Dict[str, Any] = {
+        "__builtins__": builtins,
+        "save": _save_content,
+        "load": _load_content,
+    }
+    ns.update(_SAFE_TYPING_GLOBALS)
+    return ns
+
+
 def run_text_function(
     body_text: str,
     arg_map: Dict[str, object],
@@ -98,26 +216,26 @@ def run_text_function(
     param_names = sorted(arg_map.keys())
 
     # Hash-based function name (deterministic for same body_text)
-    h = hashlib.sha256(body_text.encode("utf-8")).hexdigest()[:12]
-    fn_name = f"_fn_{h}"
+    digest = hashlib.sha256(body_text.encode("utf-8")).hexdigest()
+    fn_name = f"_fn_{digest[:12]}"
+
+    # Compose and compile the source, unless this body was compiled before
+    def build_source() -> str:
+        return f"def {fn_name}({', '.join(param_names)}):\n{textwrap.indent(body_text, '    ')}"
 
-    # Compose the source
-    src = f"def {fn_name}({', '.join(param_names)}):\n{textwrap.indent(body_text, '    ')}"
+    code = _compiled_code_cache.get_or_compile(
+        (digest, tuple(param_names)), build_source
+    )
 
     # Global namespace with all builtins available plus helper utilities
-    ns = {
-        "__builtins__": builtins,
-        "save": _save_content,
-        "load": _load_content,
-    }
-    ns.update(_SAFE_TYPING_GLOBALS)
+    ns = base_namespace()
 
     # Define and run
     # pylint: disable=exec-used
     # This is core functionality - dynamically executing user-defined server code.
     # Security: Only authenticated users can define servers, and code runs in app context
     # with proper authentication/authorization checks. All builtins are available by design.
-    exec(src, ns, ns)  # defines ns[fn_name]
+    exec(code, ns, ns)  # defines ns[fn_name]
     fn = ns[fn_name]
     kwargs = {p: arg_map[p] for p in param_names}
     return fn(**kwargs)